@@ -0,0 +1,218 @@
+"""
+本地复权计算
+- stock_zh_a_hist 日线的前复权（qfq）/后复权（hfq）请求改为获取不复权K线（经本地K线存储，历史部分不会再变化）
+  和分红送转事件（stock_fhps_detail_em），在本地计算复权价格；同一股票不同复权方式共用一份不复权K线
+- 除权除息参考价 = (前收盘 - 每股派现) / (1 + 每股送转)，每个事件是一个线性变换 p -> a*p + b：
+  前复权对除权日之前的K线依次应用之后的全部事件，后复权对除权日及之后的K线依次应用逆变换，
+  多个事件的复合变换用累积乘积/累积和一次算出，再按K线日期向量化套用
+- 分红送转事件按股票保存到磁盘，每天最多刷新一次：出现新的除权除息时只需刷新事件，不需要重新获取全部K线
+- 配股不在分红送转数据中，不参与计算
+"""
+import logging
+import os
+import pickle
+import threading
+from datetime import date, datetime
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from provider.akshare_cache import MARKET_TIMEZONE
+from provider.akshare_disk_cache import atomic_write, get_disk_cache_dir
+
+DIVIDEND_FUNCTION = 'stock_fhps_detail_em'
+
+# 支持本地复权的接口及其日期列
+ADJUST_FUNCTIONS = {
+    'stock_zh_a_hist': '日期',
+}
+LOCAL_ADJUST_MODES = ('qfq', 'hfq')
+
+# 按复权变换换算的价格列；涨跌额按同一变换的比例缩放，涨跌幅、振幅、成交量等不受复权影响
+PRICE_COLUMNS = ('开盘', '收盘', '最高', '最低')
+CHANGE_COLUMN = '涨跌额'
+PRICE_DECIMALS = 2
+
+# 分红送转数据中的列（比例均为每10股）
+EX_DATE_COLUMN = '除权除息日'
+CASH_COLUMN = '现金分红-现金分红比例'
+BONUS_COLUMN = '送转股份-送转总比例'
+
+
+def local_adjust_enabled() -> bool:
+    """AKSHARE_LOCAL_ADJUST=true 时开启本地复权（默认关闭，复权价格由数据源计算）"""
+    return os.environ.get('AKSHARE_LOCAL_ADJUST', 'false').strip().lower() in ('true', '1', 'yes')
+
+
+def get_adjust_store_dir() -> str:
+    return os.environ.get('AKSHARE_ADJUST_STORE_DIR') or os.path.join(get_disk_cache_dir(), 'adjust')
+
+
+def supports_local_adjust(function_name: str, call_kwargs: dict[str, Any]) -> bool:
+    """调用是否可以在本地复权：支持的接口、日线、前/后复权"""
+    if function_name not in ADJUST_FUNCTIONS or not call_kwargs.get('symbol'):
+        return False
+    return call_kwargs.get('period', 'daily') == 'daily' and call_kwargs.get('adjust') in LOCAL_ADJUST_MODES
+
+
+def build_adjustment_events(dividends: pd.DataFrame | None, today: date | None = None) -> pd.DataFrame:
+    """
+    从分红送转数据提取已经除权除息的事件，返回按除权除息日升序的 ex_date/cash/bonus（每股派现、每股送转）
+    同一天的多条记录合并；除权除息日晚于今天的方案尚未生效，不参与计算
+    """
+    columns = ['ex_date', 'cash', 'bonus']
+    if dividends is None or dividends.empty or EX_DATE_COLUMN not in dividends.columns:
+        return pd.DataFrame(columns=columns)
+    today = today or datetime.now(MARKET_TIMEZONE).date()
+    events = pd.DataFrame({
+        'ex_date': pd.to_datetime(dividends[EX_DATE_COLUMN], errors='coerce').dt.normalize(),
+        'cash': pd.to_numeric(dividends.get(CASH_COLUMN), errors='coerce') / 10,
+        'bonus': pd.to_numeric(dividends.get(BONUS_COLUMN), errors='coerce') / 10,
+    }).fillna({'cash': 0.0, 'bonus': 0.0})
+    events = events[events['ex_date'].notna() & (events['ex_date'] <= pd.Timestamp(today))]
+    events = events[(events['cash'] != 0) | (events['bonus'] != 0)]
+    return events.groupby('ex_date', as_index=False)[['cash', 'bonus']].sum().sort_values('ex_date').reset_index(drop=True)
+
+
+def adjustment_coefficients(events: pd.DataFrame, adjust: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    计算复权变换系数 (scale, offset)，长度为事件数+1：
+    第j项用于除权除息日位于第j个事件与第j+1个事件之间的K线，复权价格 = scale * 价格 + offset
+    """
+    cash = events['cash'].to_numpy(dtype='float64')
+    bonus = events['bonus'].to_numpy(dtype='float64')
+    if adjust == 'qfq':
+        # 单个事件：p -> (p - cash) / (1 + bonus)；第j段依次应用第j个及之后的全部事件
+        a = 1.0 / (1.0 + bonus)
+        b = -cash * a
+        suffix = np.append(np.cumprod(a[::-1])[::-1], 1.0)
+        offset = np.append(np.cumsum((b * suffix[1:])[::-1])[::-1], 0.0)
+        return suffix, offset
+    # 后复权：逆变换 p -> p * (1 + bonus) + cash；第j段从第j-1个事件倒序应用到第0个事件
+    prefix = np.append(1.0, np.cumprod(1.0 + bonus))
+    offset = np.append(0.0, np.cumsum(cash * prefix[:-1]))
+    return prefix, offset
+
+
+def adjust_bars(df: pd.DataFrame, events: pd.DataFrame, adjust: str, date_column: str = '日期') -> pd.DataFrame:
+    """对不复权K线按分红送转事件计算前复权/后复权价格，返回新的DataFrame"""
+    result = df.copy()
+    if result.empty or events.empty or date_column not in result.columns:
+        return result
+    scale, offset = adjustment_coefficients(events, adjust)
+    bar_dates = pd.to_datetime(result[date_column]).dt.normalize().to_numpy()
+    segment = np.searchsorted(events['ex_date'].to_numpy(), bar_dates, side='right')
+    bar_scale, bar_offset = scale[segment], offset[segment]
+    for column in PRICE_COLUMNS:
+        if column in result.columns:
+            prices = pd.to_numeric(result[column], errors='coerce').to_numpy(dtype='float64')
+            result[column] = np.round(prices * bar_scale + bar_offset, PRICE_DECIMALS)
+    if CHANGE_COLUMN in result.columns:
+        changes = pd.to_numeric(result[CHANGE_COLUMN], errors='coerce').to_numpy(dtype='float64')
+        result[CHANGE_COLUMN] = np.round(changes * bar_scale, PRICE_DECIMALS)
+    return result
+
+
+class AdjustmentEngine:
+    """按股票保存分红送转事件（每天最多刷新一次），在本地计算复权K线，线程安全"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._events: dict[str, tuple[date, pd.DataFrame]] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self._stats = {"adjusted_calls": 0, "event_hits": 0, "event_disk_hits": 0, "event_refreshes": 0}
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.directory, "".join(ch for ch in symbol if ch.isalnum()) + '.pkl')
+
+    def _lock(self, symbol: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _count(self, name: str) -> None:
+        with self._guard:
+            self._stats[name] += 1
+
+    def _load(self, symbol: str) -> tuple[date, pd.DataFrame] | None:
+        try:
+            with open(self._path(symbol), 'rb') as f:
+                payload = pickle.load(f)
+            return date.fromisoformat(payload['checked_on']), payload['events']
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Discarding unreadable adjustment events {self._path(symbol)}: {e}")
+            return None
+
+    def _save(self, symbol: str, checked_on: date, events: pd.DataFrame) -> None:
+        payload = {'symbol': symbol, 'checked_on': checked_on.isoformat(), 'events': events}
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            atomic_write(self._path(symbol), lambda f: pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            logging.warning(f"Failed to save adjustment events {self._path(symbol)}: {e}")
+
+    def get_events(self, symbol: str, fetch_dividends: Callable[[bool], Any], refresh: bool = False) -> pd.DataFrame:
+        """
+        股票的分红送转事件，当天已获取过时直接返回
+        fetch_dividends(use_cache) 获取分红送转原始数据；按天刷新时跳过结果缓存
+        """
+        today = datetime.now(MARKET_TIMEZONE).date()
+        with self._lock(symbol):
+            if not refresh:
+                entry = self._events.get(symbol)
+                if entry is not None and entry[0] == today:
+                    self._count("event_hits")
+                    return entry[1]
+                entry = self._load(symbol)
+                if entry is not None and entry[0] == today:
+                    self._count("event_disk_hits")
+                    self._events[symbol] = entry
+                    return entry[1]
+            self._count("event_refreshes")
+            events = build_adjustment_events(fetch_dividends(False), today)
+            self._events[symbol] = (today, events)
+            self._save(symbol, today, events)
+            return events
+
+    def fetch(
+        self,
+        function_name: str,
+        call_kwargs: dict[str, Any],
+        fetch_raw: Callable[[dict[str, Any]], Any],
+        fetch_dividends: Callable[[bool], Any],
+        refresh: bool = False,
+    ) -> Any:
+        """
+        获取不复权K线和分红送转事件并在本地复权
+        fetch_raw 接收 adjust 替换为空字符串的调用参数，返回不复权K线
+        """
+        raw = fetch_raw(dict(call_kwargs, adjust=''))
+        if not isinstance(raw, pd.DataFrame) or raw.empty:
+            return raw
+        events = self.get_events(str(call_kwargs['symbol']), fetch_dividends, refresh=refresh)
+        self._count("adjusted_calls")
+        return adjust_bars(raw, events, call_kwargs['adjust'], ADJUST_FUNCTIONS[function_name])
+
+    def clear(self) -> int:
+        """清除进程内和磁盘上的分红送转事件，返回删除的文件数"""
+        with self._guard:
+            self._events.clear()
+        removed = 0
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                    removed += 1
+                except OSError as e:
+                    logging.warning(f"Failed to remove adjustment events file {name}: {e}")
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        with self._guard:
+            stats: dict[str, Any] = dict(self._stats)
+            stats["symbols"] = len(self._events)
+        stats["directory"] = self.directory
+        return stats
@@ -0,0 +1,278 @@
+"""
+本地K线存储
+- 按 接口/周期/复权方式/股票代码 分区保存K线（安装了pyarrow时使用Parquet，否则使用pickle）
+- 每个分区记录已覆盖的日期区间，请求只获取缺失的头部或尾部区间并合并
+- 复权价格会随除权除息变化：尾部获取从最后一根已存K线开始重叠，价格不一致或没有重叠K线时丢弃分区重新全量获取
+"""
+import json
+import logging
+import os
+import pickle
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Callable
+
+import pandas as pd
+
+from provider.akshare_cache import MARKET_TIMEZONE
+from provider.akshare_disk_cache import atomic_write, get_disk_cache_dir
+
+# 支持增量存储的接口及其日期列
+BAR_STORE_FUNCTIONS = {
+    'stock_zh_a_hist': '日期',
+}
+BAR_PERIODS = ('daily', 'weekly', 'monthly')
+
+# 尾部获取从最后一根已存K线的日期再向前重叠的天数（周线/月线K线的日期不一定是周期最后一天）
+OVERLAP_DAYS = {'daily': 0, 'weekly': 7, 'monthly': 31}
+
+# 用于比较重叠K线的价格列
+PRICE_COLUMNS = ('开盘', '收盘', '最高', '最低')
+
+# 收盘数据稳定的时间（北京时间）
+SESSION_SETTLED_TIME = (15, 30)
+
+
+def bar_store_enabled() -> bool:
+    """AKSHARE_BAR_STORE=false 时关闭本地K线存储"""
+    return os.environ.get('AKSHARE_BAR_STORE', 'true').strip().lower() not in ('false', '0', 'no')
+
+
+def get_bar_store_dir() -> str:
+    return os.environ.get('AKSHARE_BAR_STORE_DIR') or os.path.join(get_disk_cache_dir(), 'bars')
+
+
+def _parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _parse_date(value: Any) -> date | None:
+    digits = "".join(ch for ch in str(value) if ch.isdigit())[:8]
+    if len(digits) != 8:
+        return None
+    try:
+        return datetime.strptime(digits, '%Y%m%d').date()
+    except ValueError:
+        return None
+
+
+def _format_date(value: date) -> str:
+    return value.strftime('%Y%m%d')
+
+
+def last_closed_date(period: str, now: datetime | None = None) -> date:
+    """
+    已经收盘、K线不会再变化的最后日期
+    - 日线：当天收盘结算后为当天，否则为前一天
+    - 周线/月线：上一个完整的自然周/月的最后一天（周末时本周视为已结束）
+    """
+    now = now or datetime.now(MARKET_TIMEZONE)
+    today = now.date()
+    settled_today = (now.hour, now.minute) >= SESSION_SETTLED_TIME
+    if period == 'weekly':
+        if today.weekday() >= 5:
+            return today
+        return today - timedelta(days=today.weekday() + 1)
+    if period == 'monthly':
+        return today.replace(day=1) - timedelta(days=1)
+    return today if settled_today else today - timedelta(days=1)
+
+
+def supports_bar_store(function_name: str, call_kwargs: dict[str, Any]) -> bool:
+    """调用是否可以使用本地K线存储：支持的接口、周期，且显式给出了合法的日期区间"""
+    if function_name not in BAR_STORE_FUNCTIONS or not call_kwargs.get('symbol'):
+        return False
+    if call_kwargs.get('period', 'daily') not in BAR_PERIODS:
+        return False
+    start = _parse_date(call_kwargs.get('start_date'))
+    end = _parse_date(call_kwargs.get('end_date'))
+    return start is not None and end is not None and start <= end
+
+
+class BarStore:
+    """按分区保存K线及其覆盖区间"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._locks: dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
+        self._stats = {"full_fetches": 0, "delta_fetches": 0, "store_hits": 0, "adjustment_resets": 0}
+
+    def _partition(self, function_name: str, call_kwargs: dict[str, Any]) -> str:
+        period = call_kwargs.get('period', 'daily')
+        adjust = call_kwargs.get('adjust') or 'none'
+        symbol = "".join(ch for ch in str(call_kwargs['symbol']) if ch.isalnum())
+        return os.path.join(self.directory, function_name, f"period={period}", f"adjust={adjust}", symbol)
+
+    def _lock(self, partition: str) -> threading.RLock:
+        with self._locks_guard:
+            return self._locks.setdefault(partition, threading.RLock())
+
+    def _load(self, partition: str) -> tuple[pd.DataFrame | None, dict[str, Any]]:
+        try:
+            with open(partition + '.json', 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('format') == 'parquet':
+                df = pd.read_parquet(partition + '.parquet')
+            else:
+                with open(partition + '.pkl', 'rb') as f:
+                    df = pickle.load(f)
+            # 数据和元数据分两次替换，中途中断时两者可能不配套，行数不符即视为无效分区
+            if meta.get('rows') != len(df):
+                logging.warning(f"Discarding bar store partition {partition}: meta rows {meta.get('rows')} != data rows {len(df)}")
+                return None, {}
+            return df, meta
+        except FileNotFoundError:
+            return None, {}
+        except Exception as e:
+            logging.warning(f"Discarding unreadable bar store partition {partition}: {e}")
+            return None, {}
+
+    def _save(self, partition: str, df: pd.DataFrame, meta: dict[str, Any]) -> None:
+        os.makedirs(os.path.dirname(partition), mode=0o700, exist_ok=True)
+        fmt = 'parquet' if _parquet_available() else 'pickle'
+        data_path = partition + ('.parquet' if fmt == 'parquet' else '.pkl')
+        meta = dict(meta, format=fmt, rows=len(df))
+
+        def write_data(f) -> None:
+            if fmt == 'parquet':
+                df.to_parquet(f, index=False)
+            else:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        try:
+            atomic_write(data_path, write_data)
+            atomic_write(partition + '.json', lambda f: json.dump(meta, f), mode='w')
+        except Exception as e:
+            logging.warning(f"Failed to save bar store partition {partition}: {e}")
+
+    def fetch(
+        self,
+        function_name: str,
+        call_kwargs: dict[str, Any],
+        fetch_range: Callable[[dict[str, Any]], Any],
+        refresh: bool = False,
+    ) -> Any:
+        """
+        获取请求区间的K线，只通过 fetch_range 获取本地未覆盖的区间
+        fetch_range 接收替换了 start_date/end_date 的调用参数并返回DataFrame
+        refresh=True 时重新获取整个请求区间，并以其替换本地分区
+        """
+        date_column = BAR_STORE_FUNCTIONS[function_name]
+        period = call_kwargs.get('period', 'daily')
+        req_start = _parse_date(call_kwargs['start_date'])
+        req_end = _parse_date(call_kwargs['end_date'])
+        closed_end = last_closed_date(period)
+        today = datetime.now(MARKET_TIMEZONE).date()
+        partition = self._partition(function_name, call_kwargs)
+
+        def fetch_segment(start: date, end: date) -> pd.DataFrame | None:
+            segment_kwargs = dict(call_kwargs, start_date=_format_date(start), end_date=_format_date(end))
+            result = fetch_range(segment_kwargs)
+            return result if isinstance(result, pd.DataFrame) else None
+
+        with self._lock(partition):
+            stored, meta = (None, {}) if refresh else self._load(partition)
+            if stored is not None and date_column not in stored.columns:
+                stored = None
+
+            if stored is None:
+                self._stats["full_fetches"] += 1
+                result = fetch_range(dict(call_kwargs))
+                if isinstance(result, pd.DataFrame) and not result.empty and date_column in result.columns:
+                    covered_end = min(req_end, closed_end)
+                    if req_start <= covered_end:
+                        meta = {"start": _format_date(req_start), "end": _format_date(covered_end), "validated_on": _format_date(today)}
+                        self._save(partition, result, meta)
+                return result
+
+            covered_start = _parse_date(meta["start"])
+            covered_end = _parse_date(meta["end"])
+            adjusted = bool(call_kwargs.get('adjust'))
+
+            head = None
+            if req_start < covered_start:
+                head = fetch_segment(req_start, covered_start - timedelta(days=1))
+
+            tail = None
+            # 覆盖区间的结束日可能是周末或节假日，从最后一根已存K线开始获取，保证尾部包含可比较的K线
+            last_bar = pd.to_datetime(stored[date_column]).max()
+            overlap_from = min(covered_end, last_bar.date()) if pd.notna(last_bar) else covered_end
+            tail_start = overlap_from - timedelta(days=OVERLAP_DAYS.get(period, 0))
+            if req_end > covered_end:
+                tail = fetch_segment(tail_start, req_end)
+            elif adjusted and meta.get("validated_on") != _format_date(today):
+                # 请求完全在本地覆盖范围内，但复权价格可能已因除权除息变化，每天校验一次最后一根K线
+                tail = fetch_segment(tail_start, covered_end)
+
+            if tail is not None and adjusted and not self._overlap_matches(date_column, stored, tail):
+                logging.info(f"Adjusted prices changed for {partition}, refetching the full range")
+                self._stats["adjustment_resets"] += 1
+                return self.fetch(function_name, call_kwargs, fetch_range, refresh=True)
+
+            if head is None and tail is None:
+                self._stats["store_hits"] += 1
+            else:
+                self._stats["delta_fetches"] += 1
+                new_end = max(covered_end, min(req_end, closed_end))
+                meta = {
+                    "start": _format_date(min(req_start, covered_start)),
+                    "end": _format_date(new_end),
+                    "validated_on": _format_date(today) if tail is not None else meta.get("validated_on"),
+                }
+                stored = self._merge(date_column, *(part for part in (head, stored, tail) if part is not None))
+                self._save(partition, stored, meta)
+
+            bar_dates = pd.to_datetime(stored[date_column]).dt.normalize()
+            mask = (bar_dates >= pd.Timestamp(req_start)) & (bar_dates <= pd.Timestamp(req_end))
+            return stored.loc[mask].reset_index(drop=True)
+
+    @staticmethod
+    def _merge(date_column: str, *parts: pd.DataFrame) -> pd.DataFrame:
+        """按日期合并K线，同一日期以后获取的数据为准"""
+        parts = [part for part in parts if part is not None and not part.empty and date_column in part.columns]
+        if not parts:
+            return pd.DataFrame()
+        merged = pd.concat(parts, ignore_index=True)
+        keys = pd.to_datetime(merged[date_column]).dt.normalize()
+        merged = merged.loc[~keys.duplicated(keep='last')]
+        order = pd.to_datetime(merged[date_column]).argsort(kind='stable')
+        return merged.iloc[order].reset_index(drop=True)
+
+    @staticmethod
+    def _overlap_matches(date_column: str, stored: pd.DataFrame, fetched: pd.DataFrame) -> bool:
+        """比较重叠日期上的复权价格，一致时返回True；没有可比较的重叠K线时无法确认未发生除权，返回False"""
+        if fetched.empty or date_column not in fetched.columns:
+            return False
+        columns = [col for col in PRICE_COLUMNS if col in stored.columns and col in fetched.columns]
+        if not columns:
+            return True
+        left = stored.assign(_bar_date=pd.to_datetime(stored[date_column]).dt.normalize()).set_index('_bar_date')[columns]
+        right = fetched.assign(_bar_date=pd.to_datetime(fetched[date_column]).dt.normalize()).set_index('_bar_date')[columns]
+        common = left.index.intersection(right.index)
+        if common.empty:
+            return False
+        left_values = left.loc[common].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        right_values = right.loc[common].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        return bool(((abs(left_values - right_values) <= 1e-6) | (pd.isna(left_values) & pd.isna(right_values))).all())
+
+    def purge(self) -> int:
+        """删除全部本地K线，返回删除的文件数"""
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                try:
+                    os.remove(os.path.join(root, name))
+                    removed += 1
+                except OSError as e:
+                    logging.warning(f"Failed to remove bar store file {name}: {e}")
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        stats: dict[str, Any] = dict(self._stats)
+        stats["directory"] = self.directory
+        return stats
@@ -0,0 +1,174 @@
+"""
+AKShare结果内存缓存
+- 按结果占用字节数限制总容量，超出时按最近最少使用（LRU）淘汰
+- 每个条目带独立的过期时间，由接口类型决定（见 INTERFACE_TIMEOUT_CONFIG 中的 cache_ttl）
+"""
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Hashable
+
+import pandas as pd
+
+from provider.akshare_singleflight import copy_result
+
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# A股交易时段按北京时间计算（无夏令时，使用固定时区即可）
+MARKET_TIMEZONE = timezone(timedelta(hours=8))
+MARKET_OPEN_TIME = (9, 15)
+MARKET_CLOSE_TIME = (15, 0)
+
+# 历史数据窗口包含当天且处于交易时段时使用的短缓存时间（秒）
+INTRADAY_HISTORY_TTL = 60.0
+
+
+def cache_enabled() -> bool:
+    """AKSHARE_CACHE=false 时关闭结果缓存"""
+    return os.environ.get('AKSHARE_CACHE', 'true').strip().lower() not in ('false', '0', 'no')
+
+
+def get_cache_max_bytes() -> int:
+    try:
+        return max(0, int(os.environ.get('AKSHARE_CACHE_MAX_BYTES', DEFAULT_CACHE_MAX_BYTES)))
+    except ValueError:
+        return DEFAULT_CACHE_MAX_BYTES
+
+
+def estimate_result_bytes(result: Any) -> int:
+    """估算结果占用的内存字节数"""
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(index=True, deep=True).sum())
+    if isinstance(result, pd.Series):
+        return int(result.memory_usage(index=True, deep=True))
+    try:
+        return len(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(result)
+
+
+def _now_in_market() -> datetime:
+    return datetime.now(MARKET_TIMEZONE)
+
+
+def is_market_session(now: datetime | None = None) -> bool:
+    """当前是否处于交易日的交易时段（不区分节假日）"""
+    now = now or _now_in_market()
+    if now.weekday() >= 5:
+        return False
+    return MARKET_OPEN_TIME <= (now.hour, now.minute) < MARKET_CLOSE_TIME
+
+
+def seconds_until_next_session(now: datetime | None = None) -> float:
+    """
+    距下一个交易日开盘的秒数
+    只跳过周末，节假日按交易日处理，缓存会提前过期而不会过期过晚
+    """
+    now = now or _now_in_market()
+    next_open = now.replace(hour=MARKET_OPEN_TIME[0], minute=MARKET_OPEN_TIME[1], second=0, microsecond=0)
+    if next_open <= now:
+        next_open += timedelta(days=1)
+    while next_open.weekday() >= 5:
+        next_open += timedelta(days=1)
+    return (next_open - now).total_seconds()
+
+
+def _window_ends_before_today(kwargs: dict[str, Any], now: datetime) -> bool:
+    """请求的日期窗口是否在今天之前结束（end_date 支持 YYYYMMDD 和 YYYY-MM-DD[ HH:MM:SS]）"""
+    end_date = kwargs.get('end_date')
+    if not end_date:
+        return False
+    digits = "".join(ch for ch in str(end_date) if ch.isdigit())[:8]
+    if len(digits) != 8:
+        return False
+    return digits < now.strftime('%Y%m%d')
+
+
+def resolve_cache_ttl(ttl_policy: Any, kwargs: dict[str, Any], now: datetime | None = None) -> float:
+    """
+    将接口类型的缓存策略转换为本次结果的缓存秒数
+    - 数字：固定秒数
+    - 'next_trading_day'：已收盘的历史K线缓存到下一个交易日开盘；
+      窗口包含当天且处于交易时段时，当天K线仍在变化，只短暂缓存
+    """
+    if ttl_policy == 'next_trading_day':
+        now = now or _now_in_market()
+        if is_market_session(now) and not _window_ends_before_today(kwargs, now):
+            return INTRADAY_HISTORY_TTL
+        return seconds_until_next_session(now)
+    try:
+        return max(0.0, float(ttl_policy))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ResultCache:
+    """按字节数限制容量的LRU结果缓存，存取时都复制结果，调用方可以安全地原地修改"""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (过期时间, 字节数, 结果)
+        self._entries: "OrderedDict[Hashable, tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "rejected": 0}
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """返回(是否命中, 结果副本)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return False, None
+            expires_at, nbytes, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= nbytes
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        return True, copy_result(value)
+
+    def put(self, key: Hashable, value: Any, ttl: float) -> bool:
+        """写入结果，超过总容量的单个结果不缓存"""
+        if ttl <= 0 or self.max_bytes <= 0:
+            return False
+        nbytes = estimate_result_bytes(value)
+        if nbytes > self.max_bytes:
+            with self._lock:
+                self._stats["rejected"] += 1
+            logging.info(f"Result of {nbytes} bytes exceeds cache capacity {self.max_bytes}, not cached")
+            return False
+        value = copy_result(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (time.monotonic() + ttl, nbytes, value)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted_bytes, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self._stats["evictions"] += 1
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """返回命中、未命中、过期、淘汰统计以及当前条目数和占用字节数"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+        return stats
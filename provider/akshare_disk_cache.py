@@ -0,0 +1,346 @@
+"""
+AKShare结果持久化磁盘缓存
+- 只缓存日期窗口已完全结束的调用结果（历史交易日、已过披露截止日的报告期），这些结果不再变化，永不过期
+- 总大小超过上限时按最近访问时间淘汰最旧的文件
+- 手动清理：python -m provider.akshare_disk_cache purge [--older-than 天数] [--bars] [--financial] [--adjust]
+"""
+import argparse
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable
+
+from provider.akshare_cache import MARKET_TIMEZONE
+
+DEFAULT_DISK_CACHE_MAX_BYTES = 512 * 1024 * 1024
+CACHE_FILE_SUFFIX = '.pkl'
+
+# 这些参数取值下，即使日期窗口已结束，结果也会随后续除权除息变化（前复权价格以最新价格为基准）
+NON_FINAL_PARAM_VALUES = {
+    'adjust': {'qfq', 'qfq-factor'},
+}
+
+# 季末报告期的法定披露截止日（月, 日, 是否跨年）
+REPORT_DEADLINES = {
+    3: (4, 30, False),   # 一季报
+    6: (8, 31, False),   # 半年报
+    9: (10, 31, False),  # 三季报
+    12: (4, 30, True),   # 年报
+}
+QUARTER_END_MONTHS = {1: 3, 2: 6, 3: 9, 4: 12}
+
+
+def disk_cache_enabled() -> bool:
+    """AKSHARE_DISK_CACHE=false 时关闭磁盘缓存"""
+    return os.environ.get('AKSHARE_DISK_CACHE', 'true').strip().lower() not in ('false', '0', 'no')
+
+
+def get_disk_cache_dir() -> str:
+    return os.environ.get('AKSHARE_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'akshare_stockdata_cache')
+
+
+def get_disk_cache_max_bytes() -> int:
+    try:
+        return max(0, int(os.environ.get('AKSHARE_DISK_CACHE_MAX_BYTES', DEFAULT_DISK_CACHE_MAX_BYTES)))
+    except ValueError:
+        return DEFAULT_DISK_CACHE_MAX_BYTES
+
+
+def _parse_date(value: Any) -> date | None:
+    digits = "".join(ch for ch in str(value) if ch.isdigit())[:8]
+    if len(digits) != 8:
+        return None
+    try:
+        return datetime.strptime(digits, '%Y%m%d').date()
+    except ValueError:
+        return None
+
+
+def _report_period_final_date(value: Any) -> date | None:
+    """
+    报告期数据不再变化的日期（披露截止日的次日）
+    支持 YYYYMMDD（季末日期）、YYYYQ（如 20231 表示2023年一季度）和 YYYY（年报）
+    """
+    digits = "".join(ch for ch in str(value) if ch.isdigit())
+    if len(digits) == 5 and digits[4] in '1234':
+        month = QUARTER_END_MONTHS[int(digits[4])]
+        period_end = date(int(digits[:4]), month, 1)
+    elif len(digits) == 4:
+        period_end = date(int(digits), 12, 1)
+    else:
+        period_end = _parse_date(digits)
+        if period_end is None:
+            return None
+    deadline = REPORT_DEADLINES.get(period_end.month)
+    if deadline is None:
+        # 非季末日期，保守地按4个月披露期处理
+        return period_end + timedelta(days=122)
+    month, day, next_year = deadline
+    return date(period_end.year + (1 if next_year else 0), month, day) + timedelta(days=1)
+
+
+def next_report_due_date(today: date | None = None) -> date:
+    """
+    下一个报告期披露截止日的次日
+    在此之前已披露的财务数据不会被新的报告期取代，可用于判断财务数据缓存何时失效
+    """
+    today = today or datetime.now(MARKET_TIMEZONE).date()
+    candidates = [
+        _report_period_final_date(f"{year}{month:02d}01")
+        for year in (today.year - 1, today.year)
+        for month in REPORT_DEADLINES
+    ]
+    return min(candidate for candidate in candidates if candidate is not None and candidate > today)
+
+
+def latest_disclosed_report_period(today: date | None = None, annual_only: bool = False) -> str:
+    """
+    披露截止日已过（全部公司均已披露）的最近一个报告期，格式 YYYYMMDD
+    annual_only 为True时只考虑年报（12月31日）
+    """
+    today = today or datetime.now(MARKET_TIMEZONE).date()
+    months = [12] if annual_only else sorted(REPORT_DEADLINES)
+    periods = [
+        date(year, month, 31 if month in (3, 12) else 30)
+        for year in range(today.year - 2, today.year + 1)
+        for month in months
+    ]
+    disclosed = [period for period in periods if _report_period_final_date(period.strftime('%Y%m%d')) <= today]
+    return max(disclosed).strftime('%Y%m%d')
+
+
+def is_closed_window(temporal_params: dict[str, str] | None, call_kwargs: dict[str, Any], today: date | None = None) -> bool:
+    """
+    判断调用的日期窗口是否已完全结束
+    - 所有标记为日期类的参数都必须显式传入且早于今天（报告期需已过披露截止日）
+    - 未标记日期类参数的接口、或参数取值会导致历史结果变化时（如前复权）返回False
+    """
+    if not temporal_params:
+        return False
+    for param_name, final_values in NON_FINAL_PARAM_VALUES.items():
+        if str(call_kwargs.get(param_name, '')).lower() in final_values:
+            return False
+    today = today or datetime.now(MARKET_TIMEZONE).date()
+    for param_name, kind in temporal_params.items():
+        value = call_kwargs.get(param_name)
+        if value in (None, ''):
+            return False
+        if kind == 'report_period':
+            final_date = _report_period_final_date(value)
+            if final_date is None or final_date > today:
+                return False
+        else:
+            value_date = _parse_date(value)
+            if value_date is None or value_date >= today:
+                return False
+    return True
+
+
+def atomic_write(path: str, writer: Callable[[Any], None], mode: str = 'wb') -> None:
+    """
+    先写同目录下的临时文件再原子替换，避免并发读取到半截文件
+    writer 接收打开的临时文件对象；写入或替换失败时删除临时文件并抛出原异常，由调用方决定如何处理
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    replaced = False
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            writer(f)
+        os.replace(tmp_path, path)
+        replaced = True
+    finally:
+        if not replaced:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+class DiskCache:
+    """以文件形式保存结果的持久化缓存，每个结果一个pickle文件，文件修改时间作为最近访问时间"""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_DISK_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + CACHE_FILE_SUFFIX)
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        """返回(最近访问时间, 字节数, 路径)列表"""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not name.endswith(CACHE_FILE_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """返回(是否命中, 结果)"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                stored_key, value = pickle.load(f)
+        except FileNotFoundError:
+            with self._lock:
+                self._stats["misses"] += 1
+            return False, None
+        except Exception as e:
+            # 文件损坏或版本不兼容时删除，下次重新获取
+            logging.warning(f"Discarding unreadable disk cache entry {path}: {e}")
+            self._remove(path)
+            with self._lock:
+                self._stats["errors"] += 1
+                self._stats["misses"] += 1
+            return False, None
+        if stored_key != key:
+            with self._lock:
+                self._stats["misses"] += 1
+            return False, None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self._stats["hits"] += 1
+        return True, value
+
+    def put(self, key: str, value: Any) -> bool:
+        if self.max_bytes <= 0:
+            return False
+        try:
+            data = pickle.dumps((key, value), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logging.info(f"Result not picklable, skipping disk cache: {e}")
+            return False
+        if len(data) > self.max_bytes:
+            return False
+        path = self._path(key)
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            atomic_write(path, lambda f: f.write(data))
+        except OSError as e:
+            logging.warning(f"Failed to write disk cache entry: {e}")
+            with self._lock:
+                self._stats["errors"] += 1
+            return False
+        with self._lock:
+            self._stats["writes"] += 1
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            else:
+                self._total_bytes += len(data) - previous_size
+            over_limit = self._total_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+        return True
+
+    def evict(self) -> int:
+        """删除最久未访问的文件，直到总大小不超过上限"""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if self._remove(path):
+                    total -= size
+                    removed += 1
+            self._total_bytes = total
+            self._stats["evictions"] += removed
+        return removed
+
+    def purge(self, older_than_seconds: float | None = None) -> tuple[int, int]:
+        """删除缓存文件，指定时间时只删除更早访问的文件，返回(文件数, 字节数)"""
+        cutoff = time.time() - older_than_seconds if older_than_seconds is not None else None
+        removed = freed = 0
+        with self._lock:
+            for mtime, size, path in self._entries():
+                if cutoff is not None and mtime >= cutoff:
+                    continue
+                if self._remove(path):
+                    removed += 1
+                    freed += size
+            self._total_bytes = None
+        return removed, freed
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logging.warning(f"Failed to remove disk cache entry {path}: {e}")
+            return False
+
+    def stats(self) -> dict[str, Any]:
+        entries = self._entries()
+        with self._lock:
+            stats = dict(self._stats)
+        stats["entries"] = len(entries)
+        stats["bytes"] = sum(size for _, size, _ in entries)
+        stats["max_bytes"] = self.max_bytes
+        stats["directory"] = self.directory
+        return stats
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="AKShare结果磁盘缓存管理")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    purge_parser = subparsers.add_parser("purge", help="删除缓存文件")
+    purge_parser.add_argument("--older-than", type=float, default=None, metavar="DAYS",
+                              help="只删除超过指定天数未访问的文件")
+    purge_parser.add_argument("--bars", action="store_true", help="同时删除本地K线存储")
+    purge_parser.add_argument("--financial", action="store_true", help="同时删除财务数据存储")
+    purge_parser.add_argument("--adjust", action="store_true", help="同时删除本地复权使用的分红送转事件")
+    subparsers.add_parser("stats", help="显示缓存目录、文件数和占用空间")
+    args = parser.parse_args(argv)
+
+    cache = DiskCache(get_disk_cache_dir(), get_disk_cache_max_bytes())
+    if args.command == "purge":
+        older_than = args.older_than * 86400 if args.older_than is not None else None
+        removed, freed = cache.purge(older_than)
+        print(f"Removed {removed} entries ({freed} bytes) from {cache.directory}")
+        if args.bars:
+            from provider.akshare_bar_store import BarStore, get_bar_store_dir
+            bar_store = BarStore(get_bar_store_dir())
+            print(f"Removed {bar_store.purge()} files from {bar_store.directory}")
+        if args.financial:
+            from provider.akshare_financial_store import FinancialDataStore, get_financial_store_dir
+            financial_store = FinancialDataStore(get_financial_store_dir())
+            print(f"Removed {financial_store.clear()} files from {financial_store.directory}")
+        if args.adjust:
+            from provider.akshare_adjust import AdjustmentEngine, get_adjust_store_dir
+            adjustment_engine = AdjustmentEngine(get_adjust_store_dir())
+            print(f"Removed {adjustment_engine.clear()} files from {adjustment_engine.directory}")
+    else:
+        for name, value in cache.stats().items():
+            print(f"{name}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
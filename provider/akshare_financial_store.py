@@ -0,0 +1,221 @@
+"""
+财务数据共享存储
+- stock_financial_analysis_indicator 的结果按 股票代码/起始年份 在进程内共享：动态估值、历史估值和API管理器
+  等所有估值计算路径使用同一份数据，并持久化到磁盘，插件重启后仍可直接使用
+- 不按容量淘汰：条目在获取之后的下一个财务报告披露截止日失效（见 REPORT_DEADLINES），此前不会出现新的报告期数据
+- 同一股票的并发请求只获取一次；use_cache=False 时重新获取并替换已存数据
+"""
+import logging
+import os
+import pickle
+import threading
+from datetime import date, datetime
+from typing import Any
+
+import pandas as pd
+
+from provider.akshare_cache import MARKET_TIMEZONE
+from provider.akshare_disk_cache import atomic_write, get_disk_cache_dir, next_report_due_date
+from provider.akshare_stockdata import safe_ak_call
+
+FINANCIAL_FUNCTION = 'stock_financial_analysis_indicator'
+DEFAULT_START_YEAR = '2020'
+
+
+def financial_store_enabled() -> bool:
+    """AKSHARE_FINANCIAL_STORE=false 时财务数据只在进程内共享，不写入磁盘"""
+    return os.environ.get('AKSHARE_FINANCIAL_STORE', 'true').strip().lower() not in ('false', '0', 'no')
+
+
+def get_financial_store_dir() -> str:
+    return os.environ.get('AKSHARE_FINANCIAL_STORE_DIR') or os.path.join(get_disk_cache_dir(), 'financial')
+
+
+def build_annual_financial_cache(financial_data: pd.DataFrame | None) -> dict[int, dict]:
+    """从财务分析指标中提取各年报（12月31日）的估值相关字段，返回 {年度: 指标}"""
+    if financial_data is None or financial_data.empty:
+        return {}
+    financial_data = financial_data.copy()
+    # 将财务数据日期转换为datetime
+    financial_data['日期'] = pd.to_datetime(financial_data['日期'])
+
+    # 获取所有可用的年报数据，按年度分组
+    annual_data = financial_data[
+        (financial_data['日期'].dt.month == 12) &
+        (financial_data['日期'].dt.day == 31)
+    ].sort_values('日期')
+
+    cache = {}
+    for _, financial_row in annual_data.iterrows():
+        year = financial_row['日期'].year
+        cache[year] = {
+            'eps': pd.to_numeric(financial_row['摊薄每股收益(元)'], errors='coerce'),
+            'bps': pd.to_numeric(financial_row['每股净资产_调整前(元)'], errors='coerce'),
+            'cps': pd.to_numeric(financial_row['每股经营性现金流(元)'], errors='coerce'),
+            'w_eps': pd.to_numeric(financial_row['加权每股收益(元)'], errors='coerce'),
+            'n_eps': pd.to_numeric(financial_row['扣除非经常性损益后的每股收益(元)'], errors='coerce'),
+            'adj_bps': pd.to_numeric(financial_row['每股净资产_调整后(元)'], errors='coerce'),
+            'cap_reserve': pd.to_numeric(financial_row['每股资本公积金(元)'], errors='coerce'),
+            'undist_profit': pd.to_numeric(financial_row['每股未分配利润(元)'], errors='coerce'),
+            'growth_rate': pd.to_numeric(financial_row['净利润增长率(%)'], errors='coerce'),
+            'roe': pd.to_numeric(financial_row['净资产收益率(%)'], errors='coerce'),
+            'date': financial_row['日期']
+        }
+    return cache
+
+
+class _Entry:
+    __slots__ = ('data', 'expires', 'annual')
+
+    def __init__(self, data: pd.DataFrame, expires: date):
+        self.data = data
+        self.expires = expires
+        self.annual: dict[int, dict] | None = None
+
+
+class FinancialDataStore:
+    """按股票代码共享的财务分析指标，线程安全，按财报披露截止日失效"""
+
+    def __init__(self, directory: str, persist: bool = True):
+        self.directory = directory
+        self.persist = persist
+        self._entries: dict[tuple[str, str], _Entry] = {}
+        self._locks: dict[tuple[str, str], threading.Lock] = {}
+        self._guard = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "refreshes": 0, "errors": 0}
+
+    def _path(self, key: tuple[str, str]) -> str:
+        symbol = "".join(ch for ch in key[0] if ch.isalnum())
+        return os.path.join(self.directory, f"{symbol}_{key[1]}.pkl")
+
+    def _lock(self, key: tuple[str, str]) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _count(self, name: str) -> None:
+        with self._guard:
+            self._stats[name] += 1
+
+    def _load(self, key: tuple[str, str]) -> _Entry | None:
+        try:
+            with open(self._path(key), 'rb') as f:
+                payload = pickle.load(f)
+            return _Entry(payload['data'], date.fromisoformat(payload['expires']))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Discarding unreadable financial store entry {self._path(key)}: {e}")
+            return None
+
+    def _save(self, key: tuple[str, str], entry: _Entry) -> None:
+        payload = {
+            'symbol': key[0],
+            'start_year': key[1],
+            'fetched_at': datetime.now(MARKET_TIMEZONE).isoformat(),
+            'expires': entry.expires.isoformat(),
+            'data': entry.data,
+        }
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            atomic_write(self._path(key), lambda f: pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            logging.warning(f"Failed to save financial store entry {self._path(key)}: {e}")
+
+    def _entry(self, symbol: str, start_year: str, retries: int, timeout: float, use_cache: bool) -> _Entry | None:
+        key = (str(symbol), str(start_year))
+        today = datetime.now(MARKET_TIMEZONE).date()
+        with self._lock(key):
+            if use_cache:
+                entry = self._entries.get(key)
+                if entry is not None and entry.expires > today:
+                    self._count("hits")
+                    return entry
+                if entry is None and self.persist:
+                    entry = self._load(key)
+                    if entry is not None and entry.expires > today:
+                        self._count("disk_hits")
+                        self._entries[key] = entry
+                        return entry
+                if entry is not None:
+                    self._count("expired")
+                self._count("misses")
+            else:
+                self._count("refreshes")
+
+            try:
+                data = safe_ak_call(
+                    FINANCIAL_FUNCTION,
+                    retries=retries,
+                    timeout=timeout,
+                    use_cache=use_cache,
+                    symbol=key[0],
+                    start_year=key[1]
+                )
+            except Exception:
+                self._count("errors")
+                raise
+            if data is None or data.empty:
+                # 空结果不保存，下次请求重新获取
+                return None
+            entry = _Entry(data, next_report_due_date(today))
+            self._entries[key] = entry
+            if self.persist:
+                self._save(key, entry)
+            return entry
+
+    def get_indicator_data(
+        self, symbol: str, start_year: str = DEFAULT_START_YEAR, retries: int = 3, timeout: float = 300, use_cache: bool = True
+    ) -> pd.DataFrame | None:
+        """财务分析指标原始数据（副本，调用方可以修改），无数据时返回None"""
+        entry = self._entry(symbol, start_year, retries, timeout, use_cache)
+        return entry.data.copy() if entry is not None else None
+
+    def get_annual_cache(
+        self, symbol: str, start_year: str = DEFAULT_START_YEAR, retries: int = 3, timeout: float = 300, use_cache: bool = True
+    ) -> dict[int, dict]:
+        """各年报的估值相关字段 {年度: 指标}，同一份数据只提取一次"""
+        entry = self._entry(symbol, start_year, retries, timeout, use_cache)
+        if entry is None:
+            return {}
+        with self._lock((str(symbol), str(start_year))):
+            if entry.annual is None:
+                entry.annual = build_annual_financial_cache(entry.data)
+            return entry.annual
+
+    def clear(self) -> int:
+        """清除进程内和磁盘上的全部条目，返回删除的文件数"""
+        with self._guard:
+            self._entries.clear()
+        removed = 0
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                    removed += 1
+                except OSError as e:
+                    logging.warning(f"Failed to remove financial store file {name}: {e}")
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        with self._guard:
+            stats: dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        stats["directory"] = self.directory if self.persist else None
+        return stats
+
+
+_financial_store: FinancialDataStore | None = None
+_financial_store_lock = threading.Lock()
+
+
+def get_financial_data_store() -> FinancialDataStore:
+    global _financial_store
+    with _financial_store_lock:
+        if _financial_store is None:
+            _financial_store = FinancialDataStore(get_financial_store_dir(), persist=financial_store_enabled())
+        return _financial_store
+
+
+def get_financial_store_stats() -> dict[str, Any]:
+    """返回财务数据存储的命中（hits内存/disk_hits磁盘）、未命中、过期、强制刷新和失败次数"""
+    return get_financial_data_store().stats()
@@ -0,0 +1,431 @@
+"""
+AKShare进程间通信协议 - 父进程与工作进程之间的长度前缀帧格式
+
+每一帧由4字节大端序长度头和对应长度的负载组成。一条消息由一个JSON头帧和若干二进制数据帧组成，
+头帧中的frames字段给出后续数据帧的数量。
+
+DataFrame结果支持两种编码，由父进程声明可接受的格式、工作进程选择：
+- pickle5：pickle协议5，数值列缓冲区以带外数据帧传输，完整保留dtype，解码无需逐行解析
+- json：与旧版一致的to_json记录格式，作为兼容回退
+
+大结果集（带外缓冲区总量超过AKSHARE_SHM_THRESHOLD）在POSIX系统上改用共享内存段传递数值缓冲区，
+管道中只传输段名称和长度，父进程直接映射共享内存构建DataFrame而无需复制。
+段名称使用父进程为每次调用分配的前缀，父进程在映射后立即unlink，
+并在超时、崩溃等任何失败路径上按前缀清理残留的段。
+
+本模块只依赖标准库，工作进程（以脚本方式运行）和父进程均可直接导入。
+"""
+import glob
+import itertools
+import json
+import os
+import pickle
+import secrets
+import select
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple
+
+# 帧长度头：4字节无符号大端整数
+FRAME_HEADER = struct.Struct('>I')
+
+# 单帧最大长度（1GB），用于识别损坏的数据流
+MAX_FRAME_SIZE = 1 << 30
+
+# 单次读取的块大小
+READ_CHUNK_SIZE = 1 << 20
+
+# DataFrame编码格式
+IPC_FORMAT_PICKLE5 = 'pickle5'
+IPC_FORMAT_JSON = 'json'
+SUPPORTED_IPC_FORMATS = (IPC_FORMAT_PICKLE5, IPC_FORMAT_JSON)
+
+# 使用共享内存传递带外缓冲区的默认阈值（字节）
+DEFAULT_SHM_THRESHOLD = 1 << 20
+
+# 流式传输时单个数据页的默认字节预算
+DEFAULT_STREAM_PAGE_BYTES = 4 << 20
+
+# 单次子进程模式下帧格式输出的标识前缀，旧版纯JSON输出不会以该前缀开头
+FRAMED_OUTPUT_MAGIC = b'AKIPC1\n'
+
+
+class FrameTimeoutError(TimeoutError):
+    """在截止时间前未能读取完整帧"""
+
+
+class FrameEOFError(EOFError):
+    """对端在帧传输过程中关闭了管道"""
+
+
+def write_frame(stream: BinaryIO, payload: bytes) -> None:
+    """写入一帧并立即刷新"""
+    stream.write(FRAME_HEADER.pack(memoryview(payload).nbytes))
+    stream.write(payload)
+    stream.flush()
+
+
+def read_frame(stream: BinaryIO) -> Optional[bytes]:
+    """阻塞读取一帧（工作进程侧使用），对端正常关闭时返回None"""
+    header = _read_exact_stream(stream, FRAME_HEADER.size)
+    if header is None:
+        return None
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame too large: {length} bytes")
+    payload = _read_exact_stream(stream, length)
+    if payload is None:
+        raise FrameEOFError("Stream closed in the middle of a frame")
+    return payload
+
+
+def _read_exact_stream(stream: BinaryIO, size: int) -> Optional[bytes]:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = stream.read(size - len(buffer))
+        if not chunk:
+            if not buffer:
+                return None
+            raise FrameEOFError("Stream closed in the middle of a frame")
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+def read_frame_from_fd(fd: int, deadline: Optional[float] = None) -> bytearray:
+    """
+    从文件描述符读取一帧（父进程侧使用）
+
+    使用select等待数据可读，在gevent环境下select会被协作式替换，不会阻塞事件循环。
+    deadline为time.monotonic()时间点，超过后抛出FrameTimeoutError。
+    返回可写的bytearray，pickle带外缓冲区可直接引用而无需再次复制。
+    """
+    header = _read_exact_fd(fd, FRAME_HEADER.size, deadline)
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame too large: {length} bytes")
+    return _read_exact_fd(fd, length, deadline)
+
+
+def _read_exact_fd(fd: int, size: int, deadline: Optional[float]) -> bytearray:
+    # 预分配缓冲区并直接读入，避免大帧在拼接时反复复制
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise FrameTimeoutError(f"Timed out after reading {received}/{size} bytes")
+        else:
+            remaining = None
+        readable, _, _ = select.select([fd], [], [], remaining)
+        if not readable:
+            continue
+        try:
+            count = os.readv(fd, [view[received:received + READ_CHUNK_SIZE]])
+        except BlockingIOError:
+            continue
+        if not count:
+            raise FrameEOFError(f"Pipe closed after reading {received}/{size} bytes")
+        received += count
+    view.release()
+    return buffer
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """将消息编码为JSON帧负载，UTF-8失败时回退到ASCII安全模式"""
+    try:
+        return json.dumps(message, ensure_ascii=False).encode('utf-8')
+    except UnicodeEncodeError:
+        return json.dumps(message, ensure_ascii=True).encode('utf-8')
+
+
+def decode_message(payload: bytes) -> Dict[str, Any]:
+    """解码JSON帧负载"""
+    return json.loads(payload.decode('utf-8', errors='replace'))
+
+
+def estimate_row_bytes(df: Any) -> float:
+    """按内存占用估算DataFrame每行字节数（至少1字节）"""
+    if len(df) == 0:
+        return 1.0
+    return max(1.0, float(df.memory_usage(index=True, deep=True).sum()) / len(df))
+
+
+def limit_dataframe(df: Any, max_rows: Optional[int] = None, max_bytes: Optional[int] = None) -> Tuple[Any, int, bool]:
+    """
+    按调用方显式给出的行数/字节数上限截取DataFrame
+
+    返回(截取后的DataFrame, 原始行数, 是否发生截断)。未给出上限时原样返回。
+    """
+    total_rows = len(df)
+    limit = total_rows
+    if max_rows is not None and max_rows >= 0:
+        limit = min(limit, int(max_rows))
+    if max_bytes is not None and max_bytes > 0 and total_rows > 0:
+        limit = min(limit, max(1, int(max_bytes // estimate_row_bytes(df))))
+    if limit < total_rows:
+        return df.iloc[:limit], total_rows, True
+    return df, total_rows, False
+
+
+def iter_dataframe_pages(df: Any, page_bytes: Optional[int] = None):
+    """按字节预算将DataFrame切分为连续的行分页（保留原始索引）"""
+    page_bytes = page_bytes or DEFAULT_STREAM_PAGE_BYTES
+    total_rows = len(df)
+    if total_rows == 0:
+        return
+    rows_per_page = max(1, int(page_bytes // estimate_row_bytes(df)))
+    for start in range(0, total_rows, rows_per_page):
+        yield df.iloc[start:start + rows_per_page]
+
+
+def negotiate_format(accepted: Optional[Sequence[str]]) -> str:
+    """按父进程声明的优先顺序选择第一个支持的编码格式，默认回退到JSON"""
+    for fmt in accepted or ():
+        if fmt in SUPPORTED_IPC_FORMATS:
+            return fmt
+    return IPC_FORMAT_JSON
+
+
+def parse_accept_formats(value: Optional[str]) -> List[str]:
+    """解析逗号分隔的格式列表，例如 "pickle5,json" """
+    if not value:
+        return [IPC_FORMAT_JSON]
+    return [item.strip().lower() for item in value.split(',') if item.strip()]
+
+
+def get_preferred_formats() -> List[str]:
+    """
+    父进程可接受的编码格式（按优先顺序）
+
+    由环境变量AKSHARE_IPC_FORMAT指定首选格式（默认pickle5），JSON始终作为最后的回退格式。
+    """
+    preferred = os.environ.get('AKSHARE_IPC_FORMAT', IPC_FORMAT_PICKLE5).strip().lower()
+    formats = [preferred] if preferred in SUPPORTED_IPC_FORMATS else []
+    if IPC_FORMAT_JSON not in formats:
+        formats.append(IPC_FORMAT_JSON)
+    return formats
+
+
+def encode_dataframe_pickle(df: Any) -> List[Any]:
+    """
+    使用pickle协议5编码DataFrame
+
+    返回数据帧列表：第一帧为pickle主体，其余为numpy数值块的带外缓冲区（零拷贝memoryview）。
+    """
+    buffers: List[pickle.PickleBuffer] = []
+    main = pickle.dumps(df, protocol=5, buffer_callback=buffers.append)
+    return [main] + [buffer.raw() for buffer in buffers]
+
+
+def decode_dataframe_pickle(frames: Sequence[Any], shm_buffers: Optional[Sequence[Any]] = None) -> Any:
+    """
+    解码pickle协议5编码的DataFrame
+
+    shm_buffers与带外缓冲区一一对应：None表示该缓冲区随数据帧传输，
+    [段名称, 字节数]表示该缓冲区位于共享内存段中。
+    数据仅来自本插件启动的工作进程，不接受外部输入。
+    """
+    if not frames:
+        raise ValueError("Missing pickle payload frame")
+    inline = iter(frames[1:])
+    if not shm_buffers:
+        buffers = list(inline)
+    else:
+        buffers = []
+        for descriptor in shm_buffers:
+            if descriptor is None:
+                buffers.append(next(inline))
+            else:
+                name, size = descriptor
+                buffers.append(attach_shm_buffer(name, int(size)))
+    return pickle.loads(frames[0], buffers=buffers)
+
+
+# ---------------------------------------------------------------------------
+# 共享内存段管理
+# ---------------------------------------------------------------------------
+
+_shm_counter = itertools.count(1)
+_shm_token = secrets.token_hex(3)
+
+# 父进程已映射、仍被DataFrame引用的共享内存段；引用释放后在下次清理时关闭
+_attached_segments: List[shared_memory.SharedMemory] = []
+_attached_lock = threading.Lock()
+
+
+def shm_supported() -> bool:
+    """共享内存传输仅在POSIX系统启用（Windows上段随最后一个句柄关闭而销毁）"""
+    return os.name == 'posix'
+
+
+def get_shm_threshold() -> int:
+    """读取共享内存传输阈值（字节），0表示禁用"""
+    try:
+        return int(os.environ.get('AKSHARE_SHM_THRESHOLD', DEFAULT_SHM_THRESHOLD))
+    except (TypeError, ValueError):
+        return DEFAULT_SHM_THRESHOLD
+
+
+def new_shm_prefix() -> str:
+    """为一次调用分配唯一的共享内存段名前缀"""
+    return f"akipc_{os.getpid()}_{_shm_token}_{next(_shm_counter)}_"
+
+
+def _create_untracked_segment(name: str, size: int) -> shared_memory.SharedMemory:
+    """创建不受resource_tracker管理的共享内存段，工作进程退出时不会自动unlink"""
+    try:
+        return shared_memory.SharedMemory(name=name, create=True, size=size, track=False)
+    except TypeError:
+        # Python 3.12没有track参数，创建后手动取消登记
+        segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(segment._name, "shared_memory")
+        except Exception:
+            pass
+        return segment
+
+
+def export_buffers_to_shm(
+    buffers: Sequence[Any], prefix: Optional[str], threshold: int
+) -> Tuple[Optional[List[Any]], List[Any]]:
+    """
+    工作进程侧：将带外缓冲区写入共享内存段
+
+    返回(shm描述列表, 仍需随数据帧传输的缓冲区列表)。未启用或未达到阈值时描述列表为None。
+    创建过程中出错会清理已创建的段并回退到数据帧传输。
+    """
+    if not prefix or threshold <= 0 or not shm_supported() or not buffers:
+        return None, list(buffers)
+    total = sum(memoryview(buffer).nbytes for buffer in buffers)
+    if total < threshold:
+        return None, list(buffers)
+
+    descriptors: List[Any] = []
+    created: List[str] = []
+    try:
+        for buffer in buffers:
+            view = memoryview(buffer).cast('B')
+            size = view.nbytes
+            if size == 0:
+                descriptors.append(None)
+                continue
+            # 按创建顺序连续编号，便于在无法枚举的系统上按序号探测清理
+            name = f"{prefix}{len(created)}"
+            segment = _create_untracked_segment(name, size)
+            created.append(name)
+            segment.buf[:size] = view
+            segment.close()
+            descriptors.append([name, size])
+    except Exception:
+        release_shm_segments(prefix)
+        return None, list(buffers)
+    inline = [buffer for buffer, descriptor in zip(buffers, descriptors) if descriptor is None]
+    return descriptors, inline
+
+
+def attach_shm_buffer(name: str, size: int) -> memoryview:
+    """
+    父进程侧：映射共享内存段并立即unlink
+
+    unlink后段名称不再可见，映射在所有引用释放后由操作系统回收，
+    因此即使后续处理出错也不会遗留段。
+    """
+    segment = shared_memory.SharedMemory(name=name)
+    try:
+        segment.unlink()
+    except FileNotFoundError:
+        pass
+    with _attached_lock:
+        _attached_segments.append(segment)
+    return segment.buf[:size]
+
+
+def sweep_attached_segments() -> int:
+    """关闭已不再被DataFrame引用的共享内存映射，返回仍在使用的段数量"""
+    with _attached_lock:
+        still_used = []
+        for segment in _attached_segments:
+            try:
+                segment.close()
+            except BufferError:
+                still_used.append(segment)
+        _attached_segments[:] = still_used
+        return len(still_used)
+
+
+def release_shm_segments(prefix: str) -> int:
+    """
+    清理指定前缀下残留的共享内存段（用于超时、崩溃和解码失败等路径）
+
+    Linux上直接枚举/dev/shm，其他POSIX系统按段序号依次探测。返回清理的段数量。
+    """
+    if not prefix or not shm_supported():
+        return 0
+    if os.path.isdir('/dev/shm'):
+        names = [os.path.basename(path) for path in glob.glob(os.path.join('/dev/shm', glob.escape(prefix) + '*'))]
+    else:
+        names = (f"{prefix}{index}" for index in itertools.count())
+    released = 0
+    for name in names:
+        try:
+            segment = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            if isinstance(names, list):
+                continue
+            break
+        try:
+            segment.unlink()
+            released += 1
+        except FileNotFoundError:
+            pass
+        finally:
+            segment.close()
+    return released
+
+
+def write_message(stream: BinaryIO, header: Dict[str, Any], body_frames: Sequence[Any] = ()) -> int:
+    """写入一条消息（JSON头帧 + 数据帧），返回写入的负载字节数"""
+    header = dict(header, frames=len(body_frames))
+    payload = encode_message(header)
+    write_frame(stream, payload)
+    total = len(payload)
+    for frame in body_frames:
+        write_frame(stream, frame)
+        total += memoryview(frame).nbytes
+    return total
+
+
+def read_message_from_fd(fd: int, deadline: Optional[float] = None) -> Tuple[Dict[str, Any], List[bytearray], int]:
+    """从文件描述符读取一条消息，返回(头信息, 数据帧列表, 负载字节数)"""
+    header_payload = read_frame_from_fd(fd, deadline)
+    header = decode_message(bytes(header_payload))
+    frames = [read_frame_from_fd(fd, deadline) for _ in range(int(header.get("frames", 0)))]
+    total = len(header_payload) + sum(len(frame) for frame in frames)
+    return header, frames, total
+
+
+def parse_framed_output(data: bytes) -> Tuple[Dict[str, Any], List[bytearray]]:
+    """解析单次子进程模式的帧格式输出（以FRAMED_OUTPUT_MAGIC开头）"""
+    view = memoryview(data)
+    offset = len(FRAMED_OUTPUT_MAGIC)
+
+    def next_frame() -> memoryview:
+        nonlocal offset
+        if offset + FRAME_HEADER.size > len(view):
+            raise FrameEOFError("Truncated framed output")
+        (length,) = FRAME_HEADER.unpack(view[offset:offset + FRAME_HEADER.size])
+        offset += FRAME_HEADER.size
+        if offset + length > len(view):
+            raise FrameEOFError("Truncated framed output")
+        frame = view[offset:offset + length]
+        offset += length
+        return frame
+
+    header = decode_message(bytes(next_frame()))
+    frames = [bytearray(next_frame()) for _ in range(int(header.get("frames", 0)))]
+    return header, frames
@@ -0,0 +1,426 @@
+"""
+AKShare常驻工作进程池 - 复用预热的工作进程，避免每次调用都重新启动解释器并导入AKShare
+
+配置（环境变量）：
+- AKSHARE_POOL_SIZE：最大工作进程数，默认2
+- AKSHARE_POOL_MAX_CALLS：单个工作进程最多处理的调用次数，超过后回收重建，默认200
+- AKSHARE_POOL_IDLE_TIMEOUT：空闲工作进程的回收时间（秒），默认300
+- AKSHARE_POOL_PREWARM：启动时预热的工作进程数，默认1
+"""
+import atexit
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from provider.akshare_ipc import (
+    FrameEOFError,
+    FrameTimeoutError,
+    encode_message,
+    get_preferred_formats,
+    read_message_from_fd,
+    write_frame,
+)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "akshare_worker.py")
+
+# stderr中属于正常提示的关键字，与单次子进程模式保持一致
+NORMAL_STDERR_KEYWORDS = [
+    "正在下载数据", "请稍等", "downloading data", "please wait",
+    "debug:", "using timeout", "warn", "warning", "userwarning"
+]
+
+
+def log_worker_stderr(stderr_text: str, prefix: str = "Subprocess") -> None:
+    """记录工作进程的stderr输出，区分AKShare的正常提示和真正的错误"""
+    if not stderr_text:
+        return
+    stderr_lower = stderr_text.lower()
+    if any(normal_warning in stderr_lower for normal_warning in NORMAL_STDERR_KEYWORDS):
+        # 这是正常的警告信息，记录为info级别
+        logging.info(f"{prefix} info: {stderr_text}")
+    else:
+        # 这可能是真正的错误，记录为warning级别
+        logging.warning(f"{prefix} stderr: {stderr_text}")
+
+
+def build_worker_env() -> Dict[str, str]:
+    """构建工作进程环境变量 - 使用UTF-8编码避免GBK编码问题"""
+    env = os.environ.copy()
+    env['PYTHONIOENCODING'] = 'utf-8'
+    # 强制设置系统编码环境变量
+    env['LANG'] = 'en_US.UTF-8'
+    env['LC_ALL'] = 'en_US.UTF-8'
+
+    # 在Windows上额外设置编码相关环境变量
+    if os.name == 'nt':  # Windows
+        env['PYTHONLEGACYWINDOWSSTDIO'] = '1'
+        env['PYTHONIOENCODING'] = 'utf-8:replace'
+    return env
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        logging.warning(f"Invalid value for {name}, using default {default}")
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        logging.warning(f"Invalid value for {name}, using default {default}")
+        return default
+
+
+class PooledWorker:
+    """单个常驻工作进程"""
+
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.calls = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.cmd = [sys.executable, WORKER_SCRIPT, '--serve']
+        self.process = subprocess.Popen(
+            self.cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=os.path.dirname(WORKER_SCRIPT),
+            env=build_worker_env(),
+        )
+        self._stdout_fd = self.process.stdout.fileno()
+        # 持续读取stderr，防止管道写满导致工作进程阻塞
+        self._stderr_thread = threading.Thread(
+            target=self._drain_stderr,
+            name=f"akshare-worker-{worker_id}-stderr",
+            daemon=True,
+        )
+        self._stderr_thread.start()
+        logging.info(f"AKShare pool worker {worker_id} started (pid={self.process.pid})")
+
+    def _drain_stderr(self) -> None:
+        stream = self.process.stderr
+        try:
+            for line in iter(stream.readline, b''):
+                text = line.decode('utf-8', errors='replace').rstrip()
+                log_worker_stderr(text, prefix=f"Pool worker {self.worker_id}")
+        except Exception:
+            pass
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def call(
+        self,
+        function_name: str,
+        kwargs: Dict[str, Any],
+        timeout: float,
+        shm_prefix: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, Any], List[bytearray], int]:
+        """发送一次调用请求并等待响应消息，返回(头信息, 数据帧列表, 负载字节数)"""
+        deadline = time.monotonic() + timeout
+        self._send_request(function_name, kwargs, timeout, shm_prefix, options)
+        return self._read_message(deadline, timeout)
+
+    def stream(
+        self,
+        function_name: str,
+        kwargs: Dict[str, Any],
+        timeout: float,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Tuple[Dict[str, Any], List[bytearray], int]]:
+        """
+        发送流式调用请求，逐条产出响应消息，直到结束标记、错误或非流式结果
+
+        超时按单条消息计算：AKShare调用本身和每个数据页都必须在timeout内到达。
+        """
+        self._send_request(function_name, kwargs, timeout, None, dict(options or {}, stream=True))
+        while True:
+            message = self._read_message(time.monotonic() + timeout, timeout)
+            yield message
+            header = message[0]
+            if header.get("type") not in ("dataframe_stream", "chunk"):
+                return
+
+    def _send_request(
+        self,
+        function_name: str,
+        kwargs: Dict[str, Any],
+        timeout: float,
+        shm_prefix: Optional[str],
+        options: Optional[Dict[str, Any]],
+    ) -> None:
+        self.calls += 1
+        request = {
+            "function": function_name,
+            "kwargs": kwargs,
+            "accept": get_preferred_formats(),
+            "shm_prefix": shm_prefix,
+            "options": options or {},
+        }
+        try:
+            write_frame(self.process.stdin, encode_message(request))
+        except (BrokenPipeError, OSError) as e:
+            returncode = self.process.poll()
+            raise RuntimeError(f"AKShare pool worker {self.worker_id} exited unexpectedly (return code {returncode}): {e}")
+
+    def _read_message(self, deadline: float, timeout: float) -> Tuple[Dict[str, Any], List[bytearray], int]:
+        try:
+            return read_message_from_fd(self._stdout_fd, deadline)
+        except FrameTimeoutError:
+            raise subprocess.TimeoutExpired(self.cmd, timeout)
+        except (FrameEOFError, OSError) as e:
+            returncode = self.process.poll()
+            raise RuntimeError(f"AKShare pool worker {self.worker_id} exited unexpectedly (return code {returncode}): {e}")
+        finally:
+            self.last_used = time.monotonic()
+
+    def terminate(self) -> None:
+        """关闭工作进程，先礼后兵"""
+        if not self.alive:
+            return
+        try:
+            write_frame(self.process.stdin, encode_message({"command": "shutdown"}))
+            self.process.stdin.close()
+            self.process.wait(timeout=2)
+        except Exception:
+            try:
+                self.process.kill()
+                self.process.wait(timeout=2)
+            except Exception:
+                pass
+        logging.info(f"AKShare pool worker {self.worker_id} stopped")
+
+    def kill(self) -> None:
+        """立即终止工作进程（用于超时或崩溃后的回收）"""
+        try:
+            self.process.kill()
+            self.process.wait(timeout=2)
+        except Exception:
+            pass
+        logging.info(f"AKShare pool worker {self.worker_id} killed")
+
+
+class AkshareWorkerPool:
+    """
+    预热的常驻工作进程池
+
+    - 每个工作进程只导入一次AKShare，后续调用通过管道传递请求
+    - 调用超时或进程崩溃时立即终止该进程，下次调用自动补充新进程
+    - 处理调用次数达到上限的进程会被回收，避免长期运行的内存增长
+    - 空闲超过设定时间的进程会被回收，释放内存
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_calls_per_worker: int = 200,
+        idle_timeout: float = 300.0,
+        prewarm: int = 1,
+    ):
+        self.size = max(1, size)
+        self.max_calls_per_worker = max(1, max_calls_per_worker)
+        self.idle_timeout = idle_timeout
+        self._idle: List[PooledWorker] = []
+        self._busy = 0
+        self._next_id = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {"calls": 0, "spawned": 0, "recycled": 0, "timeouts": 0, "crashes": 0, "reaped": 0}
+
+        with self._cond:
+            for _ in range(min(max(0, prewarm), self.size)):
+                self._idle.append(self._spawn())
+
+        if self.idle_timeout > 0:
+            reaper = threading.Thread(target=self._reap_loop, name="akshare-pool-reaper", daemon=True)
+            reaper.start()
+
+    def _spawn(self) -> PooledWorker:
+        self._next_id += 1
+        self._stats["spawned"] += 1
+        return PooledWorker(self._next_id)
+
+    def _acquire(self, deadline: float) -> PooledWorker:
+        expired: List[PooledWorker] = []
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("AKShare worker pool is closed")
+                    expired.extend(self._reap_idle_locked())
+                    # 后进先出：优先复用最近使用过的热进程，让冷进程自然空闲回收
+                    while self._idle:
+                        worker = self._idle.pop()
+                        if worker.alive:
+                            self._busy += 1
+                            return worker
+                        self._stats["crashes"] += 1
+                    if self._busy < self.size:
+                        self._busy += 1
+                        try:
+                            return self._spawn()
+                        except Exception:
+                            self._busy -= 1
+                            raise
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise subprocess.TimeoutExpired([WORKER_SCRIPT, '--serve'], 0)
+                    self._cond.wait(remaining)
+        finally:
+            for worker in expired:
+                worker.terminate()
+
+    def _release(self, worker: PooledWorker, healthy: bool) -> None:
+        retire = (
+            not healthy
+            or not worker.alive
+            or worker.calls >= self.max_calls_per_worker
+        )
+        recycle = retire and healthy and worker.alive
+        if recycle:
+            worker.terminate()
+        elif retire:
+            worker.kill()
+        with self._cond:
+            self._busy -= 1
+            self._stats["calls"] += 1
+            if recycle:
+                self._stats["recycled"] += 1
+            keep = not retire and not self._closed
+            if keep:
+                self._idle.append(worker)
+            self._cond.notify()
+        if not retire and not keep:
+            worker.terminate()
+
+    def _count(self, key: str) -> None:
+        with self._cond:
+            self._stats[key] += 1
+
+    def _reap_idle_locked(self) -> List[PooledWorker]:
+        """从空闲列表中取出空闲超时的进程，由调用方在释放锁之后关闭，避免关闭等待期间阻塞其它调用"""
+        if self.idle_timeout <= 0:
+            return []
+        now = time.monotonic()
+        keep, expired = [], []
+        for worker in self._idle:
+            if now - worker.last_used > self.idle_timeout:
+                expired.append(worker)
+            else:
+                keep.append(worker)
+        self._idle = keep
+        self._stats["reaped"] += len(expired)
+        return expired
+
+    def _reap_loop(self) -> None:
+        interval = max(1.0, self.idle_timeout / 2)
+        while not self._closed:
+            time.sleep(interval)
+            with self._cond:
+                expired = self._reap_idle_locked()
+            for worker in expired:
+                worker.terminate()
+
+    def call(
+        self,
+        function_name: str,
+        kwargs: Dict[str, Any],
+        timeout: float,
+        shm_prefix: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, Any], List[bytearray], int]:
+        """在池中的工作进程上执行一次AKShare调用，返回(头信息, 数据帧列表, 负载字节数)"""
+        deadline = time.monotonic() + timeout
+        worker = self._acquire(deadline)
+        healthy = False
+        try:
+            remaining = max(0.1, deadline - time.monotonic())
+            result = worker.call(function_name, kwargs, remaining, shm_prefix, options)
+            healthy = True
+            return result
+        except subprocess.TimeoutExpired:
+            self._count("timeouts")
+            raise
+        except RuntimeError:
+            self._count("crashes")
+            raise
+        finally:
+            self._release(worker, healthy)
+
+    def stream(
+        self,
+        function_name: str,
+        kwargs: Dict[str, Any],
+        timeout: float,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Tuple[Dict[str, Any], List[bytearray], int]]:
+        """
+        在池中的工作进程上执行一次流式调用，逐条产出响应消息
+
+        只有完整读取到结束消息的工作进程才会归还复用；调用方中途放弃时管道中仍有未读数据，
+        该工作进程会被终止回收。
+        """
+        worker = self._acquire(time.monotonic() + timeout)
+        healthy = False
+        try:
+            for message in worker.stream(function_name, kwargs, timeout, options):
+                if message[0].get("type") not in ("dataframe_stream", "chunk"):
+                    healthy = True
+                yield message
+        except subprocess.TimeoutExpired:
+            self._count("timeouts")
+            raise
+        except RuntimeError:
+            self._count("crashes")
+            raise
+        finally:
+            self._release(worker, healthy)
+
+    def stats(self) -> Dict[str, Any]:
+        """返回进程池运行统计"""
+        with self._cond:
+            return dict(self._stats, idle=len(self._idle), busy=self._busy, size=self.size)
+
+    def shutdown(self) -> None:
+        """关闭所有空闲工作进程，忙碌进程在归还时关闭"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for worker in idle:
+            worker.terminate()
+
+
+_pool: Optional[AkshareWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> AkshareWorkerPool:
+    """获取全局工作进程池（首次调用时按环境变量配置创建并预热）"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = AkshareWorkerPool(
+                    size=_env_int('AKSHARE_POOL_SIZE', 2),
+                    max_calls_per_worker=_env_int('AKSHARE_POOL_MAX_CALLS', 200),
+                    idle_timeout=_env_float('AKSHARE_POOL_IDLE_TIMEOUT', 300.0),
+                    prewarm=_env_int('AKSHARE_POOL_PREWARM', 1),
+                )
+                atexit.register(_pool.shutdown)
+    return _pool
+
+
+def get_worker_pool_stats() -> Dict[str, Any]:
+    """返回进程池统计信息，进程池未创建时返回空字典"""
+    return _pool.stats() if _pool is not None else {}
@@ -0,0 +1,229 @@
+"""
+AKShare结果查询：列投影、行过滤、排序和行数限制
+- 在序列化之前对DataFrame执行，工作进程模式下直接在工作进程中执行，只把需要的行列传回主进程
+- 查询在主进程中解析为可JSON序列化的字典，随调用选项传给工作进程，并作为缓存键的一部分
+
+过滤条件语法（多个条件用 ; 或 and 连接，全部满足才保留）：
+    涨跌幅 > 5
+    代码 in [000001, 600000]
+    名称 != 平安银行
+支持的比较符：==（或 =）、!=、>、>=、<、<=、in、not in
+
+本模块只依赖标准库和pandas，工作进程（以脚本方式运行）和父进程均可直接导入。
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+COMPARISON_OPERATORS = ('==', '!=', '>=', '<=', '>', '<')
+MEMBERSHIP_OPERATORS = ('not in', 'in')
+
+_CONDITION_SEPARATOR = re.compile(r'\s*(?:;|；|\s+and\s+)\s*', re.IGNORECASE)
+_MEMBERSHIP_PATTERN = re.compile(r'^(.+?)\s+(not\s+in|in)\s+(.+)$', re.IGNORECASE)
+_COMPARISON_PATTERN = re.compile(r'^(.+?)\s*(==|!=|>=|<=|=|>|<)\s*(.+)$')
+_LIST_SEPARATOR = re.compile(r'[,，]')
+
+
+class QueryError(ValueError):
+    """查询参数无法解析，或引用了结果中不存在的列"""
+
+
+def _split_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        items = value
+    else:
+        items = _LIST_SEPARATOR.split(str(value))
+    return [str(item).strip() for item in items if str(item).strip()]
+
+
+def _strip_quotes(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
+        return value[1:-1]
+    return value
+
+
+def parse_columns(value: Any) -> Optional[List[str]]:
+    """解析要保留的列，逗号分隔的字符串或列表，按给出的顺序输出"""
+    columns = [_strip_quotes(column) for column in _split_list(value)]
+    return columns or None
+
+
+def parse_filter(value: Any) -> Optional[List[List[Any]]]:
+    """解析过滤条件，返回[[列名, 比较符, 值], ...]，in/not in的值为列表"""
+    if value is None or not str(value).strip():
+        return None
+    conditions = []
+    for text in _CONDITION_SEPARATOR.split(str(value).strip()):
+        if not text:
+            continue
+        match = _MEMBERSHIP_PATTERN.match(text)
+        if match:
+            column, operator, raw = match.groups()
+            operator = ' '.join(operator.lower().split())
+            raw = raw.strip()
+            if raw[:1] in '[(' and raw[-1:] in '])':
+                raw = raw[1:-1]
+            values = [_strip_quotes(item) for item in _split_list(raw)]
+            if not values:
+                raise QueryError(f"Filter condition '{text}' has an empty value list")
+            conditions.append([_strip_quotes(column), operator, values])
+            continue
+        match = _COMPARISON_PATTERN.match(text)
+        if not match:
+            raise QueryError(
+                f"Cannot parse filter condition '{text}', expected '<column> <op> <value>' "
+                f"with op in {', '.join(COMPARISON_OPERATORS + MEMBERSHIP_OPERATORS)}"
+            )
+        column, operator, raw = match.groups()
+        conditions.append([_strip_quotes(column), '==' if operator == '=' else operator, _strip_quotes(raw)])
+    return conditions or None
+
+
+def parse_sort_by(value: Any) -> Optional[List[List[Any]]]:
+    """解析排序列，返回[[列名, 是否升序], ...]；列名前加 - 或后加 desc 表示降序"""
+    keys = []
+    for item in _split_list(value):
+        ascending = True
+        parts = item.split()
+        if len(parts) > 1 and parts[-1].lower() in ('asc', 'desc'):
+            ascending = parts[-1].lower() == 'asc'
+            item = ' '.join(parts[:-1])
+        if item.startswith('-'):
+            ascending = False
+            item = item[1:]
+        elif item.startswith('+'):
+            item = item[1:]
+        item = _strip_quotes(item)
+        if item:
+            keys.append([item, ascending])
+    return keys or None
+
+
+def parse_limit(value: Any) -> Optional[int]:
+    if value is None or str(value).strip() == '':
+        return None
+    try:
+        limit = int(float(str(value).strip()))
+    except ValueError:
+        raise QueryError(f"limit must be an integer, got '{value}'")
+    if limit < 0:
+        raise QueryError(f"limit must not be negative, got {limit}")
+    return limit
+
+
+def build_query(
+    columns: Any = None,
+    filter: Any = None,
+    sort_by: Any = None,
+    limit: Any = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    将查询参数解析为可JSON序列化的查询字典，未给出任何查询参数时返回None
+    参数格式错误时抛出QueryError
+    """
+    query = {
+        "columns": parse_columns(columns),
+        "filter": parse_filter(filter),
+        "sort_by": parse_sort_by(sort_by),
+        "limit": parse_limit(limit),
+    }
+    query = {key: value for key, value in query.items() if value is not None}
+    return query or None
+
+
+def _resolve_column(name: str, lookup: Dict[str, Any]) -> Any:
+    if name in lookup:
+        return lookup[name]
+    available = ', '.join(lookup)
+    raise QueryError(f"Unknown column '{name}', available columns: {available}")
+
+
+def _coerce_values(series: pd.Series, values: List[str]) -> tuple:
+    """按列类型转换比较值，返回(用于比较的列, 转换后的值列表)"""
+    try:
+        if pd.api.types.is_bool_dtype(series):
+            return series, [value.strip().lower() in ('true', '1', 'yes') for value in values]
+        if pd.api.types.is_numeric_dtype(series):
+            return series, [float(value) for value in values]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            converted = [pd.Timestamp(value) for value in values]
+            if getattr(series.dt, 'tz', None) is not None:
+                converted = [value.tz_localize(series.dt.tz) if value.tzinfo is None else value for value in converted]
+            return series, converted
+    except (TypeError, ValueError) as e:
+        raise QueryError(f"Cannot compare column '{series.name}' with {values}: {e}")
+    return series, values
+
+
+def _condition_mask(df: pd.DataFrame, column: Any, operator: str, value: Any) -> pd.Series:
+    series = df[column]
+    if operator in MEMBERSHIP_OPERATORS:
+        series, values = _coerce_values(series, value)
+        if series.dtype == object:
+            series = series.astype(str)
+        mask = series.isin(values)
+        return ~mask if operator == 'not in' else mask
+
+    series, (converted,) = _coerce_values(series, [value])
+    if series.dtype == object:
+        if operator in ('==', '!='):
+            series = series.astype(str)
+        else:
+            # 文本列中保存的数字（部分接口数值列为字符串）按数值比较，否则按字符串比较
+            try:
+                converted = float(converted)
+                series = pd.to_numeric(series, errors='coerce')
+            except ValueError:
+                series = series.astype(str)
+    if operator == '==':
+        return series == converted
+    if operator == '!=':
+        return series != converted
+    if operator == '>':
+        return series > converted
+    if operator == '>=':
+        return series >= converted
+    if operator == '<':
+        return series < converted
+    if operator == '<=':
+        return series <= converted
+    raise QueryError(f"Unsupported filter operator '{operator}'")
+
+
+def apply_query(df: pd.DataFrame, query: Optional[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    按 过滤 → 排序 → 行数限制 → 列投影 的顺序执行查询
+    过滤和排序可以引用投影中不保留的列；引用不存在的列时抛出QueryError
+    """
+    if not query or not isinstance(df, pd.DataFrame):
+        return df
+    lookup = {str(column): column for column in df.columns}
+    result = df
+
+    conditions = query.get("filter") or []
+    if conditions:
+        mask = pd.Series(True, index=df.index)
+        for column, operator, value in conditions:
+            mask &= _condition_mask(df, _resolve_column(column, lookup), operator, value).fillna(False).astype(bool)
+        result = result.loc[mask]
+
+    sort_keys = query.get("sort_by") or []
+    if sort_keys:
+        by = [_resolve_column(column, lookup) for column, _ in sort_keys]
+        result = result.sort_values(by=by, ascending=[ascending for _, ascending in sort_keys], kind='stable', na_position='last')
+
+    limit = query.get("limit")
+    if limit is not None:
+        result = result.iloc[:limit]
+
+    columns = query.get("columns")
+    if columns:
+        result = result[[_resolve_column(column, lookup) for column in columns]]
+
+    if result is not df:
+        result = result.reset_index(drop=True)
+    return result
@@ -0,0 +1,288 @@
+"""
+AKShare按数据源限流与熔断
+- 每个上游数据源（东方财富、同花顺、新浪、腾讯、巨潮等）独立的令牌桶限速和最大并发数
+- 连续出现SSL/EOF/超时/连接错误时熔断，熔断期间的调用直接失败，
+  冷却时间过后放行一次探测调用（半开），探测成功才恢复
+"""
+import logging
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from requests import exceptions as req_exc
+
+from provider.akshare_registry import get_interface_source
+
+# 函数名后缀 -> 数据源
+SOURCE_SUFFIXES = (
+    ('_em', 'eastmoney'),
+    ('_ths', 'ths'),
+    ('_sina', 'sina'),
+    ('_tx', 'tencent'),
+    ('_tx_js', 'tencent'),
+    ('_cninfo', 'cninfo'),
+    ('_baidu', 'baidu'),
+)
+DEFAULT_SOURCE = 'other'
+
+# 数据源默认限额：每秒请求数、突发请求数、最大并发数
+DEFAULT_SOURCE_LIMITS = {
+    'eastmoney': {'rate': 5.0, 'burst': 10, 'concurrency': 4},
+    'ths': {'rate': 2.0, 'burst': 4, 'concurrency': 2},
+    'sina': {'rate': 3.0, 'burst': 6, 'concurrency': 3},
+    'tencent': {'rate': 5.0, 'burst': 10, 'concurrency': 4},
+    'cninfo': {'rate': 2.0, 'burst': 4, 'concurrency': 2},
+    DEFAULT_SOURCE: {'rate': 10.0, 'burst': 20, 'concurrency': 8},
+}
+
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_RESET_SECONDS = 30.0
+
+# 会触发熔断的错误特征（工作进程中的异常以文本形式返回，只能按消息匹配）
+TRIP_ERROR_MARKERS = ('ssl', 'eof', 'timed out', 'read timeout', 'connection aborted', 'connection reset', 'remote end closed')
+
+
+class CircuitOpenError(RuntimeError):
+    """数据源处于熔断状态，调用未发出"""
+
+    def __init__(self, source: str, retry_after: float):
+        super().__init__(f"Data source {source} circuit is open after repeated network failures, retry in {retry_after:.0f}s")
+        self.source = source
+        self.retry_after = retry_after
+
+
+def rate_limit_enabled() -> bool:
+    """AKSHARE_RATE_LIMIT=false 时关闭按数据源限流与熔断"""
+    return os.environ.get('AKSHARE_RATE_LIMIT', 'true').strip().lower() not in ('false', '0', 'no')
+
+
+def get_breaker_threshold() -> int:
+    try:
+        return max(1, int(os.environ.get('AKSHARE_BREAKER_THRESHOLD', DEFAULT_BREAKER_THRESHOLD)))
+    except ValueError:
+        return DEFAULT_BREAKER_THRESHOLD
+
+
+def get_breaker_reset_seconds() -> float:
+    try:
+        return max(0.0, float(os.environ.get('AKSHARE_BREAKER_RESET_SECONDS', DEFAULT_BREAKER_RESET_SECONDS)))
+    except ValueError:
+        return DEFAULT_BREAKER_RESET_SECONDS
+
+
+def get_source_limits() -> dict[str, dict[str, float]]:
+    """
+    返回各数据源的限额，AKSHARE_RATE_LIMITS 可覆盖默认值
+    格式：数据源=每秒请求数/最大并发数，多个用逗号分隔，如 eastmoney=3/2,ths=1/1
+    """
+    limits = {source: dict(limit) for source, limit in DEFAULT_SOURCE_LIMITS.items()}
+    for item in os.environ.get('AKSHARE_RATE_LIMITS', '').split(','):
+        if '=' not in item:
+            continue
+        source, _, value = item.partition('=')
+        rate, _, concurrency = value.partition('/')
+        try:
+            limit = limits.setdefault(source.strip(), dict(DEFAULT_SOURCE_LIMITS[DEFAULT_SOURCE]))
+            limit['rate'] = float(rate)
+            limit['burst'] = max(1, int(float(rate) * 2))
+            if concurrency:
+                limit['concurrency'] = max(1, int(concurrency))
+        except ValueError:
+            logging.warning(f"Ignoring invalid AKSHARE_RATE_LIMITS entry: {item}")
+    return limits
+
+
+def get_data_source(function_name: str) -> str:
+    """接口所属数据源：优先使用注册表标明的数据源，其次按函数名后缀判断"""
+    source = get_interface_source(function_name)
+    if source:
+        return source
+    for suffix, suffix_source in SOURCE_SUFFIXES:
+        if function_name.endswith(suffix):
+            return suffix_source
+    return DEFAULT_SOURCE
+
+
+def is_trip_error(exc: BaseException) -> bool:
+    """是否为说明上游不可用或正在限流的网络错误（SSL/EOF/超时/连接中断）"""
+    if isinstance(exc, (subprocess.TimeoutExpired, req_exc.SSLError, req_exc.Timeout, req_exc.ConnectionError, TimeoutError)):
+        return True
+    message = str(exc).lower()
+    return any(marker in message for marker in TRIP_ERROR_MARKERS)
+
+
+class TokenBucket:
+    """令牌桶：按固定速率补充令牌，最多积累 burst 个"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """取一个令牌，不足时等待，返回等待的秒数"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # 先预占令牌再在锁外等待，令牌数为负表示已预约的后续请求
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """连续失败达到阈值后熔断，冷却后只放行一次探测调用"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, source: str, threshold: int, reset_seconds: float):
+        self.source = source
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._stats = {"trips": 0, "rejected": 0, "probes": 0}
+
+    def before_call(self) -> None:
+        """调用前检查，熔断中抛出 CircuitOpenError"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            elapsed = time.monotonic() - self._opened_at
+            if self.state == self.OPEN and elapsed >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                self._stats["probes"] += 1
+                logging.info(f"Circuit for {self.source} is half-open, sending a probe call")
+                return
+            self._stats["rejected"] += 1
+            retry_after = max(0.0, self.reset_seconds - elapsed)
+        raise CircuitOpenError(self.source, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logging.info(f"Circuit for {self.source} closed after a successful probe")
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.threshold:
+                if self.state != self.OPEN:
+                    self._stats["trips"] += 1
+                    logging.warning(
+                        f"Circuit for {self.source} opened after {self._failures} consecutive network failures, "
+                        f"failing fast for {self.reset_seconds:.0f}s"
+                    )
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = dict(self._stats)
+            stats["state"] = self.state
+            stats["consecutive_failures"] = self._failures
+        return stats
+
+
+class _SourceState:
+    __slots__ = ("bucket", "semaphore", "breaker", "concurrency", "in_flight", "calls", "throttled_seconds")
+
+    def __init__(self, source: str, limit: dict[str, float], threshold: int, reset_seconds: float):
+        self.bucket = TokenBucket(limit['rate'], int(limit['burst']))
+        self.concurrency = int(limit['concurrency'])
+        self.semaphore = threading.BoundedSemaphore(self.concurrency)
+        self.breaker = CircuitBreaker(source, threshold, reset_seconds)
+        self.in_flight = 0
+        self.calls = 0
+        self.throttled_seconds = 0.0
+
+
+class DataSourceLimiter:
+    """按数据源分组的限流器与熔断器"""
+
+    def __init__(self, limits: dict[str, dict[str, float]], threshold: int, reset_seconds: float):
+        self.limits = limits
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._sources: dict[str, _SourceState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, source: str) -> _SourceState:
+        with self._lock:
+            state = self._sources.get(source)
+            if state is None:
+                limit = self.limits.get(source) or self.limits[DEFAULT_SOURCE]
+                state = _SourceState(source, limit, self.threshold, self.reset_seconds)
+                self._sources[source] = state
+            return state
+
+    @contextmanager
+    def guard(self, function_name: str) -> Iterator[str]:
+        """
+        包裹一次上游调用：熔断检查、并发槽位、令牌桶限速
+        调用抛出网络类错误时计入熔断失败，其他结果（包括参数错误等）说明数据源可达，计为成功
+        """
+        source = get_data_source(function_name)
+        state = self._state(source)
+        state.breaker.before_call()
+        state.semaphore.acquire()
+        try:
+            waited = state.bucket.acquire()
+            with self._lock:
+                state.in_flight += 1
+                state.calls += 1
+                state.throttled_seconds += waited
+            try:
+                yield source
+            except BaseException as e:
+                if is_trip_error(e):
+                    state.breaker.record_failure()
+                else:
+                    state.breaker.record_success()
+                raise
+            else:
+                state.breaker.record_success()
+            finally:
+                with self._lock:
+                    state.in_flight -= 1
+        finally:
+            state.semaphore.release()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """返回各数据源的调用数、限速等待时间、进行中的调用数及熔断状态"""
+        with self._lock:
+            sources = list(self._sources.items())
+            result = {
+                source: {
+                    "calls": state.calls,
+                    "in_flight": state.in_flight,
+                    "concurrency": state.concurrency,
+                    "rate": state.bucket.rate,
+                    "throttled_seconds": round(state.throttled_seconds, 3),
+                }
+                for source, state in sources
+            }
+        for source, state in sources:
+            result[source].update(state.breaker.stats())
+        return result
@@ -2,7 +2,6 @@
 AKShare Eastmoney接口注册表
 管理东方财富股票数据接口的配置信息
 """
-import akshare as ak
 from typing import Dict, Any, Callable, List, Optional
 
 
@@ -151,10 +150,14 @@ def get_symbol_candidates(symbol: str) -> List[str]:
 
 
 # AKShare东方财富接口注册表
+# 参数配置中的 "temporal" 标记日期类参数，用于判断调用窗口是否已完全结束：
+#   "date"          - 交易日期或日期区间端点（YYYYMMDD / YYYY-MM-DD[ HH:MM:SS]）
+#   "report_period" - 报告期（季末日期、YYYYQ 季度），在法定披露截止日之后才视为结束
+# 函数名不带数据源后缀（_em、_ths、_sina、_tx、_cninfo）的接口用 "source" 标明实际请求的数据源，用于按数据源限流
 REGISTRY: Dict[str, Dict[str, Any]] = {
     "stock_individual_info_em": {
         "label": {"zh_Hans": "东方财富网-股票信息-指定股票", "en_US": "Eastmoney - Stock Information - Specific Stock"},
-        "fn": ak.stock_individual_info_em,
+        "fn": "stock_individual_info_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol"}},
             "optional": {}
@@ -165,13 +168,14 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_a_hist": {
         "label": {"zh_Hans": "东方财富网-沪深京A股-日频率数据-指定股票、周期、复权方式和指定日期区间", "en_US": "Eastmoney - A-share - Daily Data - Specified Stock, Period, Adjustment and Date Range"},
-        "fn": ak.stock_zh_a_hist,
+        "fn": "stock_zh_a_hist",
+        "source": "eastmoney",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol"},
                 "period": {"type": "str", "default": "daily"},
-                "start_date": {"type": "str", "default": "20240101"},
-                "end_date": {"type": "str", "default": "20500101"}
+                "start_date": {"type": "str", "temporal": "date", "default": "20240101"},
+                "end_date": {"type": "str", "temporal": "date", "default": "20500101"}
             },
             "optional": {
                 "adjust": {"type": "str", "default": ""}
@@ -183,12 +187,12 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_a_hist_tx": {
         "label": {"zh_Hans": "东方财富网-沪深京A股-历史行情日频率数据-指定股票、复权方式和日期区间", "en_US": "Tencent - A-share - Historical Daily Data - Specified Stock, Adjustment and Date Range"},
-        "fn": ak.stock_zh_a_hist_tx,
+        "fn": "stock_zh_a_hist_tx",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol_with_market_prefix"},
-                "start_date": {"type": "str", "default": "19000101"},
-                "end_date": {"type": "str", "default": "20500101"}
+                "start_date": {"type": "str", "temporal": "date", "default": "19000101"},
+                "end_date": {"type": "str", "temporal": "date", "default": "20500101"}
             },
             "optional": {
                 "adjust": {"type": "str", "default": ""},
@@ -201,13 +205,13 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_a_hist_min_em": {
         "label": {"zh_Hans": "东方财富网-沪深京A股-每日分时行情-指定股票、分时周期、复权方式和日期区间", "en_US": "Eastmoney - A-share - Daily Minute Data - Specified Stock, Minute Period, Adjustment and Date Range"},
-        "fn": ak.stock_zh_a_hist_min_em,
+        "fn": "stock_zh_a_hist_min_em",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol"},
                 "period": {"type": "str", "default": "5"},
-                "start_date": {"type": "str", "default": "20240101"},
-                "end_date": {"type": "str", "default": "20500101"}
+                "start_date": {"type": "str", "temporal": "date", "default": "20240101"},
+                "end_date": {"type": "str", "temporal": "date", "default": "20500101"}
             },
             "optional": {
                 "adjust": {"type": "str", "default": ""}
@@ -219,7 +223,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_a_hist_pre_min_em": {
         "label": {"zh_Hans": "东方财富网-最近一个交易日-分钟数据(包括盘前)-指定股票、时间区间", "en_US": "Eastmoney - Recent Trading Day - Minute Data (Including Pre-market) - Specified Stock and Time Range"},
-        "fn": ak.stock_zh_a_hist_pre_min_em,
+        "fn": "stock_zh_a_hist_pre_min_em",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol"},
@@ -234,7 +238,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_a_tick_tx": {
         "label": {"zh_Hans": "腾讯财经-最近交易日-历史分笔行情数据-指定股票", "en_US": "Tencent Finance - Recent Trading Day - Historical Tick Data - Specified Stock"},
-        "fn": ak.stock_zh_a_tick_tx_js,
+        "fn": "stock_zh_a_tick_tx_js",
+        "source": "tencent",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol_with_market_prefix"}
@@ -247,7 +252,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_b_spot_em": {
         "label": {"zh_Hans": "B股实时行情", "en_US": "B-share Real-time Data"},
-        "fn": ak.stock_zh_b_spot_em,
+        "fn": "stock_zh_b_spot_em",
         "params": {
             "required": {},
             "optional": {}
@@ -258,9 +263,9 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_gsrl_gsdt_em": {
         "label": {"zh_Hans": "东方财富网-公司动态-指定交易日", "en_US": "Eastmoney - Company Dynamics - Specified Trading Day"},
-        "fn": ak.stock_gsrl_gsdt_em,
+        "fn": "stock_gsrl_gsdt_em",
         "params": {
-            "required": {"date": {"type": "str", "default": "20240101"}},
+            "required": {"date": {"type": "str", "temporal": "date", "default": "20240101"}},
             "optional": {}
         },
         "supports_timeout": False,
@@ -269,7 +274,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_a_st_em": {
         "label": {"zh_Hans": "东方财富网-沪深个股-风险警示板", "en_US": "Eastmoney - A-Share Risk Warning Board"},
-        "fn": ak.stock_zh_a_st_em,
+        "fn": "stock_zh_a_st_em",
         "params": {
             "required": {},
             "optional": {}
@@ -280,7 +285,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_a_new_em": {
         "label": {"zh_Hans": "东方财富网-沪深个股-新股板块实时行情", "en_US": "Eastmoney - Shanghai-Shenzhen Individual Stocks - New Stock Board"},
-        "fn": ak.stock_zh_a_new_em,
+        "fn": "stock_zh_a_new_em",
         "params": {
             "required": {},
             "optional": {}
@@ -291,7 +296,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_a_stop_em": {
         "label": {"zh_Hans": "东方财富网-沪深个股-两网及退市", "en_US": "Eastmoney - Shanghai-Shenzhen Individual Stocks - Two Networks & Delisted"},
-        "fn": ak.stock_zh_a_stop_em,
+        "fn": "stock_zh_a_stop_em",
         "params": {
             "required": {},
             "optional": {}
@@ -302,7 +307,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_ipo_benefit_ths": {
         "label": {"zh_Hans": "同花顺-新股数据-IPO受益股", "en_US": "THS - IPO Data - IPO Beneficiary Stocks"},
-        "fn": ak.stock_ipo_benefit_ths,
+        "fn": "stock_ipo_benefit_ths",
         "params": {
             "required": {},
             "optional": {}
@@ -313,7 +318,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_kcb_report_em": {
         "label": {"zh_Hans": "科创板报告", "en_US": "STAR Market Report"},
-        "fn": ak.stock_zh_kcb_report_em,
+        "fn": "stock_zh_kcb_report_em",
         "params": {
             "required": {},
             "optional": {
@@ -327,7 +332,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_ah_spot_em": {
         "label": {"zh_Hans": "东方财富网-沪深港通-AH股比价-实时行情", "en_US": "Eastmoney - HSGT - AH Stock Comparison - Real-time Quotes"},
-        "fn": ak.stock_zh_ah_spot_em,
+        "fn": "stock_zh_ah_spot_em",
         "params": {
             "required": {},
             "optional": {}
@@ -338,13 +343,14 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_us_hist": {
         "label": {"zh_Hans": "美股历史数据", "en_US": "US Stock History"},
-        "fn": ak.stock_us_hist,
+        "fn": "stock_us_hist",
+        "source": "eastmoney",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_us_symbol"},
                 "period": {"type": "str", "default": "daily"},
-                "start_date": {"type": "str", "default": "20240101"},
-                "end_date": {"type": "str", "default": "20500101"},
+                "start_date": {"type": "str", "temporal": "date", "default": "20240101"},
+                "end_date": {"type": "str", "temporal": "date", "default": "20500101"},
                 "adjust": {"type": "str", "default": ""}
             },
             "optional": {}
@@ -355,7 +361,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_us_hist_min_em": {
         "label": {"zh_Hans": "美股分钟历史", "en_US": "US Stock Minute History"},
-        "fn": ak.stock_us_hist_min_em,
+        "fn": "stock_us_hist_min_em",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_us_symbol"}
@@ -371,13 +377,13 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_hist_min_em": {
         "label": {"zh_Hans": "港股分钟历史", "en_US": "HK Stock Minute History"},
-        "fn": ak.stock_hk_hist_min_em,
+        "fn": "stock_hk_hist_min_em",
         "params": {
             "required": {
                 "symbol": {"type": "str"},
                 "period": {"type": "str", "default": "5"},
-                "start_date": {"type": "str", "default": "1979-09-01 09:32:00"},
-                "end_date": {"type": "str", "default": "2222-01-01 09:32:00"},
+                "start_date": {"type": "str", "temporal": "date", "default": "1979-09-01 09:32:00"},
+                "end_date": {"type": "str", "temporal": "date", "default": "2222-01-01 09:32:00"},
                 "adjust": {"type": "str", "default": ""}
             },
             "optional": {}
@@ -389,7 +395,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     # 股市信息总貌相关接口
     "stock_sse_summary": {
         "label": {"zh_Hans": "上交所-股票数据总貌-最近交易日", "en_US": "SSE Stock Data Summary - Latest Trading Day"},
-        "fn": ak.stock_sse_summary,
+        "fn": "stock_sse_summary",
+        "source": "sse",
         "params": {
             "required": {},
             "optional": {}
@@ -400,9 +407,10 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_szse_summary": {
         "label": {"zh_Hans": "深交所-证券类别统计-指定交易日", "en_US": "SZSE Securities Category Statistics - Specified Trading Day"},
-        "fn": ak.stock_szse_summary,
+        "fn": "stock_szse_summary",
+        "source": "szse",
         "params": {
-            "required": {"date": {"type": "str", "default": "20240101"}},
+            "required": {"date": {"type": "str", "temporal": "date", "default": "20240101"}},
             "optional": {}
         },
         "supports_timeout": False,
@@ -412,9 +420,10 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_sse_deal_daily": {
         "label": {"zh_Hans": "上交所-股票成交概况-每日股票情况", "en_US": "SSE Stock Trading Overview - Daily Stock Situation"},
-        "fn": ak.stock_sse_deal_daily,
+        "fn": "stock_sse_deal_daily",
+        "source": "sse",
         "params": {
-            "required": {"date": {"type": "str", "default": "20240101"}},
+            "required": {"date": {"type": "str", "temporal": "date", "default": "20240101"}},
             "optional": {}
         },
         "supports_timeout": False,
@@ -424,7 +433,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     # 新增的7个股市信息总貌接口
     "stock_gpzy_profile_em": {
         "label": {"zh_Hans": "东方财富网-股权质押市场概况-所有历史", "en_US": "Eastmoney - Equity Pledge Market Overview - All History"},
-        "fn": ak.stock_gpzy_profile_em,
+        "fn": "stock_gpzy_profile_em",
         "params": {
             "required": {},
             "optional": {}
@@ -436,7 +445,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_gpzy_industry_data_em": {
         "label": {"zh_Hans": "东方财富网-上市公司质押比例-行业数据", "en_US": "Eastmoney - Industry Pledge Ratio Data"},
-        "fn": ak.stock_gpzy_industry_data_em,
+        "fn": "stock_gpzy_industry_data_em",
         "params": {
             "required": {},
             "optional": {}
@@ -447,7 +456,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_sy_profile_em": {
         "label": {"zh_Hans": "东方财富网-A股商誉市场概况-所有历史", "en_US": "Eastmoney - A-Share Goodwill Market Overview - All History"},
-        "fn": ak.stock_sy_profile_em,
+        "fn": "stock_sy_profile_em",
         "params": {
             "required": {},
             "optional": {}
@@ -458,7 +467,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_account_statistics_em": {
         "label": {"zh_Hans": "东方财富网-股票账户统计月度-所有历史", "en_US": "Eastmoney - Stock Account Statistics Monthly - All History"},
-        "fn": ak.stock_account_statistics_em,
+        "fn": "stock_account_statistics_em",
         "params": {
             "required": {},
             "optional": {}
@@ -469,7 +478,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_comment_em": {
         "label": {"zh_Hans": "东方财富网-千股千评-所有数据", "en_US": "Eastmoney - Stock Comments - All Data"},
-        "fn": ak.stock_comment_em,
+        "fn": "stock_comment_em",
         "params": {
             "required": {},
             "optional": {}
@@ -481,7 +490,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     # 资金流向分析相关接口
     "stock_individual_fund_flow": {
         "label": {"zh_Hans": "东方财富网-个股资金流向-指定股票、证交所", "en_US": "East Money - Individual Stock Fund Flow - Specified Stock, Stock Exchange"},
-        "fn": ak.stock_individual_fund_flow,
+        "fn": "stock_individual_fund_flow",
+        "source": "eastmoney",
         "params": {
             "required": {
                 "stock": {"type": "str"},
@@ -495,7 +505,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_individual_fund_flow_rank": {
         "label": {"zh_Hans": "东方财富网-资金流向-排名-指定统计周期", "en_US": "East Money - Fund Flow Rankings - Specified Statistical Period"},
-        "fn": ak.stock_individual_fund_flow_rank,
+        "fn": "stock_individual_fund_flow_rank",
+        "source": "eastmoney",
         "params": {
             "required": {
                 "indicator": {"type": "str"}
@@ -508,7 +519,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_market_fund_flow": {
         "label": {"zh_Hans": "东方财富网-资金流向-大盘-历史数据", "en_US": "East Money - Market Fund Flow - Historical Data"},
-        "fn": ak.stock_market_fund_flow,
+        "fn": "stock_market_fund_flow",
+        "source": "eastmoney",
         "params": {
             "required": {},
             "optional": {}
@@ -519,7 +531,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_sector_fund_flow_rank": {
         "label": {"zh_Hans": "东方财富网-板块资金流-排名", "en_US": "East Money - Sector Fund Flow Rankings"},
-        "fn": ak.stock_sector_fund_flow_rank,
+        "fn": "stock_sector_fund_flow_rank",
+        "source": "eastmoney",
         "params": {
             "required": {
                 "indicator": {"type": "str"},
@@ -533,10 +546,10 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_fhps_em": {
         "label": {"zh_Hans": "东方财富网-分红配送-指定日期", "en_US": "Eastmoney - Dividend Distribution - Specified Date"},
-        "fn": ak.stock_fhps_em,
+        "fn": "stock_fhps_em",
         "params": {
             "required": {
-                "date": {"type": "str"}
+                "date": {"type": "str", "temporal": "report_period"}
             },
             "optional": {}
         },
@@ -546,7 +559,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_history_dividend": {
         "label": {"zh_Hans": "新浪财经-历史分红", "en_US": "Sina Finance - Historical Dividend"},
-        "fn": ak.stock_history_dividend,
+        "fn": "stock_history_dividend",
+        "source": "sina",
         "params": {
             "required": {},
             "optional": {}
@@ -557,7 +571,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_info_a_code_name": {
         "label": {"zh_Hans": "沪深京A股-股票代码和简称", "en_US": "All A-Share Stock Codes and Names"},
-        "fn": ak.stock_info_a_code_name,
+        "fn": "stock_info_a_code_name",
         "params": {
             "required": {},
             "optional": {}
@@ -568,7 +582,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_institute_hold": {
         "label": {"zh_Hans": "新浪财经-机构持股一览表-指定报告期", "en_US": "Sina Finance - Institutional Holdings Overview"},
-        "fn": ak.stock_institute_hold,
+        "fn": "stock_institute_hold",
+        "source": "sina",
         "params": {
             "required": {"symbol": {"type": "str"}},
             "optional": {}
@@ -579,7 +594,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_institute_recommend": {
         "label": {"zh_Hans": "新浪财经-机构推荐池-指定指标", "en_US": "Sina Finance - Institutional Recommendation Pool - Specific Indicator"},
-        "fn": ak.stock_institute_recommend,
+        "fn": "stock_institute_recommend",
+        "source": "sina",
         "params": {
             "required": {"symbol": {"type": "str"}},
             "optional": {}
@@ -590,7 +606,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_main_fund_flow": {
         "label": {"zh_Hans": "东方财富网-主力净流入排名", "en_US": "East Money - Main Fund Flow Rankings"},
-        "fn": ak.stock_main_fund_flow,
+        "fn": "stock_main_fund_flow",
+        "source": "eastmoney",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -603,7 +620,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_sector_fund_flow_summary": {
         "label": {"zh_Hans": "东方财富网-行业资金流-xx行业个股资金流", "en_US": "East Money - Sector Fund Flow - Individual Stocks"},
-        "fn": ak.stock_sector_fund_flow_summary,
+        "fn": "stock_sector_fund_flow_summary",
+        "source": "eastmoney",
         "params": {
             "required": {
                 "symbol": {"type": "str"},
@@ -617,7 +635,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_sector_fund_flow_hist": {
         "label": {"zh_Hans": "东方财富网-行业历史资金流", "en_US": "East Money - Sector Historical Fund Flow"},
-        "fn": ak.stock_sector_fund_flow_hist,
+        "fn": "stock_sector_fund_flow_hist",
+        "source": "eastmoney",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -630,7 +649,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_concept_fund_flow_hist": {
         "label": {"zh_Hans": "东方财富网-概念历史资金流", "en_US": "East Money - Concept Historical Fund Flow"},
-        "fn": ak.stock_concept_fund_flow_hist,
+        "fn": "stock_concept_fund_flow_hist",
+        "source": "eastmoney",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -643,7 +663,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_fund_flow_big_deal": {
         "label": {"zh_Hans": "同花顺-资金流向-大单追踪", "en_US": "Flush - Fund Flow Big Deal Tracking"},
-        "fn": ak.stock_fund_flow_big_deal,
+        "fn": "stock_fund_flow_big_deal",
+        "source": "ths",
         "params": {
             "required": {},
             "optional": {}
@@ -654,7 +675,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_cyq_em": {
         "label": {"zh_Hans": "东方财富网-日K-筹码分布", "en_US": "East Money - Daily K Chip Distribution"},
-        "fn": ak.stock_cyq_em,
+        "fn": "stock_cyq_em",
         "params": {
             "required": {
                 "symbol": {"type": "str"},
@@ -668,7 +689,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_fund_flow_individual": {
         "label": {"zh_Hans": "同花顺-个股资金流-指定排行类别", "en_US": "Flush - Individual Stock Fund Flow - Specify Ranking Category"},
-        "fn": ak.stock_fund_flow_individual,
+        "fn": "stock_fund_flow_individual",
+        "source": "ths",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -681,7 +703,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_fund_flow_concept": {
         "label": {"zh_Hans": "同花顺-概念资金流-指定排行类别", "en_US": "Flush - Concept Fund Flow - Specify Ranking Category"},
-        "fn": ak.stock_fund_flow_concept,
+        "fn": "stock_fund_flow_concept",
+        "source": "ths",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -694,7 +717,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_fund_flow_industry": {
         "label": {"zh_Hans": "同花顺-行业资金流-指定排行类别", "en_US": "Flush - Industry Fund Flow - Specify Ranking Category"},
-        "fn": ak.stock_fund_flow_industry,
+        "fn": "stock_fund_flow_industry",
+        "source": "ths",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -707,7 +731,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hsgt_fund_flow_summary_em": {
         "label": {"zh_Hans": "东方财富网-沪深港通资金流向", "en_US": "East Money - HSGT Fund Flow Summary"},
-        "fn": ak.stock_hsgt_fund_flow_summary_em,
+        "fn": "stock_hsgt_fund_flow_summary_em",
         "params": {
             "required": {},
             "optional": {}
@@ -719,7 +743,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     # 沪深港通持股相关接口
     "stock_hk_ggt_components_em": {
         "label": {"zh_Hans": "东方财富网-港股通成份股实时行情", "en_US": "East Money - HK Connect Components Real-time Quotes"},
-        "fn": ak.stock_hk_ggt_components_em,
+        "fn": "stock_hk_ggt_components_em",
         "params": {
             "required": {},
             "optional": {}
@@ -730,7 +754,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hsgt_fund_min_em": {
         "label": {"zh_Hans": "东方财富网-沪深港通-市场概括-分时数据-指定资金类别", "en_US": "East Money - HSGT Market Overview Minute Data - Specify Fund Category"},
-        "fn": ak.stock_hsgt_fund_min_em,
+        "fn": "stock_hsgt_fund_min_em",
         "params": {
             "required": {"symbol": {"type": "str"}},
             "optional": {}
@@ -741,7 +765,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hsgt_board_rank_em": {
         "label": {"zh_Hans": "东方财富网-沪深港通持股-板块排行-指定排行类别和统计周期", "en_US": "East Money - HSGT Holdings Board Rankings - Specify Ranking Category and Statistical Period"},
-        "fn": ak.stock_hsgt_board_rank_em,
+        "fn": "stock_hsgt_board_rank_em",
         "params": {
             "required": {
                 "symbol": {"type": "str"},
@@ -755,7 +779,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hsgt_hold_stock_em": {
         "label": {"zh_Hans": "东方财富网-沪深港通持股-个股排行-指定沪深港通类别和统计周期", "en_US": "East Money - HSGT Holdings Stock Rankings - Specify HSGT Category and Statistical Period"},
-        "fn": ak.stock_hsgt_hold_stock_em,
+        "fn": "stock_hsgt_hold_stock_em",
         "params": {
             "required": {
                 "market": {"type": "str"},
@@ -769,7 +793,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hsgt_sh_hk_spot_em": {
         "label": {"zh_Hans": "东方财富网-港股通(沪>港)-股票实时行情", "en_US": "East Money - HK Connect (Shanghai>HK) Real-time Quotes"},
-        "fn": ak.stock_hsgt_sh_hk_spot_em,
+        "fn": "stock_hsgt_sh_hk_spot_em",
         "params": {
             "required": {},
             "optional": {}
@@ -780,7 +804,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hsgt_hist_em": {
         "label": {"zh_Hans": "东方财富网-沪深港通资金流向-历史数据-指定历史数据类别", "en_US": "East Money - HSGT Fund Flow Historical Data - Specify Historical Data Category"},
-        "fn": ak.stock_hsgt_hist_em,
+        "fn": "stock_hsgt_hist_em",
         "params": {
             "required": {"symbol": {"type": "str"}},
             "optional": {}
@@ -791,7 +815,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hsgt_individual_em": {
         "label": {"zh_Hans": "东方财富网-沪深港通持股-具体股票-指定A股和港股", "en_US": "East Money - HSGT Holdings Specific Stock - Specify A-share and HK Stock"},
-        "fn": ak.stock_hsgt_individual_em,
+        "fn": "stock_hsgt_individual_em",
         "params": {
             "required": {"symbol": {"type": "str"}},
             "optional": {}
@@ -803,7 +827,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     # 个股信息总貌相关接口
     "stock_hk_security_profile_em": {
         "label": {"zh_Hans": "港股-个股-证券概况", "en_US": "HK Security Profile"},
-        "fn": ak.stock_hk_security_profile_em,
+        "fn": "stock_hk_security_profile_em",
         "params": {
             "required": {"symbol": {"type": "str"}},
             "optional": {}
@@ -814,7 +838,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_company_profile_em": {
         "label": {"zh_Hans": "港股-个股-公司概况", "en_US": "HK Company Profile"},
-        "fn": ak.stock_hk_company_profile_em,
+        "fn": "stock_hk_company_profile_em",
         "params": {
             "required": {"symbol": {"type": "str"}},
             "optional": {}
@@ -825,7 +849,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zyjs_ths": {
         "label": {"zh_Hans": "A股-个股-主营业务", "en_US": "A-share Main Business"},
-        "fn": ak.stock_zyjs_ths,
+        "fn": "stock_zyjs_ths",
         "params": {
             "required": {"symbol": {"type": "str"}},
             "optional": {}
@@ -836,7 +860,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zygc_em": {
         "label": {"zh_Hans": "A股-个股-主营业务", "en_US": "A-share Main Business"},
-        "fn": ak.stock_zygc_em,
+        "fn": "stock_zygc_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol_with_uppercase_prefix"}},
             "optional": {}
@@ -847,7 +871,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_news_em": {
         "label": {"zh_Hans": "A股-个股-相关新闻资讯", "en_US": "A-share News"},
-        "fn": ak.stock_news_em,
+        "fn": "stock_news_em",
         "params": {
             "required": {"symbol": {"type": "str"}},
             "optional": {}
@@ -858,7 +882,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_profile_cninfo": {
         "label": {"zh_Hans": "A股-个股-公司概况", "en_US": "A-share Company Profile"},
-        "fn": ak.stock_profile_cninfo,
+        "fn": "stock_profile_cninfo",
         "params": {
             "required": {"symbol": {"type": "str"}},
             "optional": {}
@@ -870,7 +894,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_ipo_summary_cninfo": {
         "label": {"zh_Hans": "A股-个股-IPO信息", "en_US": "A-share IPO Info"},
-        "fn": ak.stock_ipo_summary_cninfo,
+        "fn": "stock_ipo_summary_cninfo",
         "params": {
             "required": {"symbol": {"type": "str"}},
             "optional": {}
@@ -881,12 +905,12 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_share_change_cninfo": {
         "label": {"zh_Hans": "公司股本变动", "en_US": "Share Change"},
-        "fn": ak.stock_share_change_cninfo,
+        "fn": "stock_share_change_cninfo",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol"},
-                "start_date": {"type": "str"},
-                "end_date": {"type": "str"}
+                "start_date": {"type": "str", "temporal": "date"},
+                "end_date": {"type": "str", "temporal": "date"}
             },
             "optional": {}
         },
@@ -896,7 +920,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_fhps_detail_em": {
         "label": {"zh_Hans": "A股-个股-分红配股", "en_US": "A-share Dividend"},
-        "fn": ak.stock_fhps_detail_em,
+        "fn": "stock_fhps_detail_em",
         "params": {
             "required": {"symbol": {"type": "str"}},
             "optional": {}
@@ -907,7 +931,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_fhps_detail_ths": {
         "label": {"zh_Hans": "同花顺-分红情况", "en_US": "THS Dividend Details"},
-        "fn": ak.stock_fhps_detail_ths,
+        "fn": "stock_fhps_detail_ths",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol"}},
             "optional": {}
@@ -918,7 +942,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_dividend_cninfo": {
         "label": {"zh_Hans": "巨潮资讯-历史分红-指定股票", "en_US": "CNINFO - Historical Dividend - Specific Stock"},
-        "fn": ak.stock_dividend_cninfo,
+        "fn": "stock_dividend_cninfo",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol"}},
             "optional": {}
@@ -929,7 +953,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_fhpx_detail_ths": {
         "label": {"zh_Hans": "港股-个股-分红信息", "en_US": "HK Dividend"},
-        "fn": ak.stock_hk_fhpx_detail_ths,
+        "fn": "stock_hk_fhpx_detail_ths",
         "params": {
             "required": {"symbol": {"type": "str"}},
             "optional": {}
@@ -940,7 +964,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_research_report_em": {
         "label": {"zh_Hans": "A股-个股-研报列表", "en_US": "A-share Research Report"},
-        "fn": ak.stock_research_report_em,
+        "fn": "stock_research_report_em",
         "params": {
             "required": {"symbol": {"type": "str"}},
             "optional": {}
@@ -953,10 +977,10 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     # 股票财务数据分析相关接口
     "stock_yjbb_em": {
         "label": {"zh_Hans": "东方财富网-业绩报表", "en_US": "East Money - Performance Report"},
-        "fn": ak.stock_yjbb_em,
+        "fn": "stock_yjbb_em",
         "params": {
             "required": {
-                "date": {"type": "str"}
+                "date": {"type": "str", "temporal": "report_period"}
             },
             "optional": {}
         },
@@ -966,10 +990,10 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_yjkb_em": {
         "label": {"zh_Hans": "东方财富网-业绩快报", "en_US": "East Money - Performance Forecast"},
-        "fn": ak.stock_yjkb_em,
+        "fn": "stock_yjkb_em",
         "params": {
             "required": {
-                "date": {"type": "str"}
+                "date": {"type": "str", "temporal": "report_period"}
             },
             "optional": {}
         },
@@ -979,10 +1003,10 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_yjyg_em": {
         "label": {"zh_Hans": "东方财富网-业绩预告", "en_US": "East Money - Performance Prediction"},
-        "fn": ak.stock_yjyg_em,
+        "fn": "stock_yjyg_em",
         "params": {
             "required": {
-                "date": {"type": "str"}
+                "date": {"type": "str", "temporal": "report_period"}
             },
             "optional": {}
         },
@@ -992,10 +1016,10 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_lrb_em": {
         "label": {"zh_Hans": "东方财富网-业绩快报-利润表", "en_US": "East Money - Performance Report - Profit Statement"},
-        "fn": ak.stock_lrb_em,
+        "fn": "stock_lrb_em",
         "params": {
             "required": {
-                "date": {"type": "str"}
+                "date": {"type": "str", "temporal": "report_period"}
             },
             "optional": {}
         },
@@ -1005,10 +1029,10 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_xjll_em": {
         "label": {"zh_Hans": "东方财富网-业绩快报-现金流量表", "en_US": "East Money - Performance Report - Cash Flow Statement"},
-        "fn": ak.stock_xjll_em,
+        "fn": "stock_xjll_em",
         "params": {
             "required": {
-                "date": {"type": "str"}
+                "date": {"type": "str", "temporal": "report_period"}
             },
             "optional": {}
         },
@@ -1018,10 +1042,10 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zcfz_em": {
         "label": {"zh_Hans": "东方财富网-业绩快报-资产负债表", "en_US": "East Money - Performance Report - Balance Sheet"},
-        "fn": ak.stock_zcfz_em,
+        "fn": "stock_zcfz_em",
         "params": {
             "required": {
-                "date": {"type": "str"}
+                "date": {"type": "str", "temporal": "report_period"}
             },
             "optional": {}
         },
@@ -1031,10 +1055,10 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zcfz_bj_em": {
         "label": {"zh_Hans": "东方财富网-北交所-业绩快报-资产负债表", "en_US": "East Money - BJ Exchange - Performance Report - Balance Sheet"},
-        "fn": ak.stock_zcfz_bj_em,
+        "fn": "stock_zcfz_bj_em",
         "params": {
             "required": {
-                "date": {"type": "str"}
+                "date": {"type": "str", "temporal": "report_period"}
             },
             "optional": {}
         },
@@ -1044,7 +1068,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_financial_report_sina": {
         "label": {"zh_Hans": "新浪财经-财务报表-指定股票、报表类型", "en_US": "Sina Finance - Financial Report - Specify Stock, Report Type"},
-        "fn": ak.stock_financial_report_sina,
+        "fn": "stock_financial_report_sina",
         "params": {
             "required": {
                 "stock": {"type": "str"},
@@ -1058,7 +1082,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_balance_sheet_by_report_em": {
         "label": {"zh_Hans": "东方财富网-资产负债表-按报告期-指定股票", "en_US": "Eastmoney - Balance Sheet (by Report Period) - Specific Stock"},
-        "fn": ak.stock_balance_sheet_by_report_em,
+        "fn": "stock_balance_sheet_by_report_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol_with_uppercase_prefix"}},
             "optional": {}
@@ -1069,7 +1093,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_balance_sheet_by_yearly_em": {
         "label": {"zh_Hans": "东方财富网-资产负债表-按年度-指定股票", "en_US": "Eastmoney - Balance Sheet (by Yearly) - Specific Stock"},
-        "fn": ak.stock_balance_sheet_by_yearly_em,
+        "fn": "stock_balance_sheet_by_yearly_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol_with_uppercase_prefix"}},
             "optional": {}
@@ -1080,7 +1104,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_profit_sheet_by_report_em": {
         "label": {"zh_Hans": "东方财富网-利润表-按报告期-指定股票", "en_US": "Eastmoney - Profit Sheet (by Report Period) - Specific Stock"},
-        "fn": ak.stock_profit_sheet_by_report_em,
+        "fn": "stock_profit_sheet_by_report_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol_with_uppercase_prefix"}},
             "optional": {}
@@ -1091,7 +1115,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_profit_sheet_by_yearly_em": {
         "label": {"zh_Hans": "东方财富网-利润表-按年度-指定股票", "en_US": "Eastmoney - Profit Sheet (by Yearly) - Specific Stock"},
-        "fn": ak.stock_profit_sheet_by_yearly_em,
+        "fn": "stock_profit_sheet_by_yearly_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol_with_uppercase_prefix"}},
             "optional": {}
@@ -1102,7 +1126,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_profit_sheet_by_quarterly_em": {
         "label": {"zh_Hans": "东方财富网-利润表-按单季度-指定股票", "en_US": "Eastmoney - Profit Sheet (by Quarterly) - Specific Stock"},
-        "fn": ak.stock_profit_sheet_by_quarterly_em,
+        "fn": "stock_profit_sheet_by_quarterly_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol_with_uppercase_prefix"}},
             "optional": {}
@@ -1113,7 +1137,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_cash_flow_sheet_by_report_em": {
         "label": {"zh_Hans": "东方财富网-现金流量表-按报告期-指定股票", "en_US": "Eastmoney - Cash Flow Sheet (by Report Period) - Specific Stock"},
-        "fn": ak.stock_cash_flow_sheet_by_report_em,
+        "fn": "stock_cash_flow_sheet_by_report_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol_with_uppercase_prefix"}},
             "optional": {}
@@ -1124,7 +1148,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_cash_flow_sheet_by_yearly_em": {
         "label": {"zh_Hans": "东方财富网-现金流量表-按年度-指定股票", "en_US": "Eastmoney - Cash Flow Sheet (by Yearly) - Specific Stock"},
-        "fn": ak.stock_cash_flow_sheet_by_yearly_em,
+        "fn": "stock_cash_flow_sheet_by_yearly_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol_with_uppercase_prefix"}},
             "optional": {}
@@ -1135,7 +1159,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_cash_flow_sheet_by_quarterly_em": {
         "label": {"zh_Hans": "东方财富网-现金流量表-按单季度-指定股票", "en_US": "Eastmoney - Cash Flow Sheet (by Quarterly) - Specific Stock"},
-        "fn": ak.stock_cash_flow_sheet_by_quarterly_em,
+        "fn": "stock_cash_flow_sheet_by_quarterly_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol_with_uppercase_prefix"}},
             "optional": {}
@@ -1146,7 +1170,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_financial_debt_ths": {
         "label": {"zh_Hans": "同花顺-资产负债表-指定股票、报告类型", "en_US": "THS - Individual Balance Sheet - By Report Type"},
-        "fn": ak.stock_financial_debt_ths,
+        "fn": "stock_financial_debt_ths",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol"},
@@ -1160,7 +1184,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_financial_benefit_ths": {
         "label": {"zh_Hans": "同花顺-个股利润表-指定股票、报告类型", "en_US": "THS - Individual Income Statement - By Report Type"},
-        "fn": ak.stock_financial_benefit_ths,
+        "fn": "stock_financial_benefit_ths",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol"},
@@ -1174,7 +1198,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_financial_cash_ths": {
         "label": {"zh_Hans": "同花顺-现金流量表-指定股票、报告类型", "en_US": "THS - Individual Cash Flow Statement - By Report Type"},
-        "fn": ak.stock_financial_cash_ths,
+        "fn": "stock_financial_cash_ths",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol"},
@@ -1188,7 +1212,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_financial_abstract": {
         "label": {"zh_Hans": "新浪财经-财务报表-关键指标-指定股票", "en_US": "Sina Finance - Financial Statements (Key Indicators) - Specific Stock"},
-        "fn": ak.stock_financial_abstract,
+        "fn": "stock_financial_abstract",
+        "source": "sina",
         "params": {
             "required": {"symbol": {"type": "str"}},
             "optional": {}
@@ -1199,7 +1224,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_financial_abstract_ths": {
         "label": {"zh_Hans": "同花顺-财务指标-主要指标-指定股票、指标类型", "en_US": "Flush - Financial Indicators - Main Indicators - Specify Stock, Indicator Type"},
-        "fn": ak.stock_financial_abstract_ths,
+        "fn": "stock_financial_abstract_ths",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol"},
@@ -1213,7 +1238,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_financial_analysis_indicator_em": {
         "label": {"zh_Hans": "东方财富网-A股财务分析-主要指标-指定股票、报告类型", "en_US": "Eastmoney - A-share Financial Analysis (Main Indicators) - By Report Type"},
-        "fn": ak.stock_financial_analysis_indicator_em,
+        "fn": "stock_financial_analysis_indicator_em",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol_with_dot"},
@@ -1227,7 +1252,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_financial_analysis_indicator": {
         "label": {"zh_Hans": "新浪财经-财务分析(财务指标)-指定股票、开始年份", "en_US": "Sina Finance - Financial Analysis (Financial Indicators) - By Report Type"},
-        "fn": ak.stock_financial_analysis_indicator,
+        "fn": "stock_financial_analysis_indicator",
+        "source": "sina",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol"},
@@ -1242,11 +1268,11 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_gdfx_free_top_10_em": {
         "label": {"zh_Hans": "东方财富网-个股-十大流通股东-按日期(季末)", "en_US": "Eastmoney Individual Top 10 Free Shareholders - By Date (Quarter End)"},
-        "fn": ak.stock_gdfx_free_top_10_em,
+        "fn": "stock_gdfx_free_top_10_em",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol_with_lowercase_prefix"},
-                "date": {"type": "str"}
+                "date": {"type": "str", "temporal": "report_period"}
             },
             "optional": {}
         },
@@ -1256,11 +1282,11 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_gdfx_top_10_em": {
         "label": {"zh_Hans": "东方财富网-个股-十大股东-按日期(季末)", "en_US": "Eastmoney Individual Top 10 Shareholders - By Date (Quarter End)"},
-        "fn": ak.stock_gdfx_top_10_em,
+        "fn": "stock_gdfx_top_10_em",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol_with_lowercase_prefix"},
-                "date": {"type": "str"}
+                "date": {"type": "str", "temporal": "report_period"}
             },
             "optional": {}
         },
@@ -1270,9 +1296,9 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_gdfx_free_holding_change_em": {
         "label": {"zh_Hans": "东方财富网-个股股东持股变动统计(十大流通股东)-按日期(季末)", "en_US": "Eastmoney Individual Shareholder Holding Change Statistics (Top 10 Free Shareholders) - By Date (Quarter End)"},
-        "fn": ak.stock_gdfx_free_holding_change_em,
+        "fn": "stock_gdfx_free_holding_change_em",
         "params": {
-            "required": {"date": {"type": "str"}},
+            "required": {"date": {"type": "str", "temporal": "report_period"}},
             "optional": {}
         },
         "supports_timeout": True,
@@ -1281,9 +1307,9 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_gdfx_holding_change_em": {
         "label": {"zh_Hans": "东方财富网-个股股东持股变动统计(十大股东)-按日期(季末)", "en_US": "Eastmoney Individual Shareholder Holding Change Statistics (Top 10 Shareholders) - By Date (Quarter End)"},
-        "fn": ak.stock_gdfx_holding_change_em,
+        "fn": "stock_gdfx_holding_change_em",
         "params": {
-            "required": {"date": {"type": "str"}},
+            "required": {"date": {"type": "str", "temporal": "report_period"}},
             "optional": {}
         },
         "supports_timeout": True,
@@ -1292,7 +1318,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_fund_stock_holder": {
         "label": {"zh_Hans": "新浪财经-基金持股-指定股票", "en_US": "Sina Finance - Fund Shareholding - Specific Stock"},
-        "fn": ak.stock_fund_stock_holder,
+        "fn": "stock_fund_stock_holder",
+        "source": "sina",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol"}},
             "optional": {}
@@ -1303,7 +1330,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_main_stock_holder": {
         "label": {"zh_Hans": "新浪财经-主要股东-指定股票", "en_US": "Sina Finance - Major Shareholders - Specific Stock"},
-        "fn": ak.stock_main_stock_holder,
+        "fn": "stock_main_stock_holder",
+        "source": "sina",
         "params": {
             "required": {"stock": {"type": "str", "preprocess": "normalize_symbol"}},
             "optional": {}
@@ -1314,11 +1342,12 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_institute_hold_detail": {
         "label": {"zh_Hans": "新浪财经-机构持股详情-指定股票、报告期", "en_US": "Sina Finance - Institutional Holdings Detail - Specific Stock and Quarter"},
-        "fn": ak.stock_institute_hold_detail,
+        "fn": "stock_institute_hold_detail",
+        "source": "sina",
         "params": {
             "required": {
                 "stock": {"type": "str", "preprocess": "normalize_symbol"},
-                "quarter": {"type": "str"}
+                "quarter": {"type": "str", "temporal": "report_period"}
             },
             "optional": {}
         },
@@ -1328,7 +1357,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_institute_recommend_detail": {
         "label": {"zh_Hans": "新浪财经-股票评级记录-指定股票", "en_US": "Sina Finance - Stock Rating Records - Specific Stock"},
-        "fn": ak.stock_institute_recommend_detail,
+        "fn": "stock_institute_recommend_detail",
+        "source": "sina",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol"}},
             "optional": {}
@@ -1339,7 +1369,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_value_em": {
         "label": {"zh_Hans": "东方财富网-估值分析-指定股票", "en_US": "Eastmoney - Valuation Analysis - Specific Stock"},
-        "fn": ak.stock_value_em,
+        "fn": "stock_value_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol"}},
             "optional": {}
@@ -1350,7 +1380,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_management_change_ths": {
         "label": {"zh_Hans": "同花顺-个股公司高管持股变动-指定股票", "en_US": "THS Individual Company Management Shareholding Change - Specific Stock"},
-        "fn": ak.stock_management_change_ths,
+        "fn": "stock_management_change_ths",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol"}},
             "optional": {}
@@ -1361,7 +1391,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_shareholder_change_ths": {
         "label": {"zh_Hans": "同花顺-个股公司股东持股变动-指定股票", "en_US": "THS Individual Company Shareholder Shareholding Change - Specific Stock"},
-        "fn": ak.stock_shareholder_change_ths,
+        "fn": "stock_shareholder_change_ths",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol"}},
             "optional": {}
@@ -1372,7 +1402,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_a_gdhs": {
         "label": {"zh_Hans": "东方财富网-股东户数数据-指定日期", "en_US": "Eastmoney - Shareholder Number Data - Specified Date"},
-        "fn": ak.stock_zh_a_gdhs,
+        "fn": "stock_zh_a_gdhs",
+        "source": "eastmoney",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -1385,7 +1416,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_a_gdhs_detail_em": {
         "label": {"zh_Hans": "东方财富网-股东户数详情-指定股票", "en_US": "Eastmoney - Shareholder Number Detail - Specific Stock"},
-        "fn": ak.stock_zh_a_gdhs_detail_em,
+        "fn": "stock_zh_a_gdhs_detail_em",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol"}
@@ -1398,7 +1429,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_ipo_info": {
         "label": {"zh_Hans": "新浪财经-新股发行-指定股票", "en_US": "Sina Finance - IPO Information - Specific Stock"},
-        "fn": ak.stock_ipo_info,
+        "fn": "stock_ipo_info",
+        "source": "sina",
         "params": {
             "required": {
                 "stock": {"type": "str", "preprocess": "normalize_symbol"}
@@ -1411,7 +1443,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_add_stock": {
         "label": {"zh_Hans": "新浪财经-股票增发-指定股票", "en_US": "Sina Finance - Additional Stock Issuance - Specific Stock"},
-        "fn": ak.stock_add_stock,
+        "fn": "stock_add_stock",
+        "source": "sina",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol"}
@@ -1424,7 +1457,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_restricted_release_queue_sina": {
         "label": {"zh_Hans": "新浪财经-限售解禁-指定股票", "en_US": "Sina Finance - Restricted Stock Release Schedule - Specific Stock"},
-        "fn": ak.stock_restricted_release_queue_sina,
+        "fn": "stock_restricted_release_queue_sina",
         "params": {
             "required": {
                 "symbol": {"type": "str", "preprocess": "normalize_symbol"}
@@ -1437,9 +1470,9 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_gdfx_free_holding_analyse_em": {
         "label": {"zh_Hans": "东方财富网-股东持股分析(十大流通股东)-按日期(季末)", "en_US": "Eastmoney Shareholder Holding Analysis (Top 10 Free Shareholders) - By Date (Quarter End)"},
-        "fn": ak.stock_gdfx_free_holding_analyse_em,
+        "fn": "stock_gdfx_free_holding_analyse_em",
         "params": {
-            "required": {"date": {"type": "str"}},
+            "required": {"date": {"type": "str", "temporal": "report_period"}},
             "optional": {}
         },
         "supports_timeout": True,
@@ -1448,9 +1481,9 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_gdfx_holding_analyse_em": {
         "label": {"zh_Hans": "东方财富网-股东持股分析(十大股东)-按日期(季末)", "en_US": "Eastmoney Shareholder Holding Analysis (Top 10 Shareholders) - By Date (Quarter End)"},
-        "fn": ak.stock_gdfx_holding_analyse_em,
+        "fn": "stock_gdfx_holding_analyse_em",
         "params": {
-            "required": {"date": {"type": "str"}},
+            "required": {"date": {"type": "str", "temporal": "report_period"}},
             "optional": {}
         },
         "supports_timeout": True,
@@ -1459,9 +1492,9 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_gdfx_free_holding_detail_em": {
         "label": {"zh_Hans": "东方财富网-股东持股明细(十大流通股东)-按日期(季末)", "en_US": "Eastmoney Shareholder Holding Details (Top 10 Free Shareholders) - By Date (Quarter End)"},
-        "fn": ak.stock_gdfx_free_holding_detail_em,
+        "fn": "stock_gdfx_free_holding_detail_em",
         "params": {
-            "required": {"date": {"type": "str"}},
+            "required": {"date": {"type": "str", "temporal": "report_period"}},
             "optional": {}
         },
         "supports_timeout": True,
@@ -1470,10 +1503,10 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_gdfx_holding_detail_em": {
         "label": {"zh_Hans": "东方财富网-股东持股明细(十大股东)-按日期(季末)", "en_US": "Eastmoney Shareholder Holding Details (Top 10 Shareholders) - By Date (Quarter End)"},
-        "fn": ak.stock_gdfx_holding_detail_em,
+        "fn": "stock_gdfx_holding_detail_em",
         "params": {
             "required": {
-                "date": {"type": "str"},
+                "date": {"type": "str", "temporal": "report_period"},
                 "indicator": {"type": "str"},
                 "symbol": {"type": "str"}
             },
@@ -1485,9 +1518,9 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_gdfx_free_holding_statistics_em": {
         "label": {"zh_Hans": "东方财富网-股东持股统计(十大流通股东)-按日期(季末)", "en_US": "Eastmoney Shareholder Holding Statistics (Top 10 Free Shareholders) - By Date (Quarter End)"},
-        "fn": ak.stock_gdfx_free_holding_statistics_em,
+        "fn": "stock_gdfx_free_holding_statistics_em",
         "params": {
-            "required": {"date": {"type": "str"}},
+            "required": {"date": {"type": "str", "temporal": "report_period"}},
             "optional": {}
         },
         "supports_timeout": True,
@@ -1496,9 +1529,9 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_gdfx_holding_statistics_em": {
         "label": {"zh_Hans": "东方财富网-股东持股统计(十大股东)-按日期(季末)", "en_US": "Eastmoney Shareholder Holding Statistics (Top 10 Shareholders) - By Date (Quarter End)"},
-        "fn": ak.stock_gdfx_holding_statistics_em,
+        "fn": "stock_gdfx_holding_statistics_em",
         "params": {
-            "required": {"date": {"type": "str"}},
+            "required": {"date": {"type": "str", "temporal": "report_period"}},
             "optional": {}
         },
         "supports_timeout": True,
@@ -1509,7 +1542,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     # 股票实时行情相关接口
     "stock_bid_ask_em": {
         "label": {"zh_Hans": "东方财富网-行情报价-指定股票", "en_US": "Eastmoney - Stock Quote - Specific Stock"},
-        "fn": ak.stock_bid_ask_em,
+        "fn": "stock_bid_ask_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol"}},
             "optional": {}
@@ -1520,7 +1553,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_a_spot": {
         "label": {"zh_Hans": "新浪财经-沪深京A股-实时行情数据", "en_US": "Sina Finance - A-share - Real-time Quotes"},
-        "fn": ak.stock_zh_a_spot,
+        "fn": "stock_zh_a_spot",
+        "source": "sina",
         "params": {
             "required": {},
             "optional": {}
@@ -1530,7 +1564,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     },
     "stock_zh_a_spot_em": {
         "label": {"zh_Hans": "东方财富网-沪深京A股-实时行情数据", "en_US": "Eastmoney - A-share - Real-time Quotes"},
-        "fn": ak.stock_zh_a_spot_em,
+        "fn": "stock_zh_a_spot_em",
         "params": {
             "required": {},
             "optional": {}
@@ -1541,7 +1575,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_sh_a_spot_em": {
         "label": {"zh_Hans": "东方财富网-沪A股-实时行情数据", "en_US": "Eastmoney - Shanghai A-share - Real-time Quotes"},
-        "fn": ak.stock_sh_a_spot_em,
+        "fn": "stock_sh_a_spot_em",
         "params": {
             "required": {},
             "optional": {}
@@ -1552,7 +1586,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_sz_a_spot_em": {
         "label": {"zh_Hans": "东方财富网-深A股-实时行情数据", "en_US": "Eastmoney - Shenzhen A-share - Real-time Quotes"},
-        "fn": ak.stock_sz_a_spot_em,
+        "fn": "stock_sz_a_spot_em",
         "params": {
             "required": {},
             "optional": {}
@@ -1563,7 +1597,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_bj_a_spot_em": {
         "label": {"zh_Hans": "东方财富网-京A股-实时行情数据", "en_US": "Eastmoney - Beijing A-share - Real-time Quotes"},
-        "fn": ak.stock_bj_a_spot_em,
+        "fn": "stock_bj_a_spot_em",
         "params": {
             "required": {},
             "optional": {}
@@ -1574,7 +1608,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_new_a_spot_em": {
         "label": {"zh_Hans": "东方财富网-新股-实时行情数据", "en_US": "Eastmoney - New Shares - Real-time Quotes"},
-        "fn": ak.stock_new_a_spot_em,
+        "fn": "stock_new_a_spot_em",
         "params": {
             "required": {},
             "optional": {}
@@ -1585,7 +1619,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_cy_a_spot_em": {
         "label": {"zh_Hans": "东方财富网-创业板-实时行情", "en_US": "Eastmoney - Growth Enterprise Market - Real-time Quotes"},
-        "fn": ak.stock_cy_a_spot_em,
+        "fn": "stock_cy_a_spot_em",
         "params": {
             "required": {},
             "optional": {}
@@ -1596,7 +1630,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_kc_a_spot_em": {
         "label": {"zh_Hans": "东方财富网-科创板-实时行情", "en_US": "Eastmoney - Science and Technology Innovation Board - Real-time Quotes"},
-        "fn": ak.stock_kc_a_spot_em,
+        "fn": "stock_kc_a_spot_em",
         "params": {
             "required": {},
             "optional": {}
@@ -1607,7 +1641,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_ab_comparison_em": {
         "label": {"zh_Hans": "东方财富网-沪深京A股-全量AB股比价", "en_US": "Eastmoney - Shanghai-Shenzhen - All AB Stock Comparison"},
-        "fn": getattr(ak, 'stock_zh_ab_comparison_em', None),
+        "fn": "stock_zh_ab_comparison_em",
         "params": {
             "required": {},
             "optional": {}
@@ -1618,7 +1652,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_a_new": {
         "label": {"zh_Hans": "新浪财经-沪深股市-次新股-实时行情", "en_US": "Sina Finance - Shanghai-Shenzhen Stock Market - Secondary New Stocks"},
-        "fn": ak.stock_zh_a_new,
+        "fn": "stock_zh_a_new",
+        "source": "sina",
         "params": {
             "required": {},
             "optional": {}
@@ -1630,7 +1665,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_sgt_settlement_exchange_rate_szse": {
         "label": {"zh_Hans": "深港通-港股通业务信息-结算汇率", "en_US": "SZSE - HK Connect Settlement Exchange Rate"},
-        "fn": ak.stock_sgt_settlement_exchange_rate_szse,
+        "fn": "stock_sgt_settlement_exchange_rate_szse",
+        "source": "szse",
         "params": {
             "required": {},
             "optional": {}
@@ -1641,7 +1677,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_sgt_settlement_exchange_rate_sse": {
         "label": {"zh_Hans": "沪港通-港股通信息披露-结算汇兑", "en_US": "SSE - HK Connect Settlement Exchange Rate"},
-        "fn": ak.stock_sgt_settlement_exchange_rate_sse,
+        "fn": "stock_sgt_settlement_exchange_rate_sse",
+        "source": "sse",
         "params": {
             "required": {},
             "optional": {}
@@ -1652,7 +1689,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_sgt_reference_exchange_rate_szse": {
         "label": {"zh_Hans": "深港通-港股通业务信息-参考汇率", "en_US": "SZSE - HK Connect Reference Exchange Rate"},
-        "fn": ak.stock_sgt_reference_exchange_rate_szse,
+        "fn": "stock_sgt_reference_exchange_rate_szse",
+        "source": "szse",
         "params": {
             "required": {},
             "optional": {}
@@ -1663,7 +1701,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_sgt_reference_exchange_rate_sse": {
         "label": {"zh_Hans": "沪港通-港股通信息披露-参考汇率", "en_US": "SSE - HK Connect Reference Exchange Rate"},
-        "fn": ak.stock_sgt_reference_exchange_rate_sse,
+        "fn": "stock_sgt_reference_exchange_rate_sse",
+        "source": "sse",
         "params": {
             "required": {},
             "optional": {}
@@ -1674,7 +1713,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_spot_em": {
         "label": {"zh_Hans": "东方财富网-港股-实时行情(延15分钟)", "en_US": "Eastmoney - HK Stock - Real-time Quotes (15min delay)"},
-        "fn": ak.stock_hk_spot_em,
+        "fn": "stock_hk_spot_em",
         "params": {
             "required": {},
             "optional": {}
@@ -1685,7 +1724,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_spot": {
         "label": {"zh_Hans": "新浪-港股-实时行情(延15分钟)", "en_US": "Sina - HK Stock - Real-time Quotes (15min delay)"},
-        "fn": ak.stock_hk_spot,
+        "fn": "stock_hk_spot",
+        "source": "sina",
         "params": {
             "required": {},
             "optional": {}
@@ -1696,7 +1736,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_main_board_spot_em": {
         "label": {"zh_Hans": "东方财富网-港股主板-实时行情(延15分钟)", "en_US": "Eastmoney - HK Main Board - Real-time Quotes (15min delay)"},
-        "fn": ak.stock_hk_main_board_spot_em,
+        "fn": "stock_hk_main_board_spot_em",
         "params": {
             "required": {},
             "optional": {}
@@ -1708,7 +1748,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     # 新增缺失的接口
     "stock_intraday_em": {
         "label": {"zh_Hans": "东方财富网-最近一个交易日-日内分时数据(包括盘前)-指定股票", "en_US": "Eastmoney - Recent Trading Day - Intraday Data (Including Pre-market) - Specified Stock"},
-        "fn": ak.stock_intraday_em,
+        "fn": "stock_intraday_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol"}},
             "optional": {}
@@ -1719,7 +1759,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_kcb_daily": {
         "label": {"zh_Hans": "新浪财经-科创板股票历史行情数据-指定股票、复权方式", "en_US": "Sina Finance - STAR Market - Historical Data - Specified Stock and Adjustment"},
-        "fn": ak.stock_zh_kcb_daily,
+        "fn": "stock_zh_kcb_daily",
+        "source": "sina",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol_with_market_prefix"}},
             "optional": {"adjust": {"type": "str", "default": ""}}
@@ -1730,7 +1771,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_growth_comparison_em": {
         "label": {"zh_Hans": "东方财富网-同行比较-成长性比较-指定股票", "en_US": "Eastmoney - Peer Comparison - Growth Comparison - Specified Stock"},
-        "fn": ak.stock_zh_growth_comparison_em,
+        "fn": "stock_zh_growth_comparison_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol_with_uppercase_prefix"}},
             "optional": {}
@@ -1741,7 +1782,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_valuation_comparison_em": {
         "label": {"zh_Hans": "东方财富网-同行比较-估值比较-指定股票", "en_US": "Eastmoney - Peer Comparison - Valuation Comparison - Specified Stock"},
-        "fn": ak.stock_zh_valuation_comparison_em,
+        "fn": "stock_zh_valuation_comparison_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol_with_uppercase_prefix"}},
             "optional": {}
@@ -1752,7 +1793,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_dupont_comparison_em": {
         "label": {"zh_Hans": "东方财富网-同行比较-杜邦分析比较-指定股票", "en_US": "Eastmoney - Peer Comparison - DuPont Analysis Comparison - Specified Stock"},
-        "fn": ak.stock_zh_dupont_comparison_em,
+        "fn": "stock_zh_dupont_comparison_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol_with_uppercase_prefix"}},
             "optional": {}
@@ -1763,7 +1804,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_zh_scale_comparison_em": {
         "label": {"zh_Hans": "东方财富网-同行比较-公司规模-指定股票", "en_US": "Eastmoney - Peer Comparison - Company Scale - Specified Stock"},
-        "fn": ak.stock_zh_scale_comparison_em,
+        "fn": "stock_zh_scale_comparison_em",
         "params": {
             "required": {"symbol": {"type": "str", "preprocess": "normalize_symbol_with_uppercase_prefix"}},
             "optional": {}
@@ -1774,7 +1815,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_xgsr_ths": {
         "label": {"zh_Hans": "同花顺-新股上市-新股上市首日", "en_US": "THS - New Stock Listing - New Stock First Day"},
-        "fn": ak.stock_xgsr_ths,
+        "fn": "stock_xgsr_ths",
         "params": {
             "required": {},
             "optional": {}
@@ -1785,7 +1826,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_famous_spot_em": {
         "label": {"zh_Hans": "知名港股实时行情数据", "en_US": "Famous HK Stocks Real-time Quotes"},
-        "fn": ak.stock_hk_famous_spot_em,
+        "fn": "stock_hk_famous_spot_em",
         "params": {
             "required": {},
             "optional": {}
@@ -1796,13 +1837,14 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_hist": {
         "label": {"zh_Hans": "东方财富网-港股-历史行情数据", "en_US": "Eastmoney - HK Stock - Historical Data"},
-        "fn": ak.stock_hk_hist,
+        "fn": "stock_hk_hist",
+        "source": "eastmoney",
         "params": {
             "required": {
                 "symbol": {"type": "str"},
                 "period": {"type": "str"},
-                "start_date": {"type": "str"},
-                "end_date": {"type": "str"},
+                "start_date": {"type": "str", "temporal": "date"},
+                "end_date": {"type": "str", "temporal": "date"},
                 "adjust": {"type": "str"}
             },
             "optional": {}
@@ -1813,13 +1855,13 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_hist_min_em": {
         "label": {"zh_Hans": "东方财富网-港股-每日分时行情", "en_US": "Eastmoney - HK Stock - Daily Minute Data"},
-        "fn": ak.stock_hk_hist_min_em,
+        "fn": "stock_hk_hist_min_em",
         "params": {
             "required": {
                 "symbol": {"type": "str"},
                 "period": {"type": "str"},
-                "start_date": {"type": "str"},
-                "end_date": {"type": "str"},
+                "start_date": {"type": "str", "temporal": "date"},
+                "end_date": {"type": "str", "temporal": "date"},
                 "adjust": {"type": "str"}
             },
             "optional": {}
@@ -1830,7 +1872,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_security_profile_em": {
         "label": {"zh_Hans": "东方财富网-港股-个股-证券资料", "en_US": "Eastmoney - HK Stock - Individual Stock - Security Profile"},
-        "fn": ak.stock_hk_security_profile_em,
+        "fn": "stock_hk_security_profile_em",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -1843,7 +1885,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_company_profile_em": {
         "label": {"zh_Hans": "东方财富网-港股-个股-公司资料", "en_US": "Eastmoney - HK Stock - Individual Stock - Company Profile"},
-        "fn": ak.stock_hk_company_profile_em,
+        "fn": "stock_hk_company_profile_em",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -1856,7 +1898,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_fhpx_detail_ths": {
         "label": {"zh_Hans": "同花顺-港股-个股-分红派息", "en_US": "THS - HK Stock - Individual Stock - Dividend Distribution"},
-        "fn": ak.stock_hk_fhpx_detail_ths,
+        "fn": "stock_hk_fhpx_detail_ths",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -1869,7 +1911,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_financial_indicator_em": {
         "label": {"zh_Hans": "东方财富网-港股-个股-财务指标-指定股票", "en_US": "East Money - HK Stock - Financial Indicators"},
-        "fn": ak.stock_hk_financial_indicator_em,
+        "fn": "stock_hk_financial_indicator_em",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -1882,7 +1924,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_dividend_payout_em": {
         "label": {"zh_Hans": "东方财富网-港股-个股-分红派息-指定股票", "en_US": "East Money - HK Stock - Dividend Payout"},
-        "fn": ak.stock_hk_dividend_payout_em,
+        "fn": "stock_hk_dividend_payout_em",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -1895,7 +1937,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_growth_comparison_em": {
         "label": {"zh_Hans": "东方财富网-港股-个股-成长性对比-指定股票", "en_US": "East Money - HK Stock - Growth Comparison"},
-        "fn": ak.stock_hk_growth_comparison_em,
+        "fn": "stock_hk_growth_comparison_em",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -1908,7 +1950,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hk_daily": {
         "label": {"zh_Hans": "新浪-港股-历史行情数据-指定股票、复权方式", "en_US": "Sina - HK Stock - Historical Data"},
-        "fn": ak.stock_hk_daily,
+        "fn": "stock_hk_daily",
+        "source": "sina",
         "params": {
             "required": {
                 "symbol": {"type": "str"},
@@ -1922,7 +1965,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_hsgt_fund_flow_summary_em": {
         "label": {"zh_Hans": "东方财富网-沪深港通资金流向", "en_US": "Eastmoney - HSGT Fund Flow Summary"},
-        "fn": ak.stock_hsgt_fund_flow_summary_em,
+        "fn": "stock_hsgt_fund_flow_summary_em",
         "params": {
             "required": {},
             "optional": {}
@@ -1933,7 +1976,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_financial_hk_analysis_indicator_em": {
         "label": {"zh_Hans": "港股-财务分析-主要指标", "en_US": "HK - Financial Analysis - Main Indicators"},
-        "fn": ak.stock_financial_hk_analysis_indicator_em,
+        "fn": "stock_financial_hk_analysis_indicator_em",
         "params": {
             "required": {
                 "symbol": {"type": "str"},
@@ -1947,7 +1990,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_financial_hk_report_em": {
         "label": {"zh_Hans": "港股-财务报表-三大报表", "en_US": "HK - Financial Statements - Three Major Reports"},
-        "fn": ak.stock_financial_hk_report_em,
+        "fn": "stock_financial_hk_report_em",
         "params": {
             "required": {
                 "symbol": {"type": "str"},
@@ -1962,7 +2005,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_us_famous_spot_em": {
         "label": {"zh_Hans": "知名美股的实时行情数据", "en_US": "Famous US Stocks Real-time Quotes"},
-        "fn": ak.stock_us_famous_spot_em,
+        "fn": "stock_us_famous_spot_em",
         "params": {
             "required": {"category": {"type": "str"}},
             "optional": {}
@@ -1973,7 +2016,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_financial_us_analysis_indicator_em": {
         "label": {"zh_Hans": "美股-财务分析-主要指标", "en_US": "US - Financial Analysis - Main Indicators"},
-        "fn": ak.stock_financial_us_analysis_indicator_em,
+        "fn": "stock_financial_us_analysis_indicator_em",
         "params": {
             "required": {
                 "symbol": {"type": "str"},
@@ -1987,7 +2030,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_financial_us_report_em": {
         "label": {"zh_Hans": "美股-财务分析-三大报表", "en_US": "US - Financial Analysis - Three Major Reports"},
-        "fn": ak.stock_financial_us_report_em,
+        "fn": "stock_financial_us_report_em",
         "params": {
             "required": {
                 "symbol": {"type": "str"},
@@ -2002,7 +2045,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_us_spot_em": {
         "label": {"zh_Hans": "东方财富网-美股-实时行情", "en_US": "Eastmoney - US Stock - Real-time Quotes"},
-        "fn": ak.stock_us_spot_em,
+        "fn": "stock_us_spot_em",
         "params": {
             "required": {},
             "optional": {}
@@ -2013,7 +2056,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_us_spot": {
         "label": {"zh_Hans": "新浪-美股-实时行情(延15分钟)", "en_US": "Sina - US Stock - Real-time Quotes (15min delay)"},
-        "fn": ak.stock_us_spot,
+        "fn": "stock_us_spot",
+        "source": "sina",
         "params": {
             "required": {},
             "optional": {}
@@ -2024,13 +2068,14 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_us_hist": {
         "label": {"zh_Hans": "东方财富网-美股-每日行情", "en_US": "Eastmoney - US Stock - Daily Data"},
-        "fn": ak.stock_us_hist,
+        "fn": "stock_us_hist",
+        "source": "eastmoney",
         "params": {
             "required": {
                 "symbol": {"type": "str"},
                 "period": {"type": "str"},
-                "start_date": {"type": "str"},
-                "end_date": {"type": "str"},
+                "start_date": {"type": "str", "temporal": "date"},
+                "end_date": {"type": "str", "temporal": "date"},
                 "adjust": {"type": "str"}
             },
             "optional": {}
@@ -2041,7 +2086,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_us_hist_min_em": {
         "label": {"zh_Hans": "东方财富网-美股-每日分时行情(自动最近5天)", "en_US": "Eastmoney - US Stock - Daily Minute Data (Auto 5 Days)"},
-        "fn": ak.stock_us_hist_min_em,
+        "fn": "stock_us_hist_min_em",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -2055,7 +2100,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     # 股票技术分析相关接口
     "stock_rank_cxg_ths": {
         "label": {"zh_Hans": "同花顺-技术选股-创新高-指定新高类别", "en_US": "Flush - Technical Stock Selection - Innovation High - Specify High Category"},
-        "fn": ak.stock_rank_cxg_ths,
+        "fn": "stock_rank_cxg_ths",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -2068,7 +2113,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_rank_cxd_ths": {
         "label": {"zh_Hans": "同花顺-技术选股-创新低-指定新低类别", "en_US": "Flush - Technical Stock Selection - Innovation Low - Specify Low Category"},
-        "fn": ak.stock_rank_cxd_ths,
+        "fn": "stock_rank_cxd_ths",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -2081,7 +2126,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_rank_lxsz_ths": {
         "label": {"zh_Hans": "同花顺-技术选股-连续上涨", "en_US": "Flush - Technical Stock Selection - Continuous Rise"},
-        "fn": ak.stock_rank_lxsz_ths,
+        "fn": "stock_rank_lxsz_ths",
         "params": {
             "required": {},
             "optional": {}
@@ -2092,7 +2137,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_rank_lxxd_ths": {
         "label": {"zh_Hans": "同花顺-技术选股-连续下跌", "en_US": "Flush - Technical Stock Selection - Continuous Fall"},
-        "fn": ak.stock_rank_lxxd_ths,
+        "fn": "stock_rank_lxxd_ths",
         "params": {
             "required": {},
             "optional": {}
@@ -2103,7 +2148,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_rank_cxfl_ths": {
         "label": {"zh_Hans": "同花顺-技术选股-持续放量", "en_US": "Flush - Technical Stock Selection - Continuous Volume Increase"},
-        "fn": ak.stock_rank_cxfl_ths,
+        "fn": "stock_rank_cxfl_ths",
         "params": {
             "required": {},
             "optional": {}
@@ -2114,7 +2159,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_rank_cxsl_ths": {
         "label": {"zh_Hans": "同花顺-技术选股-持续缩量", "en_US": "Flush - Technical Stock Selection - Continuous Volume Decrease"},
-        "fn": ak.stock_rank_cxsl_ths,
+        "fn": "stock_rank_cxsl_ths",
         "params": {
             "required": {},
             "optional": {}
@@ -2125,7 +2170,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_rank_xstp_ths": {
         "label": {"zh_Hans": "同花顺-技术选股-向上突破-指定均线类型", "en_US": "Flush - Technical Stock Selection - Upward Breakthrough - Specify MA Type"},
-        "fn": ak.stock_rank_xstp_ths,
+        "fn": "stock_rank_xstp_ths",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -2138,7 +2183,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_rank_xxtp_ths": {
         "label": {"zh_Hans": "同花顺-技术选股-向下突破-指定均线类型", "en_US": "Flush - Technical Stock Selection - Downward Breakthrough - Specify MA Type"},
-        "fn": ak.stock_rank_xxtp_ths,
+        "fn": "stock_rank_xxtp_ths",
         "params": {
             "required": {
                 "symbol": {"type": "str"}
@@ -2151,7 +2196,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_rank_ljqs_ths": {
         "label": {"zh_Hans": "同花顺-技术选股-量价齐升", "en_US": "Flush - Technical Stock Selection - Price-Volume Rise"},
-        "fn": ak.stock_rank_ljqs_ths,
+        "fn": "stock_rank_ljqs_ths",
         "params": {
             "required": {},
             "optional": {}
@@ -2162,7 +2207,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_rank_ljqd_ths": {
         "label": {"zh_Hans": "同花顺-技术选股-量价齐跌", "en_US": "Flush - Technical Stock Selection - Price-Volume Fall"},
-        "fn": ak.stock_rank_ljqd_ths,
+        "fn": "stock_rank_ljqd_ths",
         "params": {
             "required": {},
             "optional": {}
@@ -2173,7 +2218,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_rank_xzjp_ths": {
         "label": {"zh_Hans": "同花顺-技术选股-险资举牌", "en_US": "Flush - Technical Stock Selection - Insurance Capital Disclosure"},
-        "fn": ak.stock_rank_xzjp_ths,
+        "fn": "stock_rank_xzjp_ths",
         "params": {
             "required": {},
             "optional": {}
@@ -2184,7 +2229,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_esg_msci_sina": {
         "label": {"zh_Hans": "新浪财经-ESG评级-MSCI", "en_US": "Sina Finance - ESG Rating - MSCI"},
-        "fn": ak.stock_esg_msci_sina,
+        "fn": "stock_esg_msci_sina",
         "params": {
             "required": {},
             "optional": {}
@@ -2195,7 +2240,7 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_esg_rft_sina": {
         "label": {"zh_Hans": "新浪财经-ESG评级-路孚特", "en_US": "Sina Finance - ESG Rating - Refinitiv"},
-        "fn": ak.stock_esg_rft_sina,
+        "fn": "stock_esg_rft_sina",
         "params": {
             "required": {},
             "optional": {}
@@ -2229,7 +2274,8 @@ REGISTRY: Dict[str, Dict[str, Any]] = {
     
     "stock_us_spot": {
         "label": {"zh_Hans": "新浪-美股-实时行情(延15分钟)", "en_US": "Sina - US Stock - Real-time Quotes (15min delay)"},
-        "fn": ak.stock_us_spot,
+        "fn": "stock_us_spot",
+        "source": "sina",
         "params": {
             "required": {},
             "optional": {}
@@ -2250,6 +2296,35 @@ def get_available_interfaces() -> List[str]:
     return list(REGISTRY.keys())
 
 
+_temporal_params_by_fn: Optional[Dict[str, Dict[str, str]]] = None
+
+
+def get_temporal_params(function_name: str) -> Dict[str, str]:
+    """按AKShare函数名返回其日期类参数及类型（参数名 -> "date"/"report_period"）"""
+    global _temporal_params_by_fn
+    if _temporal_params_by_fn is None:
+        mapping: Dict[str, Dict[str, str]] = {}
+        for config in REGISTRY.values():
+            fn_name = config.get("fn")
+            if not fn_name:
+                continue
+            params = config.get("params") or {}
+            for group in ("required", "optional"):
+                for param_name, spec in (params.get(group) or {}).items():
+                    if spec.get("temporal"):
+                        mapping.setdefault(fn_name, {})[param_name] = spec["temporal"]
+        _temporal_params_by_fn = mapping
+    return dict(_temporal_params_by_fn.get(function_name, {}))
+
+
+def get_interface_source(function_name: str) -> Optional[str]:
+    """按AKShare函数名返回注册表中标明的数据源，未标明时返回None"""
+    for config in REGISTRY.values():
+        if config.get("fn") == function_name and config.get("source"):
+            return config["source"]
+    return None
+
+
 def validate_interface_params(interface_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
     """验证并处理接口参数"""
     import logging
@@ -0,0 +1,122 @@
+"""
+K线接口的日期区间分段获取
+- 日期区间较长的日线（A股、港股、美股）按自然年拆分为多个分段，并发获取
+- 每个分段独立重试并单独缓存：失败的分段重试时不会重新获取已经成功的分段，已结束年度的分段写入磁盘缓存
+- 分段结果按日期列合并去重；周线/月线的K线跨越年度边界，不分段
+- 分段数超过上限时把相邻的年度合并为一段，避免起始日期很早时发出大量空请求
+- 分钟线不分段：东方财富分钟线接口每次都下载整个时间窗口（1分钟为最近5日，其他周期为全部历史）后在本地按日期过滤，
+  拆分只会成倍增加上游请求
+"""
+import math
+import os
+from datetime import date, datetime
+from typing import Any, NamedTuple
+
+import pandas as pd
+
+from provider.akshare_cache import MARKET_TIMEZONE
+
+DEFAULT_SEGMENT_WORKERS = 4
+DEFAULT_MAX_SEGMENTS = 16
+
+
+class SegmentSpec(NamedTuple):
+    start_param: str
+    end_param: str
+    date_column: str
+
+
+# 支持分段获取的接口
+SEGMENTED_FUNCTIONS = {
+    'stock_zh_a_hist': SegmentSpec('start_date', 'end_date', '日期'),
+    'stock_hk_hist': SegmentSpec('start_date', 'end_date', '日期'),
+    'stock_us_hist': SegmentSpec('start_date', 'end_date', '日期'),
+}
+
+# 只对日线分段
+SEGMENTED_PERIODS = (None, 'daily')
+
+
+def segmented_fetch_enabled() -> bool:
+    """AKSHARE_SEGMENTED_FETCH=false 时长区间仍作为一次上游调用获取"""
+    return os.environ.get('AKSHARE_SEGMENTED_FETCH', 'true').strip().lower() not in ('false', '0', 'no')
+
+
+def get_segment_workers() -> int:
+    """并发获取分段的最大线程数，AKSHARE_SEGMENT_WORKERS 可覆盖"""
+    try:
+        return max(1, int(os.environ.get('AKSHARE_SEGMENT_WORKERS', DEFAULT_SEGMENT_WORKERS)))
+    except ValueError:
+        return DEFAULT_SEGMENT_WORKERS
+
+
+def get_max_segments() -> int:
+    """单次调用最多拆分的分段数，AKSHARE_SEGMENT_MAX 可覆盖"""
+    try:
+        return max(2, int(os.environ.get('AKSHARE_SEGMENT_MAX', DEFAULT_MAX_SEGMENTS)))
+    except ValueError:
+        return DEFAULT_MAX_SEGMENTS
+
+
+def _parse_date(value: Any) -> date | None:
+    digits = "".join(ch for ch in str(value) if ch.isdigit())[:8]
+    if len(digits) != 8:
+        return None
+    try:
+        return datetime.strptime(digits, '%Y%m%d').date()
+    except ValueError:
+        return None
+
+
+def _group(units: list[Any], max_segments: int) -> list[list[Any]]:
+    """把连续的年度均匀合并为不超过 max_segments 组"""
+    size = math.ceil(len(units) / max_segments)
+    return [units[i:i + size] for i in range(0, len(units), size)]
+
+
+def _year_segments(start: date, end: date, max_segments: int) -> list[tuple[str, str]]:
+    groups = _group(list(range(start.year, end.year + 1)), max_segments)
+    segments = []
+    for years in groups:
+        segment_start = max(start, date(years[0], 1, 1))
+        segment_end = min(end, date(years[-1], 12, 31))
+        segments.append((segment_start.strftime('%Y%m%d'), segment_end.strftime('%Y%m%d')))
+    return segments
+
+
+def plan_segments(function_name: str, call_kwargs: dict[str, Any], today: date | None = None) -> list[dict[str, Any]] | None:
+    """
+    返回各分段的调用参数（按日期先后排列），区间不需要分段时返回None
+    结束日期晚于今天时按今天计算，未来的年度不单独成段
+    """
+    spec = SEGMENTED_FUNCTIONS.get(function_name)
+    if spec is None or spec.start_param not in call_kwargs or spec.end_param not in call_kwargs:
+        return None
+    today = today or datetime.now(MARKET_TIMEZONE).date()
+    if call_kwargs.get('period') not in SEGMENTED_PERIODS:
+        return None
+    start = _parse_date(call_kwargs[spec.start_param])
+    end = _parse_date(call_kwargs[spec.end_param])
+    if start is None or end is None:
+        return None
+    end = min(end, today)
+    if start.year >= end.year:
+        return None
+    ranges = _year_segments(start, end, get_max_segments())
+    # 最后一段保留原始结束日期，与不分段时的请求一致
+    ranges[-1] = (ranges[-1][0], str(call_kwargs[spec.end_param]))
+    if len(ranges) < 2:
+        return None
+    return [{**call_kwargs, spec.start_param: segment_start, spec.end_param: segment_end} for segment_start, segment_end in ranges]
+
+
+def merge_segments(function_name: str, frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """按日期先后合并各分段结果，按日期列去重（重复时保留后一分段的K线）"""
+    frames = [frame for frame in frames if isinstance(frame, pd.DataFrame)]
+    non_empty = [frame for frame in frames if not frame.empty]
+    if not non_empty:
+        return frames[0] if frames else pd.DataFrame()
+    merged = pd.concat(non_empty, ignore_index=True) if len(non_empty) > 1 else non_empty[0].reset_index(drop=True)
+    date_column = SEGMENTED_FUNCTIONS[function_name].date_column
+    subset = [date_column] if date_column in merged.columns else None
+    return merged.drop_duplicates(subset=subset, keep='last').reset_index(drop=True)
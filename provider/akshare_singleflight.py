@@ -0,0 +1,98 @@
+"""
+AKShare调用合并（single-flight）
+同一时刻参数完全相同的并发调用只执行一次，其余调用等待并共享结果或异常
+"""
+import copy
+import json
+import threading
+from typing import Any, Callable, Hashable
+
+import pandas as pd
+
+
+def make_call_key(function_name: str, kwargs: dict[str, Any], *extra: Any) -> str | None:
+    """
+    根据接口名称和参数生成合并键
+    - 参数按键名排序后序列化，关键字参数顺序不同的调用视为同一请求
+    - 参数无法JSON序列化时返回None，表示该调用不参与合并
+    """
+    try:
+        return json.dumps([function_name, kwargs, list(extra)], sort_keys=True, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+
+
+def copy_result(result: Any) -> Any:
+    """复制共享结果，避免某个调用方原地修改影响其他调用方"""
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return result.copy(deep=True)
+    try:
+        return copy.deepcopy(result)
+    except Exception:
+        return result
+
+
+class _Flight:
+    """一次进行中的调用"""
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """按键合并并发调用，第一个调用方执行，后续相同键的调用方等待其完成"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, _Flight] = {}
+        self._stats = {"calls": 0, "executed": 0, "coalesced": 0, "shared_errors": 0}
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        执行或加入一次调用，返回(结果, 是否为合并调用)
+        有其他调用方共享结果时，每个调用方拿到的都是独立副本
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = _Flight()
+                self._flights[key] = flight
+                self._stats["executed"] += 1
+                leader = True
+            else:
+                flight.followers += 1
+                self._stats["coalesced"] += 1
+                leader = False
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                with self._lock:
+                    self._stats["shared_errors"] += 1
+                raise flight.error
+            return copy_result(flight.result), True
+
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            # 先移出进行中列表再唤醒等待者，之后到达的调用会发起新的请求
+            with self._lock:
+                self._flights.pop(key, None)
+                shared = flight.followers > 0
+            flight.done.set()
+        return (copy_result(flight.result) if shared else flight.result), False
+
+    def stats(self) -> dict[str, int]:
+        """返回合并统计：总调用数、实际执行数、被合并的调用数、共享异常数及当前进行中的请求数"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._flights)
+        return stats
@@ -1,4 +1,4 @@
-from typing import Any, Callable, Tuple, List
+from typing import Any, Callable, Iterator, Tuple, List
 import logging
 import time
 import requests
@@ -10,6 +10,7 @@ import sys
 import os
 import pandas as pd
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import nullcontext
 
 # 设置全局网络超时
 import urllib3
@@ -21,6 +22,48 @@ socket.setdefaulttimeout(1800)  # 30分钟超时，与主进程保持一致
 
 from dify_plugin import ToolProvider
 
+from provider.akshare_singleflight import SingleFlight, make_call_key
+from provider.akshare_cache import ResultCache, cache_enabled, get_cache_max_bytes, resolve_cache_ttl
+from provider.akshare_disk_cache import (
+    DiskCache,
+    disk_cache_enabled,
+    get_disk_cache_dir,
+    get_disk_cache_max_bytes,
+    is_closed_window,
+)
+from provider.akshare_bar_store import BarStore, bar_store_enabled, get_bar_store_dir, supports_bar_store
+from provider.akshare_adjust import (
+    DIVIDEND_FUNCTION,
+    AdjustmentEngine,
+    get_adjust_store_dir,
+    local_adjust_enabled,
+    supports_local_adjust,
+)
+from provider.akshare_segments import get_segment_workers, merge_segments, plan_segments, segmented_fetch_enabled
+from provider.akshare_registry import get_temporal_params
+from provider.akshare_ratelimit import (
+    CircuitOpenError,
+    DataSourceLimiter,
+    get_breaker_reset_seconds,
+    get_breaker_threshold,
+    get_source_limits,
+    rate_limit_enabled,
+)
+from provider.akshare_query import QueryError, apply_query
+from provider.akshare_pool import WORKER_SCRIPT, build_worker_env, get_worker_pool, log_worker_stderr
+from provider.akshare_ipc import (
+    FRAMED_OUTPUT_MAGIC,
+    decode_dataframe_pickle,
+    get_preferred_formats,
+    iter_dataframe_pages,
+    limit_dataframe,
+    new_shm_prefix,
+    parse_framed_output,
+    release_shm_segments,
+    shm_supported,
+    sweep_attached_segments,
+)
+
 
 class AkshareStockdataProvider(ToolProvider):
     def _validate_credentials(self, credentials: dict[str, Any]) -> None:
@@ -46,6 +89,12 @@ def classify_network_error(exc: Exception) -> Tuple[str, List[str]]:
         "如果问题持续，请联系技术支持",
     ]
 
+    if isinstance(exc, CircuitOpenError):
+        return "CIRCUIT_OPEN", [
+            f"数据源 {exc.source} 连续网络错误，已暂停请求，约 {exc.retry_after:.0f} 秒后自动恢复",
+            "稍后重试，避免出口IP被数据源封禁",
+        ]
+
     # 检查SSL相关错误
     error_msg = str(exc).lower()
     if (isinstance(exc, req_exc.SSLError) or 
@@ -78,14 +127,16 @@ INTERFACE_TIMEOUT_CONFIG = {
             'stock_zh_a_new', 'stock_zh_a_new_em', 'stock_xgsr_ths',
             'stock_hsgt_sh_hk_spot_em'  # 沪深港通实时行情
         ],
-        'timeout': 900.0  # 15分钟
+        'timeout': 900.0,  # 15分钟
+        'cache_ttl': 5.0  # 实时快照只短暂复用
     },
     # 财务数据接口 - 复杂查询，需要10分钟
     'financial_data': {
         'interfaces': [
             'stock_balance_sheet_by_report_em', 'stock_financial_abstract', 'stock_research_report_em'
         ],
-        'timeout': 600.0  # 10分钟
+        'timeout': 600.0,  # 10分钟
+        'cache_ttl': 6 * 3600.0  # 财务报表按季度披露，缓存6小时
     },
     # 财务分析接口 - 新增财务数据分析TOOL相关接口
     'financial_analysis': {
@@ -105,7 +156,8 @@ INTERFACE_TIMEOUT_CONFIG = {
             # 新浪财务接口
             'stock_financial_abstract', 'stock_financial_analysis_indicator'
         ],
-        'timeout': 600.0  # 10分钟 - 增加超时时间以处理大量财务数据
+        'timeout': 600.0,  # 10分钟 - 增加超时时间以处理大量财务数据
+        'cache_ttl': 6 * 3600.0
     },
     # 数据密集型接口 - 大量历史数据，需要5分钟
     'data_intensive': {
@@ -116,7 +168,8 @@ INTERFACE_TIMEOUT_CONFIG = {
             'stock_hsgt_hist_em',  # 沪深港通历史数据
             'stock_hsgt_individual_em'  # 沪深港通个股详情
         ],
-        'timeout': 300.0  # 5分钟
+        'timeout': 300.0,  # 5分钟
+        'cache_ttl': 3600.0
     },
     # 股东分析接口 - 需要更长时间处理大量数据，需要15分钟
     'shareholder_analysis': {
@@ -130,24 +183,44 @@ INTERFACE_TIMEOUT_CONFIG = {
             'stock_gdfx_top_10_em',  # 东方财富网-个股十大股东
             'stock_gdfx_free_top_10_em'  # 东方财富网-个股十大流通股东
         ],
-        'timeout': 900.0  # 15分钟
+        'timeout': 900.0,  # 15分钟
+        'cache_ttl': 6 * 3600.0  # 股东数据随定期报告更新
     },
     # 历史数据接口 - 中等数据量，需要5分钟
     'historical_data': {
         'interfaces': [
             'stock_hist_quotations',  # 所有历史行情相关接口
             'stock_hsgt_fund_min_em',  # 沪深港通分时数据
-            'stock_hk_daily'  # 新浪港股历史行情(全量数据)
+            'stock_hk_daily',  # 新浪港股历史行情(全量数据)
+            # K线接口（前缀匹配，包含分钟级接口）
+            'stock_zh_a_hist', 'index_zh_a_hist', 'stock_zh_index_daily',
+            'stock_hk_hist', 'stock_us_hist'
         ],
-        'timeout': 300.0  # 5分钟
+        'timeout': 300.0,  # 5分钟
+        # 已收盘的K线缓存到下一个交易日开盘，窗口包含当天时交易时段内只短暂缓存
+        'cache_ttl': 'next_trading_day'
     },
     # 基础接口 - 数据量小，需要2分钟
     'basic': {
         'interfaces': [],  # 默认类型
-        'timeout': 120.0  # 2分钟
+        'timeout': 120.0,  # 2分钟
+        'cache_ttl': 60.0
     }
 }
 
+def get_interface_category(function_name: str) -> str:
+    """根据接口名称匹配 INTERFACE_TIMEOUT_CONFIG 中的接口类型，未匹配时为 basic"""
+    for config_type, config in INTERFACE_TIMEOUT_CONFIG.items():
+        if config_type == 'basic':
+            continue  # 基础类型最后处理
+        
+        for interface_pattern in config['interfaces']:
+            if function_name == interface_pattern or function_name.startswith(interface_pattern):
+                return config_type
+    
+    return 'basic'
+
+
 def get_interface_timeout(function_name: str, user_timeout: float | None = None) -> float:
     """根据接口类型获取合适的超时时间"""
     if user_timeout is not None:
@@ -155,206 +228,641 @@ def get_interface_timeout(function_name: str, user_timeout: float | None = None)
         return min(float(user_timeout), 1800.0)
     
     # 根据接口名称匹配超时配置
-    for config_type, config in INTERFACE_TIMEOUT_CONFIG.items():
-        if config_type == 'basic':
-            continue  # 基础类型最后处理
+    return INTERFACE_TIMEOUT_CONFIG[get_interface_category(function_name)]['timeout']
+
+
+def get_interface_cache_ttl(function_name: str, call_kwargs: dict[str, Any]) -> float:
+    """根据接口类型的缓存策略计算本次结果的缓存秒数"""
+    config = INTERFACE_TIMEOUT_CONFIG[get_interface_category(function_name)]
+    return resolve_cache_ttl(config.get('cache_ttl', 0), call_kwargs)
+
+def get_subprocess_mode() -> str:
+    """
+    解析AKSHARE_USE_SUBPROCESS环境变量
+    - true（默认）：每次调用启动独立子进程
+    - pool：复用预热的常驻工作进程池
+    - false：在当前进程直接调用（用于本地开发调试）
+    """
+    mode = os.environ.get('AKSHARE_USE_SUBPROCESS', 'true').strip().lower()
+    if mode == 'false':
+        return 'direct'
+    if mode == 'pool':
+        if os.name == 'nt':
+            # Windows管道不支持select，回退到单次子进程模式
+            logging.warning("AKSHARE_USE_SUBPROCESS=pool is not supported on Windows, falling back to subprocess mode")
+            return 'subprocess'
+        return 'pool'
+    return 'subprocess'
+
+
+def get_function_name(fn: Callable[..., Any] | str) -> str:
+    """获取AKShare接口名称，支持直接传入函数名字符串"""
+    return fn if isinstance(fn, str) else fn.__name__
+
+
+def resolve_akshare_function(fn: Callable[..., Any] | str) -> Callable[..., Any]:
+    """
+    将接口名称解析为AKShare函数
+    - akshare 仅在首次解析时导入，插件主进程在子进程/进程池模式下无需加载 akshare
+    """
+    if not isinstance(fn, str):
+        return fn
+    import akshare as ak
+    return getattr(ak, fn)
+
+
+# 相同参数的并发调用合并为一次请求
+_single_flight = SingleFlight()
+
+
+def coalesce_enabled() -> bool:
+    """AKSHARE_COALESCE=false 时关闭并发调用合并"""
+    return os.environ.get('AKSHARE_COALESCE', 'true').strip().lower() not in ('false', '0', 'no')
+
+
+def get_coalesce_stats() -> dict[str, int]:
+    """返回并发调用合并统计"""
+    return _single_flight.stats()
+
+
+# 结果缓存在首次使用时按 AKSHARE_CACHE_MAX_BYTES 创建
+_result_cache: ResultCache | None = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache(get_cache_max_bytes())
+        return _result_cache
+
+
+# 日期窗口已结束的结果写入磁盘缓存，目录和容量在首次使用时读取
+_disk_cache: DiskCache | None = None
+
+
+def get_disk_cache() -> DiskCache:
+    global _disk_cache
+    with _result_cache_lock:
+        if _disk_cache is None:
+            _disk_cache = DiskCache(get_disk_cache_dir(), get_disk_cache_max_bytes())
+        return _disk_cache
+
+
+# 本地K线存储，目录在首次使用时读取
+_bar_store: BarStore | None = None
+
+
+def get_bar_store() -> BarStore:
+    global _bar_store
+    with _result_cache_lock:
+        if _bar_store is None:
+            _bar_store = BarStore(get_bar_store_dir())
+        return _bar_store
+
+
+# 本地复权计算，事件存储目录在首次使用时读取
+_adjustment_engine: AdjustmentEngine | None = None
+
+
+def get_adjustment_engine() -> AdjustmentEngine:
+    global _adjustment_engine
+    with _result_cache_lock:
+        if _adjustment_engine is None:
+            _adjustment_engine = AdjustmentEngine(get_adjust_store_dir())
+        return _adjustment_engine
+
+
+# 按数据源限流与熔断，限额在首次使用时读取
+_source_limiter: DataSourceLimiter | None = None
+_source_limiter_lock = threading.Lock()
+
+
+def get_source_limiter() -> DataSourceLimiter:
+    global _source_limiter
+    with _source_limiter_lock:
+        if _source_limiter is None:
+            _source_limiter = DataSourceLimiter(get_source_limits(), get_breaker_threshold(), get_breaker_reset_seconds())
+        return _source_limiter
+
+
+def _source_guard(function_name: str):
+    """一次上游调用的限流与熔断保护，AKSHARE_RATE_LIMIT=false 时不做任何限制"""
+    if not rate_limit_enabled():
+        return nullcontext()
+    return get_source_limiter().guard(function_name)
+
+
+def get_rate_limit_stats() -> dict[str, dict[str, Any]]:
+    """返回各数据源的调用数、限速等待时间和熔断状态（含熔断次数 trips）"""
+    return get_source_limiter().stats()
+
+
+def get_cache_stats() -> dict[str, Any]:
+    """返回结果缓存统计，disk 为磁盘缓存统计，bars 为本地K线存储统计，adjust 为本地复权统计，financial 为财务数据存储统计"""
+    # 财务数据存储依赖本模块的 safe_ak_call，在这里才导入
+    from provider.akshare_financial_store import get_financial_store_stats
+
+    stats: dict[str, Any] = get_result_cache().stats()
+    if disk_cache_enabled():
+        stats["disk"] = get_disk_cache().stats()
+    if bar_store_enabled():
+        stats["bars"] = get_bar_store().stats()
+    if local_adjust_enabled():
+        stats["adjust"] = get_adjustment_engine().stats()
+    stats["financial"] = get_financial_store_stats()
+    return stats
+
+
+def _is_persistent_call(
+    function_name: str,
+    key: str | None,
+    call_kwargs: dict[str, Any],
+    temporal_params: dict[str, str] | None,
+) -> bool:
+    """调用结果是否可以永久缓存：日期类参数全部位于已结束的窗口内"""
+    if key is None or not disk_cache_enabled():
+        return False
+    if temporal_params is None:
+        temporal_params = get_temporal_params(function_name)
+    return is_closed_window(temporal_params, call_kwargs)
+
+
+def _lookup_cached_result(function_name: str, key: str | None, call_kwargs: dict[str, Any], persistent: bool) -> tuple[bool, Any]:
+    """依次查找内存缓存和磁盘缓存，磁盘命中的结果会放回内存缓存"""
+    if key is None:
+        return False, None
+    memory_cache = get_result_cache() if cache_enabled() else None
+    if memory_cache is not None:
+        hit, cached = memory_cache.get(key)
+        if hit:
+            logging.info(f"Cache hit for {function_name}")
+            return True, cached
+    if persistent:
+        hit, cached = get_disk_cache().get(key)
+        if hit:
+            logging.info(f"Disk cache hit for {function_name}")
+            if memory_cache is not None:
+                memory_cache.put(key, cached, get_interface_cache_ttl(function_name, call_kwargs))
+            return True, cached
+    return False, None
+
+
+def _store_cached_result(function_name: str, key: str | None, call_kwargs: dict[str, Any], persistent: bool, result: Any) -> None:
+    if key is None or result is None:
+        return
+    if cache_enabled():
+        get_result_cache().put(key, result, get_interface_cache_ttl(function_name, call_kwargs))
+    if persistent and not (isinstance(result, pd.DataFrame) and result.empty):
+        get_disk_cache().put(key, result)
+
+
+# 进程间数据传输统计（按编码格式累计字节数与解码耗时）
+_ipc_stats: dict[str, dict[str, float]] = {}
+_ipc_stats_lock = threading.Lock()
+
+
+def _record_ipc_stats(function_name: str, encoding: str, nbytes: int, decode_seconds: float) -> None:
+    logging.info(f"IPC result for {function_name}: encoding={encoding}, bytes={nbytes}, decode={decode_seconds * 1000:.1f}ms")
+    with _ipc_stats_lock:
+        stats = _ipc_stats.setdefault(encoding, {"calls": 0, "bytes": 0, "decode_seconds": 0.0})
+        stats["calls"] += 1
+        stats["bytes"] += nbytes
+        stats["decode_seconds"] += decode_seconds
+
+
+# 分段获取统计
+_segment_stats = {"calls": 0, "segments": 0, "cached": 0, "failed": 0}
+_segment_stats_lock = threading.Lock()
+
+
+def get_segment_stats() -> dict[str, int]:
+    """返回分段获取统计：分段调用次数、分段总数、命中缓存的分段数和最终失败的分段数"""
+    with _segment_stats_lock:
+        return dict(_segment_stats)
+
+
+def _count_segments(**counts: int) -> None:
+    with _segment_stats_lock:
+        for name, value in counts.items():
+            _segment_stats[name] += value
+
+
+def get_ipc_stats() -> dict[str, dict[str, float]]:
+    """返回按编码格式汇总的进程间数据传输统计"""
+    with _ipc_stats_lock:
+        return {encoding: dict(stats) for encoding, stats in _ipc_stats.items()}
+
+
+def _run_worker_subprocess(
+    function_name: str,
+    call_kwargs: dict[str, Any],
+    actual_timeout: float,
+    shm_prefix: str | None = None,
+    options: dict[str, Any] | None = None,
+) -> tuple[dict[str, Any], list[bytearray], int]:
+    """启动一次性工作子进程执行AKShare调用，返回(结果头信息, 数据帧列表, 输出字节数)"""
+    # 获取工作进程脚本路径
+    worker_script = WORKER_SCRIPT
+
+    # 使用子进程避免gevent冲突
+    # 尝试使用临时文件，如果失败则回退到命令行参数
+    try:
+        import tempfile
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8', newline='') as f:
+            json.dump(call_kwargs, f, ensure_ascii=False, indent=None, separators=(',', ':'))
+            temp_file = f.name
         
-        for interface_pattern in config['interfaces']:
-            if function_name == interface_pattern or function_name.startswith(interface_pattern):
-                return config['timeout']
+        cmd = [sys.executable, worker_script, function_name, temp_file]
+    except Exception as e:
+        # 如果临时文件创建失败，回退到命令行参数方式
+        logging.warning(f"Failed to create temp file: {e}, using command line args")
+        cmd = [sys.executable, worker_script, function_name, json.dumps(call_kwargs, ensure_ascii=False)]
+    
+    # 执行子进程 - 使用UTF-8编码避免GBK编码问题
+    env = build_worker_env()
+    # 声明可接受的结果编码格式，工作进程据此选择二进制帧或JSON输出
+    env['AKSHARE_IPC_ACCEPT'] = ','.join(get_preferred_formats())
+    if shm_prefix:
+        env['AKSHARE_IPC_SHM_PREFIX'] = shm_prefix
+    if options:
+        env['AKSHARE_CALL_OPTIONS'] = json.dumps(options)
+    
+    # 使用二进制模式避免gevent编码问题
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=False,  # 使用二进制模式
+        timeout=actual_timeout,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env
+    )
+    
+    # 记录子进程的stderr输出用于调试
+    try:
+        stderr_text = result.stderr.decode('utf-8', errors='replace')
+    except UnicodeDecodeError:
+        try:
+            stderr_text = result.stderr.decode('gbk', errors='replace')
+        except UnicodeDecodeError:
+            stderr_text = result.stderr.decode('latin1', errors='replace')
+    log_worker_stderr(stderr_text)
+    
+    # 帧格式输出（二进制编码），无需文本解码
+    if result.returncode == 0 and result.stdout.startswith(FRAMED_OUTPUT_MAGIC):
+        logging.info(f"Subprocess completed with framed output: {len(result.stdout)} bytes")
+        header, frames = parse_framed_output(result.stdout)
+        return header, frames, len(result.stdout)
+    
+    # 手动解码输出，处理编码问题
+    try:
+        stdout_text = result.stdout.decode('utf-8', errors='replace')
+    except UnicodeDecodeError:
+        # 如果UTF-8解码失败，尝试其他编码
+        try:
+            stdout_text = result.stdout.decode('gbk', errors='replace')
+        except UnicodeDecodeError:
+            stdout_text = result.stdout.decode('latin1', errors='replace')
+    
+    # 添加调试信息
+    logging.info(f"Subprocess completed with return code: {result.returncode}")
+    logging.info(f"Subprocess stdout length: {len(stdout_text)}")
+    logging.info(f"Subprocess stderr length: {len(stderr_text)}")
+    
+    if result.returncode != 0:
+        raise RuntimeError(f"Subprocess failed with return code {result.returncode}: {stderr_text}")
     
-    # 默认使用基础接口的超时时间
-    return INTERFACE_TIMEOUT_CONFIG['basic']['timeout']
+    # 解析结果
+    try:
+        logging.info(f"Attempting to parse stdout: {stdout_text[:200]}...")  # 只显示前200个字符
+        result_data = json.loads(stdout_text)
+        logging.info(f"Successfully parsed result data: success={result_data.get('success')}, type={result_data.get('type')}")
+    except json.JSONDecodeError as e:
+        logging.error(f"JSON parse error: {e}")
+        logging.error(f"Raw stdout: {stdout_text}")
+        raise RuntimeError(f"Failed to parse subprocess output: {e}")
+    return result_data, [], len(result.stdout)
+
+
+def _rebuild_worker_result(result_data: dict[str, Any], frames: list[bytearray]) -> Any:
+    """根据工作进程返回的结果头信息和数据帧重建DataFrame或其他结果"""
+    if not result_data.get("success", False):
+        error_msg = result_data.get("error", "Unknown error")
+        if result_data.get("error_type") == "QueryError":
+            # 查询参数与结果列不匹配，重试不会改变结果
+            raise QueryError(error_msg)
+        raise RuntimeError(f"AKShare call failed: {error_msg}")
+    
+    # 重建DataFrame
+    if result_data.get("type") == "dataframe_pickle":
+        # 二进制编码，完整保留列类型；大结果的数值缓冲区直接映射共享内存
+        return decode_dataframe_pickle(frames, result_data.get("shm_buffers"))
+    elif result_data.get("type") == "dataframe":
+        return pd.DataFrame(result_data["data"])
+    elif result_data.get("type") == "dataframe_json":
+        # 解析JSON字符串
+        json_data = json.loads(result_data["data"])
+        return pd.DataFrame(json_data)
+    else:
+        return result_data.get("data", "")
+
+
+def _handle_attempt_error(
+    e: Exception,
+    *,
+    attempt: int,
+    retries: int,
+    backoff: float,
+    function_name: str,
+    actual_timeout: float,
+    call_kwargs: dict[str, Any],
+) -> float:
+    """记录一次失败的调用尝试，返回下次重试前的等待秒数"""
+    if isinstance(e, TypeError):
+        # Unexpected keyword 'timeout': retry without timeout in subsequent attempts
+        if "unexpected keyword argument 'timeout'" in str(e) or "got an unexpected keyword argument 'timeout'" in str(e):
+            logging.debug("safe_ak_call: removing unsupported 'timeout' argument and retrying once")
+            call_kwargs.pop("timeout", None)
+        return min(8.0, backoff ** attempt)
+    
+    if isinstance(e, subprocess.TimeoutExpired):
+        logging.warning("AKShare call timeout (attempt %s/%s): %s", attempt + 1, retries, e)
+        # 对于慢接口，提供更友好的错误信息
+        if function_name in ['stock_balance_sheet_by_report_em', 'stock_financial_abstract', 'stock_research_report_em']:
+            logging.info(f"Slow interface {function_name} timed out after {actual_timeout}s, this is normal for financial data interfaces")
+        elif function_name in ['stock_zh_a_spot_em', 'stock_sh_a_spot_em', 'stock_sz_a_spot_em', 
+                             'stock_bj_a_spot_em', 'stock_new_a_spot_em', 'stock_cy_a_spot_em', 
+                             'stock_kc_a_spot_em', 'stock_hk_spot_em', 'stock_hk_main_board_spot_em',
+                             'stock_zh_ah_spot_em', 'stock_zh_ab_comparison_em',
+                             'stock_zh_a_new', 'stock_zh_a_new_em', 'stock_xgsr_ths']:
+            logging.info(f"Real-time market data interface {function_name} timed out after {actual_timeout}s, this is normal for large market data requests")
+        
+        # 设置超时错误的重试等待时间
+        return min(8.0, backoff ** attempt)
+    
+    # network or other
+    code, _ = classify_network_error(e)
+    logging.warning("AKShare call failed (attempt %s/%s, code=%s): %s", attempt + 1, retries, code, e)
+    
+    # 对于SSL错误，增加更长的等待时间
+    if isinstance(e, (req_exc.SSLError,)) or "SSL" in str(e) or "EOF" in str(e):
+        logging.info("SSL error detected, using extended backoff")
+        return min(15.0, backoff ** attempt * 2)  # SSL错误使用更长的等待时间
+    return min(8.0, backoff ** attempt)
+
+
+def _log_truncation(function_name: str, result_data: dict[str, Any], returned_rows: int) -> None:
+    if result_data.get("truncated"):
+        logging.warning(
+            f"{function_name} returned {result_data.get('total_rows')} rows, "
+            f"truncated to {returned_rows} rows by max_rows/max_bytes"
+        )
+
 
 def safe_ak_call(
-    fn: Callable[..., Any],
+    fn: Callable[..., Any] | str,
     *,
     retries: int = 5,  # 增加默认重试次数
     backoff: float = 1.5,
     timeout: float | None = None,  # 改为None，让函数自动决定
+    max_rows: int | None = None,
+    max_bytes: int | None = None,
+    use_cache: bool = True,
+    temporal_params: dict[str, str] | None = None,
+    query: dict[str, Any] | None = None,
     **kwargs: Any,
 ) -> Any:
     """
     Call AKShare API with exponential backoff retries in a separate process.
     - Uses subprocess to completely avoid gevent blocking issues
+    - AKSHARE_USE_SUBPROCESS=pool reuses pre-warmed long-lived workers instead of spawning one per call
     - timeout parameter controls subprocess execution time, not AKShare interface timeout
+    - Results are returned in full; max_rows/max_bytes explicitly cap the DataFrame size
+    - fn may be an AKShare function or its name; names keep akshare out of the plugin process
+    - Concurrent calls with the same function and arguments share one in-flight fetch
+      (AKSHARE_COALESCE=false disables this); each caller receives its own copy of the result
+    - Results are kept in a byte-bounded LRU cache with a freshness policy per interface category
+      (see cache_ttl in INTERFACE_TIMEOUT_CONFIG); use_cache=False skips the lookup and refreshes the entry
+    - Calls whose temporal parameters (temporal_params, or the "temporal" markers in the registry)
+      all lie in the past are also persisted to the on-disk cache without expiry
+    - stock_zh_a_hist calls with an explicit date range go through the local bar store, which only
+      fetches the head/tail segments it does not cover yet (AKSHARE_BAR_STORE=false disables this)
+    - With AKSHARE_LOCAL_ADJUST=true, daily qfq/hfq stock_zh_a_hist calls fetch the unadjusted bars and the
+      dividend/bonus events (refreshed at most once a day) and compute the adjusted prices locally
+    - Long daily ranges of stock_zh_a_hist/stock_hk_hist/stock_us_hist are split by year and fetched as
+      concurrent segments, each retried and cached on its own, then merged and de-duplicated on the date column
+      (AKSHARE_SEGMENTED_FETCH=false disables this)
+    - Each attempt is throttled per upstream data source (rate and concurrency); repeated network
+      failures open the source's circuit and further calls fail fast with CircuitOpenError
+    - query (see provider.akshare_query.build_query) filters, sorts, limits and projects the DataFrame
+      before max_rows/max_bytes apply; worker modes run it in the worker so only the selected rows and
+      columns cross the process boundary. Invalid queries raise QueryError without retrying
     - Re-raise the last exception for the caller to handle.
     """
+    # 获取函数名称
+    function_name = get_function_name(fn)
+    key = make_call_key(function_name, kwargs, max_rows, max_bytes, query)
+    persistent = _is_persistent_call(function_name, key, kwargs, temporal_params)
+    
+    if use_cache:
+        hit, cached = _lookup_cached_result(function_name, key, kwargs, persistent)
+        if hit:
+            return cached
+    
+    def fetch(call_kwargs: dict[str, Any], call_query: dict[str, Any] | None = None) -> Any:
+        segments = plan_segments(function_name, call_kwargs) if segmented_fetch_enabled() else None
+        if segments:
+            return _fetch_segmented(
+                fn, function_name, segments, use_cache=use_cache, temporal_params=temporal_params,
+                retries=retries, backoff=backoff, timeout=timeout, max_rows=max_rows, max_bytes=max_bytes, query=call_query
+            )
+        return _call_with_retries(
+            fn, function_name, call_kwargs=call_kwargs, retries=retries, backoff=backoff,
+            timeout=timeout, max_rows=max_rows, max_bytes=max_bytes, query=call_query
+        )
+    
+    def fetch_raw(raw_kwargs: dict[str, Any]) -> Any:
+        return safe_ak_call(
+            fn, retries=retries, backoff=backoff, timeout=timeout, use_cache=use_cache,
+            temporal_params=temporal_params, **raw_kwargs
+        )
+    
+    def fetch_dividends(dividends_use_cache: bool) -> Any:
+        return safe_ak_call(
+            DIVIDEND_FUNCTION, retries=retries, backoff=backoff, timeout=timeout,
+            use_cache=dividends_use_cache, symbol=kwargs['symbol']
+        )
+    
+    def run() -> Any:
+        if max_rows is None and max_bytes is None and local_adjust_enabled() and supports_local_adjust(function_name, kwargs):
+            # 前/后复权K线：不复权K线经本地K线存储获取，按分红送转事件在本地复权，查询在复权后执行
+            result = apply_query(
+                get_adjustment_engine().fetch(function_name, kwargs, fetch_raw, fetch_dividends, refresh=not use_cache), query
+            )
+        elif max_rows is None and max_bytes is None and bar_store_enabled() and supports_bar_store(function_name, kwargs):
+            # K线接口：只获取本地K线存储未覆盖的区间，存储完整K线，查询在合并后执行
+            result = apply_query(get_bar_store().fetch(function_name, kwargs, fetch, refresh=not use_cache), query)
+        else:
+            result = fetch(kwargs, query)
+        _store_cached_result(function_name, key, kwargs, persistent, result)
+        return result
+    
+    if key is None or not coalesce_enabled():
+        return run()
+    
+    result, coalesced = _single_flight.do(key, run)
+    if coalesced:
+        logging.info(f"Coalesced {function_name} call with an identical in-flight request")
+    return result
+
+
+def _fetch_segmented(
+    fn: Callable[..., Any] | str,
+    function_name: str,
+    segments: list[dict[str, Any]],
+    *,
+    use_cache: bool,
+    temporal_params: dict[str, str] | None,
+    retries: int,
+    backoff: float,
+    timeout: float | None,
+    max_rows: int | None,
+    max_bytes: int | None,
+    query: dict[str, Any] | None,
+) -> Any:
+    """
+    长区间K线按分段并发获取：每个分段独立重试，并按分段参数单独缓存（已结束的年度写入磁盘缓存），
+    因此某个分段最终失败时，再次调用只需要获取失败的分段；查询和行数限制在合并之后执行
+    """
+    def fetch_segment(segment_kwargs: dict[str, Any]) -> Any:
+        key = make_call_key(function_name, segment_kwargs, None, None, None)
+        persistent = _is_persistent_call(function_name, key, segment_kwargs, temporal_params)
+        if use_cache:
+            hit, cached = _lookup_cached_result(function_name, key, segment_kwargs, persistent)
+            if hit:
+                _count_segments(cached=1)
+                return cached
+        
+        def run() -> Any:
+            result = _call_with_retries(
+                fn, function_name, call_kwargs=segment_kwargs, retries=retries, backoff=backoff,
+                timeout=timeout, max_rows=None, max_bytes=None
+            )
+            _store_cached_result(function_name, key, segment_kwargs, persistent, result)
+            return result
+        
+        if key is None or not coalesce_enabled():
+            return run()
+        return _single_flight.do(key, run)[0]
+    
+    _count_segments(calls=1, segments=len(segments))
+    logging.info(f"Fetching {function_name} in {len(segments)} segments")
+    workers = min(get_segment_workers(), len(segments))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="akshare-segment") as executor:
+        futures = [executor.submit(fetch_segment, segment_kwargs) for segment_kwargs in segments]
+        results, errors = [], []
+        for segment_kwargs, future in zip(segments, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                errors.append(e)
+                logging.warning(f"Segment {segment_kwargs} of {function_name} failed after retries: {e}")
+    if errors:
+        _count_segments(failed=len(errors))
+        raise errors[0]
+    
+    result = apply_query(merge_segments(function_name, results), query)
+    result, total_rows, truncated = limit_dataframe(result, max_rows, max_bytes)
+    _log_truncation(function_name, {"truncated": truncated, "total_rows": total_rows}, len(result))
+    return result
+
+
+def _call_with_retries(
+    fn: Callable[..., Any] | str,
+    function_name: str,
+    *,
+    call_kwargs: dict[str, Any],
+    retries: int,
+    backoff: float,
+    timeout: float | None,
+    max_rows: int | None,
+    max_bytes: int | None,
+    query: dict[str, Any] | None = None,
+) -> Any:
+    """safe_ak_call的实际执行逻辑：按模式调用AKShare并按指数退避重试"""
     # 检查是否在开发环境中（本地运行）
-    use_subprocess = os.environ.get('AKSHARE_USE_SUBPROCESS', 'true').lower() == 'true'
+    mode = get_subprocess_mode()
     
-    if not use_subprocess:
+    if mode == 'direct':
         # 直接调用模式（用于本地开发调试）
-        logging.info(f"Direct call mode for {fn.__name__}")
-        return fn(**kwargs)
+        logging.info(f"Direct call mode for {function_name}")
+        with _source_guard(function_name):
+            result = resolve_akshare_function(fn)(**call_kwargs)
+        if isinstance(result, pd.DataFrame):
+            result = apply_query(result, query)
+            result, total_rows, truncated = limit_dataframe(result, max_rows, max_bytes)
+            _log_truncation(function_name, {"truncated": truncated, "total_rows": total_rows}, len(result))
+        return result
     
     attempt = 0
     last_exc: Exception | None = None
     
-    # 获取函数名称
-    function_name = fn.__name__
-    
     # 准备调用参数 - timeout不再作为AKShare接口参数传递
-    call_kwargs = dict(kwargs)
+    call_kwargs = dict(call_kwargs)
     # 注意：timeout参数现在仅用于子进程超时控制，不作为AKShare接口参数
-
-    # 获取工作进程脚本路径
-    worker_script = os.path.join(os.path.dirname(__file__), "akshare_worker.py")
+    options = {"max_rows": max_rows, "max_bytes": max_bytes, "query": query}
     
     while attempt < max(1, retries):
+        # 设置子进程超时 - 根据接口类型自动选择超时时间
+        actual_timeout = get_interface_timeout(function_name, timeout)
         try:
-            # 使用子进程避免gevent冲突
-            # 尝试使用临时文件，如果失败则回退到命令行参数
-            try:
-                import tempfile
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8', newline='') as f:
-                    json.dump(call_kwargs, f, ensure_ascii=False, indent=None, separators=(',', ':'))
-                    temp_file = f.name
-                
-                cmd = [sys.executable, worker_script, function_name, temp_file]
-            except Exception as e:
-                # 如果临时文件创建失败，回退到命令行参数方式
-                logging.warning(f"Failed to create temp file: {e}, using command line args")
-                cmd = [sys.executable, worker_script, function_name, json.dumps(call_kwargs, ensure_ascii=False)]
-            
-            # 设置子进程超时 - 根据接口类型自动选择超时时间
-            actual_timeout = get_interface_timeout(function_name, timeout)
-            logging.info(f"Using subprocess timeout: {actual_timeout}s for {function_name} (user_set: {timeout is not None})")
-            
-            # 执行子进程 - 使用UTF-8编码避免GBK编码问题
-            env = os.environ.copy()
-            env['PYTHONIOENCODING'] = 'utf-8'
-            # 强制设置系统编码环境变量
-            env['LANG'] = 'en_US.UTF-8'
-            env['LC_ALL'] = 'en_US.UTF-8'
-            
-            # 在Windows上额外设置编码相关环境变量
-            if os.name == 'nt':  # Windows
-                env['PYTHONLEGACYWINDOWSSTDIO'] = '1'
-                env['PYTHONIOENCODING'] = 'utf-8:replace'
-            
-            # 使用二进制模式避免gevent编码问题
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=False,  # 使用二进制模式
-                timeout=actual_timeout,
-                cwd=os.path.dirname(os.path.abspath(__file__)),
-                env=env
-            )
-            
-            # 手动解码输出，处理编码问题
-            try:
-                stdout_text = result.stdout.decode('utf-8', errors='replace')
-            except UnicodeDecodeError:
-                # 如果UTF-8解码失败，尝试其他编码
-                try:
-                    stdout_text = result.stdout.decode('gbk', errors='replace')
-                except UnicodeDecodeError:
-                    stdout_text = result.stdout.decode('latin1', errors='replace')
+            logging.info(f"Using subprocess timeout: {actual_timeout}s for {function_name} (user_set: {timeout is not None}, mode: {mode})")
             
+            # 每次尝试使用独立的共享内存段名前缀，结束后无论成败都按前缀清理残留段
+            shm_prefix = new_shm_prefix() if shm_supported() else None
             try:
-                stderr_text = result.stderr.decode('utf-8', errors='replace')
-            except UnicodeDecodeError:
-                try:
-                    stderr_text = result.stderr.decode('gbk', errors='replace')
-                except UnicodeDecodeError:
-                    stderr_text = result.stderr.decode('latin1', errors='replace')
-            
-            # 创建类似subprocess.run结果的命名元组
-            class SubprocessResult:
-                def __init__(self, returncode, stdout, stderr):
-                    self.returncode = returncode
-                    self.stdout = stdout
-                    self.stderr = stderr
-            
-            result = SubprocessResult(result.returncode, stdout_text, stderr_text)
-            
-            # 记录子进程的stderr输出用于调试
-            if result.stderr:
-                # 检查是否是AKShare的正常警告信息，而不是真正的错误
-                stderr_lower = result.stderr.lower()
-                if any(normal_warning in stderr_lower for normal_warning in [
-                    "正在下载数据", "请稍等", "downloading data", "please wait",
-                    "debug:", "using timeout", "warn", "warning", "userwarning"
-                ]):
-                    # 这是正常的警告信息，记录为info级别
-                    logging.info(f"Subprocess info: {result.stderr}")
-                else:
-                    # 这可能是真正的错误，记录为warning级别
-                    logging.warning(f"Subprocess stderr: {result.stderr}")
-            
-            # 添加调试信息
-            logging.info(f"Subprocess completed with return code: {result.returncode}")
-            logging.info(f"Subprocess stdout length: {len(result.stdout)}")
-            logging.info(f"Subprocess stderr length: {len(result.stderr)}")
-            
-            if result.returncode != 0:
-                raise RuntimeError(f"Subprocess failed with return code {result.returncode}: {result.stderr}")
-            
-            # 解析结果
-            try:
-                logging.info(f"Attempting to parse stdout: {result.stdout[:200]}...")  # 只显示前200个字符
-                result_data = json.loads(result.stdout)
-                logging.info(f"Successfully parsed result data: success={result_data.get('success')}, type={result_data.get('type')}")
-            except json.JSONDecodeError as e:
-                logging.error(f"JSON parse error: {e}")
-                logging.error(f"Raw stdout: {result.stdout}")
-                raise RuntimeError(f"Failed to parse subprocess output: {e}")
-            
-            if not result_data.get("success", False):
-                error_msg = result_data.get("error", "Unknown error")
-                raise RuntimeError(f"AKShare call failed: {error_msg}")
-            
-            # 重建DataFrame
-            if result_data.get("type") == "dataframe":
-                import pandas as pd  # 延迟导入
-                df = pd.DataFrame(result_data["data"])
-                return df
-            elif result_data.get("type") == "dataframe_json":
-                import pandas as pd  # 延迟导入
-                import json as json_lib
-                # 解析JSON字符串
-                json_data = json_lib.loads(result_data["data"])
-                df = pd.DataFrame(json_data)
-                return df
-            else:
-                return result_data.get("data", "")
+                with _source_guard(function_name):
+                    if mode == 'pool':
+                        # 常驻工作进程池：超时或崩溃的进程会被回收，下次重试自动使用新进程
+                        result_data, frames, nbytes = get_worker_pool().call(
+                            function_name, call_kwargs, actual_timeout, shm_prefix, options
+                        )
+                    else:
+                        result_data, frames, nbytes = _run_worker_subprocess(
+                            function_name, call_kwargs, actual_timeout, shm_prefix, options
+                        )
                 
-        except TypeError as e:
-            # Unexpected keyword 'timeout': retry without timeout in subsequent attempts
-            if "unexpected keyword argument 'timeout'" in str(e) or "got an unexpected keyword argument 'timeout'" in str(e):
-                logging.debug("safe_ak_call: removing unsupported 'timeout' argument and retrying once")
-                call_kwargs.pop("timeout", None)
-                last_exc = e
-            else:
-                last_exc = e
-        except subprocess.TimeoutExpired as e:
+                decode_start = time.perf_counter()
+                result = _rebuild_worker_result(result_data, frames)
+                encoding = result_data.get("encoding", "json")
+                if result_data.get("shm_buffers"):
+                    encoding += "+shm"
+                    nbytes += sum(descriptor[1] for descriptor in result_data["shm_buffers"] if descriptor)
+                _record_ipc_stats(function_name, encoding, nbytes, time.perf_counter() - decode_start)
+                if isinstance(result, pd.DataFrame):
+                    _log_truncation(function_name, result_data, len(result))
+                return result
+            finally:
+                if shm_prefix:
+                    released = release_shm_segments(shm_prefix)
+                    if released:
+                        logging.warning(f"Released {released} leftover shared memory segments for {function_name}")
+                sweep_attached_segments()
+        except (CircuitOpenError, QueryError):
+            # 数据源已熔断时重试只会继续冲击上游，查询参数错误时重试也不会成功，直接失败
+            raise
+        except Exception as e:
             last_exc = e
-            logging.warning("AKShare call timeout (attempt %s/%s): %s", attempt + 1, retries, e)
-            # 对于慢接口，提供更友好的错误信息
-            if function_name in ['stock_balance_sheet_by_report_em', 'stock_financial_abstract', 'stock_research_report_em']:
-                logging.info(f"Slow interface {function_name} timed out after {actual_timeout}s, this is normal for financial data interfaces")
-            elif function_name in ['stock_zh_a_spot_em', 'stock_sh_a_spot_em', 'stock_sz_a_spot_em', 
-                                 'stock_bj_a_spot_em', 'stock_new_a_spot_em', 'stock_cy_a_spot_em', 
-                                 'stock_kc_a_spot_em', 'stock_hk_spot_em', 'stock_hk_main_board_spot_em',
-                                 'stock_zh_ah_spot_em', 'stock_zh_ab_comparison_em',
-                                 'stock_zh_a_new', 'stock_zh_a_new_em', 'stock_xgsr_ths']:
-                logging.info(f"Real-time market data interface {function_name} timed out after {actual_timeout}s, this is normal for large market data requests")
-            
-            # 设置超时错误的重试等待时间
-            sleep_s = min(8.0, backoff ** attempt)
-        except Exception as e:  # network or other
-            last_exc = e
-            code, _ = classify_network_error(e)
-            logging.warning("AKShare call failed (attempt %s/%s, code=%s): %s", attempt + 1, retries, code, e)
-            
-            # 对于SSL错误，增加更长的等待时间
-            if isinstance(e, (req_exc.SSLError,)) or "SSL" in str(e) or "EOF" in str(e):
-                logging.info("SSL error detected, using extended backoff")
-                sleep_s = min(15.0, backoff ** attempt * 2)  # SSL错误使用更长的等待时间
-            else:
-                sleep_s = min(8.0, backoff ** attempt)
+            sleep_s = _handle_attempt_error(
+                e,
+                attempt=attempt,
+                retries=retries,
+                backoff=backoff,
+                function_name=function_name,
+                actual_timeout=actual_timeout,
+                call_kwargs=call_kwargs,
+            )
         
         attempt += 1
         if attempt < retries:
@@ -365,9 +873,130 @@ def safe_ak_call(
     raise RuntimeError("safe_ak_call: unknown error")
 
 
+def safe_ak_stream(
+    fn: Callable[..., Any] | str,
+    *,
+    retries: int = 5,
+    backoff: float = 1.5,
+    timeout: float | None = None,
+    max_rows: int | None = None,
+    max_bytes: int | None = None,
+    page_bytes: int | None = None,
+    use_cache: bool = True,
+    temporal_params: dict[str, str] | None = None,
+    query: dict[str, Any] | None = None,
+    **kwargs: Any,
+) -> Iterator[Any]:
+    """
+    Call AKShare API and consume the DataFrame result page by page.
+    - In pool mode the worker sends byte-bounded pages as they are encoded, so the parent never
+      holds the whole decoded result at once
+    - Other modes fetch the full result and slice it into the same byte-bounded pages
+    - Retries only cover the call itself: once the first page header has been received, errors
+      are raised from the iterator
+    - query is applied before paging (in the worker in pool mode), see safe_ak_call
+    - Non-DataFrame results are yielded as a single item
+    - Cached results are paged directly; pool-mode streams are not written to the result caches
+    """
+    mode = get_subprocess_mode()
+    if mode != 'pool':
+        result = safe_ak_call(
+            fn, retries=retries, backoff=backoff, timeout=timeout,
+            max_rows=max_rows, max_bytes=max_bytes, use_cache=use_cache,
+            temporal_params=temporal_params, query=query, **kwargs
+        )
+        if isinstance(result, pd.DataFrame):
+            return iter_dataframe_pages(result, page_bytes)
+        return iter([result])
+    
+    attempt = 0
+    last_exc: Exception | None = None
+    function_name = get_function_name(fn)
+    
+    if use_cache:
+        key = make_call_key(function_name, kwargs, max_rows, max_bytes, query)
+        persistent = _is_persistent_call(function_name, key, kwargs, temporal_params)
+        hit, cached = _lookup_cached_result(function_name, key, kwargs, persistent)
+        if hit:
+            if isinstance(cached, pd.DataFrame):
+                return iter_dataframe_pages(cached, page_bytes)
+            return iter([cached])
+    
+    call_kwargs = dict(kwargs)
+    options = {"max_rows": max_rows, "max_bytes": max_bytes, "page_bytes": page_bytes, "query": query}
+    
+    while attempt < max(1, retries):
+        actual_timeout = get_interface_timeout(function_name, timeout)
+        try:
+            logging.info(f"Streaming {function_name} with timeout {actual_timeout}s")
+            with _source_guard(function_name):
+                messages = get_worker_pool().stream(function_name, call_kwargs, actual_timeout, options)
+                result_data, frames, _ = next(messages)
+            if result_data.get("type") != "dataframe_stream":
+                messages.close()
+                return iter([_rebuild_worker_result(result_data, frames)])
+            return _iter_stream_pages(function_name, result_data, messages)
+        except (CircuitOpenError, QueryError):
+            raise
+        except Exception as e:
+            last_exc = e
+            sleep_s = _handle_attempt_error(
+                e,
+                attempt=attempt,
+                retries=retries,
+                backoff=backoff,
+                function_name=function_name,
+                actual_timeout=actual_timeout,
+                call_kwargs=call_kwargs,
+            )
+        
+        attempt += 1
+        if attempt < retries:
+            time.sleep(sleep_s)
+    
+    if last_exc is not None:
+        raise last_exc
+    raise RuntimeError("safe_ak_stream: unknown error")
+
+
+def _iter_stream_pages(function_name: str, stream_header: dict[str, Any], messages: Iterator[Any]) -> Iterator[pd.DataFrame]:
+    """解码流式调用的数据页"""
+    rows = 0
+    try:
+        for result_data, frames, nbytes in messages:
+            message_type = result_data.get("type")
+            if message_type == "chunk":
+                decode_start = time.perf_counter()
+                if stream_header.get("encoding") == "pickle5":
+                    page = decode_dataframe_pickle(frames)
+                else:
+                    page = pd.DataFrame(json.loads(result_data["data"]))
+                _record_ipc_stats(
+                    function_name, f"{stream_header.get('encoding', 'json')}+stream",
+                    nbytes, time.perf_counter() - decode_start
+                )
+                rows += len(page)
+                yield page
+            elif message_type == "end":
+                _log_truncation(function_name, stream_header, rows)
+                return
+            else:
+                raise RuntimeError(f"AKShare stream failed: {result_data.get('error', 'Unknown error')}")
+    finally:
+        messages.close()
+
+
 def build_error_payload(exc: Exception) -> tuple[str, dict[str, Any]]:
     code, hints = classify_network_error(exc)
     message = str(exc)
     text = f"网络错误({code}): {message}\n建议: " + "; ".join(hints)
     return text, {"error_code": code, "message": message, "hints": hints}
 
+
+
+# 进程池模式下在插件启动时预热工作进程，首次调用无需等待AKShare导入
+if get_subprocess_mode() == 'pool':
+    try:
+        get_worker_pool()
+    except Exception as e:
+        logging.warning(f"Failed to pre-warm AKShare worker pool: {e}")
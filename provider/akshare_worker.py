@@ -286,80 +286,257 @@ def get_interface_timeout_for_worker(function_name: str) -> float:
     return INTERFACE_TIMEOUT_CONFIG['basic']['timeout']
 import pandas as pd
 
-def call_akshare_function(function_name, **kwargs):
-    """调用指定的AKShare函数"""
-    try:
-        # 获取函数对象
-        if hasattr(ak, function_name):
-            func = getattr(ak, function_name)
-        else:
-            raise ValueError(f"Function {function_name} not found in akshare")
-        
-        # 获取接口超时时间
-        interface_timeout = get_interface_timeout_for_worker(function_name)
-        print(f"DEBUG: Using timeout {interface_timeout}s for {function_name}", file=sys.stderr)
-        
-        # 调用函数 - 这里直接调用，超时由主进程的subprocess.run控制
-        result = func(**kwargs)
-        
-        # 处理结果
-        if isinstance(result, pd.DataFrame):
-            # 检查数据量，如果太大则截断
-            max_rows = 10000  # 限制最大行数
-            if len(result) > max_rows:
-                print(f"WARNING: DataFrame has {len(result)} rows, truncating to {max_rows} rows", file=sys.stderr)
-                result = result.head(max_rows)
-            
-            # 将DataFrame转换为JSON可序列化的格式
-            # 使用更高效的方法处理数据类型
-            try:
-                # 尝试直接使用pandas的to_json方法，这比逐列转换更高效
-                json_str = result.to_json(orient='records', date_format='iso', force_ascii=False)
-                return {
-                    "success": True,
-                    "type": "dataframe_json",
-                    "data": json_str,
-                    "shape": result.shape,
-                    "columns": result.columns.tolist()
-                }
-            except Exception as json_error:
-                print(f"WARNING: to_json failed ({json_error}), falling back to manual conversion", file=sys.stderr)
-                # 回退到原来的方法
-                df_clean = result.copy()
-                for col in df_clean.columns:
-                    # 将所有列转换为字符串，处理NaT、NaN等特殊值
-                    df_clean[col] = df_clean[col].astype(str)
-                    # 将NaN、NaT等特殊值替换为空字符串
-                    df_clean[col] = df_clean[col].replace(['nan', 'NaT', 'None'], '')
-                
-                return {
-                    "success": True,
-                    "type": "dataframe",
-                    "data": df_clean.to_dict('records'),
-                    "columns": list(result.columns),
-                    "shape": result.shape
-                }
-        else:
-            # 其他类型的结果
+def _execute_akshare_function(function_name, kwargs, options=None):
+    """
+    解析并执行指定的AKShare函数，返回(结果, 截断信息)
+
+    不再隐式截断结果；仅当调用方在options中显式给出max_rows/max_bytes时才截取，
+    截断信息会随结果头返回给主进程。options中给出query时先执行列投影和行过滤，
+    只把需要的行列编码传回主进程。
+    """
+    from akshare_ipc import limit_dataframe
+    from akshare_query import apply_query
+
+    # 获取函数对象
+    if hasattr(ak, function_name):
+        func = getattr(ak, function_name)
+    else:
+        raise ValueError(f"Function {function_name} not found in akshare")
+    
+    # 获取接口超时时间
+    interface_timeout = get_interface_timeout_for_worker(function_name)
+    print(f"DEBUG: Using timeout {interface_timeout}s for {function_name}", file=sys.stderr)
+    
+    # 调用函数 - 这里直接调用，超时由主进程控制
+    result = func(**kwargs)
+    
+    limit_info = {}
+    if isinstance(result, pd.DataFrame):
+        options = options or {}
+        result = apply_query(result, options.get("query"))
+        result, total_rows, truncated = limit_dataframe(result, options.get("max_rows"), options.get("max_bytes"))
+        if truncated:
+            print(f"WARNING: DataFrame has {total_rows} rows, truncated to {len(result)} rows by caller limits", file=sys.stderr)
+            limit_info = {"total_rows": total_rows, "truncated": True}
+    return result, limit_info
+
+
+def _build_error_info(e):
+    error_info = {
+        "success": False,
+        "error": str(e),
+        "error_type": type(e).__name__,
+        "traceback": traceback.format_exc()
+    }
+    # 同时输出到stderr用于调试
+    print(f"ERROR in call_akshare_function: {error_info}", file=sys.stderr)
+    return error_info
+
+
+def _serialize_result_json(result):
+    """将调用结果转换为JSON可序列化的结果字典（兼容格式）"""
+    # 处理结果
+    if isinstance(result, pd.DataFrame):
+        # 将DataFrame转换为JSON可序列化的格式
+        # 使用更高效的方法处理数据类型
+        try:
+            # 尝试直接使用pandas的to_json方法，这比逐列转换更高效
+            json_str = result.to_json(orient='records', date_format='iso', force_ascii=False)
             return {
                 "success": True,
-                "type": "other",
-                "data": str(result)
+                "type": "dataframe_json",
+                "data": json_str,
+                "shape": result.shape,
+                "columns": result.columns.tolist()
             }
+        except Exception as json_error:
+            print(f"WARNING: to_json failed ({json_error}), falling back to manual conversion", file=sys.stderr)
+            # 回退到原来的方法
+            df_clean = result.copy()
+            for col in df_clean.columns:
+                # 将所有列转换为字符串，处理NaT、NaN等特殊值
+                df_clean[col] = df_clean[col].astype(str)
+                # 将NaN、NaT等特殊值替换为空字符串
+                df_clean[col] = df_clean[col].replace(['nan', 'NaT', 'None'], '')
             
-    except Exception as e:
-        error_info = {
-            "success": False,
-            "error": str(e),
-            "error_type": type(e).__name__,
-            "traceback": traceback.format_exc()
+            return {
+                "success": True,
+                "type": "dataframe",
+                "data": df_clean.to_dict('records'),
+                "columns": list(result.columns),
+                "shape": result.shape
+            }
+    else:
+        # 其他类型的结果
+        return {
+            "success": True,
+            "type": "other",
+            "data": str(result)
         }
-        # 同时输出到stderr用于调试
-        print(f"ERROR in call_akshare_function: {error_info}", file=sys.stderr)
-        return error_info
+
+
+def call_akshare_function(function_name, options=None, **kwargs):
+    """调用指定的AKShare函数"""
+    try:
+        result, limit_info = _execute_akshare_function(function_name, kwargs, options)
+        return dict(_serialize_result_json(result), **limit_info)
+    except Exception as e:
+        return _build_error_info(e)
+
+
+def call_akshare_function_framed(function_name, kwargs, accept, shm_prefix=None, options=None):
+    """
+    调用指定的AKShare函数，按协商的格式编码结果
+
+    返回(头信息, 数据帧列表)。DataFrame在父进程接受pickle5时以二进制帧返回，
+    大结果的数值缓冲区在父进程提供段名前缀时写入共享内存，编码失败时回退到JSON兼容格式。
+    """
+    from akshare_ipc import (
+        IPC_FORMAT_PICKLE5, negotiate_format, encode_dataframe_pickle,
+        export_buffers_to_shm, get_shm_threshold
+    )
+
+    try:
+        result, limit_info = _execute_akshare_function(function_name, kwargs, options)
+    except Exception as e:
+        return _build_error_info(e), []
+
+    encoding = negotiate_format(accept)
+    if isinstance(result, pd.DataFrame) and encoding == IPC_FORMAT_PICKLE5:
+        try:
+            frames = encode_dataframe_pickle(result)
+            shm_buffers, inline_buffers = export_buffers_to_shm(frames[1:], shm_prefix, get_shm_threshold())
+            header = {
+                "success": True,
+                "type": "dataframe_pickle",
+                "encoding": IPC_FORMAT_PICKLE5,
+                "shape": result.shape,
+                "columns": [str(col) for col in result.columns],
+                **limit_info
+            }
+            if shm_buffers is not None:
+                header["shm_buffers"] = shm_buffers
+            return header, [frames[0]] + inline_buffers
+        except Exception as pickle_error:
+            print(f"WARNING: pickle encoding failed ({pickle_error}), falling back to JSON", file=sys.stderr)
+
+    try:
+        return dict(_serialize_result_json(result), **limit_info), []
+    except Exception as e:
+        return _build_error_info(e), []
+
+
+def stream_akshare_function(channel, function_name, kwargs, accept, options=None):
+    """
+    流式调用 - 将DataFrame结果按字节预算分页，逐页写回主进程
+
+    消息序列：结果头(type=dataframe_stream) → 若干数据页(type=chunk) → 结束标记(type=end)。
+    非DataFrame结果和调用失败时只写回一条普通结果消息。
+    """
+    from akshare_ipc import (
+        IPC_FORMAT_PICKLE5, negotiate_format, encode_dataframe_pickle,
+        iter_dataframe_pages, write_message
+    )
+
+    options = options or {}
+    try:
+        result, limit_info = _execute_akshare_function(function_name, kwargs, options)
+    except Exception as e:
+        write_message(channel, _build_error_info(e))
+        return
+    if not isinstance(result, pd.DataFrame):
+        write_message(channel, _serialize_result_json(result))
+        return
+
+    encoding = negotiate_format(accept)
+    write_message(channel, {
+        "success": True,
+        "type": "dataframe_stream",
+        "encoding": encoding,
+        "shape": result.shape,
+        "columns": [str(col) for col in result.columns],
+        **limit_info
+    })
+    sent_rows = 0
+    try:
+        for page in iter_dataframe_pages(result, options.get("page_bytes")):
+            if encoding == IPC_FORMAT_PICKLE5:
+                write_message(channel, {"type": "chunk", "rows": len(page)}, encode_dataframe_pickle(page))
+            else:
+                page_json = page.to_json(orient='records', date_format='iso', force_ascii=False)
+                write_message(channel, {"type": "chunk", "rows": len(page), "data": page_json})
+            sent_rows += len(page)
+    except Exception as e:
+        error_info = _build_error_info(e)
+        error_info["type"] = "error"
+        write_message(channel, error_info)
+        return
+    write_message(channel, {"type": "end", "rows": sent_rows})
+
+
+def _open_protocol_channel():
+    """
+    保护协议通道：复制原始stdout作为私有二进制通道，并将fd 1重定向到stderr，
+    避免AKShare内部的print输出混入结果帧
+    """
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    return channel
+
+
+def serve():
+    """
+    常驻模式 - 供工作进程池使用
+
+    进程启动时完成AKShare导入与网络补丁，之后循环读取长度前缀帧格式的请求，
+    每个请求执行一次AKShare调用并写回一条响应消息，直到父进程关闭管道或发送shutdown命令。
+    """
+    from akshare_ipc import read_frame, write_message, decode_message
+
+    channel = _open_protocol_channel()
+    stdin = sys.stdin.buffer
+
+    while True:
+        try:
+            payload = read_frame(stdin)
+        except Exception as e:
+            print(f"ERROR: failed to read request frame: {e}", file=sys.stderr)
+            break
+        if payload is None:
+            break  # 父进程关闭了管道
+
+        try:
+            request = decode_message(payload)
+        except Exception as e:
+            write_message(channel, {
+                "success": False,
+                "error": f"Request decode error: {e}",
+                "error_type": type(e).__name__
+            })
+            continue
+
+        if request.get("command") == "shutdown":
+            break
+
+        function_name = request.get("function", "")
+        kwargs = request.get("kwargs") or {}
+        options = request.get("options") or {}
+        if options.get("stream"):
+            stream_akshare_function(channel, function_name, kwargs, request.get("accept"), options)
+            continue
+        header, frames = call_akshare_function_framed(
+            function_name, kwargs, request.get("accept"), request.get("shm_prefix"), options
+        )
+        write_message(channel, header, frames)
+
 
 def main():
     """主函数 - 从命令行参数读取调用信息"""
+    if len(sys.argv) >= 2 and sys.argv[1] == '--serve':
+        serve()
+        return
+
     if len(sys.argv) < 2:
         print(json.dumps({
             "success": False,
@@ -410,8 +587,24 @@ def main():
         else:
             kwargs = {}
         
+        # 父进程声明可接受二进制格式时，使用帧格式输出
+        from akshare_ipc import (
+            FRAMED_OUTPUT_MAGIC, IPC_FORMAT_JSON, parse_accept_formats, write_message
+        )
+        accept = parse_accept_formats(os.environ.get('AKSHARE_IPC_ACCEPT'))
+        options = json.loads(os.environ.get('AKSHARE_CALL_OPTIONS') or '{}')
+        if accept != [IPC_FORMAT_JSON]:
+            channel = _open_protocol_channel()
+            header, frames = call_akshare_function_framed(
+                function_name, kwargs, accept, os.environ.get('AKSHARE_IPC_SHM_PREFIX'), options
+            )
+            channel.write(FRAMED_OUTPUT_MAGIC)
+            write_message(channel, header, frames)
+            channel.close()
+            return
+        
         # 调用函数
-        result = call_akshare_function(function_name, **kwargs)
+        result = call_akshare_function(function_name, options, **kwargs)
         
         # 输出结果 - 处理编码问题
         try:
@@ -0,0 +1,36 @@
+"""
+插件启动导入时间基准测试（python -X importtime 汇总）
+
+运行：python tests/benchmarks/bench_import_time.py [--top 15]
+输出总导入时间和累计耗时最多的顶层模块；导入了 akshare/talib/pandas_ta 时以非0状态退出
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from tests.import_profile import LAZY_MODULES, profile_imports, top_level  # noqa: E402
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args(argv)
+
+    records = profile_imports()
+    roots = top_level(records)
+    total = sum(record.cumulative_us for record in roots)
+    print(f"{len(records)} modules imported, total {total / 1000:.1f} ms")
+    for record in sorted(roots, key=lambda record: record.cumulative_us, reverse=True)[:args.top]:
+        print(f"{record.cumulative_us / 1000:9.1f} ms  {record.module}")
+    lazy = sorted({record.module.strip() for record in records} & set(LAZY_MODULES))
+    if lazy:
+        print(f"Heavy dependencies imported at startup: {', '.join(lazy)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+NumPy指标内核与pandas计算的基准测试（10k根K线）
+
+运行：python tests/benchmarks/bench_indicator_kernels.py [--bars 10000] [--repeat 10]
+内核不快于pandas时以非0状态退出
+"""
+import argparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from tests.pandas_reference import pandas_indicators, synthetic_bars  # noqa: E402
+from tools.indicator_kernels import compute_indicators  # noqa: E402
+
+
+def best_of(func, repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bars', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for missing in (False, True):
+        bars = synthetic_bars(args.bars, missing=missing)
+        kernel = best_of(lambda: compute_indicators(*bars), args.repeat)
+        reference = best_of(lambda: pandas_indicators(*bars), args.repeat)
+        label = 'with NaN' if missing else 'clean'
+        print(f"{args.bars} bars ({label}): kernel {kernel * 1000:.2f} ms, pandas {reference * 1000:.2f} ms, "
+              f"speedup {reference / kernel:.2f}x")
+        failed |= kernel >= reference
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
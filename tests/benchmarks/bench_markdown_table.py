@@ -0,0 +1,113 @@
+"""
+Markdown表格渲染基准测试：render_markdown_table 与原来的 to_markdown / iterrows 拼接实现对比（1k、10k行）
+
+运行：python tests/benchmarks/bench_markdown_table.py [--rows 1000 10000] [--repeat 3]
+需要安装 tabulate（to_markdown 的依赖）；新实现不快于任一原实现时以非0状态退出
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from tools.common_utils import render_markdown_table  # noqa: E402
+
+
+def legacy_to_markdown(df: pd.DataFrame) -> str:
+    """原 process_dataframe_output：逐列 astype(str) 后调用 to_markdown"""
+    result_clean = df.copy()
+    for col in result_clean.columns:
+        result_clean[col] = result_clean[col].astype(str)
+    return result_clean.to_markdown(index=True, tablefmt='pipe')
+
+
+def legacy_iterrows(df: pd.DataFrame) -> str:
+    """原 process_dataframe_output 的手工回退：iterrows 逐行拼接"""
+    columns = df.columns.tolist()
+    text_output = "| " + " | ".join(columns) + " |\n"
+    text_output += "| " + " | ".join(["---"] * len(columns)) + " |\n"
+    for idx, row in df.iterrows():
+        row_data = []
+        for col in columns:
+            value = row[col]
+            if pd.isna(value):
+                value = ""
+            else:
+                value = str(value)
+            row_data.append(value)
+        text_output += "| " + " | ".join(row_data) + " |\n"
+    return text_output
+
+
+def legacy_compatible_table(df: pd.DataFrame) -> str:
+    """原 StockComprehensiveTechnicalIndicatorsTool._generate_compatible_markdown_table"""
+    columns = df.columns.tolist()
+    markdown = "| " + " | ".join(columns) + " |\n"
+    markdown += "| " + " | ".join(["---"] * len(columns)) + " |\n"
+    for idx, row in df.iterrows():
+        row_data = []
+        for col in columns:
+            value = row[col]
+            if pd.isna(value) or value == 'nan' or value == '':
+                value = ""
+            else:
+                value = str(value)
+                value = value.replace('|', '\\|')
+                value = value.replace('\n', ' ')
+                value = value.replace('\r', ' ')
+                value = value.replace('\t', ' ')
+                if value.strip() == '':
+                    value = ""
+            row_data.append(value)
+        markdown += "| " + " | ".join(row_data) + " |\n"
+    return markdown
+
+
+def spot_frame(rows: int) -> pd.DataFrame:
+    """与全市场实时行情相近的表：代码、名称和十几个数值列，含少量缺失值"""
+    rng = np.random.default_rng(0)
+    data = {
+        '代码': [f'{i:06d}' for i in range(rows)],
+        '名称': [f'股票{i}' for i in range(rows)],
+    }
+    for name in ['最新价', '涨跌幅', '涨跌额', '成交量', '成交额', '振幅', '最高', '最低', '今开', '昨收',
+                 '量比', '换手率', '市盈率-动态', '市净率', '总市值', '流通市值']:
+        values = rng.normal(100, 30, rows).round(2)
+        values[rng.choice(rows, size=rows // 50, replace=False)] = np.nan
+        data[name] = values
+    return pd.DataFrame(data)
+
+
+def best_of(func, repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    cases = [
+        ('to_markdown', legacy_to_markdown, lambda df: render_markdown_table(df, index=True)),
+        ('iterrows', legacy_iterrows, lambda df: render_markdown_table(df, blank_missing=True)),
+        ('compatible_table', legacy_compatible_table, lambda df: render_markdown_table(df, blank_missing=True)),
+    ]
+    failed = False
+    for rows in args.rows:
+        df = spot_frame(rows)
+        for name, legacy, current in cases:
+            old = best_of(lambda: legacy(df), args.repeat)
+            new = best_of(lambda: current(df), args.repeat)
+            print(f"{rows:>6} rows  {name:<17} old {old * 1000:9.1f} ms  new {new * 1000:7.1f} ms  speedup {old / new:6.1f}x")
+            failed |= new >= old
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,12 @@
+"""
+测试公共配置
+- 仓库根目录加入 sys.path，以 provider.xxx / tools.xxx 导入；
+  tools 目录也加入 sys.path，与插件运行时一样支持 calculators 中的 from indicator_kernels import 写法
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'tools')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
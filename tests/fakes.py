@@ -0,0 +1,9 @@
+"""测试用的工具实例替身：只记录工具生成的消息"""
+
+
+class FakeTool:
+    def create_text_message(self, text):
+        return ('text', text)
+
+    def create_json_message(self, obj):
+        return ('json', obj)
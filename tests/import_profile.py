@@ -0,0 +1,57 @@
+"""
+插件启动时导入的模块及 python -X importtime 统计，供导入回归测试和基准测试使用
+"""
+import os
+import subprocess
+import sys
+from typing import NamedTuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 只在实际调用时才允许导入的重量级依赖
+LAZY_MODULES = ('akshare', 'talib', 'pandas_ta')
+
+# 子进程worker的入口脚本，由 akshare_pool 以独立进程启动，不在插件进程中导入
+WORKER_MODULES = ('provider.akshare_worker',)
+
+
+def plugin_modules() -> list[str]:
+    """插件进程启动时加载的模块：main、provider下的模块和全部工具模块"""
+    modules = ['main']
+    for package in ('provider', 'tools', os.path.join('tools', 'calculators')):
+        directory = os.path.join(ROOT, package)
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.py') and name != '__init__.py':
+                modules.append(package.replace(os.sep, '.') + '.' + name[:-3])
+    return [module for module in modules if module not in WORKER_MODULES]
+
+
+class ImportRecord(NamedTuple):
+    self_us: int
+    cumulative_us: int
+    module: str
+
+
+def profile_imports(modules: list[str] | None = None) -> list[ImportRecord]:
+    """在新的解释器中导入插件模块，返回 -X importtime 的逐模块记录"""
+    modules = modules or plugin_modules()
+    code = ("import importlib, sys; sys.path[:0] = [{root!r}, {tools!r}]\n"
+            "for name in {modules!r}: importlib.import_module(name)").format(
+        root=ROOT, tools=os.path.join(ROOT, 'tools'), modules=modules)
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                               capture_output=True, text=True, timeout=300)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing plugin modules failed:\n{completed.stderr[-2000:]}")
+    records = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        # 模块名前的缩进表示嵌套层级（每层两个空格），保留以便区分顶层导入
+        self_us, cumulative_us, module = line[len('import time:'):].split('|', 2)
+        records.append(ImportRecord(int(self_us), int(cumulative_us), module.rstrip()[1:]))
+    return records
+
+
+def top_level(records: list[ImportRecord]) -> list[ImportRecord]:
+    """顶层导入（缩进最少的记录），其累计时间之和即总导入时间"""
+    return [record for record in records if not record.module.startswith(' ')]
@@ -0,0 +1,107 @@
+"""
+DataFrame转JSON记录的原实现（列式编码器替换前 process_dataframe_output 的JSON分支），作为逐字节一致性测试的参考
+"""
+import json
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+def clean_nan_values(obj: Any) -> Any:
+    """
+    递归清理对象中的NaN值，将NaN转换为None
+    
+    Args:
+        obj: 需要清理的对象（dict, list, 或其他类型）
+        
+    Returns:
+        清理后的对象
+    """
+    if isinstance(obj, dict):
+        return {k: clean_nan_values(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [clean_nan_values(item) for item in obj]
+    elif isinstance(obj, tuple):
+        # 处理元组，确保所有元素都被清理
+        return tuple(clean_nan_values(item) for item in obj)
+    elif isinstance(obj, float):
+        if np.isnan(obj):
+            return None
+        # 检查是否为无穷大
+        elif np.isinf(obj):
+            return None
+        # 检查是否为整数形式的浮点数，如果是则转换为整数
+        elif obj.is_integer():
+            return int(obj)
+        else:
+            return obj
+    elif isinstance(obj, (np.integer, np.floating)):
+        # 处理numpy数值类型
+        try:
+            if np.isnan(obj):
+                return None
+            elif np.isinf(obj):
+                return None
+            elif isinstance(obj, np.integer):
+                return int(obj)
+            elif isinstance(obj, np.floating) and obj.is_integer():
+                return int(obj)
+            else:
+                return float(obj)
+        except (ValueError, TypeError, OverflowError):
+            return str(obj)
+    elif hasattr(obj, 'dtype') and hasattr(obj, 'item'):
+        # 处理numpy标量
+        try:
+            if np.isnan(obj):
+                return None
+            elif np.isinf(obj):
+                return None
+            elif np.issubdtype(obj.dtype, np.integer):
+                return int(obj)
+            elif np.issubdtype(obj.dtype, np.floating):
+                if obj.is_integer():
+                    return int(obj)
+                else:
+                    return float(obj)
+            else:
+                return obj.item()
+        except (ValueError, TypeError):
+            return str(obj)
+    else:
+        return obj
+
+
+def legacy_records(result: pd.DataFrame) -> list:
+    """按原实现把DataFrame转换为JSON记录列表"""
+    try:
+        df_clean = result.reset_index(drop=True).copy()
+        for col in df_clean.columns:
+            if df_clean[col].dtype == 'object':
+                df_clean[col] = df_clean[col].astype(str)
+                df_clean[col] = df_clean[col].replace(['nan', 'NaT', 'None', 'null'], '')
+            elif np.issubdtype(df_clean[col].dtype, np.integer):
+                df_clean[col] = df_clean[col].astype('int64')
+            elif np.issubdtype(df_clean[col].dtype, np.floating):
+                df_clean[col] = df_clean[col].replace([np.inf, -np.inf], np.nan)
+                df_clean[col] = df_clean[col].fillna('')
+        json_data = clean_nan_values(df_clean.to_dict(orient="records"))
+        try:
+            json.dumps({"data": json_data}, ensure_ascii=False)
+            return json_data
+        except (TypeError, ValueError):
+            safe_data = []
+            for record in json_data:
+                safe_record = {}
+                for key, value in record.items():
+                    try:
+                        json.dumps(value)
+                        safe_record[key] = value
+                    except (TypeError, ValueError):
+                        safe_record[key] = str(value) if value is not None else ""
+                safe_data.append(safe_record)
+            return safe_data
+    except Exception:
+        df_str = result.astype(str).replace('nan', 'null').replace('NaN', 'null').replace('inf', 'null').replace('-inf', 'null')
+        return df_str.reset_index(drop=True).to_dict(orient="records")
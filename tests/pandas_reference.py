@@ -0,0 +1,73 @@
+"""
+技术指标的pandas参考实现（NumPy内核替换前各工具pandas分支的计算方式），供一致性测试和基准测试对比
+"""
+import numpy as np
+import pandas as pd
+
+from tools.indicator_kernels import (
+    DEFAULT_BOLL_PARAMS,
+    DEFAULT_KDJ_PARAMS,
+    DEFAULT_MA_PERIODS,
+    DEFAULT_MACD_PARAMS,
+    DEFAULT_RSI_PERIODS,
+    DEFAULT_VMA_PERIODS,
+)
+
+
+def pandas_indicators(close, high, low, volume, min_periods=None, epsilon=0.0) -> pd.DataFrame:
+    """按 indicator_columns() 的列顺序返回pandas计算的全部默认指标"""
+    close, high, low, volume = (pd.Series(np.asarray(values, dtype='float64')) for values in (close, high, low, volume))
+    ewm_min_periods = min_periods or 0
+    result = {}
+    for period in DEFAULT_MA_PERIODS:
+        result[f'MA{period}'] = close.rolling(period, min_periods=min_periods).mean()
+
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    for period in DEFAULT_RSI_PERIODS:
+        rs = gain.rolling(period, min_periods=min_periods).mean() / (loss.rolling(period, min_periods=min_periods).mean() + epsilon)
+        result[f'RSI{period}'] = 100 - (100 / (1 + rs))
+
+    fast, slow, signal = DEFAULT_MACD_PARAMS
+    line = (close.ewm(span=fast, min_periods=ewm_min_periods).mean()
+            - close.ewm(span=slow, min_periods=ewm_min_periods).mean())
+    signal_line = line.ewm(span=signal, min_periods=ewm_min_periods).mean()
+    result['MACD'] = line
+    result['MACD_SIGNAL'] = signal_line
+    result['MACD_HIST'] = line - signal_line
+
+    k_period, d_period = DEFAULT_KDJ_PARAMS[0], DEFAULT_KDJ_PARAMS[1]
+    lowest = low.rolling(k_period, min_periods=min_periods).min()
+    highest = high.rolling(k_period, min_periods=min_periods).max()
+    rsv = (close - lowest) / (highest - lowest + epsilon) * 100
+    k = rsv.ewm(com=d_period - 1, min_periods=ewm_min_periods).mean()
+    d = k.ewm(com=d_period - 1, min_periods=ewm_min_periods).mean()
+    result['KDJ_K'] = k
+    result['KDJ_D'] = d
+    result['KDJ_J'] = 3 * k - 2 * d
+
+    period, width = DEFAULT_BOLL_PARAMS
+    middle = close.rolling(period, min_periods=min_periods).mean()
+    band = close.rolling(period, min_periods=min_periods).std() * width
+    result['BOLL_MIDDLE'] = middle
+    result['BOLL_UPPER'] = middle + band
+    result['BOLL_LOWER'] = middle - band
+
+    for period in DEFAULT_VMA_PERIODS:
+        result[f'VMA{period}'] = volume.rolling(period, min_periods=min_periods).mean()
+    return pd.DataFrame(result)
+
+
+def synthetic_bars(length: int, seed: int = 0, missing: bool = False):
+    """随机游走K线（收盘、最高、最低、成交量），missing为True时加入缺失值和连续平盘"""
+    rng = np.random.default_rng(seed)
+    close = 10 + np.cumsum(rng.normal(0, 0.3, length))
+    high = close + rng.uniform(0, 0.5, length)
+    low = close - rng.uniform(0, 0.5, length)
+    volume = rng.integers(1_000, 100_000, length).astype('float64')
+    if missing and length:
+        close[length // 3:length // 3 + 5] = close[length // 3 - 1] if length // 3 else close[0]
+        for values in (close, high, low, volume):
+            values[rng.choice(length, size=max(1, length // 50), replace=False)] = np.nan
+    return close, high, low, volume
@@ -0,0 +1,26 @@
+"""本地存储的原子写入"""
+import pytest
+
+from provider.akshare_disk_cache import atomic_write
+
+
+def test_replaces_target(tmp_path):
+    target = tmp_path / 'entry.json'
+    target.write_text('old', encoding='utf-8')
+    atomic_write(str(target), lambda f: f.write('新内容'), mode='w')
+    assert target.read_text(encoding='utf-8') == '新内容'
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_failed_writer_leaves_no_temp_file(tmp_path):
+    target = tmp_path / 'entry.pkl'
+    target.write_bytes(b'old')
+
+    def writer(f):
+        f.write(b'partial')
+        raise RuntimeError('serialization failed')
+
+    with pytest.raises(RuntimeError):
+        atomic_write(str(target), writer)
+    assert target.read_bytes() == b'old'
+    assert list(tmp_path.iterdir()) == [target]
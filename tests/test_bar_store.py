@@ -0,0 +1,89 @@
+"""本地K线存储的增量获取与复权校验"""
+import pandas as pd
+import pytest
+
+from provider.akshare_bar_store import BarStore
+
+
+class Upstream:
+    """按日期区间返回K线的模拟上游，记录每次请求的区间"""
+
+    def __init__(self, closes: dict):
+        self.closes = closes
+        self.calls = []
+
+    def __call__(self, kwargs):
+        self.calls.append((kwargs['start_date'], kwargs['end_date']))
+        start, end = pd.Timestamp(kwargs['start_date']), pd.Timestamp(kwargs['end_date'])
+        rows = [(day, close) for day, close in self.closes.items() if start <= pd.Timestamp(day) <= end]
+        return pd.DataFrame({
+            '日期': [day for day, _ in rows],
+            '开盘': [close for _, close in rows],
+            '收盘': [close for _, close in rows],
+            '最高': [close for _, close in rows],
+            '最低': [close for _, close in rows],
+        })
+
+
+def _trading_days(start: str, end: str) -> list:
+    return [day.strftime('%Y-%m-%d') for day in pd.bdate_range(start, end)]
+
+
+def _kwargs(start: str, end: str, adjust: str = 'qfq') -> dict:
+    return {'symbol': '000001', 'period': 'daily', 'adjust': adjust, 'start_date': start, 'end_date': end}
+
+
+def test_tail_after_weekend_end_detects_ex_dividend(tmp_path):
+    store = BarStore(str(tmp_path))
+    # 已存区间结束在周六 2026-10-10，最后一根K线是周五 10-09
+    upstream = Upstream({day: 127.0 for day in _trading_days('2026-09-01', '2026-10-09')})
+    first = store.fetch('stock_zh_a_hist', _kwargs('20260901', '20261010'), upstream)
+    assert first['收盘'].iloc[-1] == 127.0
+
+    # 周一 10-12 除息，前复权后此前的价格全部下调
+    upstream.closes = {day: 126.0 for day in _trading_days('2026-09-01', '2026-10-16')}
+    result = store.fetch('stock_zh_a_hist', _kwargs('20260901', '20261016'), upstream)
+
+    assert upstream.calls[1][0] == '20261009'
+    assert store.stats()['adjustment_resets'] == 1
+    assert (result['收盘'] == 126.0).all()
+    assert list(result['日期']) == _trading_days('2026-09-01', '2026-10-16')
+
+
+def test_tail_without_dividend_is_delta_fetch(tmp_path):
+    store = BarStore(str(tmp_path))
+    upstream = Upstream({day: 127.0 for day in _trading_days('2026-09-01', '2026-10-16')})
+    store.fetch('stock_zh_a_hist', _kwargs('20260901', '20261010'), upstream)
+    result = store.fetch('stock_zh_a_hist', _kwargs('20260901', '20261016'), upstream)
+
+    stats = store.stats()
+    assert (stats['full_fetches'], stats['delta_fetches'], stats['adjustment_resets']) == (1, 1, 0)
+    assert upstream.calls[1] == ('20261009', '20261016')
+    assert list(result['日期']) == _trading_days('2026-09-01', '2026-10-16')
+
+
+@pytest.mark.parametrize('adjust, resets', [('qfq', 1), ('', 0)])
+def test_tail_without_common_bar(tmp_path, adjust, resets):
+    store = BarStore(str(tmp_path))
+    upstream = Upstream({day: 127.0 for day in _trading_days('2026-09-01', '2026-10-09')})
+    store.fetch('stock_zh_a_hist', _kwargs('20260901', '20261010', adjust), upstream)
+    # 上游不再返回已存的最后一根K线，复权分区无法校验，重新全量获取；不复权分区直接合并
+    upstream.closes = {day: 126.0 for day in _trading_days('2026-10-12', '2026-10-16')}
+    store.fetch('stock_zh_a_hist', _kwargs('20260901', '20261016', adjust), upstream)
+    assert store.stats()['adjustment_resets'] == resets
+
+
+def test_meta_from_interrupted_save_is_discarded(tmp_path):
+    store = BarStore(str(tmp_path))
+    upstream = Upstream({day: 127.0 for day in _trading_days('2026-09-01', '2026-10-16')})
+    store.fetch('stock_zh_a_hist', _kwargs('20260901', '20261016'), upstream)
+    meta_path = next(tmp_path.rglob('*.json'))
+    wide_meta = meta_path.read_text(encoding='utf-8')
+
+    # refresh 以较窄区间重写分区，模拟数据已替换、元数据替换前中断
+    store.fetch('stock_zh_a_hist', _kwargs('20261001', '20261016'), upstream, refresh=True)
+    meta_path.write_text(wide_meta, encoding='utf-8')
+
+    result = store.fetch('stock_zh_a_hist', _kwargs('20260901', '20261016'), upstream)
+    assert store.stats()['full_fetches'] == 3
+    assert list(result['日期']) == _trading_days('2026-09-01', '2026-10-16')
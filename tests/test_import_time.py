@@ -0,0 +1,17 @@
+"""插件启动时不导入 akshare、talib、pandas_ta（-X importtime 回归测试）"""
+from tests.import_profile import LAZY_MODULES, plugin_modules, profile_imports
+
+
+def test_plugin_import_does_not_load_lazy_dependencies():
+    records = profile_imports()
+    loaded = {record.module.strip().split('.')[0] for record in records}
+    assert {'provider', 'tools', 'pandas'} <= loaded
+    assert loaded.isdisjoint(LAZY_MODULES), sorted(loaded & set(LAZY_MODULES))
+
+
+def test_all_tool_modules_are_profiled():
+    modules = plugin_modules()
+    assert 'provider.akshare_registry' in modules and 'provider.akshare_stockdata' in modules
+    assert 'tools.stock_comprehensive_technical_indicators' in modules
+    assert 'tools.calculators.technical_calculator' in modules
+    assert 'provider.akshare_worker' not in modules
@@ -0,0 +1,40 @@
+"""NumPy指标内核与pandas参考实现的一致性"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.pandas_reference import pandas_indicators, synthetic_bars
+from tools.indicator_kernels import compute_indicators, ewm_mean, indicator_columns
+
+
+def _assert_matches(length, missing=False, min_periods=None, epsilon=0.0):
+    bars = synthetic_bars(length, seed=length, missing=missing)
+    values, columns = compute_indicators(*bars, min_periods=min_periods, epsilon=epsilon)
+    expected = pandas_indicators(*bars, min_periods=min_periods, epsilon=epsilon)
+    assert columns == indicator_columns() == list(expected.columns)
+    assert values.shape == (length, len(columns))
+    np.testing.assert_allclose(values, expected.to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+# 包含短于最大窗口（60）的序列
+@pytest.mark.parametrize('length', [0, 1, 2, 3, 15, 25, 40, 59, 60, 61, 500])
+def test_matches_pandas(length):
+    _assert_matches(length)
+
+
+@pytest.mark.parametrize('length', [3, 40, 500])
+def test_matches_pandas_with_min_periods_and_epsilon(length):
+    _assert_matches(length, min_periods=1, epsilon=1e-10)
+
+
+@pytest.mark.parametrize('length', [40, 500])
+def test_matches_pandas_with_missing_values(length):
+    _assert_matches(length, missing=True)
+
+
+@pytest.mark.parametrize('span', [3, 12, 26])
+def test_ewm_mean_matches_pandas_on_long_series(span):
+    # 分块递推跨越多个缩放块
+    values = synthetic_bars(10_000, missing=True)[0]
+    expected = pd.Series(values).ewm(span=span).mean().to_numpy()
+    np.testing.assert_allclose(ewm_mean(values, span=span), expected, rtol=1e-9, atol=1e-9, equal_nan=True)
@@ -0,0 +1,57 @@
+"""多股票面板计算与逐只股票计算的一致性"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.indicator_kernels import compute_indicators, indicator_columns
+from tools.indicator_panel import SymbolBars, compute_panel_indicators
+
+LENGTHS = [0, 1, 3, 30, 80]
+
+
+def _bars(length: int, seed: int) -> SymbolBars:
+    rng = np.random.default_rng(seed)
+    close = 10 + np.cumsum(rng.normal(0, 0.3, length))
+    inputs = np.column_stack([close, close + rng.uniform(0, 0.5, length), close - rng.uniform(0, 0.5, length),
+                              rng.integers(1_000, 100_000, length).astype('float64')])
+    # 上市时间错开：较短的历史结束在同一天，开始得更晚
+    times = pd.date_range(end='2026-10-16', periods=length, freq='B').to_numpy()
+    return SymbolBars(times, inputs, inputs[:, :1].copy())
+
+
+def _universe() -> dict:
+    # 每个长度两只股票，打乱输入顺序，使分块与恢复顺序都被覆盖
+    bars = {f'{length:03d}{copy}': _bars(length, seed=length * 10 + copy) for copy in range(2) for length in LENGTHS}
+    return dict(sorted(bars.items(), key=lambda item: item[0][::-1]))
+
+
+def _expected(bars: SymbolBars) -> np.ndarray:
+    values, _ = compute_indicators(*bars.inputs.T)
+    return values
+
+
+@pytest.mark.parametrize('memory_budget', [None, 1])
+def test_long_output_matches_per_symbol(memory_budget):
+    bars = _universe()
+    result = compute_panel_indicators(bars, '日期', ['收盘'], latest_only=False, memory_budget=memory_budget)
+    columns = indicator_columns()
+    assert list(result['代码'].drop_duplicates()) == [symbol for symbol, item in bars.items() if len(item.inputs)]
+    for symbol, item in bars.items():
+        rows = result[result['代码'] == symbol]
+        assert len(rows) == len(item.inputs)
+        np.testing.assert_array_equal(rows['日期'].to_numpy(), item.times)
+        np.testing.assert_allclose(rows[columns].to_numpy(), _expected(item), rtol=1e-12, atol=1e-12, equal_nan=True)
+
+
+@pytest.mark.parametrize('memory_budget', [None, 1])
+def test_latest_output_matches_per_symbol(memory_budget):
+    bars = _universe()
+    result = compute_panel_indicators(bars, '日期', ['收盘'], latest_only=True, memory_budget=memory_budget)
+    columns = indicator_columns()
+    expected_symbols = [symbol for symbol, item in bars.items() if len(item.inputs)]
+    assert list(result['代码']) == expected_symbols
+    for symbol in expected_symbols:
+        row = result[result['代码'] == symbol]
+        assert row['日期'].iloc[0] == bars[symbol].times[-1]
+        np.testing.assert_allclose(row[columns].to_numpy()[0], _expected(bars[symbol])[-1],
+                                   rtol=1e-12, atol=1e-12, equal_nan=True)
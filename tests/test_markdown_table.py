@@ -0,0 +1,67 @@
+"""Markdown表格渲染与分块输出"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.fakes import FakeTool
+from tools.common_utils import (
+    markdown_table_lines,
+    process_dataframe_output,
+    process_dataframe_stream_output,
+    render_markdown_table,
+)
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        '代码': [f'{i:06d}' for i in range(rows)],
+        '名称': [f'股票|{i}\n第{i}行' for i in range(rows)],
+        '最新价': np.where(np.arange(rows) % 7 == 0, np.nan, np.arange(rows) * 1.5),
+    })
+
+
+def _texts(messages) -> list:
+    return [content for kind, content in messages if kind == 'text']
+
+
+def test_render_escapes_cells():
+    df = pd.DataFrame({'a|b': ['x|y', 'line\nbreak\ttab'], 'n': [1.5, np.nan]})
+    assert render_markdown_table(df).splitlines() == [
+        '| a\\|b | n |',
+        '| --- | --- |',
+        '| x\\|y | 1.5 |',
+        '| line break tab | nan |',
+    ]
+    assert render_markdown_table(df, blank_missing=True).splitlines()[-1] == '| line break tab |  |'
+
+
+def test_headerless_chunks_join_into_one_table():
+    df = _frame(25)
+    full = render_markdown_table(df, index=True)
+    parts = [render_markdown_table(df.iloc[:10], index=True)]
+    parts += [render_markdown_table(df.iloc[start:start + 10], index=True, include_header=False) for start in (10, 20)]
+    assert "\n".join(parts) == full
+    # 后续块直接以数据行开头
+    assert all(part.splitlines()[0] == markdown_table_lines(df, index=True)[2 + start] for part, start in zip(parts[1:], (10, 20)))
+
+
+@pytest.mark.parametrize('output_mode', ['both', 'text'])
+def test_chunked_text_messages_join_into_one_table(monkeypatch, output_mode):
+    monkeypatch.setenv('AKSHARE_OUTPUT_CHUNK_BYTES', '4096')
+    df = _frame(400)
+    texts = _texts(process_dataframe_output(df, FakeTool(), output_mode=output_mode))
+    assert len(texts) > 1
+    # 只有第一块带表头和分隔行
+    assert sum('| --- |' in text for text in texts) == 1
+    assert all(len(text.encode('utf-8')) <= 4096 for text in texts)
+    assert "\n".join(texts) == render_markdown_table(df, index=True)
+
+
+def test_stream_pages_continue_the_same_table(monkeypatch):
+    monkeypatch.setenv('AKSHARE_OUTPUT_CHUNK_BYTES', '4096')
+    monkeypatch.delenv('AKSHARE_OUTPUT_FILE_THRESHOLD', raising=False)
+    df = _frame(300)
+    pages = [df.iloc[start:start + 70] for start in range(0, len(df), 70)]
+    texts = _texts(process_dataframe_stream_output(iter(pages), FakeTool()))
+    assert sum('| --- |' in text for text in texts) == 1
+    assert "\n".join(texts) == render_markdown_table(df, index=True)
@@ -0,0 +1,50 @@
+"""分块输出的字节预算"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.fakes import FakeTool
+from tools.common_utils import DEFAULT_OUTPUT_CHUNK_BYTES, JSON_LAYOUTS, process_dataframe_output
+
+
+def _size(message) -> int:
+    kind, content = message
+    text = content if kind == 'text' else json.dumps(content, ensure_ascii=False)
+    return len(text.encode('utf-8'))
+
+
+def _wide_frame(columns: int, rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(rng.normal(size=(rows, columns)).round(4), columns=[f'指标{i}' for i in range(columns)])
+
+
+@pytest.mark.parametrize('json_layout', JSON_LAYOUTS)
+@pytest.mark.parametrize('columns, rows', [(3000, 5), (600, 40), (8, 5000)])
+def test_every_message_within_budget(monkeypatch, json_layout, columns, rows):
+    monkeypatch.delenv('AKSHARE_OUTPUT_CHUNK_BYTES', raising=False)
+    messages = list(process_dataframe_output(_wide_frame(columns, rows), FakeTool(), json_layout=json_layout))
+    assert messages
+    assert max(_size(message) for message in messages) <= DEFAULT_OUTPUT_CHUNK_BYTES
+
+
+@pytest.mark.parametrize('json_layout', ['split', 'columns'])
+def test_layout_kept_when_columns_fit(monkeypatch, json_layout):
+    monkeypatch.delenv('AKSHARE_OUTPUT_CHUNK_BYTES', raising=False)
+    df = _wide_frame(8, 5000)
+    json_messages = [content for kind, content in process_dataframe_output(df, FakeTool(), json_layout=json_layout) if kind == 'json']
+    assert len(json_messages) > 1
+    if json_layout == 'split':
+        assert json_messages[0]['columns'] == list(df.columns)
+        assert sum(len(message['data']) for message in json_messages) == len(df)
+    else:
+        assert all(list(message['data']) == list(df.columns) for message in json_messages)
+        assert sum(len(message['data']['指标0']) for message in json_messages) == len(df)
+
+
+def test_wide_split_falls_back_to_records(monkeypatch):
+    monkeypatch.delenv('AKSHARE_OUTPUT_CHUNK_BYTES', raising=False)
+    json_messages = [content for kind, content in process_dataframe_output(_wide_frame(3000, 5), FakeTool(), json_layout='split')
+                     if kind == 'json']
+    assert json_messages and all('columns' not in message and isinstance(message['data'][0], dict) for message in json_messages)
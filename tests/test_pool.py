@@ -0,0 +1,67 @@
+"""工作进程池在关闭进程时不持有锁"""
+import threading
+import time
+
+from provider.akshare_pool import AkshareWorkerPool
+
+
+class SlowWorker:
+    """terminate 阻塞到放行为止的工作进程替身"""
+
+    def __init__(self, last_used: float):
+        self.alive = True
+        self.calls = 0
+        self.last_used = last_used
+        self.terminating = threading.Event()
+        self.release = threading.Event()
+
+    def terminate(self):
+        self.terminating.set()
+        self.release.wait(5)
+        self.alive = False
+
+    def kill(self):
+        self.alive = False
+
+
+def _pool(spawned):
+    pool = AkshareWorkerPool(size=2, idle_timeout=60, prewarm=0)
+    pool._spawn = lambda: spawned
+    return pool
+
+
+def test_reaped_worker_is_terminated_outside_lock():
+    fresh = SlowWorker(time.monotonic())
+    pool = _pool(fresh)
+    expired = SlowWorker(time.monotonic() - 120)
+    pool._idle.append(expired)
+
+    acquired = []
+    thread = threading.Thread(target=lambda: acquired.append(pool._acquire(time.monotonic() + 5)))
+    thread.start()
+    assert expired.terminating.wait(5)
+    # 过期进程正在关闭时，其它调用仍能拿到锁
+    stats_done = threading.Event()
+    threading.Thread(target=lambda: (pool.stats(), stats_done.set()), daemon=True).start()
+    assert stats_done.wait(1)
+    expired.release.set()
+    thread.join(5)
+
+    assert acquired == [fresh]
+    assert pool.stats()['reaped'] == 1
+
+
+def test_release_after_shutdown_terminates_outside_lock():
+    worker = SlowWorker(time.monotonic())
+    pool = _pool(worker)
+    pool._acquire(time.monotonic() + 5)
+    pool.shutdown()
+
+    thread = threading.Thread(target=pool._release, args=(worker, True))
+    thread.start()
+    assert worker.terminating.wait(5)
+    stats = pool.stats()
+    worker.release.set()
+    thread.join(5)
+
+    assert (stats['busy'], stats['calls']) == (0, 1)
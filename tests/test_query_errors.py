@@ -0,0 +1,42 @@
+"""查询参数错误按参数错误报告，不按网络或接口错误处理"""
+import pytest
+
+from provider.akshare_query import QueryError
+from provider.akshare_stockdata import classify_network_error
+from tests.fakes import FakeTool
+from tools.stock_spot_quotations import StockSpotQuotationsTool
+
+
+class FakeSpotTool(FakeTool, StockSpotQuotationsTool):
+    def __init__(self):
+        pass
+
+
+def _invalid_query_payloads(messages):
+    return [content for kind, content in messages if kind == 'json' and content.get('error') == 'invalid_query']
+
+
+def test_parse_time_query_error_is_invalid_query():
+    messages = list(FakeSpotTool()._invoke({'interface': 'stock_zh_a_spot_em', 'limit': 'abc'}))
+    payloads = _invalid_query_payloads(messages)
+    assert len(payloads) == 1
+    assert 'limit' in payloads[0]['details']
+    assert all('重试' not in content for kind, content in messages if kind == 'text')
+
+
+def test_apply_time_query_error_is_invalid_query(monkeypatch):
+    def _raise(*args, **kwargs):
+        raise QueryError("列不存在: 不存在的列")
+
+    monkeypatch.setattr('tools.stock_spot_quotations.safe_ak_stream', _raise)
+    messages = list(FakeSpotTool()._invoke({'interface': 'stock_zh_a_spot_em', 'filter': '不存在的列 > 1'}))
+    payloads = _invalid_query_payloads(messages)
+    assert len(payloads) == 1
+    assert payloads[0]['details'] == "列不存在: 不存在的列"
+    assert payloads[0]['hints']
+
+
+@pytest.mark.parametrize('exc', [QueryError('bad filter'), ValueError('bad value')])
+def test_classify_network_error_ignores_query_errors(exc):
+    code, _ = classify_network_error(exc)
+    assert code != 'INVALID_QUERY'
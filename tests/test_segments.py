@@ -0,0 +1,66 @@
+"""长区间K线分段计划与合并"""
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from provider.akshare_segments import merge_segments, plan_segments
+
+TODAY = date(2026, 10, 17)
+
+
+def _ranges(plan):
+    return [(segment['start_date'], segment['end_date']) for segment in plan]
+
+
+def test_daily_range_split_by_year():
+    kwargs = {'symbol': '000001', 'period': 'daily', 'start_date': '20230315', 'end_date': '20261016', 'adjust': ''}
+    plan = plan_segments('stock_zh_a_hist', kwargs, today=TODAY)
+    assert _ranges(plan) == [('20230315', '20231231'), ('20240101', '20241231'),
+                             ('20250101', '20251231'), ('20260101', '20261016')]
+    assert all(segment['symbol'] == '000001' and segment['adjust'] == '' for segment in plan)
+
+
+def test_last_segment_keeps_original_end_and_future_years_are_dropped():
+    kwargs = {'symbol': '00700', 'period': 'daily', 'start_date': '20250101', 'end_date': '20500101'}
+    assert _ranges(plan_segments('stock_hk_hist', kwargs, today=TODAY)) == [('20250101', '20251231'), ('20260101', '20500101')]
+
+
+def test_segment_count_is_capped(monkeypatch):
+    monkeypatch.setenv('AKSHARE_SEGMENT_MAX', '4')
+    kwargs = {'symbol': '000001', 'period': 'daily', 'start_date': '19900101', 'end_date': '20261016'}
+    ranges = _ranges(plan_segments('stock_zh_a_hist', kwargs, today=TODAY))
+    assert len(ranges) == 4
+    assert ranges[0][0] == '19900101' and ranges[-1][1] == '20261016'
+    # 分段首尾相接，没有遗漏的年度
+    for (_, previous_end), (next_start, _) in zip(ranges, ranges[1:]):
+        assert int(next_start[:4]) == int(previous_end[:4]) + 1
+
+
+@pytest.mark.parametrize('function_name, kwargs', [
+    ('stock_zh_a_hist', {'symbol': '000001', 'period': 'daily', 'start_date': '20260101', 'end_date': '20261016'}),
+    ('stock_zh_a_hist', {'symbol': '000001', 'period': 'weekly', 'start_date': '20200101', 'end_date': '20261016'}),
+    ('stock_zh_a_hist', {'symbol': '000001', 'period': 'daily', 'start_date': 'bad', 'end_date': '20261016'}),
+    # 分钟线上游总是下载整个窗口，分段只会增加请求
+    ('stock_zh_a_hist_min_em', {'symbol': '000001', 'period': '1', 'start_date': '2025-01-01 09:30:00',
+                                'end_date': '2026-10-16 15:00:00'}),
+    ('stock_zh_a_spot_em', {}),
+])
+def test_not_segmented(function_name, kwargs):
+    assert plan_segments(function_name, kwargs, today=TODAY) is None
+
+
+def test_merge_segments_orders_and_deduplicates():
+    first = pd.DataFrame({'日期': ['2025-12-30', '2025-12-31'], '收盘': [1.0, 2.0]})
+    second = pd.DataFrame({'日期': ['2025-12-31', '2026-01-02'], '收盘': [2.5, 3.0]})
+    merged = merge_segments('stock_zh_a_hist', [first, pd.DataFrame(), second])
+    assert list(merged['日期']) == ['2025-12-30', '2025-12-31', '2026-01-02']
+    # 重复日期保留后一分段的K线
+    assert list(merged['收盘']) == [1.0, 2.5, 3.0]
+    assert list(merged.index) == [0, 1, 2]
+
+
+def test_merge_segments_all_empty_keeps_columns():
+    empty = pd.DataFrame(columns=['日期', '收盘'])
+    merged = merge_segments('stock_zh_a_hist', [empty, empty])
+    assert merged.empty and list(merged.columns) == ['日期', '收盘']
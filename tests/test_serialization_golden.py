@@ -0,0 +1,97 @@
+"""
+JSON输出与原实现逐字节一致的金标准测试
+tests/golden/serialization/<名称>.json 由原实现（tests/legacy_serializer.py）生成，
+新增用例时运行 python tests/test_serialization_golden.py 重新生成金标准文件
+"""
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fakes import FakeTool  # noqa: E402
+from tests.legacy_serializer import legacy_records  # noqa: E402
+from tools.common_utils import dataframe_to_json_payload, dataframe_to_records, process_dataframe_output  # noqa: E402
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden', 'serialization')
+
+
+def _spot() -> pd.DataFrame:
+    return pd.DataFrame({
+        '序号': np.arange(1, 7),
+        '代码': ['000001', '600519', '300750', '688981', '830799', None],
+        '名称': ['平安银行', '贵州茅台', 'nan', 'None', 'null', '中芯|国际'],
+        '最新价': [10.5, 1700.0, np.nan, np.inf, -np.inf, 0.1],
+        '成交量': [1.0e6, 2.0e12, 3.5, -0.0, 1e20, np.nan],
+        '涨跌幅': np.array([1.25, -0.5, 0, 3, np.nan, 7.777], dtype='float32'),
+    }, index=[10, 11, 12, 13, 14, 15])
+
+
+def _hist() -> pd.DataFrame:
+    return pd.DataFrame({
+        '日期': pd.to_datetime(['2026-10-12', '2026-10-13', None]),
+        '开盘': [10.0, 10.2, 10.1],
+        '成交量': np.array([100, 200, 300], dtype='int32'),
+        '停牌': [False, True, False],
+        '备注': [{'a': 1}, [1, 2], 1.5],
+    })
+
+
+FRAMES = {
+    'spot_numpy_dtypes': _spot,
+    'hist_datetime_bool_object': _hist,
+    'nullable_int': lambda: pd.DataFrame({'代码': ['000001', '600519'], '数量': pd.array([1, None], dtype='Int64'), '价格': [1.5, 2.0]}),
+    'nullable_float_boolean': lambda: pd.DataFrame({'a': pd.array([1.5, None], dtype='Float64'), 'b': pd.array([True, None], dtype='boolean')}),
+    'string_dtype': lambda: pd.DataFrame({'名称': pd.array(['平安银行', None], dtype='string'), '价格': [np.nan, 3.0]}),
+    'categorical_nan': lambda: pd.DataFrame({'行业': pd.Categorical(['银行', np.nan, '白酒']), '价格': [1.0, np.inf, 2.5]}),
+    'tz_datetime': lambda: pd.DataFrame({'时间': pd.to_datetime(['2026-10-16 09:30', None]).tz_localize('Asia/Shanghai'), 'v': [1, 2]}),
+    'timedelta': lambda: pd.DataFrame({'间隔': pd.to_timedelta([1, 2.5], unit='D'), 'v': [1.0, 2.0]}),
+    'timedelta_nat': lambda: pd.DataFrame({'间隔': pd.to_timedelta([1, None], unit='D'), 'v': [1.0, np.nan]}),
+}
+
+
+def _golden_path(name: str) -> str:
+    return os.path.join(GOLDEN_DIR, f'{name}.json')
+
+
+def _dumps(payload) -> str:
+    return json.dumps(payload, ensure_ascii=False)
+
+
+@pytest.mark.parametrize('name', sorted(FRAMES))
+def test_records_match_golden_file(name):
+    with open(_golden_path(name), encoding='utf-8') as f:
+        golden = f.read()
+    df = FRAMES[name]()
+    assert _dumps({"data": dataframe_to_records(df)}) == golden
+    assert _dumps(dataframe_to_json_payload(df)) == golden
+    # 工具实际发出的JSON消息
+    json_messages = [content for kind, content in process_dataframe_output(df, FakeTool()) if kind == 'json']
+    assert [_dumps(message) for message in json_messages] == [golden]
+
+
+@pytest.mark.parametrize('name', sorted(FRAMES))
+def test_golden_file_is_legacy_output(name):
+    with open(_golden_path(name), encoding='utf-8') as f:
+        assert f.read() == _dumps({"data": legacy_records(FRAMES[name]())})
+
+
+@pytest.mark.parametrize('name', sorted(FRAMES))
+def test_split_layout_uses_same_values(name):
+    df = FRAMES[name]()
+    records = dataframe_to_records(df)
+    payload = dataframe_to_json_payload(df, 'split')
+    assert [dict(zip(payload['columns'], row)) for row in payload['data']] == records
+
+
+if __name__ == '__main__':
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    for name, build in sorted(FRAMES.items()):
+        with open(_golden_path(name), 'w', encoding='utf-8') as f:
+            f.write(_dumps({"data": legacy_records(build())}))
+        print(f"wrote {_golden_path(name)}")
@@ -4,52 +4,63 @@
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+from functools import lru_cache
 import logging
 
-# 尝试导入技术分析库
-try:
-    import talib
-    USE_TALIB = True
-    USE_PANDAS_TA = False
-    USE_PANDAS_ONLY = False
-except ImportError:
+from indicator_kernels import compute_indicators, join_indicator_columns
+
+
+@lru_cache(maxsize=1)
+def load_technical_analysis_libraries() -> Tuple[Optional[Any], Optional[Any]]:
+    """
+    按需导入技术分析库，返回 (talib, pandas_ta)，不可用的库为 None
+    - 优先使用 talib，其次 pandas_ta，都不可用时调用方使用NumPy指标内核
+    - 导入结果会被缓存，只在首次计算技术指标时付出导入开销
+    """
+    try:
+        import talib
+        return talib, None
+    except ImportError:
+        pass
     try:
-        import pandas_ta as ta
-        USE_TALIB = False
-        USE_PANDAS_TA = True
-        USE_PANDAS_ONLY = False
+        import pandas_ta
+        logging.warning("talib not available, using pandas_ta as fallback")
+        return None, pandas_ta
     except ImportError:
-        USE_TALIB = False
-        USE_PANDAS_TA = False
-        USE_PANDAS_ONLY = True
+        logging.warning("Neither talib nor pandas_ta available, using built-in NumPy indicator kernels")
+        return None, None
 
 
 class TechnicalIndicatorCalculator:
     """技术指标计算器"""
     
     def __init__(self, use_talib: bool = True, use_pandas_ta: bool = False):
-        self.use_talib = use_talib and USE_TALIB
-        self.use_pandas_ta = use_pandas_ta and USE_PANDAS_TA
+        talib, ta = load_technical_analysis_libraries()
+        self._talib = talib
+        self._ta = ta
+        self.use_talib = use_talib and talib is not None
+        self.use_pandas_ta = use_pandas_ta and ta is not None
         self.use_pandas_only = not (self.use_talib or self.use_pandas_ta)
         self.logger = logging.getLogger(__name__)
         
         if self.use_pandas_only:
-            self.logger.warning("使用pandas内置功能计算技术指标")
+            self.logger.warning("使用NumPy指标内核计算技术指标")
     
     def calculate_moving_averages(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
         """计算移动平均线"""
         try:
+            if self.use_pandas_only:
+                return self._calculate_with_kernel(df, ma_periods=periods)
+            
             df = df.copy()
             close_values = df['收盘'].astype('float64').fillna(0).values
             
             for period in periods:
                 if self.use_talib:
-                    df[f'MA{period}'] = talib.SMA(close_values, timeperiod=period)
-                elif self.use_pandas_ta:
-                    df[f'MA{period}'] = ta.sma(df['收盘'], length=period)
+                    df[f'MA{period}'] = self._talib.SMA(close_values, timeperiod=period)
                 else:
-                    df[f'MA{period}'] = df['收盘'].rolling(window=period).mean()
+                    df[f'MA{period}'] = self._ta.sma(df['收盘'], length=period)
             
             return df
             
@@ -60,16 +71,17 @@ class TechnicalIndicatorCalculator:
     def calculate_rsi(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
         """计算RSI指标"""
         try:
+            if self.use_pandas_only:
+                return self._calculate_with_kernel(df, rsi_periods=periods)
+            
             df = df.copy()
             close_values = df['收盘'].astype('float64').fillna(0).values
             
             for period in periods:
                 if self.use_talib:
-                    df[f'RSI{period}'] = talib.RSI(close_values, timeperiod=period)
-                elif self.use_pandas_ta:
-                    df[f'RSI{period}'] = ta.rsi(df['收盘'], length=period)
+                    df[f'RSI{period}'] = self._talib.RSI(close_values, timeperiod=period)
                 else:
-                    df[f'RSI{period}'] = self._calculate_rsi_pandas(df['收盘'], period)
+                    df[f'RSI{period}'] = self._ta.rsi(df['收盘'], length=period)
             
             return df
             
@@ -80,26 +92,23 @@ class TechnicalIndicatorCalculator:
     def calculate_macd(self, df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> pd.DataFrame:
         """计算MACD指标"""
         try:
+            if self.use_pandas_only:
+                return self._calculate_with_kernel(df, macd=(fast, slow, signal))
+            
             df = df.copy()
             close_values = df['收盘'].astype('float64').fillna(0).values
             
             if self.use_talib:
-                macd, macd_signal, macd_hist = talib.MACD(close_values, 
+                macd, macd_signal, macd_hist = self._talib.MACD(close_values, 
                                                         fastperiod=fast, slowperiod=slow, signalperiod=signal)
                 df['MACD'] = macd
                 df['MACD_SIGNAL'] = macd_signal
                 df['MACD_HIST'] = macd_hist
-            elif self.use_pandas_ta:
-                macd_data = ta.macd(df['收盘'], fast=fast, slow=slow, signal=signal)
+            else:
+                macd_data = self._ta.macd(df['收盘'], fast=fast, slow=slow, signal=signal)
                 df['MACD'] = macd_data[f'MACD_{fast}_{slow}_{signal}']
                 df['MACD_SIGNAL'] = macd_data[f'MACDs_{fast}_{slow}_{signal}']
                 df['MACD_HIST'] = macd_data[f'MACDh_{fast}_{slow}_{signal}']
-            else:
-                ema_fast = df['收盘'].ewm(span=fast).mean()
-                ema_slow = df['收盘'].ewm(span=slow).mean()
-                df['MACD'] = ema_fast - ema_slow
-                df['MACD_SIGNAL'] = df['MACD'].ewm(span=signal).mean()
-                df['MACD_HIST'] = df['MACD'] - df['MACD_SIGNAL']
             
             return df
             
@@ -110,27 +119,25 @@ class TechnicalIndicatorCalculator:
     def calculate_kdj(self, df: pd.DataFrame, k_period: int = 9, d_period: int = 3, j_period: int = 3) -> pd.DataFrame:
         """计算KDJ指标"""
         try:
+            if self.use_pandas_only:
+                return self._calculate_with_kernel(df, kdj=(k_period, d_period, j_period))
+            
             df = df.copy()
             high_values = df['最高'].astype('float64').fillna(0).values
             low_values = df['最低'].astype('float64').fillna(0).values
             close_values = df['收盘'].astype('float64').fillna(0).values
             
             if self.use_talib:
-                k, d = talib.STOCH(high_values, low_values, close_values, 
+                k, d = self._talib.STOCH(high_values, low_values, close_values, 
                                  fastk_period=k_period, slowk_period=d_period, slowd_period=d_period)
                 df['KDJ_K'] = k
                 df['KDJ_D'] = d
                 df['KDJ_J'] = 3 * k - 2 * d
-            elif self.use_pandas_ta:
-                stoch_data = ta.stoch(df['最高'], df['最低'], df['收盘'], k=k_period, d=d_period)
+            else:
+                stoch_data = self._ta.stoch(df['最高'], df['最低'], df['收盘'], k=k_period, d=d_period)
                 df['KDJ_K'] = stoch_data[f'STOCHk_{k_period}_{d_period}_{d_period}']
                 df['KDJ_D'] = stoch_data[f'STOCHd_{k_period}_{d_period}_{d_period}']
                 df['KDJ_J'] = 3 * df['KDJ_K'] - 2 * df['KDJ_D']
-            else:
-                k, d, j = self._calculate_kdj_pandas(df['最高'], df['最低'], df['收盘'], k_period, d_period)
-                df['KDJ_K'] = k
-                df['KDJ_D'] = d
-                df['KDJ_J'] = j
             
             return df
             
@@ -141,26 +148,23 @@ class TechnicalIndicatorCalculator:
     def calculate_bollinger_bands(self, df: pd.DataFrame, period: int = 20, std_dev: float = 2.0) -> pd.DataFrame:
         """计算布林带指标"""
         try:
+            if self.use_pandas_only:
+                return self._calculate_with_kernel(df, boll=(period, std_dev))
+            
             df = df.copy()
             close_values = df['收盘'].astype('float64').fillna(0).values
             
             if self.use_talib:
-                upper, middle, lower = talib.BBANDS(close_values, 
+                upper, middle, lower = self._talib.BBANDS(close_values, 
                                                   timeperiod=period, nbdevup=std_dev, nbdevdn=std_dev)
                 df['BOLL_UPPER'] = upper
                 df['BOLL_MIDDLE'] = middle
                 df['BOLL_LOWER'] = lower
-            elif self.use_pandas_ta:
-                bb_data = ta.bbands(df['收盘'], length=period, std=std_dev)
+            else:
+                bb_data = self._ta.bbands(df['收盘'], length=period, std=std_dev)
                 df['BOLL_UPPER'] = bb_data[f'BBU_{period}_{std_dev}']
                 df['BOLL_MIDDLE'] = bb_data[f'BBM_{period}_{std_dev}']
                 df['BOLL_LOWER'] = bb_data[f'BBL_{period}_{std_dev}']
-            else:
-                middle = df['收盘'].rolling(window=period).mean()
-                std = df['收盘'].rolling(window=period).std()
-                df['BOLL_MIDDLE'] = middle
-                df['BOLL_UPPER'] = middle + (std * std_dev)
-                df['BOLL_LOWER'] = middle - (std * std_dev)
             
             return df
             
@@ -171,16 +175,17 @@ class TechnicalIndicatorCalculator:
     def calculate_volume_indicators(self, df: pd.DataFrame, periods: List[int]) -> pd.DataFrame:
         """计算成交量指标"""
         try:
+            if self.use_pandas_only:
+                return self._calculate_with_kernel(df, vma_periods=periods)
+            
             df = df.copy()
             volume_values = df['成交量'].astype('float64').fillna(0).values
             
             for period in periods:
                 if self.use_talib:
-                    df[f'VMA{period}'] = talib.SMA(volume_values, timeperiod=period)
-                elif self.use_pandas_ta:
-                    df[f'VMA{period}'] = ta.sma(df['成交量'], length=period)
+                    df[f'VMA{period}'] = self._talib.SMA(volume_values, timeperiod=period)
                 else:
-                    df[f'VMA{period}'] = df['成交量'].rolling(window=period).mean()
+                    df[f'VMA{period}'] = self._ta.sma(df['成交量'], length=period)
             
             return df
             
@@ -191,6 +196,10 @@ class TechnicalIndicatorCalculator:
     def calculate_all_indicators(self, df: pd.DataFrame, config: Dict[str, Any]) -> pd.DataFrame:
         """计算所有技术指标"""
         try:
+            if self.use_pandas_only:
+                # 没有talib/pandas_ta时一次计算全部启用的指标，共享中间结果
+                return self._calculate_with_kernel(df, **self._kernel_groups(config))
+            
             df = df.copy()
             
             # 移动平均线
@@ -234,22 +243,31 @@ class TechnicalIndicatorCalculator:
             self.logger.error(f"计算技术指标失败: {e}")
             return df
     
-    def _calculate_rsi_pandas(self, prices: pd.Series, window: int) -> pd.Series:
-        """使用pandas计算RSI"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi.astype('float64')
+    @staticmethod
+    def _kernel_groups(config: Dict[str, Any]) -> Dict[str, Any]:
+        """把指标配置转换为 compute_indicators 的参数，未启用的指标组为None"""
+        def group(name: str) -> Optional[Dict[str, Any]]:
+            section = config.get(name, {})
+            return section if section.get('enabled', True) else None
+        
+        moving_averages = group('moving_averages')
+        rsi = group('rsi')
+        macd = group('macd')
+        kdj = group('kdj')
+        bollinger_bands = group('bollinger_bands')
+        volume = group('volume')
+        return {
+            'ma_periods': moving_averages.get('periods', [5, 10, 20, 30, 60]) if moving_averages is not None else None,
+            'rsi_periods': rsi.get('periods', [6, 12, 24]) if rsi is not None else None,
+            'macd': (macd.get('fast_period', 12), macd.get('slow_period', 26), macd.get('signal_period', 9)) if macd is not None else None,
+            'kdj': (kdj.get('k_period', 9), kdj.get('d_period', 3), kdj.get('j_period', 3)) if kdj is not None else None,
+            'boll': (bollinger_bands.get('period', 20), bollinger_bands.get('std_dev', 2.0)) if bollinger_bands is not None else None,
+            'vma_periods': volume.get('periods', [5, 10, 20]) if volume is not None else None,
+        }
     
-    def _calculate_kdj_pandas(self, high: pd.Series, low: pd.Series, close: pd.Series, 
-                             k_period: int, d_period: int) -> Tuple[pd.Series, pd.Series, pd.Series]:
-        """使用pandas计算KDJ"""
-        lowest_low = low.rolling(window=k_period).min()
-        highest_high = high.rolling(window=k_period).max()
-        rsv = (close - lowest_low) / (highest_high - lowest_low) * 100
-        k = rsv.ewm(com=2).mean()
-        d = k.ewm(com=2).mean()
-        j = 3 * k - 2 * d
-        return k.astype('float64'), d.astype('float64'), j.astype('float64')
+    def _calculate_with_kernel(self, df: pd.DataFrame, **groups: Any) -> pd.DataFrame:
+        """使用NumPy指标内核计算指定的指标组，未指定的指标组不计算"""
+        spec = {'ma_periods': None, 'rsi_periods': None, 'macd': None, 'kdj': None, 'boll': None, 'vma_periods': None}
+        spec.update(groups)
+        values, columns = compute_indicators(df['收盘'], df.get('最高'), df.get('最低'), df.get('成交量'), **spec)
+        return join_indicator_columns(df, values, columns)
@@ -1,12 +1,19 @@
 """
 公共工具函数，用于避免代码重复
 """
+import hashlib
+import io
+import json
 import logging
+import os
+from datetime import datetime
 import numpy as np
 import pandas as pd
 from typing import Any, Generator
 from dify_plugin.entities.tool import ToolInvokeMessage
 
+from provider.akshare_query import QueryError, build_query
+
 
 def clean_nan_values(obj: Any) -> Any:
     """
@@ -73,179 +80,367 @@ def clean_nan_values(obj: Any) -> Any:
         return obj
 
 
-def process_dataframe_output(result: pd.DataFrame, tool_instance, max_rows_for_single_output=500) -> Generator[ToolInvokeMessage, None, None]:
+# 单条输出消息的默认字节预算：打包模式下消息经stdio传输，bufio.Scanner单行上限64KB，留出消息封装的余量
+DEFAULT_OUTPUT_CHUNK_BYTES = 48 * 1024
+MIN_OUTPUT_CHUNK_BYTES = 4 * 1024
+
+# {"data": []} 的字节数，及记录之间的分隔符字节数
+_JSON_ENVELOPE_BYTES = len('{"data": []}')
+_JSON_SEPARATOR_BYTES = len(', ')
+TRUNCATION_MARK = '…'
+
+
+def get_output_chunk_bytes() -> int:
+    """单条TEXT/JSON消息的字节预算，可通过 AKSHARE_OUTPUT_CHUNK_BYTES 调整"""
+    try:
+        value = int(os.environ.get('AKSHARE_OUTPUT_CHUNK_BYTES', DEFAULT_OUTPUT_CHUNK_BYTES))
+    except ValueError:
+        return DEFAULT_OUTPUT_CHUNK_BYTES
+    return max(MIN_OUTPUT_CHUNK_BYTES, value)
+
+
+# 工具输出模式：both 同时输出TEXT和JSON，json/text 只输出其一，summary 只输出表格概要，file 输出为数据文件
+OUTPUT_MODES = ('both', 'json', 'text', 'summary', 'file')
+DEFAULT_OUTPUT_MODE = 'both'
+
+# JSON布局：records 每行一个对象（默认），split 列名只出现一次、每行一个值数组，columns 每列一个值数组
+JSON_LAYOUTS = ('records', 'split', 'columns')
+DEFAULT_JSON_LAYOUT = 'records'
+
+# summary模式下展示的首尾行数
+SUMMARY_PREVIEW_ROWS = 5
+
+
+def parse_output_mode(value: Any, default: str = DEFAULT_OUTPUT_MODE) -> str:
+    """解析工具的output_mode参数，未提供或取值无效时返回默认值"""
+    if value is None:
+        return default
+    mode = str(value).strip().lower()
+    if mode not in OUTPUT_MODES:
+        logging.warning(f"Unknown output_mode {value!r}, using {default}")
+        return default
+    return mode
+
+
+# 文件输出格式：格式 -> (扩展名, MIME类型, 压缩方式)；parquet/feather需要pyarrow，不可用时回退到gzip压缩的CSV
+OUTPUT_FILE_FORMATS = {
+    'parquet': ('.parquet', 'application/vnd.apache.parquet', 'zstd'),
+    'feather': ('.feather', 'application/vnd.apache.arrow.file', 'zstd'),
+    'csv': ('.csv.gz', 'application/gzip', 'gzip'),
+}
+DEFAULT_OUTPUT_FILE_FORMAT = 'parquet'
+OUTPUT_FILE_PREFIX = 'akshare_data'
+
+
+def get_output_file_threshold() -> int:
+    """
+    表格估算字节数超过该值时自动改为文件输出（AKSHARE_OUTPUT_FILE_THRESHOLD），0表示不自动切换
+    只影响 both/json/text 模式，summary 模式不受影响
+    """
+    try:
+        return max(0, int(os.environ.get('AKSHARE_OUTPUT_FILE_THRESHOLD', 0)))
+    except ValueError:
+        return 0
+
+
+def get_output_file_format() -> str:
+    """文件输出格式（AKSHARE_OUTPUT_FILE_FORMAT）：parquet（默认）、feather 或 csv"""
+    fmt = os.environ.get('AKSHARE_OUTPUT_FILE_FORMAT', DEFAULT_OUTPUT_FILE_FORMAT).strip().lower()
+    if fmt not in OUTPUT_FILE_FORMATS:
+        logging.warning(f"Unknown AKSHARE_OUTPUT_FILE_FORMAT {fmt!r}, using {DEFAULT_OUTPUT_FILE_FORMAT}")
+        return DEFAULT_OUTPUT_FILE_FORMAT
+    return fmt
+
+
+def parse_json_layout(value: Any, default: str = DEFAULT_JSON_LAYOUT) -> str:
+    """解析工具的json_layout参数，未提供或取值无效时返回默认值"""
+    if value is None:
+        return default
+    layout = str(value).strip().lower()
+    if layout not in JSON_LAYOUTS:
+        logging.warning(f"Unknown json_layout {value!r}, using {default}")
+        return default
+    return layout
+
+
+def parse_query_params(tool_parameters: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    解析工具的columns/filter/sort_by/limit参数，交给safe_ak_call在序列化前执行
+    未提供任何查询参数时返回None；格式错误时抛出QueryError
+    """
+    return build_query(
+        columns=tool_parameters.get("columns"),
+        filter=tool_parameters.get("filter"),
+        sort_by=tool_parameters.get("sort_by"),
+        limit=tool_parameters.get("limit"),
+    )
+
+
+# 对象列转换为字符串后视为空值的文本
+MISSING_TEXT_VALUES = ['nan', 'NaT', 'None', 'null']
+
+# 整表按文本输出时替换为 'null' 的文本
+NULL_TEXT_VALUES = ['nan', 'NaN', 'inf', '-inf']
+
+# int64可以精确表示的浮点数范围，超出范围的整数值浮点数逐个转换
+_INT64_SAFE_FLOAT = float(2 ** 63)
+
+
+def _json_safe(value: Any) -> Any:
+    """无法JSON序列化的值转换为字符串"""
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return str(value) if value is not None else ""
+
+
+def _encode_float_column(values: np.ndarray) -> list:
+    """浮点列：NaN/inf转为空字符串，整数值转为int，其余为float"""
+    values = values.astype(np.float64, copy=False)
+    finite = np.isfinite(values)
+    integral = finite & (np.floor(values) == values)
+    small_integral = integral & (np.abs(values) < _INT64_SAFE_FLOAT)
+    encoded = values.astype(object)
+    encoded[~finite] = ''
+    if small_integral.any():
+        encoded[small_integral] = values[small_integral].astype(np.int64).astype(object)
+    for i in np.flatnonzero(integral & ~small_integral):
+        encoded[i] = int(values[i])
+    return encoded.tolist()
+
+
+def _encode_column(column: pd.Series) -> list:
+    """按列类型把一列（NumPy类型）转换为可JSON序列化的Python值列表"""
+    dtype = column.dtype
+    if dtype == 'object':
+        text = column.astype(str)
+        return text.where(~text.isin(MISSING_TEXT_VALUES), '').tolist()
+    if np.issubdtype(dtype, np.integer):
+        # 时间差也属于整数类型，与原实现一样输出纳秒数
+        return column.to_numpy().astype(np.int64).tolist()
+    if np.issubdtype(dtype, np.floating):
+        return _encode_float_column(column.to_numpy())
+    if np.issubdtype(dtype, np.bool_):
+        return column.to_numpy().tolist()
+    if np.issubdtype(dtype, np.datetime64):
+        return [str(value) for value in column]
+    return [_json_safe(value) for value in clean_nan_values(column.tolist())]
+
+
+def _encode_text_column(column: pd.Series) -> list:
+    """整表按文本输出时的一列：astype(str)，'nan'、'NaN'、'inf'、'-inf' 转为 'null'"""
+    text = column.astype(str)
+    return text.where(~text.isin(NULL_TEXT_VALUES), 'null').tolist()
+
+
+def _encode_columns(df: pd.DataFrame) -> list[list]:
+    """
+    逐列编码DataFrame
+    含有扩展类型列（可空整数、分类、字符串、带时区日期等）时，与原实现一样整表所有列都按文本输出
+    """
+    if all(isinstance(dtype, np.dtype) for dtype in df.dtypes):
+        return [_encode_column(df.iloc[:, i]) for i in range(df.shape[1])]
+    return [_encode_text_column(df.iloc[:, i]) for i in range(df.shape[1])]
+
+
+# Markdown单元格中需要转义或替换的字符：管道符转义，换行和制表符替换为空格，保证一行对应一条记录
+_MARKDOWN_ESCAPES = str.maketrans({'|': '\\|', '\n': ' ', '\r': ' ', '\t': ' '})
+_MARKDOWN_SPECIAL_PATTERN = r'[|\n\r\t]'
+
+
+def _markdown_cells(values: pd.Series, blank_missing: bool) -> list[str]:
+    """把一列转换为Markdown单元格文本（整列批量转换和转义）"""
+    text = values.astype(str)
+    if text.str.contains(_MARKDOWN_SPECIAL_PATTERN, regex=True).any():
+        text = text.str.translate(_MARKDOWN_ESCAPES)
+    if blank_missing:
+        missing = values.isna().to_numpy() | (text == 'nan').to_numpy() | (text.str.strip() == '').to_numpy()
+        text = text.where(~missing, '')
+    return text.tolist()
+
+
+def markdown_table_lines(df: pd.DataFrame, index: bool = False, blank_missing: bool = False) -> list[str]:
+    """
+    逐列生成Markdown管道表格的各行：表头、分隔行和每条记录一行
+    - 单元格中的 | 转义为 \\|，换行和制表符替换为空格
+    - index=True 时第一列为行索引（表头为空）
+    - blank_missing=True 时缺失值、'nan' 和空白文本显示为空单元格，否则与 astype(str) 一致
+    """
+    headers = [str(col).translate(_MARKDOWN_ESCAPES) for col in df.columns]
+    columns = [_markdown_cells(df.iloc[:, i], blank_missing) for i in range(df.shape[1])]
+    if index:
+        headers.insert(0, '')
+        columns.insert(0, _markdown_cells(df.index.to_series(), blank_missing))
+    lines = ["| " + " | ".join(headers) + " |", "| " + " | ".join(["---"] * len(headers)) + " |"]
+    lines.extend("| " + " | ".join(cells) + " |" for cells in zip(*columns))
+    return lines
+
+
+def render_markdown_table(df: pd.DataFrame, index: bool = False, include_header: bool = True, blank_missing: bool = False) -> str:
+    """生成Markdown管道表格文本，include_header=False 时只包含数据行（用于分块输出的后续块）"""
+    lines = markdown_table_lines(df, index=index, blank_missing=blank_missing)
+    return "\n".join(lines if include_header else lines[2:])
+
+
+def dataframe_to_records(df: pd.DataFrame) -> list[dict[str, Any]]:
+    """
+    将DataFrame转换为JSON记录列表（忽略索引），逐列批量转换后一次性组装记录
+    - 对象列转为字符串，'nan'、'NaT'、'None'、'null' 转为空字符串
+    - 浮点列的NaN/inf转为空字符串，整数值转为int
+    - 日期时间列转为字符串
+    - 含有扩展类型列时整表转为字符串，'nan'、'inf' 等转为 'null'
+    """
+    if df.shape[1] == 0:
+        return [{} for _ in range(len(df))]
+    columns = list(df.columns)
+    encoded = _encode_columns(df)
+    return [dict(zip(columns, row)) for row in zip(*encoded)]
+
+
+def dataframe_to_rows(df: pd.DataFrame) -> list[list[Any]]:
+    """与 dataframe_to_records 相同的逐列转换，每行为按列顺序排列的值列表（用于split/columns布局）"""
+    if df.shape[1] == 0:
+        return [[] for _ in range(len(df))]
+    encoded = _encode_columns(df)
+    return [list(row) for row in zip(*encoded)]
+
+
+def _encode_json_rows(df: pd.DataFrame, json_layout: str) -> list[Any]:
+    return dataframe_to_records(df) if json_layout == 'records' else dataframe_to_rows(df)
+
+
+def _build_json_payload(df: pd.DataFrame, rows: list[Any], json_layout: str, include_columns: bool = True) -> dict[str, Any]:
+    """
+    按布局组装JSON消息
+    - records: {"data": [{列名: 值, ...}, ...]}
+    - split: {"columns": [列名, ...], "data": [[值, ...], ...]}，分块输出时只有第一块带columns
+    - columns: {"data": {列名: [值, ...], ...}}
+    """
+    if json_layout == 'records':
+        return {"data": rows}
+    columns = [str(col) for col in df.columns]
+    if json_layout == 'columns':
+        values = list(zip(*rows)) if rows else [()] * len(columns)
+        return {"data": {col: list(column_values) for col, column_values in zip(columns, values)}}
+    if include_columns:
+        return {"columns": columns, "data": rows}
+    return {"data": rows}
+
+
+def dataframe_to_json_payload(df: pd.DataFrame, json_layout: str = DEFAULT_JSON_LAYOUT) -> dict[str, Any]:
+    """按json_layout把整个DataFrame编码为一条JSON消息的内容（不分块）"""
+    return _build_json_payload(df, _encode_json_rows(df, json_layout), json_layout)
+
+
+def _json_envelope_bytes(df: pd.DataFrame, json_layout: str, include_columns: bool = True) -> int:
+    """不含任何行时JSON消息的字节数；每行的字节数（含columns布局下各列的分隔符）另行累加"""
+    if json_layout == 'records':
+        return _JSON_ENVELOPE_BYTES
+    return _utf8_len(json.dumps(_build_json_payload(df, [], json_layout, include_columns), ensure_ascii=False))
+
+
+def process_dataframe_output(
+    result: pd.DataFrame,
+    tool_instance,
+    max_rows_for_single_output=None,
+    output_mode: str = DEFAULT_OUTPUT_MODE,
+    json_layout: str = DEFAULT_JSON_LAYOUT,
+) -> Generator[ToolInvokeMessage, None, None]:
     """
     处理DataFrame输出，生成TEXT和JSON消息
     JSON保持AKShare原始数据不变，TEXT使用Markdown格式
     
-    如果数据量过大（超过max_rows_for_single_output）或JSON大小超过50KB，自动分块处理以避免缓冲区溢出
+    如果TEXT或JSON消息超过字节预算（见 get_output_chunk_bytes），自动按字节预算分块处理以避免缓冲区溢出
     
     Args:
         result: pandas DataFrame
         tool_instance: 工具实例，用于调用create_text_message和create_json_message
-        max_rows_for_single_output: 单次输出的最大行数，超过此值将自动分块（默认500行）
+        max_rows_for_single_output: 单次输出的最大行数，超过此值将分块（默认不限制，只按字节预算判断）
+        output_mode: both/json/text/summary/file，不需要的消息不会生成（见 parse_output_mode）；
+            表格超过 AKSHARE_OUTPUT_FILE_THRESHOLD 时自动改为文件输出
+        json_layout: records/split/columns，JSON消息的布局（见 _build_json_payload）
         
     Yields:
         ToolInvokeMessage: TEXT和JSON消息
     """
+    if output_mode == 'summary':
+        yield from process_dataframe_summary_output(result, tool_instance)
+        return
+    want_text = output_mode != 'json'
+    want_json = output_mode != 'text'
+    
     if result.empty:
-        yield tool_instance.create_text_message("暂无数据")
-        yield tool_instance.create_json_message({"data": []})
+        yield from handle_empty_result(tool_instance, output_mode)
         return
     
-    # 先快速估算JSON大小，如果可能超过限制，直接分块处理
-    import json
-    MAX_SAFE_JSON_SIZE = 50 * 1024  # 50KB，留出安全余量
+    if use_file_output(result, output_mode):
+        yield from process_dataframe_file_output(result, tool_instance, output_mode)
+        return
     
-    # 快速估算：每行JSON大小 ≈ (列数 * 平均列名长度 + 数据长度) * 2 (JSON格式开销)
-    # 更准确的估算：先用前几行数据试序列化
-    try:
-        # 取前10行快速估算平均每行大小
-        sample_size = min(10, len(result))
-        sample_df = result.iloc[:sample_size].reset_index(drop=True)
-        
-        # 处理样本数据
-        sample_clean = sample_df.copy()
-        for col in sample_clean.columns:
-            if sample_clean[col].dtype == 'object':
-                sample_clean[col] = sample_clean[col].astype(str)
-            elif np.issubdtype(sample_clean[col].dtype, np.integer):
-                sample_clean[col] = sample_clean[col].astype('int64')
-            elif np.issubdtype(sample_clean[col].dtype, np.floating):
-                sample_clean[col] = sample_clean[col].fillna('')
-        
-        sample_json_data = sample_clean.to_dict(orient="records")
-        sample_json_data = clean_nan_values(sample_json_data)
-        sample_json_str = json.dumps({"data": sample_json_data}, ensure_ascii=False)
-        sample_json_size = len(sample_json_str.encode('utf-8'))
-        
-        # 估算总大小
-        if sample_size > 0:
-            estimated_size_per_row = sample_json_size / sample_size
-            estimated_total_size = estimated_size_per_row * len(result)
-            
-            # 如果估算超过限制或行数过多，直接分块
-            if estimated_total_size > MAX_SAFE_JSON_SIZE or len(result) > max_rows_for_single_output:
-                logging.info(f"DataFrame has {len(result)} rows, estimated JSON size {estimated_total_size:.0f} bytes, using chunked processing")
-                yield from process_large_dataframe_output(result, tool_instance, chunk_size=50)
-                return
-    except Exception as e:
-        # 如果估算失败，按行数判断
-        logging.warning(f"Failed to estimate JSON size: {e}, using row count only")
-        if len(result) > max_rows_for_single_output:
-            logging.info(f"DataFrame has {len(result)} rows, exceeding {max_rows_for_single_output}, using chunked processing")
-            yield from process_large_dataframe_output(result, tool_instance, chunk_size=50)
-            return
+    budget = get_output_chunk_bytes()
+    
+    if max_rows_for_single_output is not None and len(result) > max_rows_for_single_output:
+        logging.info(f"DataFrame has {len(result)} rows, exceeding {max_rows_for_single_output}, using chunked processing")
+        yield from process_large_dataframe_output(result, tool_instance, output_mode=output_mode, json_layout=json_layout)
+        return
+    
+    # 一次性转换JSON记录并精确计算大小，超过字节预算时按预算分块
+    json_data = None
+    record_sizes = None
+    json_size = 0
+    if want_json:
+        try:
+            json_data = _encode_json_rows(result, json_layout)
+            record_sizes = _record_json_sizes(json_data)
+            json_size = _json_envelope_bytes(result, json_layout) + sum(record_sizes) + _JSON_SEPARATOR_BYTES * max(0, len(record_sizes) - 1)
+        except Exception as e:
+            logging.warning(f"Failed to encode DataFrame to JSON records: {e}")
+            json_data = None
+            record_sizes = None
+            json_size = 0
+    
+    if json_size > budget:
+        logging.info(f"DataFrame has {len(result)} rows, JSON size {json_size} bytes, splitting into chunks of at most {budget} bytes")
+        yield from _emit_dataframe_chunks(
+            result, tool_instance, include_header=True, records=json_data, record_sizes=record_sizes,
+            output_mode=output_mode, json_layout=json_layout
+        )
+        return
     
-    # 对于键值对格式的数据（如买卖盘口），使用Markdown表格格式
-    if len(result.columns) == 2 and 'item' in result.columns and 'value' in result.columns:
-        text_output = "## 股票实时数据\n\n"
-        text_output += "| 项目 | 数值 |\n"
-        text_output += "|------|------|\n"
-        for _, row in result.iterrows():
-            text_output += f"| {row['item']} | {row['value']} |\n"
+    if not want_text:
+        text_output = ""
     else:
-        # 普通表格格式，TEXT输出标准Markdown表格格式，符合Dify工作流要求
         try:
-            # 检查DataFrame是否为空
-            if result.empty:
-                text_output = "暂无数据"
+            if len(result.columns) == 2 and 'item' in result.columns and 'value' in result.columns:
+                # 对于键值对格式的数据（如买卖盘口），使用项目/数值两列表格
+                key_values = result[['item', 'value']].set_axis(['项目', '数值'], axis=1)
+                text_output = "## 股票实时数据\n\n" + render_markdown_table(key_values)
             else:
-                # 预处理DataFrame，确保所有列都是字符串类型，避免to_markdown转换错误
-                result_clean = result.copy()
-                for col in result_clean.columns:
-                    result_clean[col] = result_clean[col].astype(str)
-                
-                # 使用pandas的to_markdown方法生成标准Markdown表格
-                text_output = result_clean.to_markdown(index=True, tablefmt='pipe')
+                # 普通表格格式，TEXT输出标准Markdown表格格式，符合Dify工作流要求
+                text_output = render_markdown_table(result, index=True)
         except Exception as e:
-            logging.warning(f"to_markdown failed: {e}, using manual markdown generation")
-            try:
-                # 如果to_markdown失败，手动构建Markdown表格
-                if result.empty:
-                    text_output = "暂无数据"
-                else:
-                    # 获取列名
-                    columns = result.columns.tolist()
-                    
-                    # 构建表头
-                    text_output = "| " + " | ".join(columns) + " |\n"
-                    text_output += "| " + " | ".join(["---"] * len(columns)) + " |\n"
-                    
-                    # 构建数据行
-                    for idx, row in result.iterrows():
-                        row_data = []
-                        for col in columns:
-                            value = row[col]
-                            # 处理NaN值
-                            if pd.isna(value):
-                                value = ""
-                            else:
-                                value = str(value)
-                            row_data.append(value)
-                        text_output += "| " + " | ".join(row_data) + " |\n"
-                    
-            except Exception as e2:
-                logging.warning(f"Manual markdown generation failed: {e2}, using simple format")
-                # 如果都失败，使用简单的格式
-                text_output = str(result)
+            logging.warning(f"Markdown generation failed: {e}, using simple format")
+            text_output = str(result)
     
-    yield tool_instance.create_text_message(text_output)
+    if (json_data is not None or not want_json) and _utf8_len(text_output) > budget:
+        # JSON未超出预算但Markdown表格超出，同样分块发送
+        yield from _emit_dataframe_chunks(
+            result, tool_instance, include_header=True, records=json_data, record_sizes=record_sizes,
+            output_mode=output_mode, json_layout=json_layout
+        )
+        return
+    
+    if want_text:
+        yield tool_instance.create_text_message(text_output)
+    if not want_json:
+        return
     
     # 处理JSON序列化，保持原始数据完整性
     try:
-        # 重置索引以避免浮点数索引问题
-        df_reset = result.reset_index(drop=True)
-        
-        # 确保所有列的数据类型都是JSON可序列化的，但保持原始数据
-        df_clean = df_reset.copy()
-        for col in df_clean.columns:
-            if df_clean[col].dtype == 'object':
-                # 对于对象类型，转换为字符串并处理特殊值
-                df_clean[col] = df_clean[col].astype(str)
-                # 替换常见的非JSON值
-                df_clean[col] = df_clean[col].replace(['nan', 'NaT', 'None', 'null'], '')
-            elif np.issubdtype(df_clean[col].dtype, np.integer):
-                # 对于整数类型，确保是Python整数
-                df_clean[col] = df_clean[col].astype('int64')
-            elif np.issubdtype(df_clean[col].dtype, np.floating):
-                # 对于浮点数类型，处理NaN值
-                df_clean[col] = df_clean[col].replace([np.inf, -np.inf], np.nan)
-                # 将NaN替换为空字符串
-                df_clean[col] = df_clean[col].fillna('')
-        
-        # 先将DataFrame转换为字典，然后手动处理NaN值
-        json_data = df_clean.to_dict(orient="records")
-        json_data = clean_nan_values(json_data)
-        
-        # 构建输出数据
-        output_data = {"data": json_data}
-        
-        # 确保最终的JSON数据是有效的
-        import json
-        try:
-            # 测试JSON序列化
-            json_str = json.dumps(output_data, ensure_ascii=False)
-            # 直接发送（大小已经在函数开头检查过了）
-            yield tool_instance.create_json_message(output_data)
-        except (TypeError, ValueError) as json_error:
-            logging.warning(f"JSON serialization failed: {json_error}")
-            # 如果JSON序列化失败，使用更安全的方式
-            safe_data = []
-            for record in json_data:
-                safe_record = {}
-                for key, value in record.items():
-                    try:
-                        # 测试每个值是否可以JSON序列化
-                        json.dumps(value)
-                        safe_record[key] = value
-                    except (TypeError, ValueError):
-                        # 如果不能序列化，转换为字符串
-                        safe_record[key] = str(value) if value is not None else ""
-                safe_data.append(safe_record)
-            
-            safe_output = {"data": safe_data}
-            yield tool_instance.create_json_message(safe_output)
+        if json_data is None:
+            raise ValueError("DataFrame could not be encoded to JSON records")
+        yield tool_instance.create_json_message(_build_json_payload(result, json_data, json_layout))
     except Exception as e:
         logging.warning(f"Failed to serialize DataFrame to JSON: {e}")
         # 如果还是失败，尝试更简单的方式
@@ -276,19 +471,142 @@ def process_dataframe_output(result: pd.DataFrame, tool_instance, max_rows_for_s
                 yield tool_instance.create_json_message(output_data)
 
 
-def process_other_output(result: Any, tool_instance) -> Generator[ToolInvokeMessage, None, None]:
+def build_dataframe_summary(df: pd.DataFrame, preview_rows: int = SUMMARY_PREVIEW_ROWS) -> dict[str, Any]:
+    """
+    生成表格概要：行列数、列名和类型、首尾若干行、数值列的基本统计
+    行数不超过首尾预览行数之和时，head包含全部行，tail为空
+    """
+    if len(df) <= preview_rows * 2:
+        head, tail = df, df.iloc[0:0]
+    else:
+        head, tail = df.head(preview_rows), df.tail(preview_rows)
+    stats: dict[str, Any] = {}
+    numeric = df.select_dtypes(include='number')
+    if not numeric.empty:
+        described = numeric.describe().T[['count', 'mean', 'std', 'min', 'max']]
+        stats = clean_nan_values({str(col): row.to_dict() for col, row in described.iterrows()})
+    return {
+        "rows": int(len(df)),
+        "columns": [str(col) for col in df.columns],
+        "dtypes": {str(col): str(dtype) for col, dtype in df.dtypes.items()},
+        "head": dataframe_to_records(head),
+        "tail": dataframe_to_records(tail),
+        "stats": stats,
+    }
+
+
+def process_dataframe_summary_output(df: pd.DataFrame, tool_instance) -> Generator[ToolInvokeMessage, None, None]:
+    """summary模式：输出表格概要而不是完整数据，JSON为 {"summary": build_dataframe_summary(df)}"""
+    summary = build_dataframe_summary(df)
+    text_output = f"## 数据概要\n\n共 {summary['rows']} 行 × {len(summary['columns'])} 列\n\n列：{', '.join(summary['columns'])}"
+    if not df.empty:
+        if summary["tail"]:
+            text_output += f"\n\n### 前{SUMMARY_PREVIEW_ROWS}行\n\n" + render_markdown_table(df.head(SUMMARY_PREVIEW_ROWS), index=True)
+            text_output += f"\n\n### 后{SUMMARY_PREVIEW_ROWS}行\n\n" + render_markdown_table(df.tail(SUMMARY_PREVIEW_ROWS), index=True)
+        else:
+            text_output += "\n\n### 数据\n\n" + render_markdown_table(df, index=True)
+    if summary["stats"]:
+        stats_df = pd.DataFrame.from_dict(summary["stats"], orient='index')
+        text_output += "\n\n### 数值列统计\n\n" + render_markdown_table(stats_df, index=True)
+    yield tool_instance.create_text_message(text_output)
+    yield tool_instance.create_json_message({"summary": summary})
+
+
+def _estimate_dataframe_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=False, deep=True).sum())
+
+
+def use_file_output(df: pd.DataFrame, output_mode: str) -> bool:
+    """是否以数据文件输出：output_mode为file，或表格估算字节数超过 get_output_file_threshold()"""
+    if output_mode == 'file':
+        return True
+    if output_mode == 'summary':
+        return False
+    threshold = get_output_file_threshold()
+    return threshold > 0 and _estimate_dataframe_bytes(df) > threshold
+
+
+def serialize_dataframe_file(df: pd.DataFrame, fmt: str | None = None) -> tuple[bytes, str]:
+    """
+    将DataFrame一次性序列化为压缩数据文件，返回(文件内容, 实际格式)
+    列名统一转换为字符串，不保存索引；parquet/feather不可用或编码失败时回退到gzip压缩的CSV
+    """
+    fmt = fmt or get_output_file_format()
+    frame = df.reset_index(drop=True)
+    frame.columns = [str(col) for col in frame.columns]
+    if fmt in ('parquet', 'feather'):
+        compression = OUTPUT_FILE_FORMATS[fmt][2]
+        try:
+            buffer = io.BytesIO()
+            if fmt == 'parquet':
+                frame.to_parquet(buffer, index=False, compression=compression)
+            else:
+                frame.to_feather(buffer, compression=compression)
+            return buffer.getvalue(), fmt
+        except ImportError:
+            logging.info(f"pyarrow is not installed, writing CSV instead of {fmt}")
+        except Exception as e:
+            logging.warning(f"Failed to write DataFrame as {fmt}: {e}, writing CSV instead")
+    buffer = io.BytesIO()
+    frame.to_csv(buffer, index=False, encoding='utf-8', compression={'method': 'gzip', 'mtime': 0})
+    return buffer.getvalue(), 'csv'
+
+
+def build_file_manifest(df: pd.DataFrame, content: bytes, fmt: str, filename: str) -> dict[str, Any]:
+    """数据文件清单：文件名、格式、压缩方式、字节数、SHA-256校验和、行数以及列名和类型"""
+    _, mime_type, compression = OUTPUT_FILE_FORMATS[fmt]
+    return {
+        "filename": filename,
+        "format": fmt,
+        "mime_type": mime_type,
+        "compression": compression,
+        "bytes": len(content),
+        "sha256": hashlib.sha256(content).hexdigest(),
+        "rows": int(len(df)),
+        "columns": [{"name": str(col), "dtype": str(dtype)} for col, dtype in df.dtypes.items()],
+    }
+
+
+def process_dataframe_file_output(
+    df: pd.DataFrame, tool_instance, output_mode: str = DEFAULT_OUTPUT_MODE
+) -> Generator[ToolInvokeMessage, None, None]:
+    """
+    文件模式：把DataFrame序列化为一个压缩数据文件并以blob消息输出，代替逐块的TEXT/JSON消息
+    另输出JSON清单 {"file": build_file_manifest(...)}；output_mode为text时不输出清单，为json时不输出TEXT说明
+    """
+    content, fmt = serialize_dataframe_file(df)
+    extension, mime_type, _ = OUTPUT_FILE_FORMATS[fmt]
+    filename = f"{OUTPUT_FILE_PREFIX}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}"
+    manifest = build_file_manifest(df, content, fmt, filename)
+    logging.info(f"DataFrame with {len(df)} rows written as {fmt} file of {len(content)} bytes")
+    
+    yield tool_instance.create_blob_message(content, meta={"mime_type": mime_type, "filename": filename})
+    if output_mode != 'json':
+        yield tool_instance.create_text_message(
+            f"## 数据文件\n\n已输出为 {filename}（{manifest['rows']} 行 × {len(manifest['columns'])} 列，"
+            f"{manifest['bytes']} 字节，{fmt} 格式）\n\nSHA-256: {manifest['sha256']}"
+        )
+    if output_mode != 'text':
+        yield tool_instance.create_json_message({"file": manifest})
+
+
+def process_other_output(result: Any, tool_instance, output_mode: str = DEFAULT_OUTPUT_MODE) -> Generator[ToolInvokeMessage, None, None]:
     """
     处理非DataFrame输出，生成TEXT和JSON消息
     
     Args:
         result: 非DataFrame结果
         tool_instance: 工具实例，用于调用create_text_message和create_json_message
+        output_mode: json/text 只输出其一，both 和 summary 同时输出
         
     Yields:
         ToolInvokeMessage: TEXT和JSON消息
     """
-    text_output = str(result)
-    yield tool_instance.create_text_message(text_output)
+    if output_mode != 'json':
+        text_output = str(result)
+        yield tool_instance.create_text_message(text_output)
+    if output_mode == 'text':
+        return
     
     # 清理结果中的NaN值和其他不可序列化的值
     try:
@@ -304,18 +622,21 @@ def process_other_output(result: Any, tool_instance) -> Generator[ToolInvokeMess
             yield tool_instance.create_json_message({"data": "数据序列化失败"})
 
 
-def handle_empty_result(tool_instance) -> Generator[ToolInvokeMessage, None, None]:
+def handle_empty_result(tool_instance, output_mode: str = DEFAULT_OUTPUT_MODE) -> Generator[ToolInvokeMessage, None, None]:
     """
     处理空结果，生成TEXT和JSON消息
     
     Args:
         tool_instance: 工具实例，用于调用create_text_message和create_json_message
+        output_mode: json/text 只输出其一
         
     Yields:
         ToolInvokeMessage: TEXT和JSON消息
     """
-    yield tool_instance.create_text_message("暂无数据")
-    yield tool_instance.create_json_message({"data": []})
+    if output_mode != 'json':
+        yield tool_instance.create_text_message("暂无数据")
+    if output_mode != 'text':
+        yield tool_instance.create_json_message({"data": []})
 
 
 def validate_required_params(tool_parameters: dict[str, Any], required_params: list[str], tool_instance) -> Generator[ToolInvokeMessage, None, None]:
@@ -456,6 +777,31 @@ def validate_stock_symbol(symbol: str, tool_instance) -> Generator[ToolInvokeMes
     yield True
 
 
+# 查询参数错误的修改建议
+QUERY_ERROR_HINTS = [
+    "检查 columns/filter/sort_by 中的列名是否与接口返回的列名一致",
+    "过滤条件格式：列名 比较符 值，如 涨跌幅 > 5 或 代码 in [000001, 600000]，多个条件用 ; 分隔",
+    "limit 必须是非负整数",
+]
+
+
+def handle_query_error(error: QueryError, tool_instance) -> Generator[ToolInvokeMessage, None, None]:
+    """
+    查询参数（columns/filter/sort_by/limit）无效时的统一输出
+    无论在解析参数时还是在结果上执行时发现，都按参数错误报告，不作为网络或接口错误，也不提示重试
+    """
+    error_msg = str(error)
+    hints = "\n".join(f"{i}. {hint}" for i, hint in enumerate(QUERY_ERROR_HINTS, 1))
+    yield tool_instance.create_text_message(f"查询参数错误：\n\n{error_msg}\n\n建议：\n{hints}")
+    yield tool_instance.create_json_message({
+        "error": "invalid_query",
+        "message": "查询参数无效",
+        "details": error_msg,
+        "fields": ["columns", "filter", "sort_by", "limit"],
+        "hints": QUERY_ERROR_HINTS,
+    })
+
+
 def handle_akshare_error(error: Exception, tool_instance, context: str = "", timeout_value: str = None) -> Generator[ToolInvokeMessage, None, None]:
     """
     统一处理AKShare接口错误
@@ -684,6 +1030,31 @@ def validate_adjust(adjust: str, tool_instance) -> Generator[ToolInvokeMessage,
     return True
 
 
+def parse_bool_param(value: Any, default: bool) -> bool:
+    """
+    解析布尔类型的工具参数，兼容LLM传入的字符串形式
+    
+    Args:
+        value: 参数值（bool、数字或 "true"/"false" 等字符串）
+        default: 未传入或无法识别时的默认值
+        
+    Returns:
+        bool: 解析后的布尔值
+    """
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in ("true", "1", "yes", "y", "是"):
+        return True
+    if text in ("false", "0", "no", "n", "否"):
+        return False
+    return default
+
+
 def process_symbol_format(symbol: str, interface: str) -> str:
     """
     处理股票代码格式，根据接口要求进行转换
@@ -730,73 +1101,245 @@ def process_symbol_format(symbol: str, interface: str) -> str:
     return symbol
 
 
-def process_large_dataframe_output(df: pd.DataFrame, tool_instance, chunk_size=50) -> Generator[ToolInvokeMessage, None, None]:
+def process_large_dataframe_output(
+    df: pd.DataFrame,
+    tool_instance,
+    chunk_size=None,
+    output_mode: str = DEFAULT_OUTPUT_MODE,
+    json_layout: str = DEFAULT_JSON_LAYOUT,
+) -> Generator[ToolInvokeMessage, None, None]:
     """
     处理大数据量DataFrame输出，分块发送以避免缓冲区溢出
     
     关键：在打包模式下，所有输出通过stdio传输，bufio.Scanner有64KB限制
-    使用保守的小块大小（50行）确保JSON消息不超过限制，避免动态检测的性能问题
+    按字节预算（见 get_output_chunk_bytes）精确累计每行的JSON和TEXT字节数，每块装入尽可能多的行；
+    单行超出预算时截断其中较长的文本字段
     
     Args:
         df: 要处理的DataFrame
         tool_instance: 工具实例
-        chunk_size: 每块的行数，默认50行（保守值，确保JSON < 60KB）
+        chunk_size: 每块的最大行数，默认不限制，只按字节预算分块
+        output_mode: both/json/text/summary/file（见 parse_output_mode）
+        json_layout: records/split/columns；split布局只有第一块带columns，后续块只包含数据行
         
     Yields:
         ToolInvokeMessage: 分块的数据消息，每块独立发送（不包含进度提示）
     """
+    if output_mode == 'summary':
+        yield from process_dataframe_summary_output(df, tool_instance)
+        return
     if df.empty:
-        yield tool_instance.create_text_message("暂无数据")
-        yield tool_instance.create_json_message({"data": []})
+        yield from handle_empty_result(tool_instance, output_mode)
         return
-    
-    total_rows = len(df)
-    if total_rows <= chunk_size:
-        # 数据量不大，直接处理（使用无限大的max_rows_for_single_output以避免递归）
-        yield from process_dataframe_output(df, tool_instance, max_rows_for_single_output=999999)
+    if use_file_output(df, output_mode):
+        yield from process_dataframe_file_output(df, tool_instance, output_mode)
         return
     
-    # 数据量大，分块处理并逐块发送（避免一次性输出过大）
     # 注意：不输出分块处理的提示信息，每块只包含数据
-    for i in range(0, total_rows, chunk_size):
-        chunk = df.iloc[i:i+chunk_size]
-        
-        # 处理当前块的JSON数据
-        chunk_reset = chunk.reset_index(drop=True)
-        chunk_clean = chunk_reset.copy()
-        for col in chunk_clean.columns:
-            if chunk_clean[col].dtype == 'object':
-                chunk_clean[col] = chunk_clean[col].astype(str)
-                chunk_clean[col] = chunk_clean[col].replace(['nan', 'NaT', 'None', 'null'], '')
-            elif np.issubdtype(chunk_clean[col].dtype, np.integer):
-                chunk_clean[col] = chunk_clean[col].astype('int64')
-            elif np.issubdtype(chunk_clean[col].dtype, np.floating):
-                chunk_clean[col] = chunk_clean[col].replace([np.inf, -np.inf], np.nan)
-                chunk_clean[col] = chunk_clean[col].fillna('')
-        
-        chunk_json_data = chunk_clean.to_dict(orient="records")
-        chunk_json_data = clean_nan_values(chunk_json_data)
-        
-        # 处理TEXT格式
-        try:
-            chunk_clean_text = chunk.copy()
-            for col in chunk_clean_text.columns:
-                chunk_clean_text[col] = chunk_clean_text[col].astype(str)
-            chunk_text = chunk_clean_text.to_markdown(index=True, tablefmt='pipe')
-        except Exception:
-            chunk_text = str(chunk)
+    yield from _emit_dataframe_chunks(
+        df, tool_instance, include_header=True, max_rows=chunk_size, output_mode=output_mode, json_layout=json_layout
+    )
+
+
+def process_dataframe_stream_output(
+    pages,
+    tool_instance,
+    chunk_size=None,
+    output_mode: str = DEFAULT_OUTPUT_MODE,
+    json_layout: str = DEFAULT_JSON_LAYOUT,
+) -> Generator[ToolInvokeMessage, None, None]:
+    """
+    逐页转发流式获取的DataFrame结果（配合safe_ak_stream使用）
+    
+    每收到一页数据即按字节预算切块发送，不需要等待完整结果，也不在内存中拼接全部数据。
+    第一块包含表头，后续块只包含数据行，与process_large_dataframe_output的输出格式一致。
+    
+    Args:
+        pages: DataFrame分页的可迭代对象（非DataFrame结果按普通结果输出）
+        tool_instance: 工具实例
+        chunk_size: 每块的最大行数，默认不限制，只按字节预算分块
+        output_mode: both/json/text/summary/file；summary 和 file 需要完整数据，会先拼接全部分页。
+            设置了 AKSHARE_OUTPUT_FILE_THRESHOLD 时，先暂存不超过阈值的分页，超过阈值即改为文件输出
+        json_layout: records/split/columns；split布局只有整个结果的第一块带columns
         
-        # 发送消息
-        if i == 0:
-            # 第一个块：包含完整的表格（带表头）
-            yield tool_instance.create_text_message(chunk_text)
+    Yields:
+        ToolInvokeMessage: 分块的数据消息
+    """
+    summary = output_mode == 'summary'
+    to_file = output_mode == 'file'
+    threshold = 0 if summary or to_file else get_output_file_threshold()
+    held_pages = []
+    held_bytes = 0
+    first_chunk = True
+    for page in pages:
+        if page is None:
+            yield from handle_empty_result(tool_instance, output_mode)
+            return
+        if not isinstance(page, pd.DataFrame):
+            yield from process_other_output(page, tool_instance, output_mode)
+            return
+        if page.empty:
+            continue
+        if summary or to_file:
+            held_pages.append(page)
+            continue
+        if threshold:
+            held_pages.append(page)
+            held_bytes += _estimate_dataframe_bytes(page)
+            to_file = held_bytes > threshold
+            continue
+        yield from _emit_dataframe_chunks(
+            page, tool_instance, include_header=first_chunk, max_rows=chunk_size,
+            output_mode=output_mode, json_layout=json_layout
+        )
+        first_chunk = False
+    
+    if held_pages:
+        df = pd.concat(held_pages)
+        if summary:
+            yield from process_dataframe_summary_output(df, tool_instance)
+        elif to_file:
+            yield from process_dataframe_file_output(df, tool_instance, output_mode)
         else:
-            # 后续块：只包含数据行（去掉表头行）
-            lines = chunk_text.split('\n')
-            if len(lines) > 2:
-                data_lines = '\n'.join(lines[2:])
-                if data_lines.strip():
-                    yield tool_instance.create_text_message(data_lines)
+            yield from _emit_dataframe_chunks(
+                df, tool_instance, include_header=True, max_rows=chunk_size, output_mode=output_mode, json_layout=json_layout
+            )
+    elif first_chunk:
+        yield from handle_empty_result(tool_instance, output_mode)
+
+
+def _utf8_len(text: str) -> int:
+    return len(text.encode('utf-8'))
+
+
+def _truncate_utf8(text: str, max_bytes: int) -> str:
+    """按UTF-8字节数截断文本，不截断多字节字符"""
+    return text.encode('utf-8')[:max(0, max_bytes)].decode('utf-8', errors='ignore')
+
+
+def _record_json_sizes(records: list[dict[str, Any]]) -> list[int]:
+    """每条记录序列化后的UTF-8字节数"""
+    return [_utf8_len(json.dumps(record, ensure_ascii=False)) for record in records]
+
+
+def _fit_record(record: dict[str, Any], max_bytes: int) -> dict[str, Any]:
+    """
+    将单条超出预算的记录缩减到 max_bytes 以内
+    依次截断最长的文本字段；仍然超出时只保留排在前面、能放下的字段
+    """
+    size = _utf8_len(json.dumps(record, ensure_ascii=False))
+    if size <= max_bytes:
+        return record
+    fitted = dict(record)
+    text_keys = [key for key, value in fitted.items() if isinstance(value, str)]
+    if text_keys:
+        # 文本字段平分剩余空间：短字段保持原样，长字段截断到相同长度
+        overhead = _utf8_len(json.dumps({**fitted, **{key: '' for key in text_keys}}, ensure_ascii=False))
+        remaining = max_bytes - overhead - _utf8_len(TRUNCATION_MARK) * len(text_keys)
+        ordered = sorted(text_keys, key=lambda key: _utf8_len(fitted[key]))
+        for i, key in enumerate(ordered):
+            share = max(0, remaining // (len(ordered) - i))
+            value_bytes = _utf8_len(fitted[key])
+            if value_bytes > share:
+                fitted[key] = _truncate_utf8(fitted[key], share) + TRUNCATION_MARK
+            remaining -= min(value_bytes, share)
+        size = _utf8_len(json.dumps(fitted, ensure_ascii=False))
+    if size > max_bytes:
+        kept: dict[str, Any] = {}
+        used = len('{}')
+        for key, value in fitted.items():
+            item_bytes = _utf8_len(json.dumps({key: value}, ensure_ascii=False)) - len('{}') + _JSON_SEPARATOR_BYTES
+            if used + item_bytes > max_bytes:
+                break
+            kept[key] = value
+            used += item_bytes
+        fitted = kept
+    logging.warning(f"Output row of {_utf8_len(json.dumps(record, ensure_ascii=False))} bytes exceeds the message budget, truncated to {max_bytes} bytes")
+    return fitted
+
+
+def _fit_row(row: dict[str, Any] | list[Any], max_bytes: int) -> dict[str, Any] | list[Any]:
+    """_fit_record 的split/columns布局版本：值数组按位置对齐，放不下的值以空字符串占位"""
+    if isinstance(row, dict):
+        return _fit_record(row, max_bytes)
+    placeholder_bytes = len('"", ') * len(row)
+    fitted = _fit_record({str(i): value for i, value in enumerate(row)}, max_bytes - placeholder_bytes)
+    return [fitted.get(str(i), '') for i in range(len(row))]
+
+
+def _min_row_bytes(df: pd.DataFrame) -> int:
+    """split/columns布局下一行数据至少占用的字节数（每个值都是空字符串时）"""
+    return len('"", ') * df.shape[1]
+
+
+def _emit_dataframe_chunks(
+    df: pd.DataFrame,
+    tool_instance,
+    include_header: bool,
+    records: list[dict[str, Any]] | None = None,
+    record_sizes: list[int] | None = None,
+    max_rows: int | None = None,
+    output_mode: str = DEFAULT_OUTPUT_MODE,
+    json_layout: str = DEFAULT_JSON_LAYOUT,
+) -> Generator[ToolInvokeMessage, None, None]:
+    """
+    按字节预算把DataFrame拆成若干块，每块发送一条TEXT和一条JSON消息
+    每块在TEXT和JSON都不超出预算的前提下装入尽可能多的行；include_header为False时第一块TEXT也不含表头，
+    split布局的第一块JSON也不带columns
+    records/record_sizes为按json_layout编码的JSON行及其字节数，未给出时在此编码
+    output_mode为json或text时只生成并计算对应的消息
+    列很多、split/columns布局的列名本身就放不下一行数据时改用records布局，保证每条消息不超出预算
+    """
+    budget = get_output_chunk_bytes()
+    want_text = output_mode != 'json'
+    want_json = output_mode != 'text'
+    total_rows = len(df)
+    if want_json and json_layout != 'records' and _json_envelope_bytes(df, json_layout) + _min_row_bytes(df) > budget:
+        logging.warning(f"Column names of a {df.shape[1]}-column table exceed the message budget in {json_layout} layout, using records")
+        json_layout = 'records'
+        records = record_sizes = None
+    if want_json:
+        if records is None:
+            records = _encode_json_rows(df, json_layout)
+        if record_sizes is None:
+            record_sizes = _record_json_sizes(records)
+    else:
+        record_sizes = [0] * total_rows
+    if want_text:
+        lines = markdown_table_lines(df, index=True)
+        header = "\n".join(lines[:2])
+        line_sizes = [_utf8_len(line) + 1 for line in lines[2:]]
+    else:
+        lines, header = [], ""
+        line_sizes = [0] * total_rows
+    
+    start = 0
+    with_header = include_header
+    while start < total_rows:
+        envelope_bytes = _json_envelope_bytes(df, json_layout, include_columns=with_header)
+        json_bytes = envelope_bytes
+        text_bytes = _utf8_len(header) if with_header else 0
+        end = start
+        while end < total_rows and (max_rows is None or end - start < max_rows):
+            row_json = record_sizes[end] + (_JSON_SEPARATOR_BYTES if end > start else 0)
+            if end > start and (json_bytes + row_json > budget or text_bytes + line_sizes[end] > budget):
+                break
+            json_bytes += row_json
+            text_bytes += line_sizes[end]
+            end += 1
+        
+        if want_text:
+            text = "\n".join(([header] if with_header else []) + lines[2 + start:2 + end])
+            if _utf8_len(text) > budget:
+                text = _truncate_utf8(text, budget - _utf8_len(TRUNCATION_MARK)) + TRUNCATION_MARK
+            if text.strip():
+                yield tool_instance.create_text_message(text)
         
-        # 发送JSON数据
-        yield tool_instance.create_json_message({"data": chunk_json_data})
+        if want_json:
+            chunk_records = records[start:end]
+            if json_bytes > budget:
+                # 单行超出预算
+                chunk_records = [_fit_row(chunk_records[0], budget - envelope_bytes)]
+            yield tool_instance.create_json_message(_build_json_payload(df, chunk_records, json_layout, include_columns=with_header))
+        start = end
+        with_header = False
@@ -0,0 +1,351 @@
+"""
+技术指标NumPy计算内核
+- 收盘价、最高价、最低价、成交量只转换一次为float64数组，所有指标共享价格差分、前缀和、滚动极值等中间结果
+- compute_indicators 一次计算MA/RSI/MACD/KDJ/BOLL/VMA，全部写入预分配的二维数组
+- 计算口径与pandas内置实现一致：rolling(window, min_periods)、ewm(span/com, adjust=True)、样本标准差(ddof=1)，
+  缺失值的处理方式也相同，可直接替换各工具中的pandas计算分支
+- 输入也可以是 时间×股票 的二维面板，沿第0维（时间）逐列计算，多只股票一次向量化完成
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 股票分析领域的标准参数
+DEFAULT_MA_PERIODS = (5, 10, 20, 30, 60)
+DEFAULT_RSI_PERIODS = (6, 12, 24)
+DEFAULT_MACD_PARAMS = (12, 26, 9)
+DEFAULT_KDJ_PARAMS = (9, 3, 3)
+DEFAULT_BOLL_PARAMS = (20, 2.0)
+DEFAULT_VMA_PERIODS = (5, 10, 20)
+
+# 指数加权递推分块计算时缩放因子的上限（以e为底的指数），保证不溢出
+_EWM_MAX_EXPONENT = 600.0
+
+
+def as_float_array(values: Any) -> np.ndarray:
+    """转换为float64数组（一维序列，或 时间×股票 的二维面板），已是float64的数组或Series不复制"""
+    array = np.asarray(values, dtype='float64')
+    return array if array.ndim == 2 else array.reshape(-1)
+
+
+def _prefix_sum(values: np.ndarray) -> np.ndarray:
+    """沿时间轴的前缀和，开头补一行0"""
+    total = np.cumsum(values, axis=0)
+    return np.concatenate((np.zeros((1,) + total.shape[1:], dtype=total.dtype), total))
+
+
+class RollingWindow:
+    """
+    一个序列在多个窗口长度下的滚动统计，前缀和与非缺失计数只计算一次
+    min_periods 为None时与pandas默认一致，等于窗口长度
+    """
+
+    def __init__(self, values: Any):
+        self.values = as_float_array(values)
+        missing = np.isnan(self.values)
+        self._has_missing = bool(missing.any())
+        filled = np.where(missing, 0.0, self.values) if self._has_missing else self.values
+        # 以首个有效值为基准累加（面板逐列取基准），减小长序列前缀和的舍入误差
+        self._offset: Any = 0.0
+        if len(self.values):
+            first = np.argmax(~missing, axis=0) if self._has_missing else 0
+            if self.values.ndim == 1:
+                self._offset = float(filled[first])
+            else:
+                self._offset = filled[first, np.arange(self.values.shape[1])]
+        shifted = filled - self._offset
+        if self._has_missing:
+            shifted[missing] = 0.0
+        self._sum = _prefix_sum(shifted)
+        self._count = _prefix_sum(~missing) if self._has_missing else None
+        zeros = filled == 0
+        # 含有0值的序列（如RSI的涨跌幅）记录非零计数，窗口内全为0时精确返回0
+        self._nonzero = _prefix_sum(~zeros) if zeros.any() else None
+        self._windows: Dict[Tuple[str, int, Optional[int]], np.ndarray] = {}
+
+    def _window_diff(self, prefix: np.ndarray, window: int) -> np.ndarray:
+        # 以位置i结尾的窗口之和 = prefix[i+1] - prefix[i+1-window]，窗口超出序列开头时取到开头为止
+        result = prefix[1:].copy()
+        if window < len(result):
+            result[window:] -= prefix[1:len(prefix) - window]
+        return result
+
+    def count(self, window: int) -> np.ndarray:
+        key = ('count', window, None)
+        if key not in self._windows:
+            if self._count is None:
+                counts = np.minimum(np.arange(1, len(self.values) + 1), window)
+                if self.values.ndim == 2:
+                    # 没有缺失值时各列计数相同，广播为只读视图
+                    counts = np.broadcast_to(counts[:, None], self.values.shape)
+                self._windows[key] = counts
+            else:
+                self._windows[key] = self._window_diff(self._count, window)
+        return self._windows[key]
+
+    def _valid(self, window: int, min_periods: Optional[int], minimum: int = 1) -> np.ndarray:
+        required = window if min_periods is None else min_periods
+        return self.count(window) >= max(required, minimum)
+
+    def mean(self, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+        key = ('mean', window, min_periods)
+        if key not in self._windows:
+            count = self.count(window)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result = self._window_diff(self._sum, window) / count + self._offset
+            if self._nonzero is not None:
+                # 前缀和相减会留下极小的舍入残差
+                result[self._window_diff(self._nonzero, window) == 0] = 0.0
+            result[~self._valid(window, min_periods)] = np.nan
+            self._windows[key] = result
+        return self._windows[key]
+
+    def std(self, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+        """样本标准差(ddof=1)，按窗口均值的离差平方和计算，避免前缀平方和相减的精度损失"""
+        key = ('std', window, min_periods)
+        if key not in self._windows:
+            mean = self.mean(window, 1)
+            squares = np.zeros(self.values.shape)
+            # 窗口内第j个滞后值对所有窗口的贡献一次向量化累加，共window次
+            for lag in range(min(window, len(self.values))):
+                deviations = self.values[:len(self.values) - lag] - mean[lag:]
+                np.multiply(deviations, deviations, out=deviations)
+                if self._has_missing:
+                    deviations[np.isnan(deviations)] = 0.0
+                squares[lag:] += deviations
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result = np.sqrt(squares / (self.count(window) - 1))
+            result[~self._valid(window, min_periods, minimum=2)] = np.nan
+            self._windows[key] = result
+        return self._windows[key]
+
+    def _extreme(self, kind: str, window: int, min_periods: Optional[int]) -> np.ndarray:
+        key = (kind, window, min_periods)
+        if key not in self._windows:
+            # fmin/fmax忽略NaN，与pandas滚动极值跳过缺失值一致
+            reduce = np.fmin if kind == 'min' else np.fmax
+            result = self.values.copy()
+            for lag in range(1, min(window, len(self.values))):
+                reduce(result[lag:], self.values[:len(self.values) - lag], out=result[lag:])
+            result[~self._valid(window, min_periods)] = np.nan
+            self._windows[key] = result
+        return self._windows[key]
+
+    def min(self, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+        return self._extreme('min', window, min_periods)
+
+    def max(self, window: int, min_periods: Optional[int] = None) -> np.ndarray:
+        return self._extreme('max', window, min_periods)
+
+
+def _powers(base: float, start: int, stop: int) -> np.ndarray:
+    """base的start到stop-1次幂，用指数函数计算，比逐元素幂运算快"""
+    return np.exp(np.arange(start, stop, dtype='float64') * np.log(base))
+
+
+def _decayed_cumsum(values: np.ndarray, decay: float) -> np.ndarray:
+    """
+    计算 y[t] = values[t] + decay * y[t-1]
+    分块用缩放后的累加和向量化求解，块长保证缩放因子不溢出，块之间传递上一块的末值
+    """
+    n = len(values)
+    result = np.empty(values.shape, dtype='float64')
+    if n == 0:
+        return result
+    if decay <= 0.0:
+        result[:] = values
+        return result
+    block = n if decay >= 1.0 else max(1, min(n, int(_EWM_MAX_EXPONENT / -np.log(decay))))
+    powers = _powers(decay, 0, block)
+    carry = 0.0
+    for start in range(0, n, block):
+        chunk = values[start:start + block]
+        scale = powers[:len(chunk)].reshape((-1,) + (1,) * (values.ndim - 1))
+        # y[start+i] = decay^i * (carry*decay + sum_{j<=i} chunk[j] / decay^j)
+        result[start:start + len(chunk)] = scale * (carry * decay + np.cumsum(chunk / scale, axis=0))
+        carry = result[start + len(chunk) - 1]
+    return result
+
+
+def ewm_alpha(span: Optional[float] = None, com: Optional[float] = None) -> float:
+    """由span或com计算平滑系数，口径同pandas"""
+    if span is not None:
+        return 2.0 / (span + 1.0)
+    if com is not None:
+        return 1.0 / (1.0 + com)
+    raise ValueError("ewm requires span or com")
+
+
+def ewm_accumulators(values: Any, alpha: float) -> Tuple[float, float, int]:
+    """
+    序列末尾的指数加权累加量 (加权和, 权重和, 有效值个数)，加权平均 = 加权和 / 权重和
+    用于从历史数据初始化逐根K线递推的增量计算状态
+    """
+    values = as_float_array(values)
+    if len(values) == 0:
+        return 0.0, 0.0, 0
+    valid = ~np.isnan(values)
+    decay = 1.0 - alpha
+    weighted = _decayed_cumsum(np.where(valid, values, 0.0), decay)[-1]
+    weights = _decayed_cumsum(valid.astype('float64'), decay)[-1]
+    return float(weighted), float(weights), int(valid.sum())
+
+
+def ewm_mean(values: Any, span: Optional[float] = None, com: Optional[float] = None, min_periods: int = 0) -> np.ndarray:
+    """
+    指数加权平均，等价于 pandas.Series.ewm(span=..., com=..., adjust=True, min_periods=...).mean()
+    缺失值不参与加权但权重照常衰减（与pandas默认的ignore_na=False一致）
+    """
+    values = as_float_array(values)
+    alpha = ewm_alpha(span, com)
+    valid = ~np.isnan(values)
+    decay = 1.0 - alpha
+    first = int(valid.argmax()) if values.ndim == 1 and len(values) else 0
+    if values.ndim == 1 and valid[first:].all():
+        # 除开头的缺失值外没有缺失值（如KDJ的RSV）：从首个有效值起递推，权重和为等比数列求和
+        result = np.full(len(values), np.nan)
+        tail = values[first:]
+        if len(tail):
+            weights = (1.0 - _powers(decay, 1, len(tail) + 1)) / alpha if decay > 0 else np.ones(len(tail))
+            result[first:] = _decayed_cumsum(tail, decay) / weights
+            result[first:first + max(min_periods, 1) - 1] = np.nan
+        return result
+    weighted = _decayed_cumsum(np.where(valid, values, 0.0), decay)
+    weights = _decayed_cumsum(valid.astype('float64'), decay)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = weighted / weights
+    result[np.cumsum(valid, axis=0) < max(min_periods, 1)] = np.nan
+    return result
+
+
+def _rsi(gain: RollingWindow, loss: RollingWindow, window: int, min_periods: Optional[int], epsilon: float) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = gain.mean(window, min_periods) / (loss.mean(window, min_periods) + epsilon)
+        return 100 - (100 / (1 + rs))
+
+
+def kdj_rsv(close: Any, high: Any, low: Any, period: int, min_periods: Optional[int] = None, epsilon: float = 0.0) -> np.ndarray:
+    """KDJ的未成熟随机值RSV：收盘价在周期内最低价与最高价之间的位置（0-100）"""
+    lowest = RollingWindow(low).min(period, min_periods)
+    highest = RollingWindow(high).max(period, min_periods)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (as_float_array(close) - lowest) / (highest - lowest + epsilon) * 100
+
+
+def indicator_columns(
+    ma_periods: Optional[Sequence[int]] = DEFAULT_MA_PERIODS,
+    rsi_periods: Optional[Sequence[int]] = DEFAULT_RSI_PERIODS,
+    macd: Optional[Sequence[int]] = DEFAULT_MACD_PARAMS,
+    kdj: Optional[Sequence[int]] = DEFAULT_KDJ_PARAMS,
+    boll: Optional[Sequence[float]] = DEFAULT_BOLL_PARAMS,
+    vma_periods: Optional[Sequence[int]] = DEFAULT_VMA_PERIODS,
+) -> List[str]:
+    """compute_indicators 输出的列名，顺序与输出数组的列一致；参数为None或空表示不计算该组指标"""
+    columns = [f'MA{period}' for period in ma_periods or ()]
+    columns += [f'RSI{period}' for period in rsi_periods or ()]
+    if macd:
+        columns += ['MACD', 'MACD_SIGNAL', 'MACD_HIST']
+    if kdj:
+        columns += ['KDJ_K', 'KDJ_D', 'KDJ_J']
+    if boll:
+        columns += ['BOLL_MIDDLE', 'BOLL_UPPER', 'BOLL_LOWER']
+    columns += [f'VMA{period}' for period in vma_periods or ()]
+    return columns
+
+
+def compute_indicators(
+    close: Any,
+    high: Any = None,
+    low: Any = None,
+    volume: Any = None,
+    ma_periods: Optional[Sequence[int]] = DEFAULT_MA_PERIODS,
+    rsi_periods: Optional[Sequence[int]] = DEFAULT_RSI_PERIODS,
+    macd: Optional[Sequence[int]] = DEFAULT_MACD_PARAMS,
+    kdj: Optional[Sequence[int]] = DEFAULT_KDJ_PARAMS,
+    boll: Optional[Sequence[float]] = DEFAULT_BOLL_PARAMS,
+    vma_periods: Optional[Sequence[int]] = DEFAULT_VMA_PERIODS,
+    min_periods: Optional[int] = None,
+    epsilon: float = 0.0,
+    leading_padding: bool = False,
+) -> Tuple[np.ndarray, List[str]]:
+    """
+    一次计算全部技术指标，返回 (n×k 的float64数组, 列名列表)；输入为 n×m 的面板时返回 n×m×k 的数组
+
+    - macd 为 (快线, 慢线, 信号线) 的span；kdj 为 (RSV周期, 平滑周期, 平滑周期)，K/D按 com=平滑周期-1 平滑；
+      boll 为 (周期, 标准差倍数)
+    - min_periods 为None时滚动指标在数据不足一个窗口时为NaN（pandas默认），为1时从第一行开始输出
+    - epsilon 加在RSI和KDJ的分母上，用于避免除零（为0时与pandas一致，除零得到inf/NaN）
+    - 计算KDJ需要 high/low，计算VMA需要 volume
+    - leading_padding 为True表示开头的缺失值是对齐面板时补的空位而不是K线，RSI的涨跌幅在这些位置也视为缺失，
+      使上市较晚的股票与单独计算时结果一致
+    """
+    columns = indicator_columns(ma_periods, rsi_periods, macd, kdj, boll, vma_periods)
+    close_window = RollingWindow(close)
+    close_values = close_window.values
+    # 每个指标占连续的一块内存，逐个写入；一维输入时返回的n×k视图按列存放，构造DataFrame时也无需转置
+    output = np.empty((len(columns),) + close_values.shape, dtype='float64')
+    position = 0
+
+    def emit(values: np.ndarray) -> None:
+        nonlocal position
+        output[position] = values
+        position += 1
+
+    for period in ma_periods or ():
+        emit(close_window.mean(period, min_periods))
+
+    if rsi_periods:
+        # 价格差分与涨跌幅前缀和由各RSI周期共享；首行差分为NaN，与pandas的where一样按0计入
+        delta = np.diff(close_values, axis=0, prepend=np.nan)
+        gains = np.where(delta > 0, delta, 0.0)
+        losses = -np.where(delta < 0, delta, 0.0)
+        if leading_padding and len(close_values):
+            padding = np.arange(len(close_values)).reshape((-1,) + (1,) * (close_values.ndim - 1)) < np.argmax(~np.isnan(close_values), axis=0)
+            gains[padding] = np.nan
+            losses[padding] = np.nan
+        gain = RollingWindow(gains)
+        loss = RollingWindow(losses)
+        for period in rsi_periods:
+            emit(_rsi(gain, loss, period, min_periods, epsilon))
+
+    if macd:
+        fast, slow, signal = macd
+        ewm_min_periods = min_periods or 0
+        line = ewm_mean(close_values, span=fast, min_periods=ewm_min_periods) - ewm_mean(close_values, span=slow, min_periods=ewm_min_periods)
+        signal_line = ewm_mean(line, span=signal, min_periods=ewm_min_periods)
+        emit(line)
+        emit(signal_line)
+        emit(line - signal_line)
+
+    if kdj:
+        k_period, d_period = kdj[0], kdj[1]
+        rsv = kdj_rsv(close_values, high, low, k_period, min_periods, epsilon)
+        k = ewm_mean(rsv, com=d_period - 1, min_periods=min_periods or 0)
+        d = ewm_mean(k, com=d_period - 1, min_periods=min_periods or 0)
+        emit(k)
+        emit(d)
+        emit(3 * k - 2 * d)
+
+    if boll:
+        period, width = int(boll[0]), boll[1]
+        # 中轨与同周期的MA共用同一个滚动均值
+        middle = close_window.mean(period, min_periods)
+        band = close_window.std(period, min_periods) * width
+        emit(middle)
+        emit(middle + band)
+        emit(middle - band)
+
+    if vma_periods:
+        volume_window = RollingWindow(volume)
+        for period in vma_periods:
+            emit(volume_window.mean(period, min_periods))
+
+    return np.moveaxis(output, 0, -1), columns
+
+
+def join_indicator_columns(df: pd.DataFrame, values: np.ndarray, columns: List[str]) -> pd.DataFrame:
+    """把指标数组一次性拼接为DataFrame的新列（已有的同名列先移除），避免逐列赋值反复调整内部数据块"""
+    existing = [column for column in columns if column in df.columns]
+    base = df.drop(columns=existing) if existing else df
+    return pd.concat([base, pd.DataFrame(values, columns=columns, index=df.index)], axis=1)
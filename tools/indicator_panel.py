@@ -0,0 +1,190 @@
+"""
+多股票横截面技术指标计算
+- 并发获取各股票K线（线程数有上限，上游调用仍受按数据源的限流与并发控制），
+  每只股票只保留指标计算所需的float64数组和时间，不保留原始DataFrame
+- 各股票按自己的K线序号右对齐为 时间×股票 的二维面板：最新K线在最后一行，K线较少的股票在开头补NaN，
+  停牌不会在序列中间留下空位，因此每只股票的指标与单独计算完全一致
+- 用NumPy指标内核沿时间轴一次向量化计算全部股票；股票很多时按内存预算分块，每块只分配一次面板数组
+"""
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .indicator_kernels import compute_indicators, indicator_columns
+
+# 指标计算的输入列（顺序与 compute_indicators 的参数一致）
+INPUT_COLUMNS = ['收盘', '最高', '最低', '成交量']
+
+DEFAULT_PANEL_WORKERS = 8
+DEFAULT_PANEL_MEMORY_MB = 32
+PANEL_OUTPUTS = ('latest', 'long')
+DEFAULT_PANEL_OUTPUT = 'latest'
+
+_SYMBOL_SEPARATOR = re.compile(r'[\s,，;；、]+')
+
+# 计算一块面板时，除输出外同时存在的中间数组（前缀和、滚动窗口缓存、指数加权累加量等）个数的估计
+_WORKING_ARRAYS = 48
+
+
+def get_panel_workers() -> int:
+    """并发获取K线的最大线程数，AKSHARE_PANEL_WORKERS 可覆盖"""
+    try:
+        return max(1, int(os.environ.get('AKSHARE_PANEL_WORKERS', DEFAULT_PANEL_WORKERS)))
+    except ValueError:
+        return DEFAULT_PANEL_WORKERS
+
+
+def get_panel_memory_bytes() -> int:
+    """每块面板计算的内存预算，AKSHARE_PANEL_MEMORY_MB 可覆盖（单位MB）"""
+    try:
+        megabytes = float(os.environ.get('AKSHARE_PANEL_MEMORY_MB', DEFAULT_PANEL_MEMORY_MB))
+    except ValueError:
+        megabytes = DEFAULT_PANEL_MEMORY_MB
+    return max(1, int(megabytes * 1024 * 1024))
+
+
+def parse_symbols(value: Any) -> List[str]:
+    """解析股票代码列表，支持逗号（中英文）、分号、空白分隔，去重并保持顺序"""
+    if value is None:
+        return []
+    items = value if isinstance(value, (list, tuple)) else _SYMBOL_SEPARATOR.split(str(value))
+    return list(dict.fromkeys(str(item).strip() for item in items if str(item).strip()))
+
+
+def parse_panel_output(value: Any, default: str = DEFAULT_PANEL_OUTPUT) -> str:
+    """解析多股票输出格式：latest 每只股票只输出最新一根K线，long 输出全部K线（长表）"""
+    text = str(value).strip().lower() if value is not None else ''
+    return text if text in PANEL_OUTPUTS else default
+
+
+class SymbolBars(NamedTuple):
+    """一只股票的紧凑K线数据"""
+    times: np.ndarray  # 每根K线的时间（datetime64）；只输出最新K线时只保留最后一个
+    inputs: np.ndarray  # n×4，收盘/最高/最低/成交量
+    extra: np.ndarray  # 输出时附带的其他行情列；只输出最新K线时只保留最后一行
+
+
+def compact_bars(df: pd.DataFrame, time_column: str, extra_columns: Sequence[str], latest_only: bool) -> SymbolBars:
+    """把预处理后的K线DataFrame压缩为指标计算所需的数组"""
+    times = df[time_column].to_numpy() if time_column in df.columns else np.arange(len(df))
+    inputs = df[INPUT_COLUMNS].to_numpy(dtype='float64')
+    extra = df.reindex(columns=list(extra_columns)).to_numpy(dtype='float64')
+    if latest_only:
+        times, extra = times[-1:].copy(), extra[-1:].copy()
+    return SymbolBars(times, inputs, extra)
+
+
+def fetch_panel_bars(
+    symbols: Sequence[str],
+    fetch: Callable[[str], Optional[SymbolBars]],
+    max_workers: Optional[int] = None,
+) -> Tuple[Dict[str, SymbolBars], Dict[str, str]]:
+    """
+    并发获取多只股票的K线，返回 ({股票代码: K线}, {失败的股票代码: 原因})，结果按输入顺序排列
+    fetch 返回None或空数据表示该股票没有数据
+    """
+    workers = min(max_workers or get_panel_workers(), max(1, len(symbols)))
+    bars: Dict[str, SymbolBars] = {}
+    failures: Dict[str, str] = {}
+
+    def fetch_one(symbol: str) -> Tuple[str, Optional[SymbolBars], Optional[str]]:
+        try:
+            result = fetch(symbol)
+        except Exception as e:
+            return symbol, None, str(e)
+        if result is None or len(result.inputs) == 0:
+            return symbol, None, "no data"
+        return symbol, result, None
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="akshare-panel") as executor:
+        for symbol, result, error in executor.map(fetch_one, symbols):
+            if error is None:
+                bars[symbol] = result
+            else:
+                failures[symbol] = error
+    if failures:
+        logging.warning(f"Panel fetch failed for {len(failures)}/{len(symbols)} symbols: {', '.join(list(failures)[:10])}")
+    return bars, failures
+
+
+def _blocks(lengths: List[int], columns: int, budget: int) -> List[Tuple[int, int]]:
+    """按内存预算把股票划分为连续的块，块内面板行数取块内最长的K线数"""
+    blocks = []
+    start = 0
+    while start < len(lengths):
+        stop = start + 1
+        rows = lengths[start]
+        while stop < len(lengths):
+            rows_next = max(rows, lengths[stop])
+            if rows_next * (stop + 1 - start) * (columns + _WORKING_ARRAYS) * 8 > budget:
+                break
+            rows = rows_next
+            stop += 1
+        blocks.append((start, stop))
+        start = stop
+    return blocks
+
+
+def compute_panel_indicators(
+    bars: Dict[str, SymbolBars],
+    time_column: str,
+    extra_columns: Sequence[str],
+    latest_only: bool = True,
+    memory_budget: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    计算多只股票的趋势动量震荡指标（参数同单只股票的NumPy内核默认参数）
+    latest_only 为True时每只股票输出最新一根K线（横截面），否则输出全部K线（按股票、时间排列的长表）
+    输出列：代码、时间列、extra_columns、指标列
+    """
+    columns = indicator_columns()
+    # 没有K线的股票没有最新一根K线，也不产生长表行
+    symbols = [symbol for symbol in bars if len(bars[symbol].inputs)]
+    # 按K线数排序后分块，块内补齐的空位最少
+    symbols.sort(key=lambda symbol: len(bars[symbol].inputs))
+    lengths = [len(bars[symbol].inputs) for symbol in symbols]
+    budget = memory_budget or get_panel_memory_bytes()
+
+    symbol_parts, time_parts, extra_parts, value_parts = [], [], [], []
+    for start, stop in _blocks(lengths, len(columns), budget):
+        block = symbols[start:stop]
+        rows = max(lengths[start:stop])
+        panel = np.full((len(INPUT_COLUMNS), rows, len(block)), np.nan)
+        for j, symbol in enumerate(block):
+            inputs = bars[symbol].inputs
+            panel[:, rows - len(inputs):, j] = inputs.T
+        values, _ = compute_indicators(*panel, leading_padding=True)
+        logging.debug(f"Panel block of {len(block)} symbols x {rows} bars computed")
+
+        if latest_only:
+            value_parts.append(values[-1].copy())
+            for symbol in block:
+                time_parts.append(bars[symbol].times[-1:])
+                extra_parts.append(bars[symbol].extra[-1:])
+            symbol_parts.extend(block)
+            continue
+        for j, symbol in enumerate(block):
+            count = lengths[start + j]
+            value_parts.append(values[rows - count:, j])
+            time_parts.append(bars[symbol].times)
+            extra_parts.append(bars[symbol].extra)
+            symbol_parts.append(np.full(count, symbol, dtype=object))
+
+    if not symbols:
+        return pd.DataFrame(columns=['代码', time_column] + list(extra_columns) + columns)
+    frame = pd.DataFrame(np.concatenate(value_parts), columns=columns)
+    extra = pd.DataFrame(np.concatenate(extra_parts), columns=list(extra_columns))
+    codes = symbol_parts if latest_only else np.concatenate(symbol_parts)
+    head = pd.DataFrame({'代码': codes, time_column: np.concatenate(time_parts)})
+    result = pd.concat([head, extra, frame], axis=1)
+
+    # 恢复输入顺序（长表内同一股票的K线按时间排列）
+    order = {symbol: position for position, symbol in enumerate(bars)}
+    positions = result['代码'].map(order).to_numpy()
+    result = result.iloc[np.argsort(positions, kind='stable')].reset_index(drop=True)
+    return result
@@ -0,0 +1,346 @@
+"""
+技术指标增量计算状态
+- IndicatorState 保存逐根K线递推所需的全部状态：各周期的滚动窗口、RSI涨跌幅窗口、
+  MACD/KDJ的指数加权累加量，新K线到来时O(1)更新，输出与 compute_indicators 全量计算一致
+- 状态可序列化为JSON，由 IndicatorStateStore 保存在本地K线存储目录下，按 接口/周期/复权方式/股票代码 分区
+"""
+import json
+import logging
+import math
+import os
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from provider.akshare_bar_store import get_bar_store_dir
+from provider.akshare_disk_cache import atomic_write
+
+from .indicator_kernels import (
+    DEFAULT_BOLL_PARAMS, DEFAULT_KDJ_PARAMS, DEFAULT_MA_PERIODS, DEFAULT_MACD_PARAMS, DEFAULT_RSI_PERIODS,
+    DEFAULT_VMA_PERIODS, as_float_array, compute_indicators, ewm_accumulators, ewm_alpha, indicator_columns, kdj_rsv,
+)
+
+STATE_VERSION = 1
+NAN = float('nan')
+
+
+def _is_nan(value: float) -> bool:
+    return value != value
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    """与NumPy一致的除法：除零时得到inf或NaN而不是抛出异常"""
+    if denominator == 0:
+        if numerator == 0 or _is_nan(numerator):
+            return NAN
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+class _Ewm:
+    """pandas ewm(adjust=True) 的递推形式：加权和与权重和同时衰减，缺失值只衰减不累加"""
+
+    __slots__ = ('decay', 'weighted', 'weights', 'observations')
+
+    def __init__(self, alpha: float, weighted: float = 0.0, weights: float = 0.0, observations: int = 0):
+        self.decay = 1.0 - alpha
+        self.weighted = weighted
+        self.weights = weights
+        self.observations = observations
+
+    def update(self, value: float, min_periods: int) -> float:
+        self.weighted *= self.decay
+        self.weights *= self.decay
+        if not _is_nan(value):
+            self.weighted += value
+            self.weights += 1.0
+            self.observations += 1
+        if self.observations < max(min_periods, 1):
+            return NAN
+        return _divide(self.weighted, self.weights)
+
+    def to_list(self) -> List[float]:
+        return [self.weighted, self.weights, self.observations]
+
+
+def _tail(window: deque, length: int) -> List[float]:
+    items = list(window)
+    return items[-length:] if length < len(items) else items
+
+
+class IndicatorState:
+    """
+    一组指标参数下的增量计算状态
+    参数含义与 compute_indicators 相同，update 每次接收一根K线并返回该K线的指标值（顺序同 columns）
+    """
+
+    def __init__(
+        self,
+        ma_periods: Optional[Sequence[int]] = DEFAULT_MA_PERIODS,
+        rsi_periods: Optional[Sequence[int]] = DEFAULT_RSI_PERIODS,
+        macd: Optional[Sequence[int]] = DEFAULT_MACD_PARAMS,
+        kdj: Optional[Sequence[int]] = DEFAULT_KDJ_PARAMS,
+        boll: Optional[Sequence[float]] = DEFAULT_BOLL_PARAMS,
+        vma_periods: Optional[Sequence[int]] = DEFAULT_VMA_PERIODS,
+        min_periods: Optional[int] = None,
+        epsilon: float = 0.0,
+    ):
+        self.spec = {
+            'ma_periods': list(ma_periods or []),
+            'rsi_periods': list(rsi_periods or []),
+            'macd': list(macd or []),
+            'kdj': list(kdj or []),
+            'boll': list(boll or []),
+            'vma_periods': list(vma_periods or []),
+            'min_periods': min_periods,
+            'epsilon': epsilon,
+        }
+        self.columns = indicator_columns(ma_periods, rsi_periods, macd, kdj, boll, vma_periods)
+        close_length = max(self.spec['ma_periods'] + ([int(boll[0])] if boll else []) + [1])
+        self.closes: deque = deque(maxlen=close_length)
+        self.gains: deque = deque(maxlen=max(self.spec['rsi_periods'] + [1]))
+        self.losses: deque = deque(maxlen=max(self.spec['rsi_periods'] + [1]))
+        self.highs: deque = deque(maxlen=int(kdj[0]) if kdj else 1)
+        self.lows: deque = deque(maxlen=int(kdj[0]) if kdj else 1)
+        self.volumes: deque = deque(maxlen=max(self.spec['vma_periods'] + [1]))
+        self.previous_close = NAN
+        self.bars = 0
+        self.ewm: Dict[str, _Ewm] = {}
+        if macd:
+            self.ewm['fast'] = _Ewm(ewm_alpha(span=macd[0]))
+            self.ewm['slow'] = _Ewm(ewm_alpha(span=macd[1]))
+            self.ewm['signal'] = _Ewm(ewm_alpha(span=macd[2]))
+        if kdj:
+            self.ewm['k'] = _Ewm(ewm_alpha(com=kdj[1] - 1))
+            self.ewm['d'] = _Ewm(ewm_alpha(com=kdj[1] - 1))
+
+    # ---------- 窗口统计 ----------
+
+    def _required(self, window: int, minimum: int = 1) -> int:
+        min_periods = self.spec['min_periods']
+        return max(window if min_periods is None else min_periods, minimum)
+
+    def _mean(self, values: deque, window: int) -> float:
+        valid = [value for value in _tail(values, window) if not _is_nan(value)]
+        if len(valid) < self._required(window):
+            return NAN
+        return math.fsum(valid) / len(valid)
+
+    def _std(self, values: deque, window: int) -> float:
+        valid = [value for value in _tail(values, window) if not _is_nan(value)]
+        if len(valid) < self._required(window, minimum=2):
+            return NAN
+        mean = math.fsum(valid) / len(valid)
+        return math.sqrt(math.fsum((value - mean) ** 2 for value in valid) / (len(valid) - 1))
+
+    def _extreme(self, values: deque, window: int, reduce: Any) -> float:
+        valid = [value for value in _tail(values, window) if not _is_nan(value)]
+        if len(valid) < self._required(window):
+            return NAN
+        return reduce(valid)
+
+    # ---------- 递推 ----------
+
+    def update(self, close: float, high: float = NAN, low: float = NAN, volume: float = NAN) -> List[float]:
+        """接收一根新K线，返回该K线的全部指标值"""
+        close, high, low, volume = (float(value) for value in (close, high, low, volume))
+        spec = self.spec
+        min_periods = spec['min_periods'] or 0
+        epsilon = spec['epsilon']
+        self.closes.append(close)
+        self.highs.append(high)
+        self.lows.append(low)
+        self.volumes.append(volume)
+        # 首根K线差分为NaN，与全量计算一样按涨跌幅0计入
+        delta = close - self.previous_close
+        self.gains.append(delta if delta > 0 else 0.0)
+        self.losses.append(-delta if delta < 0 else 0.0)
+        self.previous_close = close
+        self.bars += 1
+
+        row = [self._mean(self.closes, period) for period in spec['ma_periods']]
+        for period in spec['rsi_periods']:
+            rs = _divide(self._mean(self.gains, period), self._mean(self.losses, period) + epsilon)
+            row.append(100 - _divide(100, 1 + rs))
+        if spec['macd']:
+            line = self.ewm['fast'].update(close, min_periods) - self.ewm['slow'].update(close, min_periods)
+            signal = self.ewm['signal'].update(line, min_periods)
+            row += [line, signal, line - signal]
+        if spec['kdj']:
+            period = int(spec['kdj'][0])
+            lowest = self._extreme(self.lows, period, min)
+            highest = self._extreme(self.highs, period, max)
+            rsv = _divide(close - lowest, highest - lowest + epsilon) * 100
+            k = self.ewm['k'].update(rsv, min_periods)
+            d = self.ewm['d'].update(k, min_periods)
+            row += [k, d, 3 * k - 2 * d]
+        if spec['boll']:
+            period, width = int(spec['boll'][0]), spec['boll'][1]
+            middle = self._mean(self.closes, period)
+            band = self._std(self.closes, period) * width
+            row += [middle, middle + band, middle - band]
+        row += [self._mean(self.volumes, period) for period in spec['vma_periods']]
+        return row
+
+    # ---------- 初始化与序列化 ----------
+
+    @classmethod
+    def from_history(
+        cls, close: Any, high: Any = None, low: Any = None, volume: Any = None, **spec: Any
+    ) -> Tuple['IndicatorState', np.ndarray, List[str]]:
+        """
+        用历史K线全量计算指标，并初始化可继续递推的状态
+        返回 (状态, 指标数组, 列名)，指标数组与 compute_indicators 的结果相同
+        """
+        state = cls(**spec)
+        spec = state.spec
+        close = as_float_array(close)
+        length = len(close)
+        high = as_float_array(high) if high is not None else np.full(length, np.nan)
+        low = as_float_array(low) if low is not None else np.full(length, np.nan)
+        volume = as_float_array(volume) if volume is not None else np.full(length, np.nan)
+        values, columns = compute_indicators(
+            close, high, low, volume,
+            ma_periods=spec['ma_periods'], rsi_periods=spec['rsi_periods'], macd=spec['macd'], kdj=spec['kdj'],
+            boll=spec['boll'], vma_periods=spec['vma_periods'], min_periods=spec['min_periods'], epsilon=spec['epsilon'],
+        )
+        if length == 0:
+            return state, values, columns
+
+        state.closes.extend(close[-state.closes.maxlen:].tolist())
+        state.highs.extend(high[-state.highs.maxlen:].tolist())
+        state.lows.extend(low[-state.lows.maxlen:].tolist())
+        state.volumes.extend(volume[-state.volumes.maxlen:].tolist())
+        delta = np.diff(close, prepend=np.nan)
+        state.gains.extend(np.where(delta > 0, delta, 0.0)[-state.gains.maxlen:].tolist())
+        state.losses.extend((-np.where(delta < 0, delta, 0.0))[-state.losses.maxlen:].tolist())
+        state.previous_close = float(close[-1])
+        state.bars = length
+
+        def seed(name: str, series: np.ndarray) -> None:
+            ewm = state.ewm[name]
+            ewm.weighted, ewm.weights, ewm.observations = ewm_accumulators(series, 1.0 - ewm.decay)
+
+        if spec['macd']:
+            position = columns.index('MACD')
+            seed('fast', close)
+            seed('slow', close)
+            seed('signal', values[:, position])
+        if spec['kdj']:
+            position = columns.index('KDJ_K')
+            seed('k', kdj_rsv(close, high, low, int(spec['kdj'][0]), spec['min_periods'], spec['epsilon']))
+            seed('d', values[:, position])
+        return state, values, columns
+
+    def to_dict(self) -> Dict[str, Any]:
+        """序列化为JSON兼容的字典（NaN/inf 由json模块按JavaScript字面量写出）"""
+        return {
+            'version': STATE_VERSION,
+            'spec': self.spec,
+            'bars': self.bars,
+            'previous_close': self.previous_close,
+            'closes': list(self.closes),
+            'gains': list(self.gains),
+            'losses': list(self.losses),
+            'highs': list(self.highs),
+            'lows': list(self.lows),
+            'volumes': list(self.volumes),
+            'ewm': {name: ewm.to_list() for name, ewm in self.ewm.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'IndicatorState':
+        if data.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported indicator state version: {data.get('version')}")
+        spec = dict(data['spec'])
+        state = cls(**spec)
+        state.bars = int(data['bars'])
+        state.previous_close = float(data['previous_close'])
+        for name in ('closes', 'gains', 'losses', 'highs', 'lows', 'volumes'):
+            getattr(state, name).extend(float(value) for value in data[name])
+        for name, (weighted, weights, observations) in data['ewm'].items():
+            ewm = state.ewm[name]
+            ewm.weighted, ewm.weights, ewm.observations = float(weighted), float(weights), int(observations)
+        return state
+
+    def copy(self) -> 'IndicatorState':
+        return IndicatorState.from_dict(self.to_dict())
+
+
+def get_indicator_state_dir() -> str:
+    return os.environ.get('AKSHARE_INDICATOR_STATE_DIR') or os.path.join(get_bar_store_dir(), 'indicators')
+
+
+class IndicatorStateStore:
+    """按 接口/周期/复权方式/股票代码 分区保存增量计算状态的JSON文件"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._locks: Dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "resets": 0, "writes": 0, "errors": 0}
+
+    def _path(self, function_name: str, call_kwargs: Dict[str, Any]) -> str:
+        period = call_kwargs.get('period') or 'daily'
+        adjust = call_kwargs.get('adjust') or 'none'
+        symbol = "".join(ch for ch in str(call_kwargs['symbol']) if ch.isalnum())
+        return os.path.join(self.directory, function_name, f"period={period}", f"adjust={adjust}", symbol + '.json')
+
+    def lock(self, function_name: str, call_kwargs: Dict[str, Any]) -> threading.RLock:
+        """同一分区的读取-递推-保存需要在锁内完成，避免并发请求互相覆盖状态"""
+        path = self._path(function_name, call_kwargs)
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.RLock())
+
+    def get(self, function_name: str, call_kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        path = self._path(function_name, call_kwargs)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            self._stats["misses"] += 1
+            return None
+        except Exception as e:
+            logging.warning(f"Discarding unreadable indicator state {path}: {e}")
+            self._stats["errors"] += 1
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        return payload
+
+    def put(self, function_name: str, call_kwargs: Dict[str, Any], payload: Dict[str, Any]) -> None:
+        path = self._path(function_name, call_kwargs)
+        try:
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            atomic_write(path, lambda f: json.dump(payload, f), mode='w')
+            self._stats["writes"] += 1
+        except Exception as e:
+            logging.warning(f"Failed to save indicator state {path}: {e}")
+            self._stats["errors"] += 1
+
+    def record_reset(self) -> None:
+        self._stats["resets"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._stats)
+        stats["directory"] = self.directory
+        return stats
+
+
+_state_store: Optional[IndicatorStateStore] = None
+_state_store_lock = threading.Lock()
+
+
+def get_indicator_state_store() -> IndicatorStateStore:
+    global _state_store
+    with _state_store_lock:
+        if _state_store is None or _state_store.directory != get_indicator_state_dir():
+            _state_store = IndicatorStateStore(get_indicator_state_dir())
+        return _state_store
+
+
+def get_indicator_state_stats() -> Dict[str, Any]:
+    """返回增量计算状态的命中、重置和写入次数"""
+    return get_indicator_state_store().stats()
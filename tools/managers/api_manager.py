@@ -6,18 +6,18 @@ import concurrent.futures
 import pandas as pd
 from typing import Dict, Any, Tuple, Optional, List
 import logging
-import akshare as ak
-from functools import lru_cache
 
+from provider.akshare_financial_store import get_financial_data_store
 from provider.akshare_stockdata import safe_ak_call
 
 
 class APIManager:
     """API管理器"""
     
-    def __init__(self, retries: int = 5, timeout: float = 600):
+    def __init__(self, retries: int = 5, timeout: float = 600, use_cache: bool = True):
         self.retries = retries
         self.timeout = timeout
+        self.use_cache = use_cache
         self.logger = logging.getLogger(__name__)
     
     def parallel_basic_info_calls(self, symbol: str) -> Dict[str, Any]:
@@ -26,17 +26,17 @@ class APIManager:
         """
         try:
             def call_api(api_func, **kwargs):
-                return safe_ak_call(api_func, retries=self.retries, timeout=self.timeout, **kwargs)
+                return safe_ak_call(api_func, retries=self.retries, timeout=self.timeout, use_cache=self.use_cache, **kwargs)
             
             results = {}
             
             with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
                 # 提交所有API调用任务
                 futures = {
-                    'basic_info': executor.submit(call_api, ak.stock_individual_info_em, symbol=symbol),
-                    'company_info': executor.submit(call_api, ak.stock_profile_cninfo, symbol=symbol),
-                    'business_info': executor.submit(call_api, ak.stock_zyjs_ths, symbol=symbol),
-                    'current_price': executor.submit(call_api, ak.stock_bid_ask_em, symbol=symbol)
+                    'basic_info': executor.submit(call_api, "stock_individual_info_em", symbol=symbol),
+                    'company_info': executor.submit(call_api, "stock_profile_cninfo", symbol=symbol),
+                    'business_info': executor.submit(call_api, "stock_zyjs_ths", symbol=symbol),
+                    'current_price': executor.submit(call_api, "stock_bid_ask_em", symbol=symbol)
                 }
                 
                 # 等待所有任务完成
@@ -61,19 +61,20 @@ class APIManager:
             with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
                 # 并行获取财务数据和当前股价
                 financial_future = executor.submit(
-                    safe_ak_call, 
-                    ak.stock_financial_analysis_indicator,
+                    get_financial_data_store().get_indicator_data,
+                    symbol,
+                    "2020",
                     retries=self.retries,
                     timeout=self.timeout,
-                    symbol=symbol,
-                    start_year="2020"
+                    use_cache=self.use_cache
                 )
                 
                 price_future = executor.submit(
                     safe_ak_call,
-                    ak.stock_bid_ask_em,
+                    "stock_bid_ask_em",
                     retries=self.retries,
                     timeout=self.timeout,
+                    use_cache=self.use_cache,
                     symbol=symbol
                 )
                 
@@ -86,56 +87,15 @@ class APIManager:
             self.logger.error(f"并行财务数据调用失败: {e}")
             return None, None
     
-    @lru_cache(maxsize=128)
     def get_financial_cache(self, symbol: str, start_year: str = "2020") -> Dict[int, Dict]:
         """
         获取财务数据缓存
-        使用LRU缓存机制，避免重复获取相同股票的财务数据
+        使用进程内共享的财务数据存储，所有APIManager实例和估值计算路径共用同一份数据
         """
         try:
-            financial_data = safe_ak_call(
-                ak.stock_financial_analysis_indicator,
-                retries=3,
-                timeout=300,
-                symbol=symbol,
-                start_year=start_year
+            return get_financial_data_store().get_annual_cache(
+                symbol, start_year, retries=3, timeout=300, use_cache=self.use_cache
             )
-            
-            if financial_data is None or financial_data.empty:
-                return {}
-            
-            # 将财务数据日期转换为datetime
-            financial_data['日期'] = pd.to_datetime(financial_data['日期'])
-            
-            # 预处理：获取所有可用的年报数据，按年度分组
-            annual_data = financial_data[
-                (financial_data['日期'].dt.month == 12) & 
-                (financial_data['日期'].dt.day == 31)
-            ].sort_values('日期')
-            
-            if annual_data.empty:
-                return {}
-            
-            # 预计算财务指标缓存
-            cache = {}
-            for _, financial_row in annual_data.iterrows():
-                year = financial_row['日期'].year
-                cache[year] = {
-                    'eps': pd.to_numeric(financial_row['摊薄每股收益(元)'], errors='coerce'),
-                    'bps': pd.to_numeric(financial_row['每股净资产_调整前(元)'], errors='coerce'),
-                    'cps': pd.to_numeric(financial_row['每股经营性现金流(元)'], errors='coerce'),
-                    'w_eps': pd.to_numeric(financial_row['加权每股收益(元)'], errors='coerce'),
-                    'n_eps': pd.to_numeric(financial_row['扣除非经常性损益后的每股收益(元)'], errors='coerce'),
-                    'adj_bps': pd.to_numeric(financial_row['每股净资产_调整后(元)'], errors='coerce'),
-                    'cap_reserve': pd.to_numeric(financial_row['每股资本公积金(元)'], errors='coerce'),
-                    'undist_profit': pd.to_numeric(financial_row['每股未分配利润(元)'], errors='coerce'),
-                    'growth_rate': pd.to_numeric(financial_row['净利润增长率(%)'], errors='coerce'),
-                    'roe': pd.to_numeric(financial_row['净资产收益率(%)'], errors='coerce'),
-                    'date': financial_row['日期']
-                }
-            
-            return cache
-            
         except Exception as e:
             self.logger.error(f"获取财务数据缓存失败: {e}")
             return {}
@@ -147,9 +107,10 @@ class APIManager:
         """
         try:
             result = safe_ak_call(
-                ak.stock_zh_a_hist,
+                "stock_zh_a_hist",
                 retries=self.retries,
                 timeout=self.timeout,
+                use_cache=self.use_cache,
                 symbol=symbol,
                 period='daily',
                 start_date=start_date,
@@ -179,9 +140,10 @@ class APIManager:
                 market_symbol = symbol  # 如果已经包含市场标识，直接使用
             
             result = safe_ak_call(
-                ak.stock_zygc_em,
+                "stock_zygc_em",
                 retries=2,
                 timeout=self.timeout,
+                use_cache=self.use_cache,
                 symbol=market_symbol
             )
             return result
@@ -194,5 +156,5 @@ class APIManager:
         """
         清除缓存
         """
-        self.get_financial_cache.cache_clear()
+        get_financial_data_store().clear()
         self.logger.info("API缓存已清除")
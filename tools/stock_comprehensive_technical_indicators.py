@@ -7,8 +7,6 @@ from functools import lru_cache
 import time
 import logging
 
-import akshare as ak
-
 # 导入新的错误处理模块
 from .exceptions import (
     StockDataError, DataFetchError, DataValidationError, 
@@ -19,31 +17,43 @@ from .error_handlers import (
     ErrorRecoveryHandler, ErrorReportGenerator
 )
 
-# 尝试导入技术分析库，如果都不可用则使用pandas内置功能
-try:
-    import talib
-    USE_TALIB = True
-    USE_PANDAS_TA = False
-    USE_PANDAS_ONLY = False
-except ImportError:
-    try:
-        import pandas_ta as ta
-        USE_TALIB = False
-        USE_PANDAS_TA = True
-        USE_PANDAS_ONLY = False
-        import logging
-        logging.warning("talib not available, using pandas_ta as fallback")
-    except ImportError:
-        USE_TALIB = False
-        USE_PANDAS_TA = False
-        USE_PANDAS_ONLY = True
-        import logging
-        logging.warning("Neither talib nor pandas_ta available, using pandas built-in functions")
-
 from provider.akshare_stockdata import safe_ak_call, build_error_payload
+from provider.akshare_financial_store import get_financial_data_store
+from provider.akshare_disk_cache import latest_disclosed_report_period
+from provider.akshare_query import QueryError, apply_query
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, validate_required_params, validate_date_format, handle_akshare_error
+from .indicator_kernels import (
+    DEFAULT_BOLL_PARAMS, DEFAULT_KDJ_PARAMS, DEFAULT_MA_PERIODS, DEFAULT_MACD_PARAMS, DEFAULT_VMA_PERIODS,
+    compute_indicators, indicator_columns, join_indicator_columns,
+)
+from .indicator_panel import compact_bars, compute_panel_indicators, fetch_panel_bars, parse_panel_output, parse_symbols
+from .indicator_state import IndicatorState, get_indicator_state_store
+from .valuation_kernels import add_historical_valuation_columns, format_historical_valuation
+from .valuation_screener import BATCH_VALUATION_COLUMNS, REQUIRED_TABLES, compute_batch_valuation, fetch_screener_tables
+from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, validate_required_params, validate_date_format, handle_akshare_error, parse_bool_param, parse_output_mode, parse_json_layout, parse_query_params, render_markdown_table, dataframe_to_json_payload
+
+
+# ==================== 技术分析库加载 ====================
+
+@lru_cache(maxsize=1)
+def load_technical_analysis_libraries() -> Tuple[Optional[Any], Optional[Any]]:
+    """
+    按需导入技术分析库，返回 (talib, pandas_ta)，不可用的库为 None
+    都不可用时使用NumPy指标内核；导入结果会被缓存，只在首次计算指标时付出导入开销
+    """
+    try:
+        import talib
+        return talib, None
+    except ImportError:
+        pass
+    try:
+        import pandas_ta
+        logging.warning("talib not available, using pandas_ta as fallback")
+        return None, pandas_ta
+    except ImportError:
+        logging.warning("Neither talib nor pandas_ta available, using built-in NumPy indicator kernels")
+        return None, None
 
 
 # ==================== 性能优化相关函数 ====================
@@ -95,77 +105,34 @@ def preprocess_data_for_indicators(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-@lru_cache(maxsize=128)
 def precompute_financial_cache(symbol: str, start_year: str = "2020") -> Dict[int, Dict]:
     """
     预计算财务数据缓存，避免重复计算
-    使用LRU缓存机制，避免重复获取相同股票的财务数据
+    使用进程内共享的财务数据存储，与动态估值、API管理器共用同一份数据，新的报告期披露截止后才重新获取
     """
     try:
-        financial_data = safe_ak_call(
-            ak.stock_financial_analysis_indicator,
-            retries=3,
-            timeout=300,
-            symbol=symbol,
-            start_year=start_year
-        )
-        
-        if financial_data is None or financial_data.empty:
-            return {}
-        
-        # 将财务数据日期转换为datetime
-        financial_data['日期'] = pd.to_datetime(financial_data['日期'])
-        
-        # 预处理：获取所有可用的年报数据，按年度分组
-        annual_data = financial_data[
-            (financial_data['日期'].dt.month == 12) & 
-            (financial_data['日期'].dt.day == 31)
-        ].sort_values('日期')
-        
-        if annual_data.empty:
-            return {}
-        
-        # 预计算财务指标缓存
-        cache = {}
-        for _, financial_row in annual_data.iterrows():
-            year = financial_row['日期'].year
-            cache[year] = {
-                'eps': pd.to_numeric(financial_row['摊薄每股收益(元)'], errors='coerce'),
-                'bps': pd.to_numeric(financial_row['每股净资产_调整前(元)'], errors='coerce'),
-                'cps': pd.to_numeric(financial_row['每股经营性现金流(元)'], errors='coerce'),
-                'w_eps': pd.to_numeric(financial_row['加权每股收益(元)'], errors='coerce'),
-                'n_eps': pd.to_numeric(financial_row['扣除非经常性损益后的每股收益(元)'], errors='coerce'),
-                'adj_bps': pd.to_numeric(financial_row['每股净资产_调整后(元)'], errors='coerce'),
-                'cap_reserve': pd.to_numeric(financial_row['每股资本公积金(元)'], errors='coerce'),
-                'undist_profit': pd.to_numeric(financial_row['每股未分配利润(元)'], errors='coerce'),
-                'growth_rate': pd.to_numeric(financial_row['净利润增长率(%)'], errors='coerce'),
-                'roe': pd.to_numeric(financial_row['净资产收益率(%)'], errors='coerce'),
-                'date': financial_row['日期']
-            }
-        
-        return cache
-        
+        return get_financial_data_store().get_annual_cache(symbol, start_year, retries=3, timeout=300)
     except Exception as e:
         print(f"预计算财务数据缓存失败: {e}")
         return {}
 
 
-def parallel_basic_info_calls(symbol: str, retries: int = 5, timeout: float = 600) -> Dict[str, Any]:
+def parallel_basic_info_calls(symbol: str, retries: int = 5, timeout: float = 600, use_cache: bool = True) -> Dict[str, Any]:
     """
     并行调用基本信息相关接口
     """
     def call_api(api_func, **kwargs):
-        return safe_ak_call(api_func, retries=retries, timeout=timeout, **kwargs)
+        return safe_ak_call(api_func, retries=retries, timeout=timeout, use_cache=use_cache, **kwargs)
     
     results = {}
     
     with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
         # 提交所有API调用任务
         futures = {
-            'basic_info': executor.submit(call_api, ak.stock_individual_info_em, symbol=symbol),
-            'company_info': executor.submit(call_api, ak.stock_profile_cninfo, symbol=symbol),
-            'business_info': executor.submit(call_api, ak.stock_zyjs_ths, symbol=symbol),
-            'current_price': executor.submit(call_api, ak.stock_bid_ask_em, symbol=symbol)
+            'basic_info': executor.submit(call_api, "stock_individual_info_em", symbol=symbol),
+            'company_info': executor.submit(call_api, "stock_profile_cninfo", symbol=symbol),
+            'business_info': executor.submit(call_api, "stock_zyjs_ths", symbol=symbol),
+            'current_price': executor.submit(call_api, "stock_bid_ask_em", symbol=symbol)
         }
         
         # 等待所有任务完成
@@ -179,26 +146,27 @@ def parallel_basic_info_calls(symbol: str, retries: int = 5, timeout: float = 60
     return results
 
 
-def parallel_financial_data_calls(symbol: str, retries: int = 5, timeout: float = 600) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+def parallel_financial_data_calls(symbol: str, retries: int = 5, timeout: float = 600, use_cache: bool = True) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
     """
     并行获取财务数据和当前股价
     """
     with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
         # 并行获取财务数据和当前股价
         financial_future = executor.submit(
-            safe_ak_call, 
-            ak.stock_financial_analysis_indicator,
+            get_financial_data_store().get_indicator_data,
+            symbol,
+            "2020",
             retries=retries,
             timeout=timeout,
-            symbol=symbol,
-            start_year="2020"
+            use_cache=use_cache
         )
         
         price_future = executor.submit(
             safe_ak_call,
-            ak.stock_bid_ask_em,
+            "stock_bid_ask_em",
             retries=retries,
             timeout=timeout,
+            use_cache=use_cache,
             symbol=symbol
         )
         
@@ -274,35 +242,22 @@ def ensure_json_serializable(df: pd.DataFrame) -> pd.DataFrame:
 
 # ==================== 原有函数优化 ====================
 
-def calculate_trend_momentum_oscillator(df: pd.DataFrame, period: str = "daily") -> pd.DataFrame:
+def add_trend_momentum_indicators(df: pd.DataFrame) -> pd.DataFrame:
     """
-    计算趋势动量震荡指标(日频)-指定股票代码、周期(日频)
-    包括：移动平均线、RSI、MACD、KDJ、布林带、成交量指标
-    根据周期调整技术指标参数
+    在预处理后的K线数据上添加趋势动量震荡指标列（日频与分钟级共用）
+    使用统一的股票分析领域标准参数，无论什么时间周期，技术指标参数都保持一致：
+    MA5-MA60、RSI6/12/24、MACD(12,26,9)、KDJ(9,3,3)、布林带(20,2.0)、VMA5-VMA20
+    数据不足一个窗口的指标保持为NaN，不填充为0
     """
-    # 检查数据有效性
-    if df.empty or len(df.columns) == 0:
-        raise ValueError("日频数据为空或没有列名，可能是无效的股票代码")
-    
-    # 检查必要列是否存在
-    required_columns = ['开盘', '收盘', '最高', '最低', '成交量']
-    missing_columns = [col for col in required_columns if col not in df.columns]
-    if missing_columns:
-        raise ValueError(f"日频数据缺少必要列: {missing_columns}")
-    
-    # 使用预处理函数优化数据处理
-    df = preprocess_data_for_indicators(df)
-    
-    # 使用统一的股票分析领域标准参数
-    # 无论什么时间周期，技术指标参数都保持一致
-    ma_periods = [5, 10, 20, 30, 60]  # 移动平均线：MA5、MA10、MA20、MA30、MA60
-    rsi_periods = [6, 12, 24]  # RSI指标：RSI6、RSI12、RSI24
-    macd_params = (12, 26, 9)  # MACD指标：快线12、慢线26、信号线9
-    kdj_params = (9, 3, 3)  # KDJ指标：K值9、D值3、J值3
-    boll_params = (20, 2.0)  # 布林带：周期20、标准差2.0
-    vma_periods = [5, 10, 20]  # 成交量均线：VMA5、VMA10、VMA20
-    
-    if USE_TALIB:
+    # 技术分析库在首次计算时才导入
+    talib, ta = load_technical_analysis_libraries()
+    ma_periods = DEFAULT_MA_PERIODS
+    macd_params = DEFAULT_MACD_PARAMS
+    kdj_params = DEFAULT_KDJ_PARAMS
+    boll_params = DEFAULT_BOLL_PARAMS
+    vma_periods = DEFAULT_VMA_PERIODS
+
+    if talib is not None:
         # 使用talib计算技术指标
         # 确保数据是numpy数组且为float64类型，处理缺失值
         close_values = df['收盘'].astype('float64').fillna(0).values
@@ -310,9 +265,9 @@ def calculate_trend_momentum_oscillator(df: pd.DataFrame, period: str = "daily")
         low_values = df['最低'].astype('float64').fillna(0).values
         volume_values = df['成交量'].astype('float64').fillna(0).values
         
-        # 计算移动平均线（使用统一标准参数）
-        for period in ma_periods:
-            df[f'MA{period}'] = talib.SMA(close_values, timeperiod=period)
+        # 计算移动平均线
+        for period_val in ma_periods:
+            df[f'MA{period_val}'] = talib.SMA(close_values, timeperiod=period_val)
         
         # 计算RSI
         df['RSI6'] = talib.RSI(close_values, timeperiod=6)
@@ -338,45 +293,14 @@ def calculate_trend_momentum_oscillator(df: pd.DataFrame, period: str = "daily")
         df['BOLL_MIDDLE'] = middle
         df['BOLL_LOWER'] = lower
         
-        # 计算成交量均线（使用统一标准参数）
-        for period in vma_periods:
-            df[f'VMA{period}'] = talib.SMA(volume_values, timeperiod=period)
-    elif USE_PANDAS_TA:
+        # 计算成交量均线
+        for period_val in vma_periods:
+            df[f'VMA{period_val}'] = talib.SMA(volume_values, timeperiod=period_val)
+    elif ta is not None:
         # 使用pandas_ta计算技术指标
-        # 计算移动平均线（使用动态参数）
-        for period in ma_periods:
-            if period == 4:
-                df['MA4W'] = ta.sma(df['收盘'], length=period)
-            elif period == 8:
-                df['MA8W'] = ta.sma(df['收盘'], length=period)
-            elif period == 16:
-                df['MA16W'] = ta.sma(df['收盘'], length=period)
-            elif period == 24:
-                df['MA24W'] = ta.sma(df['收盘'], length=period)
-            elif period == 48:
-                df['MA48W'] = ta.sma(df['收盘'], length=period)
-            elif period == 3:
-                df['MA3M'] = ta.sma(df['收盘'], length=period)
-            elif period == 6:
-                df['MA6M'] = ta.sma(df['收盘'], length=period)
-            elif period == 12:
-                df['MA12M'] = ta.sma(df['收盘'], length=period)
-            elif period == 24:
-                df['MA24M'] = ta.sma(df['收盘'], length=period)
-            elif period == 36:
-                df['MA36M'] = ta.sma(df['收盘'], length=period)
-            else:
-                # 日线参数
-                if period == 5:
-                    df['MA5'] = ta.sma(df['收盘'], length=period)
-                elif period == 10:
-                    df['MA10'] = ta.sma(df['收盘'], length=period)
-                elif period == 20:
-                    df['MA20'] = ta.sma(df['收盘'], length=period)
-                elif period == 30:
-                    df['MA30'] = ta.sma(df['收盘'], length=period)
-                elif period == 60:
-                    df['MA60'] = ta.sma(df['收盘'], length=period)
+        # 计算移动平均线
+        for period_val in ma_periods:
+            df[f'MA{period_val}'] = ta.sma(df['收盘'], length=period_val)
         
         # 计算RSI
         df['RSI6'] = ta.rsi(df['收盘'], length=6)
@@ -401,155 +325,37 @@ def calculate_trend_momentum_oscillator(df: pd.DataFrame, period: str = "daily")
         df['BOLL_MIDDLE'] = bb_data[f'BBM_{boll_params[0]}_{boll_params[1]}']
         df['BOLL_LOWER'] = bb_data[f'BBL_{boll_params[0]}_{boll_params[1]}']
         
-        # 计算成交量均线（使用动态参数）
-        for period in vma_periods:
-            if period == 4:
-                df['VMA4W'] = ta.sma(df['成交量'], length=period)
-            elif period == 8:
-                df['VMA8W'] = ta.sma(df['成交量'], length=period)
-            elif period == 16:
-                df['VMA16W'] = ta.sma(df['成交量'], length=period)
-            elif period == 3:
-                df['VMA3M'] = ta.sma(df['成交量'], length=period)
-            elif period == 6:
-                df['VMA6M'] = ta.sma(df['成交量'], length=period)
-            elif period == 12:
-                df['VMA12M'] = ta.sma(df['成交量'], length=period)
-            else:
-                # 日线参数
-                if period == 5:
-                    df['VMA5'] = ta.sma(df['成交量'], length=period)
-                elif period == 10:
-                    df['VMA10'] = ta.sma(df['成交量'], length=period)
-                elif period == 20:
-                    df['VMA20'] = ta.sma(df['成交量'], length=period)
+        # 计算成交量均线
+        for period_val in vma_periods:
+            df[f'VMA{period_val}'] = ta.sma(df['成交量'], length=period_val)
     else:
-        # 使用pandas内置功能计算技术指标
-        # 确保收盘价是float64类型
-        close_prices = df['收盘'].astype('float64')
-        high_prices = df['最高'].astype('float64')
-        low_prices = df['最低'].astype('float64')
-        volume = df['成交量'].astype('float64')
-        
-        # 计算移动平均线（使用动态参数）
-        for period in ma_periods:
-            if period == 4:
-                df['MA4W'] = close_prices.rolling(window=period).mean()
-            elif period == 8:
-                df['MA8W'] = close_prices.rolling(window=period).mean()
-            elif period == 16:
-                df['MA16W'] = close_prices.rolling(window=period).mean()
-            elif period == 24:
-                df['MA24W'] = close_prices.rolling(window=period).mean()
-            elif period == 48:
-                df['MA48W'] = close_prices.rolling(window=period).mean()
-            elif period == 3:
-                df['MA3M'] = close_prices.rolling(window=period).mean()
-            elif period == 6:
-                df['MA6M'] = close_prices.rolling(window=period).mean()
-            elif period == 12:
-                df['MA12M'] = close_prices.rolling(window=period).mean()
-            elif period == 24:
-                df['MA24M'] = close_prices.rolling(window=period).mean()
-            elif period == 36:
-                df['MA36M'] = close_prices.rolling(window=period).mean()
-            else:
-                # 日线参数
-                if period == 5:
-                    df['MA5'] = close_prices.rolling(window=period).mean()
-                elif period == 10:
-                    df['MA10'] = close_prices.rolling(window=period).mean()
-                elif period == 20:
-                    df['MA20'] = close_prices.rolling(window=period).mean()
-                elif period == 30:
-                    df['MA30'] = close_prices.rolling(window=period).mean()
-                elif period == 60:
-                    df['MA60'] = close_prices.rolling(window=period).mean()
-        
-        # 计算RSI (简化版本)
-        def calculate_rsi(prices, window):
-            delta = prices.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            return rsi.astype('float64')
-        
-        df['RSI6'] = calculate_rsi(close_prices, 6)
-        df['RSI12'] = calculate_rsi(close_prices, 12)
-        df['RSI24'] = calculate_rsi(close_prices, 24)
-        
-        # 计算MACD (简化版本)
-        ema12 = close_prices.ewm(span=macd_params[0]).mean()
-        ema26 = close_prices.ewm(span=macd_params[1]).mean()
-        df['MACD'] = (ema12 - ema26).astype('float64')
-        df['MACD_SIGNAL'] = df['MACD'].ewm(span=macd_params[2]).mean().astype('float64')
-        df['MACD_HIST'] = (df['MACD'] - df['MACD_SIGNAL']).astype('float64')
-        
-        # 计算KDJ (简化版本)
-        def calculate_kdj(high, low, close, k_period=9, d_period=3):
-            lowest_low = low.rolling(window=k_period).min()
-            highest_high = high.rolling(window=k_period).max()
-            rsv = (close - lowest_low) / (highest_high - lowest_low) * 100
-            k = rsv.ewm(com=2).mean()
-            d = k.ewm(com=2).mean()
-            j = 3 * k - 2 * d
-            return k.astype('float64'), d.astype('float64'), j.astype('float64')
-        
-        df['KDJ_K'], df['KDJ_D'], df['KDJ_J'] = calculate_kdj(high_prices, low_prices, close_prices, kdj_params[0], kdj_params[1])
-        
-        # 计算布林带 (简化版本)
-        df['BOLL_MIDDLE'] = close_prices.rolling(window=boll_params[0]).mean().astype('float64')
-        std = close_prices.rolling(window=boll_params[0]).std()
-        df['BOLL_UPPER'] = (df['BOLL_MIDDLE'] + (std * boll_params[1])).astype('float64')
-        df['BOLL_LOWER'] = (df['BOLL_MIDDLE'] - (std * boll_params[1])).astype('float64')
-        
-        # 计算成交量均线（使用动态参数）
-        for period in vma_periods:
-            if period == 4:
-                df['VMA4W'] = volume.rolling(window=period).mean().astype('float64')
-            elif period == 8:
-                df['VMA8W'] = volume.rolling(window=period).mean().astype('float64')
-            elif period == 16:
-                df['VMA16W'] = volume.rolling(window=period).mean().astype('float64')
-            elif period == 3:
-                df['VMA3M'] = volume.rolling(window=period).mean().astype('float64')
-            elif period == 6:
-                df['VMA6M'] = volume.rolling(window=period).mean().astype('float64')
-            elif period == 12:
-                df['VMA12M'] = volume.rolling(window=period).mean().astype('float64')
-            else:
-                # 日线参数
-                if period == 5:
-                    df['VMA5'] = volume.rolling(window=period).mean().astype('float64')
-                elif period == 10:
-                    df['VMA10'] = volume.rolling(window=period).mean().astype('float64')
-                elif period == 20:
-                    df['VMA20'] = volume.rolling(window=period).mean().astype('float64')
+        # 使用NumPy内核一次计算全部指标，计算口径与pandas rolling/ewm一致
+        values, columns = compute_indicators(df['收盘'], df['最高'], df['最低'], df['成交量'])
+        df = join_indicator_columns(df, values, columns)
     
-    # 处理技术指标中的NaN值 - 对于技术指标，NaN通常表示数据不足，应该保持为NaN而不是0
-    # 根据周期构建技术指标列列表
-    if period == "weekly":
-        technical_columns = ['MA4W', 'MA8W', 'MA16W', 'MA24W', 'MA48W', 'RSI6', 'RSI12', 'RSI24', 
-                            'MACD', 'MACD_SIGNAL', 'MACD_HIST', 'KDJ_K', 'KDJ_D', 'KDJ_J',
-                            'BOLL_UPPER', 'BOLL_MIDDLE', 'BOLL_LOWER', 'VMA4W', 'VMA8W', 'VMA16W']
-    elif period == "monthly":
-        technical_columns = ['MA3M', 'MA6M', 'MA12M', 'MA24M', 'MA36M', 'RSI6', 'RSI12', 'RSI24', 
-                            'MACD', 'MACD_SIGNAL', 'MACD_HIST', 'KDJ_K', 'KDJ_D', 'KDJ_J',
-                            'BOLL_UPPER', 'BOLL_MIDDLE', 'BOLL_LOWER', 'VMA3M', 'VMA6M', 'VMA12M']
-    else:
-        # 日线参数
-        technical_columns = ['MA5', 'MA10', 'MA20', 'MA30', 'MA60', 'RSI6', 'RSI12', 'RSI24', 
-                            'MACD', 'MACD_SIGNAL', 'MACD_HIST', 'KDJ_K', 'KDJ_D', 'KDJ_J',
-                            'BOLL_UPPER', 'BOLL_MIDDLE', 'BOLL_LOWER', 'VMA5', 'VMA10', 'VMA20']
+    return df
+
+
+def calculate_trend_momentum_oscillator(df: pd.DataFrame, period: str = "daily") -> pd.DataFrame:
+    """
+    计算趋势动量震荡指标(日频)-指定股票代码、周期(日频)
+    包括：移动平均线、RSI、MACD、KDJ、布林带、成交量指标
+    根据周期调整技术指标参数
+    """
+    # 检查数据有效性
+    if df.empty or len(df.columns) == 0:
+        raise ValueError("日频数据为空或没有列名，可能是无效的股票代码")
     
-    for col in technical_columns:
-        if col in df.columns:
-            # 对于技术指标，保持NaN值，不填充为0
-            # 这样可以更准确地表示数据不足的情况
-            pass
+    # 检查必要列是否存在
+    required_columns = ['开盘', '收盘', '最高', '最低', '成交量']
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"日频数据缺少必要列: {missing_columns}")
     
-    return df
+    # 使用预处理函数优化数据处理
+    df = preprocess_data_for_indicators(df)
+    
+    return add_trend_momentum_indicators(df)
 
 
 def calculate_trend_momentum_oscillator_minute(df: pd.DataFrame, period: str = "5") -> pd.DataFrame:
@@ -571,157 +377,67 @@ def calculate_trend_momentum_oscillator_minute(df: pd.DataFrame, period: str = "
     # 使用预处理函数优化数据处理
     df = preprocess_data_for_indicators(df)
     
-    # 使用统一的股票分析领域标准参数
-    # 无论什么时间周期，技术指标参数都保持一致
-    ma_periods = [5, 10, 20, 30, 60]  # 移动平均线：MA5、MA10、MA20、MA30、MA60
-    rsi_periods = [6, 12, 24]  # RSI指标：RSI6、RSI12、RSI24
-    macd_params = (12, 26, 9)  # MACD指标：快线12、慢线26、信号线9
-    kdj_params = (9, 3, 3)  # KDJ指标：K值9、D值3、J值3
-    boll_params = (20, 2.0)  # 布林带：周期20、标准差2.0
-    vma_periods = [5, 10, 20]  # 成交量均线：VMA5、VMA10、VMA20
-    
-    if USE_TALIB:
-        # 使用talib计算技术指标
-        # 确保数据是numpy数组且为float64类型，处理缺失值
-        close_values = df['收盘'].astype('float64').fillna(0).values
-        high_values = df['最高'].astype('float64').fillna(0).values
-        low_values = df['最低'].astype('float64').fillna(0).values
-        volume_values = df['成交量'].astype('float64').fillna(0).values
-        
-        # 计算移动平均线（使用动态参数）
-        for period_val in ma_periods:
-            df[f'MA{period_val}'] = talib.SMA(close_values, timeperiod=period_val)
-        
-        # 计算RSI
-        df['RSI6'] = talib.RSI(close_values, timeperiod=6)
-        df['RSI12'] = talib.RSI(close_values, timeperiod=12)
-        df['RSI24'] = talib.RSI(close_values, timeperiod=24)
-        
-        # 计算MACD
-        macd, signal, hist = talib.MACD(close_values, 
-                                       fastperiod=macd_params[0], slowperiod=macd_params[1], signalperiod=macd_params[2])
-        df['MACD'] = macd
-        df['MACD_SIGNAL'] = signal
-        df['MACD_HIST'] = hist
-        
-        # 计算KDJ
-        df['KDJ_K'], df['KDJ_D'] = talib.STOCH(high_values, low_values, close_values, 
-                                              fastk_period=kdj_params[0], slowk_period=kdj_params[1], slowd_period=kdj_params[2])
-        df['KDJ_J'] = 3 * df['KDJ_K'] - 2 * df['KDJ_D']
-        
-        # 计算布林带
-        upper, middle, lower = talib.BBANDS(close_values, 
-                                           timeperiod=boll_params[0], nbdevup=boll_params[1], nbdevdn=boll_params[1])
-        df['BOLL_UPPER'] = upper
-        df['BOLL_MIDDLE'] = middle
-        df['BOLL_LOWER'] = lower
-        
-        # 计算成交量均线（使用动态参数）
-        for period_val in vma_periods:
-            df[f'VMA{period_val}'] = talib.SMA(volume_values, timeperiod=period_val)
-    elif USE_PANDAS_TA:
-        # 使用pandas_ta计算技术指标
-        # 计算移动平均线（使用动态参数）
-        for period_val in ma_periods:
-            df[f'MA{period_val}'] = ta.sma(df['收盘'], length=period_val)
-        
-        # 计算RSI
-        df['RSI6'] = ta.rsi(df['收盘'], length=6)
-        df['RSI12'] = ta.rsi(df['收盘'], length=12)
-        df['RSI24'] = ta.rsi(df['收盘'], length=24)
-        
-        # 计算MACD
-        macd_data = ta.macd(df['收盘'], fast=macd_params[0], slow=macd_params[1], signal=macd_params[2])
-        df['MACD'] = macd_data[f'MACD_{macd_params[0]}_{macd_params[1]}_{macd_params[2]}']
-        df['MACD_SIGNAL'] = macd_data[f'MACDs_{macd_params[0]}_{macd_params[1]}_{macd_params[2]}']
-        df['MACD_HIST'] = macd_data[f'MACDh_{macd_params[0]}_{macd_params[1]}_{macd_params[2]}']
-        
-        # 计算KDJ
-        stoch_data = ta.stoch(df['最高'], df['最低'], df['收盘'], k=kdj_params[0], d=kdj_params[1])
-        df['KDJ_K'] = stoch_data[f'STOCHk_{kdj_params[0]}_{kdj_params[1]}_{kdj_params[2]}']
-        df['KDJ_D'] = stoch_data[f'STOCHd_{kdj_params[0]}_{kdj_params[1]}_{kdj_params[2]}']
-        df['KDJ_J'] = 3 * df['KDJ_K'] - 2 * df['KDJ_D']
-        
-        # 计算布林带
-        bb_data = ta.bbands(df['收盘'], length=boll_params[0], std=boll_params[1])
-        df['BOLL_UPPER'] = bb_data[f'BBU_{boll_params[0]}_{boll_params[1]}']
-        df['BOLL_MIDDLE'] = bb_data[f'BBM_{boll_params[0]}_{boll_params[1]}']
-        df['BOLL_LOWER'] = bb_data[f'BBL_{boll_params[0]}_{boll_params[1]}']
-        
-        # 计算成交量均线（使用动态参数）
-        for period_val in vma_periods:
-            df[f'VMA{period_val}'] = ta.sma(df['成交量'], length=period_val)
-    else:
-        # 使用pandas内置功能计算技术指标
-        # 确保收盘价是float64类型
-        close_prices = df['收盘'].astype('float64')
-        high_prices = df['最高'].astype('float64')
-        low_prices = df['最低'].astype('float64')
-        volume = df['成交量'].astype('float64')
-        
-        # 计算移动平均线（使用动态参数）
-        for period_val in ma_periods:
-            df[f'MA{period_val}'] = close_prices.rolling(window=period_val).mean()
-        
-        # 计算RSI (简化版本)
-        def calculate_rsi(prices, window):
-            delta = prices.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            return rsi.astype('float64')
-        
-        df['RSI6'] = calculate_rsi(close_prices, 6)
-        df['RSI12'] = calculate_rsi(close_prices, 12)
-        df['RSI24'] = calculate_rsi(close_prices, 24)
-        
-        # 计算MACD (简化版本)
-        ema12 = close_prices.ewm(span=macd_params[0]).mean()
-        ema26 = close_prices.ewm(span=macd_params[1]).mean()
-        df['MACD'] = (ema12 - ema26).astype('float64')
-        df['MACD_SIGNAL'] = df['MACD'].ewm(span=macd_params[2]).mean().astype('float64')
-        df['MACD_HIST'] = (df['MACD'] - df['MACD_SIGNAL']).astype('float64')
-        
-        # 计算KDJ (简化版本)
-        def calculate_kdj(high, low, close, k_period, d_period):
-            lowest_low = low.rolling(window=k_period).min()
-            highest_high = high.rolling(window=k_period).max()
-            rsv = (close - lowest_low) / (highest_high - lowest_low) * 100
-            k = rsv.ewm(com=2).mean()
-            d = k.ewm(com=2).mean()
-            j = 3 * k - 2 * d
-            return k.astype('float64'), d.astype('float64'), j.astype('float64')
-        
-        df['KDJ_K'], df['KDJ_D'], df['KDJ_J'] = calculate_kdj(high_prices, low_prices, close_prices, kdj_params[0], kdj_params[1])
-        
-        # 计算布林带 (简化版本)
-        df['BOLL_MIDDLE'] = close_prices.rolling(window=boll_params[0]).mean().astype('float64')
-        std = close_prices.rolling(window=boll_params[0]).std()
-        df['BOLL_UPPER'] = (df['BOLL_MIDDLE'] + (std * boll_params[1])).astype('float64')
-        df['BOLL_LOWER'] = (df['BOLL_MIDDLE'] - (std * boll_params[1])).astype('float64')
-        
-        # 计算成交量均线（使用动态参数）
-        for period_val in vma_periods:
-            df[f'VMA{period_val}'] = volume.rolling(window=period_val).mean().astype('float64')
+    return add_trend_momentum_indicators(df)
+
+
+def calculate_trend_momentum_incremental(df: pd.DataFrame, function_name: str, state_kwargs: Dict[str, Any]) -> pd.DataFrame:
+    """
+    增量计算趋势动量震荡指标，只返回新增K线的指标行
+    - 状态按 接口/周期/复权方式/股票代码 保存在本地K线存储目录下，记录已递推到的K线（最后一根K线之前的一根）
+    - 本次数据中找到该K线且价格一致时，从其后继续逐根递推；否则（首次请求、复权价格变化、数据不连续）全量计算
+    - 最后一根K线可能尚未收盘，不计入保存的状态，下次请求会以最新值再返回一次
+    - 指标参数与口径同NumPy指标内核，不使用talib/pandas_ta，保证增量结果与全量计算一致
+    """
+    if df.empty or len(df.columns) == 0:
+        raise ValueError("数据为空或没有列名，可能是无效的股票代码")
+    required_columns = ['开盘', '收盘', '最高', '最低', '成交量']
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"数据缺少必要列: {missing_columns}")
     
-    # 处理技术指标中的NaN值 - 对于技术指标，NaN通常表示数据不足，应该保持为NaN而不是0
-    # 根据分钟周期构建技术指标列列表
-    technical_columns = []
-    for period_val in ma_periods:
-        technical_columns.append(f'MA{period_val}')
-    technical_columns.extend(['RSI6', 'RSI12', 'RSI24', 'MACD', 'MACD_SIGNAL', 'MACD_HIST', 
-                             'KDJ_K', 'KDJ_D', 'KDJ_J', 'BOLL_UPPER', 'BOLL_MIDDLE', 'BOLL_LOWER'])
-    for period_val in vma_periods:
-        technical_columns.append(f'VMA{period_val}')
+    df = preprocess_data_for_indicators(df)
+    time_column = '日期' if '日期' in df.columns else '时间'
+    timestamps = df[time_column].dt.strftime('%Y-%m-%d %H:%M:%S').tolist() if time_column in df.columns else [str(i) for i in range(len(df))]
+    bars = df[['收盘', '最高', '最低', '成交量']].to_numpy(dtype='float64')
+    last = len(bars) - 1
+    store = get_indicator_state_store()
     
-    for col in technical_columns:
-        if col in df.columns:
-            # 对于技术指标，保持NaN值，不填充为0
-            # 这样可以更准确地表示数据不足的情况
-            pass
+    with store.lock(function_name, state_kwargs):
+        state = None
+        start = 0
+        payload = store.get(function_name, state_kwargs)
+        if payload is not None:
+            try:
+                committed = payload['committed']
+                position = timestamps.index(committed['timestamp'])
+                if np.allclose(bars[position], committed['bar'], rtol=1e-9, atol=0, equal_nan=True):
+                    restored = IndicatorState.from_dict(payload['state'])
+                    if restored.spec == IndicatorState().spec:
+                        state, start = restored, position + 1
+            except (KeyError, ValueError, TypeError) as e:
+                logging.info(f"Indicator state for {state_kwargs.get('symbol')} not reusable: {e}")
+            if state is None:
+                store.record_reset()
+        
+        if state is None:
+            state, values, columns = IndicatorState.from_history(*bars[:last].T)
+            rows = list(values)
+        elif start > last:
+            # 没有新的K线
+            return df.iloc[0:0]
+        else:
+            columns = state.columns
+            rows = [state.update(*bar) for bar in bars[start:last]]
+        
+        if last > 0:
+            store.put(function_name, state_kwargs, {
+                'committed': {'timestamp': timestamps[last - 1], 'bar': bars[last - 1].tolist()},
+                'state': state.to_dict(),
+            })
+        rows.append(state.copy().update(*bars[last]))
     
-    return df
+    new_bars = df.iloc[start:].reset_index(drop=True)
+    return join_indicator_columns(new_bars, np.array(rows, dtype='float64').reshape(len(rows), len(columns)), columns)
 
 
 def calculate_financial_health_scores(financial_row: pd.Series) -> dict:
@@ -939,20 +655,20 @@ def calculate_financial_health_scores(financial_row: pd.Series) -> dict:
     return scores
 
 
-def calculate_dynamic_valuation_indicators(symbol: str, retries: int = 5, timeout: float = 600) -> dict:
+def calculate_dynamic_valuation_indicators(symbol: str, retries: int = 5, timeout: float = 600, use_cache: bool = True) -> dict:
     """
     计算动态估值指标-指定股票代码
     基于stock_financial_analysis_indicator和stock_bid_ask_em接口
     """
     try:
         # 使用并行调用优化性能
-        financial_data, current_price_data = parallel_financial_data_calls(symbol, retries, timeout)
+        financial_data, current_price_data = parallel_financial_data_calls(symbol, retries, timeout, use_cache)
         
         if financial_data is None or financial_data.empty:
             return {"error": "无法获取财务数据"}
         
         # 获取最新年度数据（优先12月31日）
-        annual_data = financial_data[financial_data['日期'].str.contains('12-31', na=False)]
+        annual_data = financial_data[financial_data['日期'].astype(str).str.contains('12-31', na=False)]
         if not annual_data.empty:
             latest_financial = annual_data.iloc[-1]
             data_type = "年度数据"
@@ -1081,6 +797,7 @@ def calculate_historical_valuation_indicators(df: pd.DataFrame, symbol: str, ret
     计算历史估值指标-指定股票代码、周期(日频)、日期范围
     基于个股日频历史行情数据和财务数据，按日期排序计算历史估值指标
     统一使用早于计算日期的年报数据，按静态估值指标计算
+    返回的估值指标为数值列（无法计算时为NaN），输出前用 format_historical_valuation 转换为文本
     """
     try:
         # 使用缓存机制优化性能
@@ -1094,121 +811,10 @@ def calculate_historical_valuation_indicators(df: pd.DataFrame, symbol: str, ret
         # 预处理数据
         result_df = preprocess_data_for_indicators(df)
         
-        # 初始化所有历史估值指标列为object类型，避免dtype冲突
-        result_df['PE_历史'] = "N/A"
-        result_df['PB_历史'] = "N/A"
-        result_df['PCF_历史'] = "N/A"
-        result_df['PE_加权历史'] = "N/A"
-        result_df['PE_扣非历史'] = "N/A"
-        result_df['PB_调整后历史'] = "N/A"
-        result_df['每股资本公积金比率_历史'] = "N/A"
-        result_df['每股未分配利润比率_历史'] = "N/A"
-        result_df['PEG_历史'] = "N/A"
-        result_df['市净率×ROE_历史'] = "N/A"
-        result_df['财务数据时间点'] = "N/A"
-        
         print(f"找到 {len(financial_cache)} 个年报数据：{list(financial_cache.keys())}")
         
-        # 遍历每个交易日，使用缓存的财务数据
-        for index, row in result_df.iterrows():
-            # 确保收盘价是数值类型
-            current_price = pd.to_numeric(row['收盘'], errors='coerce')
-            
-            if pd.isna(current_price) or current_price <= 0:
-                continue
-            
-            # 获取当前交易日的日期
-            current_date = pd.to_datetime(row['日期'])
-            current_year = current_date.year
-            
-            # 找到适用的年报数据（早于当前交易日的最新年报）
-            applicable_years = [year for year in financial_cache.keys() if year < current_year]
-            if not applicable_years:
-                continue
-            
-            # 使用最新的年报数据
-            latest_year = max(applicable_years)
-            financial_data_row = financial_cache[latest_year]
-            
-            # 计算基础估值指标（处理极限情况）
-            eps = financial_data_row['eps']
-            if pd.notna(eps) and eps > 0.01:
-                result_df.loc[index, 'PE_历史'] = str(round(current_price / eps, 2))
-            else:
-                result_df.loc[index, 'PE_历史'] = "N/A"
-            
-            bps = financial_data_row['bps']
-            if pd.notna(bps) and bps > 0.01:
-                result_df.loc[index, 'PB_历史'] = str(round(current_price / bps, 2))
-            else:
-                result_df.loc[index, 'PB_历史'] = "N/A"
-            
-            cps = financial_data_row['cps']
-            if pd.notna(cps) and cps > 0.01:
-                result_df.loc[index, 'PCF_历史'] = str(round(current_price / cps, 2))
-            else:
-                result_df.loc[index, 'PCF_历史'] = "N/A"
-            
-            # 计算扩展估值指标（处理极限情况）
-            w_eps = financial_data_row['w_eps']
-            if pd.notna(w_eps) and w_eps > 0.01:
-                result_df.loc[index, 'PE_加权历史'] = str(round(current_price / w_eps, 2))
-            else:
-                result_df.loc[index, 'PE_加权历史'] = "N/A"
-            
-            n_eps = financial_data_row['n_eps']
-            if pd.notna(n_eps) and n_eps > 0.01:
-                result_df.loc[index, 'PE_扣非历史'] = str(round(current_price / n_eps, 2))
-            else:
-                result_df.loc[index, 'PE_扣非历史'] = "N/A"
-            
-            adj_bps = financial_data_row['adj_bps']
-            if pd.notna(adj_bps) and adj_bps > 0.01:
-                result_df.loc[index, 'PB_调整后历史'] = str(round(current_price / adj_bps, 2))
-            else:
-                result_df.loc[index, 'PB_调整后历史'] = "N/A"
-            
-            # 计算每股价值指标（处理极限情况）
-            cap_reserve = financial_data_row['cap_reserve']
-            if pd.notna(cap_reserve) and cap_reserve > 0.01:
-                result_df.loc[index, '每股资本公积金比率_历史'] = str(round(current_price / cap_reserve, 2))
-            else:
-                result_df.loc[index, '每股资本公积金比率_历史'] = "N/A"
-            
-            undist_profit = financial_data_row['undist_profit']
-            if pd.notna(undist_profit) and undist_profit > 0.01:
-                result_df.loc[index, '每股未分配利润比率_历史'] = str(round(current_price / undist_profit, 2))
-            else:
-                result_df.loc[index, '每股未分配利润比率_历史'] = "N/A"
-            
-            # 计算成长性估值指标（处理极限情况）
-            growth_rate = financial_data_row['growth_rate']
-            if (pd.notna(growth_rate) and growth_rate > 0.01 and 
-                result_df.loc[index, 'PE_历史'] != "N/A" and 
-                isinstance(result_df.loc[index, 'PE_历史'], str) and result_df.loc[index, 'PE_历史'].replace('.', '').isdigit()):
-                pe_value = float(result_df.loc[index, 'PE_历史'])
-                if pe_value > 0:
-                    result_df.loc[index, 'PEG_历史'] = str(round(pe_value / growth_rate, 2))
-                else:
-                    result_df.loc[index, 'PEG_历史'] = "N/A"
-            else:
-                result_df.loc[index, 'PEG_历史'] = "N/A"
-            
-            # 计算盈利能力估值指标（处理极限情况）
-            roe = financial_data_row['roe']
-            if (pd.notna(roe) and 
-                result_df.loc[index, 'PB_历史'] != "N/A" and 
-                isinstance(result_df.loc[index, 'PB_历史'], str) and result_df.loc[index, 'PB_历史'].replace('.', '').isdigit()):
-                pb_value = float(result_df.loc[index, 'PB_历史'])
-                if pb_value > 0:
-                    result_df.loc[index, '市净率×ROE_历史'] = str(round(pb_value * roe, 2))
-                else:
-                    result_df.loc[index, '市净率×ROE_历史'] = "N/A"
-            else:
-                result_df.loc[index, '市净率×ROE_历史'] = "N/A"
-            
-            # 添加财务数据时间点信息（转换为字符串以避免JSON序列化问题）
-            result_df.loc[index, '财务数据时间点'] = financial_data_row['date'].strftime('%Y-%m-%d')
+        # 按交易日所在年度与年报年度做as-of匹配，各估值比率整列计算为数值；"N/A"文本在输出阶段生成
+        result_df = add_historical_valuation_columns(result_df, financial_cache)
         
         return result_df
         
@@ -1218,7 +824,7 @@ def calculate_historical_valuation_indicators(df: pd.DataFrame, symbol: str, ret
         return df
 
 
-def calculate_stock_basic_info_summary(symbol: str, retries: int = 5, timeout: float = 600) -> dict:
+def calculate_stock_basic_info_summary(symbol: str, retries: int = 5, timeout: float = 600, use_cache: bool = True) -> dict:
     """
     计算个股基本信息汇总-指定股票代码
     整合多个接口，提供个股的全面基本信息
@@ -1272,7 +878,7 @@ def calculate_stock_basic_info_summary(symbol: str, retries: int = 5, timeout: f
         }
         
         # 使用并行调用优化性能
-        api_results = parallel_basic_info_calls(symbol, retries, timeout)
+        api_results = parallel_basic_info_calls(symbol, retries, timeout, use_cache)
         
         # 1. 处理证券资料 (ak.stock_individual_info_em)
         basic_info = api_results.get('basic_info')
@@ -1347,9 +953,10 @@ def calculate_stock_basic_info_summary(symbol: str, retries: int = 5, timeout: f
                 market_symbol = symbol  # 如果已经包含市场标识，直接使用
             
             business_structure = safe_ak_call(
-                ak.stock_zygc_em,
+                "stock_zygc_em",
                 retries=2,  # 现在接口稳定了，可以增加重试次数
                 timeout=timeout,
+                use_cache=use_cache,
                 symbol=market_symbol
             )
             if business_structure is not None and not business_structure.empty:
@@ -1568,6 +1175,8 @@ def get_indicator_columns(indicator_type: str, period: str = "daily") -> list:
             # 元数据
             '财务数据时间点'
         ]
+    elif indicator_type == "batch_valuation_screener":
+        return list(BATCH_VALUATION_COLUMNS)
     elif indicator_type == "stock_basic_info_summary":
         return [
             # 证券资料 (ak.stock_individual_info_em)
@@ -1618,6 +1227,10 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
                 yield from self._handle_basic_info_summary(params, context)
             elif params['indicator'] == "dynamic_valuation_indicators":
                 yield from self._handle_dynamic_valuation(params, context)
+            elif params['indicator'] == "batch_valuation_screener":
+                yield from self._handle_batch_valuation(params, context)
+            elif len(params['symbols']) > 1:
+                yield from self._handle_panel_indicators(params, context)
             else:
                 yield from self._handle_historical_indicators(params, context)
                 
@@ -1658,6 +1271,49 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
             
             retries = int(tool_parameters.get("retries", 5))
             timeout = float(tool_parameters.get("timeout", 600))
+            use_cache = parse_bool_param(tool_parameters.get("use_cache"), True)
+            incremental = parse_bool_param(tool_parameters.get("incremental"), False)
+            panel_output = parse_panel_output(tool_parameters.get("panel_output"))
+            output_mode = parse_output_mode(tool_parameters.get("output_mode"))
+            json_layout = parse_json_layout(tool_parameters.get("json_layout"))
+            report_date = str(tool_parameters.get("report_date") or "").strip()
+            try:
+                query = parse_query_params(tool_parameters)
+            except QueryError as query_error:
+                raise DataValidationError(
+                    message=f"查询参数格式错误: {query_error}",
+                    validation_type="invalid_format",
+                    details={'fields': ['columns', 'filter', 'sort_by', 'limit'], 'error': str(query_error)}
+                )
+            
+            # 市场估值筛选覆盖全部A股，不使用股票代码和日期范围，只需要报告期
+            if indicator == "batch_valuation_screener":
+                if report_date:
+                    try:
+                        parsed_report_date = pd.to_datetime(report_date, format="%Y%m%d")
+                    except Exception:
+                        parsed_report_date = None
+                    if parsed_report_date is None or parsed_report_date.strftime("%m%d") not in ("0331", "0630", "0930", "1231"):
+                        raise DataValidationError(
+                            message="报告期格式错误，请使用季末日期（YYYY0331、YYYY0630、YYYY0930、YYYY1231）",
+                            validation_type="invalid_format",
+                            details={'field': 'report_date', 'value': report_date}
+                        )
+                else:
+                    # 默认使用全部公司均已披露的最近一期年报
+                    report_date = latest_disclosed_report_period(annual_only=True)
+                return {
+                    'symbol': symbol,
+                    'symbols': parse_symbols(symbol),
+                    'indicator': indicator,
+                    'report_date': report_date,
+                    'query': query,
+                    'retries': retries,
+                    'timeout': timeout,
+                    'use_cache': use_cache,
+                    'output_mode': output_mode,
+                    'json_layout': json_layout
+                }
             
             # 参数验证
             if not symbol:
@@ -1667,6 +1323,15 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
                     details={'field': 'symbol', 'value': symbol}
                 )
             
+            # 多个股票代码（逗号分隔）只支持日/周/月频趋势动量震荡指标的面板计算
+            symbols = parse_symbols(symbol)
+            if len(symbols) > 1 and indicator != "trend_momentum_oscillator":
+                raise DataValidationError(
+                    message="多个股票代码仅支持趋势动量震荡指标(trend_momentum_oscillator)",
+                    validation_type="invalid_value",
+                    details={'field': 'symbol', 'value': symbol, 'indicator': indicator}
+                )
+            
             # 根据指标类型确定使用的周期参数
             if indicator == "trend_momentum_oscillator_minute":
                 period = period_minute
@@ -1717,6 +1382,7 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
             
             return {
                 'symbol': symbol,
+                'symbols': symbols,
                 'start_date': start_date,
                 'end_date': end_date,
                 'period': period,
@@ -1725,7 +1391,13 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
                 'adjust': adjust,
                 'indicator': indicator,
                 'retries': retries,
-                'timeout': timeout
+                'timeout': timeout,
+                'use_cache': use_cache,
+                'incremental': incremental,
+                'panel_output': panel_output,
+                'query': query,
+                'output_mode': output_mode,
+                'json_layout': json_layout
             }
             
         except DataValidationError:
@@ -1778,7 +1450,8 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
             summary_result = calculate_stock_basic_info_summary(
                 params['symbol'], 
                 params['retries'], 
-                params['timeout']
+                params['timeout'],
+                params['use_cache']
             )
             
             if "error" in summary_result:
@@ -1789,11 +1462,13 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
                 )
             
             # 格式化为Markdown表格
-            text_output = self._format_basic_info_as_table(summary_result)
-            yield self.create_text_message(text_output)
+            if params['output_mode'] != 'json':
+                text_output = self._format_basic_info_as_table(summary_result)
+                yield self.create_text_message(text_output)
             
             # 输出JSON数据
-            yield self.create_json_message({"data": summary_result})
+            if params['output_mode'] != 'text':
+                yield self.create_json_message({"data": summary_result})
             context.add_step("基本信息汇总输出", success=True)
                 
         except StockDataError:
@@ -1863,7 +1538,8 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
             valuation_result = calculate_dynamic_valuation_indicators(
                 params['symbol'], 
                 params['retries'], 
-                params['timeout']
+                params['timeout'],
+                params['use_cache']
             )
             
             if "error" in valuation_result:
@@ -1877,7 +1553,7 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
             valuation_df = pd.DataFrame([valuation_result])
             
             # 输出结果 - 使用兼容的Markdown格式
-            yield from self._output_compatible_markdown(valuation_df)
+            yield from self._output_compatible_markdown(valuation_df, params['output_mode'], params['json_layout'])
             context.add_step("动态估值指标输出", success=True)
                 
         except StockDataError:
@@ -1889,6 +1565,49 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
                 details={'symbol': params['symbol'], 'error': str(e)}
             )
     
+    def _handle_batch_valuation(self, params: Dict[str, Any], context: ErrorContext) -> Generator[ToolInvokeMessage]:
+        """处理市场估值筛选：获取四张整表，一次合并计算全部A股的估值指标，再按查询参数筛选排序"""
+        try:
+            context.add_step("整表数据获取", success=True)
+            tables = fetch_screener_tables(
+                params['report_date'],
+                params['retries'],
+                params['timeout'],
+                params['use_cache']
+            )
+            missing_tables = [name for name in REQUIRED_TABLES if tables.get(name) is None]
+            if missing_tables:
+                raise DataFetchError(
+                    message=f"市场估值筛选数据获取失败: {', '.join(missing_tables)}",
+                    api_name=missing_tables[0],
+                    details={'report_date': params['report_date']}
+                )
+            
+            context.add_step("批量估值计算", success=True)
+            result_df = compute_batch_valuation(tables, params['report_date'])
+            del tables
+            try:
+                result_df = apply_query(result_df, params['query'])
+            except QueryError as query_error:
+                raise DataValidationError(
+                    message=f"查询参数错误: {query_error}",
+                    validation_type="invalid_value",
+                    details={'fields': ['columns', 'filter', 'sort_by', 'limit'], 'error': str(query_error)}
+                )
+            result_df = ensure_json_serializable(result_df)
+            
+            yield from self._output_compatible_markdown(result_df, params['output_mode'], params['json_layout'])
+            context.add_step("批量估值输出", success=True)
+        
+        except StockDataError:
+            raise
+        except Exception as e:
+            raise CalculationError(
+                message=f"市场估值筛选计算错误: {str(e)}",
+                indicator_type="batch_valuation_screener",
+                details={'report_date': params['report_date'], 'error': str(e)}
+            )
+    
     def _handle_historical_indicators(self, params: Dict[str, Any], context: ErrorContext) -> Generator[ToolInvokeMessage]:
         """处理历史指标计算"""
         try:
@@ -1898,9 +1617,10 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
             if params['indicator'] == "trend_momentum_oscillator_minute":
                 # 分钟级数据获取
                 result = safe_ak_call(
-                    ak.stock_zh_a_hist_min_em,
+                    "stock_zh_a_hist_min_em",
                     retries=params['retries'],
                     timeout=params['timeout'],
+                    use_cache=params['use_cache'],
                     symbol=params['symbol'],
                     start_date=params['start_date'],
                     end_date=params['end_date'],
@@ -1910,9 +1630,10 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
             else:
                 # 日/周/月级数据获取
                 result = safe_ak_call(
-                    ak.stock_zh_a_hist,
+                    "stock_zh_a_hist",
                     retries=params['retries'],
                     timeout=params['timeout'],
+                    use_cache=params['use_cache'],
                     symbol=params['symbol'],
                     period=params['period'],
                     start_date=params['start_date'],
@@ -1935,7 +1656,14 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
             df = preprocess_data_for_indicators(result)
                 
                 # 根据指标类型选择计算函数
-            if params['indicator'] == "trend_momentum_oscillator":
+            if params['incremental'] and params['indicator'] in ("trend_momentum_oscillator", "trend_momentum_oscillator_minute"):
+                # 增量模式：从保存的指标状态继续递推，只输出新增K线
+                df = calculate_trend_momentum_incremental(
+                    df,
+                    "stock_zh_a_hist_min_em" if params['indicator'] == "trend_momentum_oscillator_minute" else "stock_zh_a_hist",
+                    {'symbol': params['symbol'], 'period': params['period'], 'adjust': params['adjust']}
+                )
+            elif params['indicator'] == "trend_momentum_oscillator":
                 df = calculate_trend_momentum_oscillator(df, params['period'])
             elif params['indicator'] == "trend_momentum_oscillator_minute":
                 df = calculate_trend_momentum_oscillator_minute(df, params['period'])
@@ -1952,6 +1680,9 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
             # 只选择实际存在的列
             available_columns = [col for col in output_columns if col in df.columns]
             result_df = df[available_columns].copy()
+            if params['indicator'] == "historical_valuation_indicators":
+                # 估值指标保留两位小数输出为文本，无法计算的为"N/A"（须在压缩数值类型之前转换）
+                result_df = format_historical_valuation(result_df)
             
             # 优化内存使用
             result_df = optimize_dataframe_memory(result_df)
@@ -2005,7 +1736,7 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
                         pass
             
             # 输出结果 - 使用兼容的Markdown格式
-            yield from self._output_compatible_markdown(result_df)
+            yield from self._output_compatible_markdown(result_df, params['output_mode'], params['json_layout'])
             context.add_step("历史指标输出", success=True)
         
         except StockDataError:
@@ -2017,12 +1748,81 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
                 details={'symbol': params['symbol'], 'error': str(e)}
             )
     
-    def _output_compatible_markdown(self, df: pd.DataFrame) -> Generator[ToolInvokeMessage]:
-        """输出兼容的Markdown表格格式，确保与Markdown转XLSX节点兼容"""
+    def _handle_panel_indicators(self, params: Dict[str, Any], context: ErrorContext) -> Generator[ToolInvokeMessage]:
+        """处理多只股票的趋势动量震荡指标：并发获取K线，对齐为二维面板后一次向量化计算"""
+        symbols = params['symbols']
+        try:
+            context.add_step("多股票历史数据获取", success=True)
+            latest_only = params['panel_output'] == 'latest'
+            output_columns = get_indicator_columns(params['indicator'], params['period'])
+            indicator_names = set(indicator_columns())
+            extra_columns = [col for col in output_columns if col != '日期' and col not in indicator_names]
+            
+            def fetch(symbol: str):
+                result = safe_ak_call(
+                    "stock_zh_a_hist",
+                    retries=params['retries'],
+                    timeout=params['timeout'],
+                    use_cache=params['use_cache'],
+                    symbol=symbol,
+                    period=params['period'],
+                    start_date=params['start_date'],
+                    end_date=params['end_date'],
+                    adjust=params['adjust']
+                )
+                if result is None or result.empty or len(result.columns) == 0:
+                    return None
+                missing_columns = [col for col in ['开盘', '收盘', '最高', '最低', '成交量'] if col not in result.columns]
+                if missing_columns:
+                    raise ValueError(f"数据缺少必要列: {missing_columns}")
+                return compact_bars(preprocess_data_for_indicators(result), '日期', extra_columns, latest_only)
+            
+            bars, failures = fetch_panel_bars(symbols, fetch)
+            if not bars:
+                raise DataFetchError(
+                    message="所有股票均暂无历史数据，可能是无效的股票代码",
+                    api_name="stock_zh_a_hist",
+                    symbol=",".join(symbols[:10]),
+                    details={'start_date': params['start_date'], 'end_date': params['end_date'], 'failures': failures}
+                )
+            
+            context.add_step("面板指标计算", success=True)
+            df = compute_panel_indicators(bars, '日期', extra_columns, latest_only=latest_only)
+            
+            # 面板中的行情列统一为float64：数据源没有提供的列整列为空，不输出；整数列（如成交量）恢复为整数
+            empty_columns = [col for col in extra_columns if df[col].isna().all()]
+            for col in extra_columns:
+                if col not in empty_columns and df[col].notna().all() and (df[col] % 1 == 0).all():
+                    df[col] = df[col].astype('int64')
+            result_df = df[['代码'] + [col for col in output_columns if col in df.columns and col not in empty_columns]]
+            result_df = optimize_dataframe_memory(result_df)
+            result_df['日期'] = pd.to_datetime(result_df['日期']).dt.strftime('%Y-%m-%d')
+            result_df = ensure_json_serializable(result_df)
+            
+            if failures and params['output_mode'] in ('both', 'text'):
+                yield self.create_text_message(f"以下{len(failures)}只股票未获取到数据：{', '.join(failures)}\n")
+            yield from self._output_compatible_markdown(result_df, params['output_mode'], params['json_layout'])
+            context.add_step("面板指标输出", success=True)
+        
+        except StockDataError:
+            raise
+        except Exception as e:
+            raise CalculationError(
+                message=f"多股票指标计算错误: {str(e)}",
+                indicator_type=params['indicator'],
+                details={'symbols': symbols, 'error': str(e)}
+            )
+    
+    def _output_compatible_markdown(
+        self, df: pd.DataFrame, output_mode: str = 'both', json_layout: str = 'records'
+    ) -> Generator[ToolInvokeMessage]:
+        """输出兼容的Markdown表格格式，确保与Markdown转XLSX节点兼容；output_mode见 parse_output_mode，json_layout见 parse_json_layout"""
         try:
+            if output_mode in ('summary', 'file'):
+                yield from process_dataframe_output(df, self, output_mode=output_mode, json_layout=json_layout)
+                return
             if df.empty:
-                yield self.create_text_message("暂无数据")
-                yield self.create_json_message({"data": []})
+                yield from handle_empty_result(self, output_mode)
                 return
             
             # 预处理数据，确保数值格式正确
@@ -2037,17 +1837,20 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
                     # 其他列转换为字符串
                     df_clean[col] = df_clean[col].astype(str)
             
-            # 生成兼容的Markdown表格
-            markdown_text = self._generate_compatible_markdown_table(df_clean)
-            
-            # 输出文本和JSON
-            yield self.create_text_message(markdown_text)
-            yield self.create_json_message({"data": df_clean.to_dict('records')})
+            # 生成兼容的Markdown表格并输出文本和JSON
+            if output_mode != 'json':
+                markdown_text = self._generate_compatible_markdown_table(df_clean)
+                yield self.create_text_message(markdown_text)
+            if output_mode != 'text':
+                if json_layout == 'records':
+                    yield self.create_json_message({"data": df_clean.to_dict('records')})
+                else:
+                    yield self.create_json_message(dataframe_to_json_payload(df_clean, json_layout))
             
         except Exception as e:
             logging.error(f"Error generating compatible markdown: {e}")
             # 回退到标准输出
-            yield from process_dataframe_output(df, self)
+            yield from process_dataframe_output(df, self, output_mode=output_mode, json_layout=json_layout)
     
     def _format_number(self, x):
         """格式化数字，避免科学计数法"""
@@ -2070,32 +1873,5 @@ class StockComprehensiveTechnicalIndicatorsTool(Tool):
         if df.empty:
             return "暂无数据"
         
-        # 获取列名
-        columns = df.columns.tolist()
-        
-        # 构建表头 - 确保格式完全符合标准
-        markdown = "| " + " | ".join(columns) + " |\n"
-        markdown += "| " + " | ".join(["---"] * len(columns)) + " |\n"
-        
-        # 构建数据行
-        for idx, row in df.iterrows():
-            row_data = []
-            for col in columns:
-                value = row[col]
-                # 处理NaN值
-                if pd.isna(value) or value == 'nan' or value == '':
-                    value = ""
-                else:
-                    value = str(value)
-                    # 清理特殊字符，确保Markdown兼容
-                    value = value.replace('|', '\\|')  # 转义管道符
-                    value = value.replace('\n', ' ')   # 替换换行符
-                    value = value.replace('\r', ' ')   # 替换回车符
-                    value = value.replace('\t', ' ')   # 替换制表符
-                    # 确保值不为空
-                    if value.strip() == '':
-                        value = ""
-                row_data.append(value)
-            markdown += "| " + " | ".join(row_data) + " |\n"
-        
-        return markdown
+        # 缺失值和空白文本显示为空单元格，管道符转义，换行和制表符替换为空格
+        return render_markdown_table(df, blank_missing=True) + "\n"
@@ -2,12 +2,12 @@ from collections.abc import Generator
 from typing import Any
 import pandas as pd
 
-import akshare as ak
 from provider.akshare_stockdata import safe_ak_call, build_error_payload
+from provider.akshare_query import QueryError
 from provider.akshare_registry import get_interface_config
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, validate_required_params, handle_akshare_error, validate_stock_symbol
+from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, validate_required_params, handle_akshare_error, validate_stock_symbol, parse_bool_param, parse_output_mode, parse_json_layout, parse_query_params, handle_query_error
 
 
 class StockFinancialAnalysisTool(Tool):
@@ -26,6 +26,14 @@ class StockFinancialAnalysisTool(Tool):
             report_type = tool_parameters.get("report_type", "")  # 报表类型
             report_type_sina = tool_parameters.get("report_type_sina", "")  # 新浪报表类型
             retries = int(tool_parameters.get("retries", 5))
+            use_cache = parse_bool_param(tool_parameters.get("use_cache"), True)
+            output_mode = parse_output_mode(tool_parameters.get("output_mode"))
+            json_layout = parse_json_layout(tool_parameters.get("json_layout"))
+            try:
+                query = parse_query_params(tool_parameters)
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             timeout = float(tool_parameters.get("timeout", 600))
             
             logging.info(f"Interface: {interface}, Symbol: {symbol}, Date: {date}, IndicatorTHS: {indicator_ths}, IndicatorHK: {indicator_hk}, IndicatorUS: {indicator_us}, StartYear: {start_year}, ReportType: {report_type}, ReportTypeSina: {report_type_sina}, Retries: {retries}, Timeout: {timeout}")
@@ -45,8 +53,9 @@ class StockFinancialAnalysisTool(Tool):
         interface_configs = {
             # 日期类接口（需要date参数）- 业绩快报
             "stock_yjbb_em": {
-                "fn": ak.stock_yjbb_em,
+                "fn": "stock_yjbb_em",
                 "requires_date": True,
+                "temporal_params": {"date": "report_period"},
                 "requires_symbol": False,
                 "requires_indicator": False,
                 "requires_start_year": False,
@@ -55,8 +64,9 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {}
             },
             "stock_yjkb_em": {
-                "fn": ak.stock_yjkb_em,
+                "fn": "stock_yjkb_em",
                 "requires_date": True,
+                "temporal_params": {"date": "report_period"},
                 "requires_symbol": False,
                 "requires_indicator": False,
                 "requires_start_year": False,
@@ -65,8 +75,9 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {}
             },
             "stock_yjyg_em": {
-                "fn": ak.stock_yjyg_em,
+                "fn": "stock_yjyg_em",
                 "requires_date": True,
+                "temporal_params": {"date": "report_period"},
                 "requires_symbol": False,
                 "requires_indicator": False,
                 "requires_start_year": False,
@@ -75,8 +86,9 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {}
             },
             "stock_lrb_em": {
-                "fn": ak.stock_lrb_em,
+                "fn": "stock_lrb_em",
                 "requires_date": True,
+                "temporal_params": {"date": "report_period"},
                 "requires_symbol": False,
                 "requires_indicator": False,
                 "requires_start_year": False,
@@ -85,8 +97,9 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {}
             },
             "stock_xjll_em": {
-                "fn": ak.stock_xjll_em,
+                "fn": "stock_xjll_em",
                 "requires_date": True,
+                "temporal_params": {"date": "report_period"},
                 "requires_symbol": False,
                 "requires_indicator": False,
                 "requires_start_year": False,
@@ -95,8 +108,9 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {}
             },
             "stock_zcfz_em": {
-                "fn": ak.stock_zcfz_em,
+                "fn": "stock_zcfz_em",
                 "requires_date": True,
+                "temporal_params": {"date": "report_period"},
                 "requires_symbol": False,
                 "requires_indicator": False,
                 "requires_start_year": False,
@@ -105,8 +119,9 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {}
             },
             "stock_zcfz_bj_em": {
-                "fn": ak.stock_zcfz_bj_em,
+                "fn": "stock_zcfz_bj_em",
                 "requires_date": True,
+                "temporal_params": {"date": "report_period"},
                 "requires_symbol": False,
                 "requires_indicator": False,
                 "requires_start_year": False,
@@ -116,7 +131,7 @@ class StockFinancialAnalysisTool(Tool):
             },
             # 新浪财务报表接口（需要symbol和report_type_sina参数）
             "stock_financial_report_sina": {
-                "fn": ak.stock_financial_report_sina,
+                "fn": "stock_financial_report_sina",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": False,
@@ -127,7 +142,7 @@ class StockFinancialAnalysisTool(Tool):
             },
             # 财务报表接口（需要symbol参数）
             "stock_balance_sheet_by_report_em": {
-                "fn": ak.stock_balance_sheet_by_report_em,
+                "fn": "stock_balance_sheet_by_report_em",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": False,
@@ -137,7 +152,7 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol"}
             },
             "stock_balance_sheet_by_yearly_em": {
-                "fn": ak.stock_balance_sheet_by_yearly_em,
+                "fn": "stock_balance_sheet_by_yearly_em",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": False,
@@ -147,7 +162,7 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol"}
             },
             "stock_profit_sheet_by_report_em": {
-                "fn": ak.stock_profit_sheet_by_report_em,
+                "fn": "stock_profit_sheet_by_report_em",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": False,
@@ -157,7 +172,7 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol"}
             },
             "stock_profit_sheet_by_yearly_em": {
-                "fn": ak.stock_profit_sheet_by_yearly_em,
+                "fn": "stock_profit_sheet_by_yearly_em",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": False,
@@ -167,7 +182,7 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol"}
             },
             "stock_profit_sheet_by_quarterly_em": {
-                "fn": ak.stock_profit_sheet_by_quarterly_em,
+                "fn": "stock_profit_sheet_by_quarterly_em",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": False,
@@ -177,7 +192,7 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol"}
             },
             "stock_cash_flow_sheet_by_report_em": {
-                "fn": ak.stock_cash_flow_sheet_by_report_em,
+                "fn": "stock_cash_flow_sheet_by_report_em",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": False,
@@ -187,7 +202,7 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol"}
             },
             "stock_cash_flow_sheet_by_yearly_em": {
-                "fn": ak.stock_cash_flow_sheet_by_yearly_em,
+                "fn": "stock_cash_flow_sheet_by_yearly_em",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": False,
@@ -197,7 +212,7 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol"}
             },
             "stock_cash_flow_sheet_by_quarterly_em": {
-                "fn": ak.stock_cash_flow_sheet_by_quarterly_em,
+                "fn": "stock_cash_flow_sheet_by_quarterly_em",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": False,
@@ -207,7 +222,7 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol"}
             },
             "stock_financial_debt_ths": {
-                "fn": ak.stock_financial_debt_ths,
+                "fn": "stock_financial_debt_ths",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": False,
@@ -218,7 +233,7 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol", "indicator": "report_type"}
             },
             "stock_financial_benefit_ths": {
-                "fn": ak.stock_financial_benefit_ths,
+                "fn": "stock_financial_benefit_ths",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": False,
@@ -229,7 +244,7 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol", "indicator": "report_type"}
             },
             "stock_financial_cash_ths": {
-                "fn": ak.stock_financial_cash_ths,
+                "fn": "stock_financial_cash_ths",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": False,
@@ -240,7 +255,7 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol", "indicator": "report_type"}
             },
             "stock_financial_abstract": {
-                "fn": ak.stock_financial_abstract,
+                "fn": "stock_financial_abstract",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": False,
@@ -250,7 +265,7 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol"}
             },
             "stock_financial_abstract_ths": {
-                "fn": ak.stock_financial_abstract_ths,
+                "fn": "stock_financial_abstract_ths",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": False,
@@ -261,7 +276,7 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol", "indicator": "indicator_ths"}
             },
             "stock_financial_analysis_indicator_em": {
-                "fn": ak.stock_financial_analysis_indicator_em,
+                "fn": "stock_financial_analysis_indicator_em",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": True,
@@ -271,7 +286,7 @@ class StockFinancialAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol", "indicator": "indicator_ths"}
             },
             "stock_financial_analysis_indicator": {
-                "fn": ak.stock_financial_analysis_indicator,
+                "fn": "stock_financial_analysis_indicator",
                 "requires_date": False,
                 "requires_symbol": True,
                 "requires_indicator": False,
@@ -467,6 +482,9 @@ class StockFinancialAnalysisTool(Tool):
             result = safe_ak_call(
                 config["fn"],
                 retries=retries,
+                use_cache=use_cache,
+                query=query,
+                temporal_params=config.get("temporal_params"),
                 timeout=interface_timeout,
                 **call_params
             )
@@ -483,11 +501,14 @@ class StockFinancialAnalysisTool(Tool):
                     yield self.create_json_message({"data": []})
                 else:
                     # 处理DataFrame输出
-                    yield from process_dataframe_output(result, self)
+                    yield from process_dataframe_output(result, self, output_mode=output_mode, json_layout=json_layout)
             else:
                 # 处理其他类型输出
-                yield from process_other_output(result, self)
+                yield from process_other_output(result, self, output_mode=output_mode)
                 
+        except QueryError as e:
+            yield from handle_query_error(e, self)
+            return
         except Exception as e:
             logging.error(f"Error in AKShare call: {e}")
             
@@ -2,12 +2,12 @@ from collections.abc import Generator
 from typing import Any
 import pandas as pd
 
-import akshare as ak
 from provider.akshare_stockdata import safe_ak_call, build_error_payload
+from provider.akshare_query import QueryError
 from provider.akshare_registry import get_interface_config
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, validate_required_params, handle_akshare_error, validate_stock_symbol
+from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, validate_required_params, handle_akshare_error, validate_stock_symbol, parse_bool_param, parse_output_mode, parse_json_layout, parse_query_params, handle_query_error
 
 
 class StockFundFlowAnalysisTool(Tool):
@@ -26,6 +26,14 @@ class StockFundFlowAnalysisTool(Tool):
             symbol = tool_parameters.get("symbol", "")  # 排行类别
             adjust = tool_parameters.get("adjust", "")  # 复权方式
             retries = int(tool_parameters.get("retries", 5))
+            use_cache = parse_bool_param(tool_parameters.get("use_cache"), True)
+            output_mode = parse_output_mode(tool_parameters.get("output_mode"))
+            json_layout = parse_json_layout(tool_parameters.get("json_layout"))
+            try:
+                query = parse_query_params(tool_parameters)
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             timeout = float(tool_parameters.get("timeout", 600))
             
             logging.info(f"Interface: {interface}, StockCode: {stock_code}, Market: {market}, Indicator: {indicator}, SectorType: {sector_type}, MarketChoice: {market_choice}, IndustryNameConceptName: {industry_name_concept_name}, Symbol: {symbol}, Adjust: {adjust}, Retries: {retries}, Timeout: {timeout}")
@@ -45,7 +53,7 @@ class StockFundFlowAnalysisTool(Tool):
         interface_configs = {
             # 个股类接口
             "stock_individual_fund_flow": {
-                "fn": ak.stock_individual_fund_flow,
+                "fn": "stock_individual_fund_flow",
                 "requires_stock_code": True,
                 "requires_market": True,
                 "requires_indicator": False,
@@ -58,7 +66,7 @@ class StockFundFlowAnalysisTool(Tool):
                 "param_mapping": {"stock": "stock_code", "market": "market"}
             },
             "stock_individual_fund_flow_rank": {
-                "fn": ak.stock_individual_fund_flow_rank,
+                "fn": "stock_individual_fund_flow_rank",
                 "requires_stock_code": False,
                 "requires_market": False,
                 "requires_indicator": True,
@@ -71,7 +79,7 @@ class StockFundFlowAnalysisTool(Tool):
                 "param_mapping": {"indicator": "indicator"}
             },
             "stock_cyq_em": {
-                "fn": ak.stock_cyq_em,
+                "fn": "stock_cyq_em",
                 "requires_stock_code": True,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -85,7 +93,7 @@ class StockFundFlowAnalysisTool(Tool):
             },
             # 同花顺资金流接口
             "stock_fund_flow_individual": {
-                "fn": ak.stock_fund_flow_individual,
+                "fn": "stock_fund_flow_individual",
                 "requires_stock_code": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -99,7 +107,7 @@ class StockFundFlowAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol"}
             },
             "stock_fund_flow_concept": {
-                "fn": ak.stock_fund_flow_concept,
+                "fn": "stock_fund_flow_concept",
                 "requires_stock_code": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -113,7 +121,7 @@ class StockFundFlowAnalysisTool(Tool):
                 "param_mapping": {"symbol": "symbol"}
             },
             "stock_fund_flow_industry": {
-                "fn": ak.stock_fund_flow_industry,
+                "fn": "stock_fund_flow_industry",
                 "requires_stock_code": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -128,7 +136,7 @@ class StockFundFlowAnalysisTool(Tool):
             },
             # 市场类接口
             "stock_market_fund_flow": {
-                "fn": ak.stock_market_fund_flow,
+                "fn": "stock_market_fund_flow",
                 "requires_stock_code": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -141,7 +149,7 @@ class StockFundFlowAnalysisTool(Tool):
                 "param_mapping": {}
             },
             "stock_main_fund_flow": {
-                "fn": ak.stock_main_fund_flow,
+                "fn": "stock_main_fund_flow",
                 "requires_stock_code": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -155,7 +163,7 @@ class StockFundFlowAnalysisTool(Tool):
             },
             # 板块类接口
             "stock_sector_fund_flow_rank": {
-                "fn": ak.stock_sector_fund_flow_rank,
+                "fn": "stock_sector_fund_flow_rank",
                 "requires_stock_code": False,
                 "requires_market": False,
                 "requires_indicator": True,
@@ -168,7 +176,7 @@ class StockFundFlowAnalysisTool(Tool):
                 "param_mapping": {"indicator": "indicator", "sector_type": "sector_type"}
             },
             "stock_sector_fund_flow_summary": {
-                "fn": ak.stock_sector_fund_flow_summary,
+                "fn": "stock_sector_fund_flow_summary",
                 "requires_stock_code": False,
                 "requires_market": False,
                 "requires_indicator": True,
@@ -181,7 +189,7 @@ class StockFundFlowAnalysisTool(Tool):
                 "param_mapping": {"symbol": "industry_name_concept_name", "indicator": "indicator"}
             },
             "stock_sector_fund_flow_hist": {
-                "fn": ak.stock_sector_fund_flow_hist,
+                "fn": "stock_sector_fund_flow_hist",
                 "requires_stock_code": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -195,7 +203,7 @@ class StockFundFlowAnalysisTool(Tool):
             },
             # 概念类接口
             "stock_concept_fund_flow_hist": {
-                "fn": ak.stock_concept_fund_flow_hist,
+                "fn": "stock_concept_fund_flow_hist",
                 "requires_stock_code": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -209,7 +217,7 @@ class StockFundFlowAnalysisTool(Tool):
             },
             # 大单追踪接口
             "stock_fund_flow_big_deal": {
-                "fn": ak.stock_fund_flow_big_deal,
+                "fn": "stock_fund_flow_big_deal",
                 "requires_stock_code": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -223,7 +231,7 @@ class StockFundFlowAnalysisTool(Tool):
             },
             # 沪深港通资金流向接口
             "stock_hsgt_fund_flow_summary_em": {
-                "fn": ak.stock_hsgt_fund_flow_summary_em,
+                "fn": "stock_hsgt_fund_flow_summary_em",
                 "requires_stock_code": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -352,9 +360,14 @@ class StockFundFlowAnalysisTool(Tool):
             result = safe_ak_call(
                 config["fn"],
                 retries=retries,
+                use_cache=use_cache,
+                query=query,
                 timeout=interface_timeout,
                 **call_params
             )
+        except QueryError as e:
+            yield from handle_query_error(e, self)
+            return
         except Exception as e:
             # 检查是否是已知的AKShare接口问题
             error_msg = str(e)
@@ -392,23 +405,22 @@ class StockFundFlowAnalysisTool(Tool):
         
         # 处理结果
         if result is None:
-            yield from handle_empty_result(self)
+            yield from handle_empty_result(self, output_mode)
             return
         
         # 检查是否为空
         if hasattr(result, 'empty') and result.empty:
-            yield from handle_empty_result(self)
+            yield from handle_empty_result(self, output_mode)
             return
         
         # 输出处理
         if isinstance(result, pd.DataFrame):
-            yield from process_dataframe_output(result, self)
+            yield from process_dataframe_output(result, self, output_mode=output_mode, json_layout=json_layout)
         else:
-            yield from process_other_output(result, self)
+            yield from process_other_output(result, self, output_mode=output_mode)
     
     def _handle_invalid_sector_name(self, error, interface, call_params):
         """处理行业名称或概念名称错误的情况"""
-        import akshare as ak
         import logging
         
         try:
@@ -436,13 +448,12 @@ class StockFundFlowAnalysisTool(Tool):
     
     def _get_industry_names(self, error):
         """获取行业名称列表"""
-        import akshare as ak
         import logging
         
         try:
             # 获取可用的行业名称列表
-            industry_names_df = ak.stock_board_industry_name_em()
-            if not industry_names_df.empty and '板块名称' in industry_names_df.columns:
+            industry_names_df = safe_ak_call("stock_board_industry_name_em", retries=1)
+            if isinstance(industry_names_df, pd.DataFrame) and not industry_names_df.empty and '板块名称' in industry_names_df.columns:
                 available_names = industry_names_df['板块名称'].tolist()[:20]  # 取前20个作为示例
                 names_text = "、".join(available_names)
                 
@@ -476,13 +487,12 @@ class StockFundFlowAnalysisTool(Tool):
     
     def _get_concept_names(self, error):
         """获取概念名称列表"""
-        import akshare as ak
         import logging
         
         try:
             # 获取可用的概念名称列表
-            concept_names_df = ak.stock_board_concept_name_em()
-            if not concept_names_df.empty and '板块名称' in concept_names_df.columns:
+            concept_names_df = safe_ak_call("stock_board_concept_name_em", retries=1)
+            if isinstance(concept_names_df, pd.DataFrame) and not concept_names_df.empty and '板块名称' in concept_names_df.columns:
                 available_names = concept_names_df['板块名称'].tolist()[:20]  # 取前20个作为示例
                 names_text = "、".join(available_names)
                 
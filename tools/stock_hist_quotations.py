@@ -2,8 +2,8 @@ from collections.abc import Generator
 from typing import Any
 import pandas as pd
 
-import akshare as ak
 from provider.akshare_stockdata import safe_ak_call, build_error_payload
+from provider.akshare_query import QueryError
 from provider.akshare_registry import get_interface_config, normalize_symbol_with_market_prefix, normalize_symbol_with_uppercase_prefix
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
@@ -17,7 +17,8 @@ from .common_utils import (
     validate_period,
     validate_date_range,
     validate_adjust,
-    process_symbol_format
+    process_symbol_format,
+    parse_bool_param, parse_output_mode, parse_json_layout, parse_query_params, handle_query_error
 )
 
 
@@ -70,7 +71,7 @@ class StockHistQuotationsTool(Tool):
         interface_configs = {
             # A股相关接口
             "stock_zh_a_hist": {
-                "fn": ak.stock_zh_a_hist,
+                "fn": "stock_zh_a_hist",
                 "requires_symbol": True,
                 "requires_period": True,
                 "period_type": "historical",  # 历史行情类
@@ -79,7 +80,7 @@ class StockHistQuotationsTool(Tool):
                 "description": "东方财富网-沪深京A股-日频率数据-指定股票、周期、复权方式和指定日期区间"
             },
             "stock_zh_a_hist_tx": {
-                "fn": ak.stock_zh_a_hist_tx,
+                "fn": "stock_zh_a_hist_tx",
                 "requires_symbol": True,
                 "requires_period": False,
                 "requires_date_range": True,
@@ -88,7 +89,7 @@ class StockHistQuotationsTool(Tool):
                 "description": "东方财富网-沪深京A股-历史行情日频率数据-指定股票、复权方式和日期区间"
             },
             "stock_zh_a_hist_min_em": {
-                "fn": ak.stock_zh_a_hist_min_em,
+                "fn": "stock_zh_a_hist_min_em",
                 "requires_symbol": True,
                 "requires_period": True,
                 "period_type": "minute",  # 分时行情类
@@ -98,7 +99,7 @@ class StockHistQuotationsTool(Tool):
                 "description": "东方财富网-沪深京A股-每日分时行情-指定股票、分时周期、复权方式和日期区间"
             },
             "stock_intraday_em": {
-                "fn": ak.stock_intraday_em,
+                "fn": "stock_intraday_em",
                 "requires_symbol": True,
                 "requires_period": False,
                 "requires_date_range": False,
@@ -107,7 +108,7 @@ class StockHistQuotationsTool(Tool):
                 "description": "东方财富网-最近一个交易日-日内分时数据(包括盘前)-指定股票"
             },
             "stock_zh_a_hist_pre_min_em": {
-                "fn": ak.stock_zh_a_hist_pre_min_em,
+                "fn": "stock_zh_a_hist_pre_min_em",
                 "requires_symbol": True,
                 "requires_period": False,
                 "requires_date_range": False,
@@ -117,7 +118,7 @@ class StockHistQuotationsTool(Tool):
                 "description": "东方财富网-最近一个交易日-分钟数据(包括盘前)-指定股票、时间区间"
             },
             "stock_zh_a_tick_tx": {
-                "fn": ak.stock_zh_a_tick_tx_js,
+                "fn": "stock_zh_a_tick_tx_js",
                 "requires_symbol": True,
                 "requires_period": False,
                 "requires_date_range": False,
@@ -126,7 +127,7 @@ class StockHistQuotationsTool(Tool):
                 "description": "腾讯财经-最近交易日-历史分笔行情数据-指定股票"
             },
             "stock_zh_kcb_daily": {
-                "fn": ak.stock_zh_kcb_daily,
+                "fn": "stock_zh_kcb_daily",
                 "requires_symbol": True,
                 "requires_period": False,
                 "requires_date_range": False,
@@ -135,7 +136,7 @@ class StockHistQuotationsTool(Tool):
                 "description": "新浪财经-科创板股票历史行情数据-指定股票、复权方式"
             },
             "stock_zh_growth_comparison_em": {
-                "fn": ak.stock_zh_growth_comparison_em,
+                "fn": "stock_zh_growth_comparison_em",
                 "requires_symbol": True,
                 "requires_period": False,
                 "requires_date_range": False,
@@ -144,7 +145,7 @@ class StockHistQuotationsTool(Tool):
                 "description": "东方财富网-同行比较-成长性比较-指定股票"
             },
             "stock_zh_valuation_comparison_em": {
-                "fn": ak.stock_zh_valuation_comparison_em,
+                "fn": "stock_zh_valuation_comparison_em",
                 "requires_symbol": True,
                 "requires_period": False,
                 "requires_date_range": False,
@@ -153,7 +154,7 @@ class StockHistQuotationsTool(Tool):
                 "description": "东方财富网-同行比较-估值比较-指定股票"
             },
             "stock_zh_dupont_comparison_em": {
-                "fn": ak.stock_zh_dupont_comparison_em,
+                "fn": "stock_zh_dupont_comparison_em",
                 "requires_symbol": True,
                 "requires_period": False,
                 "requires_date_range": False,
@@ -162,7 +163,7 @@ class StockHistQuotationsTool(Tool):
                 "description": "东方财富网-同行比较-杜邦分析比较-指定股票"
             },
             "stock_zh_scale_comparison_em": {
-                "fn": ak.stock_zh_scale_comparison_em,
+                "fn": "stock_zh_scale_comparison_em",
                 "requires_symbol": True,
                 "requires_period": False,
                 "requires_date_range": False,
@@ -171,7 +172,7 @@ class StockHistQuotationsTool(Tool):
                 "description": "东方财富网-同行比较-公司规模-指定股票"
             },
             "stock_xgsr_ths": {
-                "fn": ak.stock_xgsr_ths,
+                "fn": "stock_xgsr_ths",
                 "requires_symbol": False,
                 "requires_period": False,
                 "requires_date_range": False,
@@ -259,6 +260,14 @@ class StockHistQuotationsTool(Tool):
         try:
             # 网络参数 - 统一处理逻辑
             retries = int(tool_parameters.get("retries", 5))
+            use_cache = parse_bool_param(tool_parameters.get("use_cache"), True)
+            output_mode = parse_output_mode(tool_parameters.get("output_mode"))
+            json_layout = parse_json_layout(tool_parameters.get("json_layout"))
+            try:
+                query = parse_query_params(tool_parameters)
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             timeout_param = tool_parameters.get("timeout")  # 让子进程根据接口类型自动决定超时时间
             timeout = float(timeout_param) if timeout_param is not None else None
             logging.info(f"Network params - retries: {retries}, timeout: {timeout} (auto-determined by interface type)")
@@ -353,9 +362,14 @@ class StockHistQuotationsTool(Tool):
                 result = safe_ak_call(
                     config["fn"],
                     retries=retries,
+                    use_cache=use_cache,
+                    query=query,
                     timeout=timeout,
                     **call_params
                 )
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             except Exception as e:
                 # 检查是否是SSL连接错误（历史数据接口也可能遇到）
                 error_msg = str(e)
@@ -375,19 +389,19 @@ class StockHistQuotationsTool(Tool):
             
             # 处理结果
             if result is None:
-                yield from handle_empty_result(self)
+                yield from handle_empty_result(self, output_mode)
                 return
             
             # 检查是否为空
             if hasattr(result, 'empty') and result.empty:
-                yield from handle_empty_result(self)
+                yield from handle_empty_result(self, output_mode)
                 return
             
             # 输出处理
             if isinstance(result, pd.DataFrame):
-                yield from process_dataframe_output(result, self)
+                yield from process_dataframe_output(result, self, output_mode=output_mode, json_layout=json_layout)
             else:
-                yield from process_other_output(result, self)
+                yield from process_other_output(result, self, output_mode=output_mode)
                 
         except Exception as e:
             import logging
@@ -2,12 +2,12 @@ from collections.abc import Generator
 from typing import Any
 import pandas as pd
 
-import akshare as ak
 from provider.akshare_stockdata import safe_ak_call, build_error_payload
+from provider.akshare_query import QueryError
 from provider.akshare_registry import get_interface_config
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, handle_akshare_error
+from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, handle_akshare_error, parse_bool_param, parse_output_mode, parse_json_layout, parse_query_params, handle_query_error
 
 
 class StockHkDataTool(Tool):
@@ -33,24 +33,24 @@ class StockHkDataTool(Tool):
         interface_configs = {
             # 港股实时行情接口
             "stock_hk_spot_em": {
-                "fn": ak.stock_hk_spot_em,
+                "fn": "stock_hk_spot_em",
                 "description": "港股-实时行情(延15分钟)"
             },
             "stock_hk_spot": {
-                "fn": ak.stock_hk_spot,
+                "fn": "stock_hk_spot",
                 "description": "新浪-港股-实时行情(延15分钟)"
             },
             "stock_hk_main_board_spot_em": {
-                "fn": ak.stock_hk_main_board_spot_em,
+                "fn": "stock_hk_main_board_spot_em",
                 "description": "港股主板-实时行情(延15分钟)"
             },
             "stock_hk_famous_spot_em": {
-                "fn": ak.stock_hk_famous_spot_em,
+                "fn": "stock_hk_famous_spot_em",
                 "description": "知名港股实时行情数据"
             },
             # 港股历史行情接口
             "stock_hk_hist": {
-                "fn": ak.stock_hk_hist,
+                "fn": "stock_hk_hist",
                 "requires_symbol": True,
                 "requires_period": True,
                 "requires_date_range": True,
@@ -58,7 +58,7 @@ class StockHkDataTool(Tool):
                 "description": "港股-历史行情数据-指定股票代码、周期、日期范围、复权方式"
             },
             "stock_hk_hist_min_em": {
-                "fn": ak.stock_hk_hist_min_em,
+                "fn": "stock_hk_hist_min_em",
                 "requires_symbol": True,
                 "requires_period": True,
                 "requires_date_range": True,
@@ -66,52 +66,52 @@ class StockHkDataTool(Tool):
                 "description": "港股-每日分时行情-指定股票代码、周期、日期范围、复权方式"
             },
             "stock_hk_daily": {
-                "fn": ak.stock_hk_daily,
+                "fn": "stock_hk_daily",
                 "requires_symbol": True,
                 "requires_adjust": True,
                 "description": "新浪-港股-历史行情数据-指定股票代码、复权方式"
             },
             # 港股个股信息接口
             "stock_hk_security_profile_em": {
-                "fn": ak.stock_hk_security_profile_em,
+                "fn": "stock_hk_security_profile_em",
                 "requires_symbol": True,
                 "description": "港股-个股-证券资料-指定股票代码"
             },
             "stock_hk_company_profile_em": {
-                "fn": ak.stock_hk_company_profile_em,
+                "fn": "stock_hk_company_profile_em",
                 "requires_symbol": True,
                 "description": "港股-个股-公司资料-指定股票代码"
             },
             "stock_hk_fhpx_detail_ths": {
-                "fn": ak.stock_hk_fhpx_detail_ths,
+                "fn": "stock_hk_fhpx_detail_ths",
                 "requires_symbol": True,
                 "description": "港股-个股-分红派息-指定股票代码"
             },
             "stock_hk_financial_indicator_em": {
-                "fn": ak.stock_hk_financial_indicator_em,
+                "fn": "stock_hk_financial_indicator_em",
                 "requires_symbol": True,
                 "description": "东方财富网-港股-个股-财务指标-指定股票代码"
             },
             "stock_hk_dividend_payout_em": {
-                "fn": ak.stock_hk_dividend_payout_em,
+                "fn": "stock_hk_dividend_payout_em",
                 "requires_symbol": True,
                 "description": "东方财富网-港股-个股-分红派息-指定股票代码"
             },
             "stock_hk_growth_comparison_em": {
-                "fn": ak.stock_hk_growth_comparison_em,
+                "fn": "stock_hk_growth_comparison_em",
                 "requires_symbol": True,
                 "description": "东方财富网-港股-个股-成长性对比-指定股票代码"
             },
             # 港股财务分析接口
             "stock_financial_hk_analysis_indicator_em": {
-                "fn": ak.stock_financial_hk_analysis_indicator_em,
+                "fn": "stock_financial_hk_analysis_indicator_em",
                 "requires_symbol": True,
                 "requires_indicator_hk": True,
                 "timeout": 600,
                 "description": "港股-财务分析-主要指标-指定股票代码、指标类型"
             },
             "stock_financial_hk_report_em": {
-                "fn": ak.stock_financial_hk_report_em,
+                "fn": "stock_financial_hk_report_em",
                 "requires_symbol": True,
                 "requires_report_type": True,
                 "requires_indicator_hk": True,
@@ -125,7 +125,7 @@ class StockHkDataTool(Tool):
             },
             # 沪深港通资金流向接口
             "stock_hsgt_fund_flow_summary_em": {
-                "fn": ak.stock_hsgt_fund_flow_summary_em,
+                "fn": "stock_hsgt_fund_flow_summary_em",
                 "description": "沪深港通资金流向"
             }
         }
@@ -218,6 +218,14 @@ class StockHkDataTool(Tool):
             
             # 获取重试次数和超时时间
             retries = tool_parameters.get("retries", 5)
+            use_cache = parse_bool_param(tool_parameters.get("use_cache"), True)
+            output_mode = parse_output_mode(tool_parameters.get("output_mode"))
+            json_layout = parse_json_layout(tool_parameters.get("json_layout"))
+            try:
+                query = parse_query_params(tool_parameters)
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             timeout = tool_parameters.get("timeout", 600)
             
             # 使用接口特定的超时时间
@@ -227,6 +235,8 @@ class StockHkDataTool(Tool):
             result = safe_ak_call(
                 config["fn"],
                 retries=retries,
+                use_cache=use_cache,
+                query=query,
                 timeout=interface_timeout,
                 **call_params
             )
@@ -244,10 +254,13 @@ class StockHkDataTool(Tool):
                     return
                 
                 # 处理DataFrame输出
-                yield from process_dataframe_output(result, self)
+                yield from process_dataframe_output(result, self, output_mode=output_mode, json_layout=json_layout)
             else:
                 # 处理其他类型输出
-                yield from process_other_output(result, self)
+                yield from process_other_output(result, self, output_mode=output_mode)
                 
+        except QueryError as e:
+            yield from handle_query_error(e, self)
+            return
         except Exception as e:
             yield from handle_akshare_error(e, self, f"接口: {interface}")
@@ -2,8 +2,8 @@ from collections.abc import Generator
 from typing import Any
 import pandas as pd
 
-import akshare as ak
 from provider.akshare_stockdata import safe_ak_call, build_error_payload
+from provider.akshare_query import QueryError
 from provider.akshare_registry import get_interface_config
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
@@ -15,7 +15,8 @@ from .common_utils import (
     handle_akshare_error, 
     validate_stock_symbol,
     validate_date_format,
-    validate_date_range
+    validate_date_range,
+    parse_bool_param, parse_output_mode, parse_json_layout, parse_query_params, handle_query_error
 )
 
 
@@ -52,7 +53,7 @@ class StockHsgtHoldingsTool(Tool):
         interface_configs = {
             # 结算汇率-深港通
             "stock_sgt_settlement_exchange_rate_szse": {
-                "fn": ak.stock_sgt_settlement_exchange_rate_szse,
+                "fn": "stock_sgt_settlement_exchange_rate_szse",
                 "requires_symbol": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -61,7 +62,7 @@ class StockHsgtHoldingsTool(Tool):
             },
             # 结算汇率-沪港通
             "stock_sgt_settlement_exchange_rate_sse": {
-                "fn": ak.stock_sgt_settlement_exchange_rate_sse,
+                "fn": "stock_sgt_settlement_exchange_rate_sse",
                 "requires_symbol": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -70,7 +71,7 @@ class StockHsgtHoldingsTool(Tool):
             },
             # 参考汇率-深港通
             "stock_sgt_reference_exchange_rate_szse": {
-                "fn": ak.stock_sgt_reference_exchange_rate_szse,
+                "fn": "stock_sgt_reference_exchange_rate_szse",
                 "requires_symbol": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -79,7 +80,7 @@ class StockHsgtHoldingsTool(Tool):
             },
             # 参考汇率-沪港通
             "stock_sgt_reference_exchange_rate_sse": {
-                "fn": ak.stock_sgt_reference_exchange_rate_sse,
+                "fn": "stock_sgt_reference_exchange_rate_sse",
                 "requires_symbol": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -88,7 +89,7 @@ class StockHsgtHoldingsTool(Tool):
             },
             # 港股通成份股
             "stock_hk_ggt_components_em": {
-                "fn": ak.stock_hk_ggt_components_em,
+                "fn": "stock_hk_ggt_components_em",
                 "requires_symbol": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -97,7 +98,7 @@ class StockHsgtHoldingsTool(Tool):
             },
             # 沪深港通分时数据 - 使用类别一（资金流向类）
             "stock_hsgt_fund_min_em": {
-                "fn": ak.stock_hsgt_fund_min_em,
+                "fn": "stock_hsgt_fund_min_em",
                 "requires_symbol": True,
                 "symbol_type": "fund_flow",  # 资金流向类
                 "requires_market": False,
@@ -107,7 +108,7 @@ class StockHsgtHoldingsTool(Tool):
             },
             # 板块排行 - 使用类别二（板块排行类）
             "stock_hsgt_board_rank_em": {
-                "fn": ak.stock_hsgt_board_rank_em,
+                "fn": "stock_hsgt_board_rank_em",
                 "requires_symbol": True,
                 "symbol_type": "board_ranking",  # 板块排行类
                 "requires_market": False,
@@ -119,7 +120,7 @@ class StockHsgtHoldingsTool(Tool):
             # （已移除）沪深港通持股-个股排行
             # 个股排行
             "stock_hsgt_hold_stock_em": {
-                "fn": ak.stock_hsgt_hold_stock_em,
+                "fn": "stock_hsgt_hold_stock_em",
                 "requires_symbol": False,
                 "requires_market": True,
                 "market_type": "stock_ranking",  # 个股排行类
@@ -130,7 +131,7 @@ class StockHsgtHoldingsTool(Tool):
             },
             # 沪深港通资金流向
             "stock_hsgt_fund_flow_summary_em": {
-                "fn": ak.stock_hsgt_fund_flow_summary_em,
+                "fn": "stock_hsgt_fund_flow_summary_em",
                 "requires_symbol": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -139,7 +140,7 @@ class StockHsgtHoldingsTool(Tool):
             },
             # 港股通实时行情
             "stock_hsgt_sh_hk_spot_em": {
-                "fn": ak.stock_hsgt_sh_hk_spot_em,
+                "fn": "stock_hsgt_sh_hk_spot_em",
                 "requires_symbol": False,
                 "requires_market": False,
                 "requires_indicator": False,
@@ -148,7 +149,7 @@ class StockHsgtHoldingsTool(Tool):
             },
             # 沪深港通历史数据 - 使用历史数据类别
             "stock_hsgt_hist_em": {
-                "fn": ak.stock_hsgt_hist_em,
+                "fn": "stock_hsgt_hist_em",
                 "requires_symbol": True,
                 "symbol_type": "historical_data",  # 历史数据类
                 "requires_market": False,
@@ -158,7 +159,7 @@ class StockHsgtHoldingsTool(Tool):
             },
             # 沪深港通持股-个股 - 使用类别三（个股类）
             "stock_hsgt_individual_em": {
-                "fn": ak.stock_hsgt_individual_em,
+                "fn": "stock_hsgt_individual_em",
                 "requires_symbol": True,
                 "symbol_type": "individual_stock",  # 个股类
                 "requires_market": False,
@@ -169,7 +170,7 @@ class StockHsgtHoldingsTool(Tool):
             # 沪深港通持股-个股详情 - 使用类别三（个股类）
             # 注意：该接口当前数据源不可用，暂时禁用
             # "stock_hsgt_individual_detail_em": {
-            #     "fn": ak.stock_hsgt_individual_detail_em,
+            #     "fn": "stock_hsgt_individual_detail_em",
             #     "requires_symbol": True,
             #     "symbol_type": "individual_stock",  # 个股类
             #     "requires_market": False,
@@ -284,6 +285,14 @@ class StockHsgtHoldingsTool(Tool):
         try:
             # 网络参数 - 统一处理逻辑
             retries = int(tool_parameters.get("retries", 5))
+            use_cache = parse_bool_param(tool_parameters.get("use_cache"), True)
+            output_mode = parse_output_mode(tool_parameters.get("output_mode"))
+            json_layout = parse_json_layout(tool_parameters.get("json_layout"))
+            try:
+                query = parse_query_params(tool_parameters)
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             timeout_param = tool_parameters.get("timeout")  # 让子进程根据接口类型自动决定超时时间
             timeout = float(timeout_param) if timeout_param is not None else None
             logging.info(f"Network params - retries: {retries}, timeout: {timeout} (auto-determined by interface type)")
@@ -424,9 +433,14 @@ class StockHsgtHoldingsTool(Tool):
                 result = safe_ak_call(
                     config["fn"],
                     retries=retries,
+                    use_cache=use_cache,
+                    query=query,
                     timeout=timeout,
                     **call_params
                 )
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             except Exception as e:
                 # 检查是否是已知的AKShare接口问题或网络问题
                 error_msg = str(e)
@@ -466,19 +480,19 @@ class StockHsgtHoldingsTool(Tool):
             
             # 处理结果
             if result is None:
-                yield from handle_empty_result(self)
+                yield from handle_empty_result(self, output_mode)
                 return
             
             # 检查是否为空
             if hasattr(result, 'empty') and result.empty:
-                yield from handle_empty_result(self)
+                yield from handle_empty_result(self, output_mode)
                 return
             
             # 输出处理
             if isinstance(result, pd.DataFrame):
-                yield from process_dataframe_output(result, self)
+                yield from process_dataframe_output(result, self, output_mode=output_mode, json_layout=json_layout)
             else:
-                yield from process_other_output(result, self)
+                yield from process_other_output(result, self, output_mode=output_mode)
                 
         except Exception as e:
             import logging
@@ -2,15 +2,17 @@ from collections.abc import Generator
 from typing import Any
 import pandas as pd
 
-import akshare as ak
 from provider.akshare_stockdata import safe_ak_call, build_error_payload
+from provider.akshare_query import QueryError
+from provider.akshare_query import apply_query
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
 from .common_utils import (
     process_dataframe_output, 
     process_other_output, 
     handle_empty_result, 
-    handle_akshare_error
+    handle_akshare_error,
+    parse_bool_param, parse_output_mode, parse_json_layout, parse_query_params, handle_query_error
 )
 from .stock_comprehensive_technical_indicators import (
     calculate_trend_momentum_oscillator,
@@ -36,6 +38,14 @@ class StockIndexDataTool(Tool):
             start_datetime = tool_parameters.get("start_datetime", "")
             end_datetime = tool_parameters.get("end_datetime", "")
             retries = int(tool_parameters.get("retries", 5))
+            use_cache = parse_bool_param(tool_parameters.get("use_cache"), True)
+            output_mode = parse_output_mode(tool_parameters.get("output_mode"))
+            json_layout = parse_json_layout(tool_parameters.get("json_layout"))
+            try:
+                query = parse_query_params(tool_parameters)
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             timeout = float(tool_parameters.get("timeout", 900))
             
             logging.info(f"Interface: {interface}, Symbol: {symbol}, Category: {index_category}, Period: {period}, PeriodMinute: {period_minute}")
@@ -50,7 +60,7 @@ class StockIndexDataTool(Tool):
             # 根据接口类型调用不同的函数
             if interface == "stock_zh_index_spot_sina":
                 # 新浪实时行情，不需要参数
-                result = safe_ak_call(ak.stock_zh_index_spot_sina, retries=retries, timeout=timeout)
+                result = safe_ak_call("stock_zh_index_spot_sina", retries=retries, timeout=timeout, use_cache=use_cache, query=query)
                 
             elif interface == "stock_zh_index_spot_em":
                 # 东方财富实时行情，需要指数类别参数
@@ -58,7 +68,7 @@ class StockIndexDataTool(Tool):
                     yield self.create_text_message("请选择指数类别")
                     yield self.create_json_message({"error": "index_category required for stock_zh_index_spot_em"})
                     return
-                result = safe_ak_call(ak.stock_zh_index_spot_em, symbol=index_category, retries=retries, timeout=timeout)
+                result = safe_ak_call("stock_zh_index_spot_em", symbol=index_category, retries=retries, timeout=timeout, use_cache=use_cache, query=query)
                 
             elif interface == "stock_zh_index_daily":
                 # 新浪历史数据，需要指数代码（带市场标识）
@@ -71,7 +81,7 @@ class StockIndexDataTool(Tool):
                     yield self.create_text_message(f"指数代码格式错误，新浪接口需要带市场标识（如sh000001、sz399552）")
                     yield self.create_json_message({"error": "Invalid symbol format for Sina interface"})
                     return
-                result = safe_ak_call(ak.stock_zh_index_daily, symbol=symbol, retries=retries, timeout=timeout)
+                result = safe_ak_call("stock_zh_index_daily", symbol=symbol, retries=retries, timeout=timeout, use_cache=use_cache, query=query)
                 
             elif interface == "stock_zh_index_daily_tx":
                 # 腾讯历史数据，需要指数代码（带市场标识）
@@ -84,7 +94,7 @@ class StockIndexDataTool(Tool):
                     yield self.create_text_message(f"指数代码格式错误，腾讯接口需要带市场标识（如sh000001、sz399552）")
                     yield self.create_json_message({"error": "Invalid symbol format for Tencent interface"})
                     return
-                result = safe_ak_call(ak.stock_zh_index_daily_tx, symbol=symbol.lower(), retries=retries, timeout=timeout)
+                result = safe_ak_call("stock_zh_index_daily_tx", symbol=symbol.lower(), retries=retries, timeout=timeout, use_cache=use_cache, query=query)
         
             elif interface == "stock_zh_index_daily_em":
                 # 东方财富历史数据，需要指数代码（带市场标识）、日期范围
@@ -102,11 +112,13 @@ class StockIndexDataTool(Tool):
                     yield self.create_json_message({"error": "date range required"})
                     return
                 result = safe_ak_call(
-                    ak.stock_zh_index_daily_em,
+                    "stock_zh_index_daily_em",
                     symbol=symbol.lower(),
                     start_date=start_date,
                     end_date=end_date,
                     retries=retries,
+                    use_cache=use_cache,
+                    query=query,
                     timeout=timeout
                 )
                 
@@ -127,12 +139,14 @@ class StockIndexDataTool(Tool):
                     yield self.create_json_message({"error": "date range required"})
                     return
                 result = safe_ak_call(
-                    ak.index_zh_a_hist,
+                    "index_zh_a_hist",
                     symbol=symbol_digits,
                     period=period,
                     start_date=start_date,
                     end_date=end_date,
                     retries=retries,
+                    use_cache=use_cache,
+                    query=query,
                     timeout=timeout
                 )
                 
@@ -153,12 +167,14 @@ class StockIndexDataTool(Tool):
                     yield self.create_json_message({"error": "datetime range required"})
                     return
                 result = safe_ak_call(
-                    ak.index_zh_a_hist_min_em,
+                    "index_zh_a_hist_min_em",
                     symbol=symbol_digits,
                     period=period_minute,
                     start_date=start_datetime,
                     end_date=end_datetime,
                     retries=retries,
+                    use_cache=use_cache,
+                    query=query,
                     timeout=timeout
                 )
                 
@@ -180,11 +196,12 @@ class StockIndexDataTool(Tool):
         
                 # 获取基础数据
                 result = safe_ak_call(
-                    ak.stock_zh_index_daily_em,
+                    "stock_zh_index_daily_em",
                     symbol=symbol.lower(),
                     start_date=start_date,
                     end_date=end_date,
                     retries=retries,
+                    use_cache=use_cache,
                     timeout=timeout
                 )
                 
@@ -197,6 +214,8 @@ class StockIndexDataTool(Tool):
                     # 转换日期为字符串格式
                     if '日期' in result.columns:
                         result['日期'] = result['日期'].dt.strftime('%Y-%m-%d')
+                    # 查询引用的是指标结果中的列，在计算指标之后执行
+                    result = apply_query(result, query)
                     
             elif interface == "index_trend_momentum_oscillator_minute":
                 # 指数趋势动量震荡指标（分钟），需要指数代码（纯数字）、分钟周期、日期时间范围
@@ -221,12 +240,13 @@ class StockIndexDataTool(Tool):
                 
                 # 获取基础数据
                 result = safe_ak_call(
-                    ak.index_zh_a_hist_min_em,
+                    "index_zh_a_hist_min_em",
                     symbol=symbol_digits,
                     period=period_minute,
                     start_date=start_datetime,
                     end_date=end_datetime,
                     retries=retries,
+                    use_cache=use_cache,
                     timeout=timeout
                 )
                 
@@ -244,6 +264,7 @@ class StockIndexDataTool(Tool):
                     # 转换时间为字符串格式
                     if '时间' in result.columns:
                         result['时间'] = result['时间'].dt.strftime('%Y-%m-%d %H:%M:%S')
+                    result = apply_query(result, query)
                 else:
                     result = pd.DataFrame()
                     
@@ -254,20 +275,23 @@ class StockIndexDataTool(Tool):
             
             # 处理结果
             if result is None:
-                yield from handle_empty_result(self)
+                yield from handle_empty_result(self, output_mode)
                 return
             
             # 检查是否为空
             if hasattr(result, 'empty') and result.empty:
-                yield from handle_empty_result(self)
+                yield from handle_empty_result(self, output_mode)
                 return
             
             # 输出处理
             if isinstance(result, pd.DataFrame):
-                yield from process_dataframe_output(result, self)
+                yield from process_dataframe_output(result, self, output_mode=output_mode, json_layout=json_layout)
             else:
-                yield from process_other_output(result, self)
+                yield from process_other_output(result, self, output_mode=output_mode)
                 
+        except QueryError as e:
+            yield from handle_query_error(e, self)
+            return
         except Exception as e:
             import logging
             logging.error(f"StockIndexDataTool error: {e}")
@@ -2,12 +2,12 @@ from collections.abc import Generator
 from typing import Any
 import pandas as pd
 
-import akshare as ak
 from provider.akshare_stockdata import safe_ak_call, build_error_payload
+from provider.akshare_query import QueryError
 from provider.akshare_registry import get_interface_config
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, validate_required_params, handle_akshare_error, validate_stock_symbol
+from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, validate_required_params, handle_akshare_error, validate_stock_symbol, parse_bool_param, parse_output_mode, parse_json_layout, parse_query_params, handle_query_error
 
 
 class StockIndividualInfoSummaryTool(Tool):
@@ -82,103 +82,103 @@ class StockIndividualInfoSummaryTool(Tool):
         interface_configs = {
             # A股相关接口
             "stock_individual_info_em": {
-                "fn": ak.stock_individual_info_em,
+                "fn": "stock_individual_info_em",
                 "description": "东方财富网-股票信息-指定股票"
             },
             "stock_zyjs_ths": {
-                "fn": ak.stock_zyjs_ths,
+                "fn": "stock_zyjs_ths",
                 "description": "同花顺-主营介绍-指定股票"
             },
             "stock_zygc_em": {
-                "fn": ak.stock_zygc_em,
+                "fn": "stock_zygc_em",
                 "description": "东方财富网-主营构成-指定股票"
             },
             "stock_news_em": {
-                "fn": ak.stock_news_em,
+                "fn": "stock_news_em",
                 "description": "东方财富网-新闻资讯数据-指定股票"
             },
             "stock_profile_cninfo": {
-                "fn": ak.stock_profile_cninfo,
+                "fn": "stock_profile_cninfo",
                 "description": "巨潮资讯-公司概况-指定股票"
             },
             "stock_ipo_summary_cninfo": {
-                "fn": ak.stock_ipo_summary_cninfo,
+                "fn": "stock_ipo_summary_cninfo",
                 "description": "巨潮资讯-上市相关资讯-指定股票"
             },
             "stock_share_change_cninfo": {
-                "fn": ak.stock_share_change_cninfo,
+                "fn": "stock_share_change_cninfo",
                 "description": "巨潮资讯-数据-公司股本变动"
             },
             "stock_fhps_detail_em": {
-                "fn": ak.stock_fhps_detail_em,
+                "fn": "stock_fhps_detail_em",
                 "description": "东方财富网-数据中心-分红送配-分红送配详情"
             },
             "stock_fhps_detail_ths": {
-                "fn": ak.stock_fhps_detail_ths,
+                "fn": "stock_fhps_detail_ths",
                 "description": "同花顺-分红情况"
             },
             "stock_dividend_cninfo": {
-                "fn": ak.stock_dividend_cninfo,
+                "fn": "stock_dividend_cninfo",
                 "description": "巨潮资讯-历史分红-指定股票"
             },
             "stock_research_report_em": {
-                "fn": ak.stock_research_report_em,
+                "fn": "stock_research_report_em",
                 "description": "东方财富网-数据中心-研究报告-个股研报"
             },
             "stock_gdfx_free_top_10_em": {
-                "fn": ak.stock_gdfx_free_top_10_em,
+                "fn": "stock_gdfx_free_top_10_em",
                 "description": "东方财富网-个股-十大流通股东-指定股票、日期(季末)"
             },
             "stock_gdfx_top_10_em": {
-                "fn": ak.stock_gdfx_top_10_em,
+                "fn": "stock_gdfx_top_10_em",
                 "description": "东方财富网-个股-十大股东-指定股票、日期(季末)"
             },
             "stock_fund_stock_holder": {
-                "fn": ak.stock_fund_stock_holder,
+                "fn": "stock_fund_stock_holder",
                 "description": "新浪财经-基金持股-指定股票"
             },
             "stock_main_stock_holder": {
-                "fn": ak.stock_main_stock_holder,
+                "fn": "stock_main_stock_holder",
                 "description": "新浪财经-主要股东-指定股票"
             },
             "stock_management_change_ths": {
-                "fn": ak.stock_management_change_ths,
+                "fn": "stock_management_change_ths",
                 "description": "同花顺-公司高管持股变动-指定股票"
             },
             "stock_shareholder_change_ths": {
-                "fn": ak.stock_shareholder_change_ths,
+                "fn": "stock_shareholder_change_ths",
                 "description": "同花顺-公司股东持股变动-指定股票"
             },
             "stock_zh_a_gdhs": {
-                "fn": ak.stock_zh_a_gdhs,
+                "fn": "stock_zh_a_gdhs",
                 "description": "东方财富网-股东户数数据-指定日期"
             },
             "stock_zh_a_gdhs_detail_em": {
-                "fn": ak.stock_zh_a_gdhs_detail_em,
+                "fn": "stock_zh_a_gdhs_detail_em",
                 "description": "东方财富网-股东户数详情-指定股票"
             },
             "stock_institute_hold_detail": {
-                "fn": ak.stock_institute_hold_detail,
+                "fn": "stock_institute_hold_detail",
                 "description": "新浪财经-机构持股详情-指定股票、报告期"
             },
             "stock_institute_recommend_detail": {
-                "fn": ak.stock_institute_recommend_detail,
+                "fn": "stock_institute_recommend_detail",
                 "description": "新浪财经-股票评级记录-指定股票"
             },
             "stock_value_em": {
-                "fn": ak.stock_value_em,
+                "fn": "stock_value_em",
                 "description": "东方财富网-估值分析-指定股票"
             },
             "stock_ipo_info": {
-                "fn": ak.stock_ipo_info,
+                "fn": "stock_ipo_info",
                 "description": "新浪财经-新股发行-指定股票"
             },
             "stock_add_stock": {
-                "fn": ak.stock_add_stock,
+                "fn": "stock_add_stock",
                 "description": "新浪财经-股票增发-指定股票"
             },
             "stock_restricted_release_queue_sina": {
-                "fn": ak.stock_restricted_release_queue_sina,
+                "fn": "stock_restricted_release_queue_sina",
                 "description": "新浪财经-限售解禁-指定股票"
             }
         }
@@ -193,6 +193,14 @@ class StockIndividualInfoSummaryTool(Tool):
         try:
             # 网络参数 - 统一处理逻辑
             retries = int(tool_parameters.get("retries", 5))
+            use_cache = parse_bool_param(tool_parameters.get("use_cache"), True)
+            output_mode = parse_output_mode(tool_parameters.get("output_mode"))
+            json_layout = parse_json_layout(tool_parameters.get("json_layout"))
+            try:
+                query = parse_query_params(tool_parameters)
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             timeout_param = tool_parameters.get("timeout")  # 让子进程根据接口类型自动决定超时时间
             timeout = float(timeout_param) if timeout_param is not None else None
             
@@ -264,10 +272,15 @@ class StockIndividualInfoSummaryTool(Tool):
                 result = safe_ak_call(
                     config["fn"],
                     retries=retries,
+                    use_cache=use_cache,
+                    query=query,
                     timeout=timeout,
                     **call_params
                 )
                 logging.info(f"safe_ak_call completed successfully for {interface}")
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             except Exception as e:
                 # 检查是否是SSL连接错误
                 error_msg = str(e)
@@ -298,12 +311,12 @@ class StockIndividualInfoSummaryTool(Tool):
             
             # 处理结果
             if result is None:
-                yield from handle_empty_result(self)
+                yield from handle_empty_result(self, output_mode)
                 return
             
             # 检查是否为空
             if hasattr(result, 'empty') and result.empty:
-                yield from handle_empty_result(self)
+                yield from handle_empty_result(self, output_mode)
                 return
             
             # 输出处理
@@ -323,12 +336,12 @@ class StockIndividualInfoSummaryTool(Tool):
                 if interface in large_data_interfaces:
                     # 大数据量接口使用分块处理
                     from .common_utils import process_large_dataframe_output
-                    yield from process_large_dataframe_output(result, self)
+                    yield from process_large_dataframe_output(result, self, output_mode=output_mode, json_layout=json_layout)
                 else:
                     # 普通接口使用常规处理
-                    yield from process_dataframe_output(result, self)
+                    yield from process_dataframe_output(result, self, output_mode=output_mode, json_layout=json_layout)
             else:
-                yield from process_other_output(result, self)
+                yield from process_other_output(result, self, output_mode=output_mode)
                 
         except Exception as e:
             import logging
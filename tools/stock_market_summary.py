@@ -2,12 +2,12 @@ from collections.abc import Generator
 from typing import Any
 import pandas as pd
 
-import akshare as ak
 from provider.akshare_stockdata import safe_ak_call, build_error_payload
+from provider.akshare_query import QueryError
 from provider.akshare_registry import get_interface_config
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, validate_required_params, validate_date_format, handle_akshare_error
+from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, validate_required_params, validate_date_format, handle_akshare_error, parse_bool_param, parse_output_mode, parse_json_layout, parse_query_params, handle_query_error
 
 
 class StockMarketSummaryTool(Tool):
@@ -33,111 +33,118 @@ class StockMarketSummaryTool(Tool):
         interface_configs = {
             # A股相关接口
             "stock_sse_summary": {
-                "fn": ak.stock_sse_summary,
+                "fn": "stock_sse_summary",
                 "requires_date": False,
                 "date_format": None,
                 "description": "上交所-股票数据总貌-最近交易日"
             },
             "stock_szse_summary": {
-                "fn": ak.stock_szse_summary,
+                "fn": "stock_szse_summary",
                 "requires_date": True,
                 "date_format": "YYYYMMDD",
+                "temporal_params": {"date": "date"},
                 "description": "深交所-证券类别统计-指定交易日"
             },
             "stock_sse_deal_daily": {
-                "fn": ak.stock_sse_deal_daily,
+                "fn": "stock_sse_deal_daily",
                 "requires_date": True,
                 "date_format": "YYYYMMDD",
+                "temporal_params": {"date": "date"},
                 "description": "上交所-股票成交概况-每日股票情况"
             },
             "stock_zh_a_st_em": {
-                "fn": ak.stock_zh_a_st_em,
+                "fn": "stock_zh_a_st_em",
                 "requires_date": False,
                 "date_format": None,
                 "description": "东方财富网-沪深个股-风险警示板"
             },
             "stock_gsrl_gsdt_em": {
-                "fn": ak.stock_gsrl_gsdt_em,
+                "fn": "stock_gsrl_gsdt_em",
                 "requires_date": True,
                 "date_format": "YYYYMMDD",
+                "temporal_params": {"date": "date"},
                 "description": "东方财富网-公司动态-指定交易日"
             },
             # 新增的7个接口
             "stock_gpzy_profile_em": {
-                "fn": ak.stock_gpzy_profile_em,
+                "fn": "stock_gpzy_profile_em",
                 "requires_date": False,
                 "date_format": None,
                 "description": "东方财富网-股权质押市场概况-所有历史"
             },
             "stock_gpzy_pledge_ratio_em": {
-                "fn": ak.stock_gpzy_pledge_ratio_em,
+                "fn": "stock_gpzy_pledge_ratio_em",
                 "requires_date": True,
                 "date_format": "YYYYMMDD",
+                "temporal_params": {"date": "date"},
                 "description": "东方财富网-上市公司质押比例-指定交易日"
             },
             "stock_gpzy_industry_data_em": {
-                "fn": ak.stock_gpzy_industry_data_em,
+                "fn": "stock_gpzy_industry_data_em",
                 "requires_date": False,
                 "date_format": None,
                 "description": "东方财富网-上市公司质押比例-行业数据"
             },
             "stock_gpzy_distribute_statistics_company_em": {
-                "fn": ak.stock_gpzy_distribute_statistics_company_em,
+                "fn": "stock_gpzy_distribute_statistics_company_em",
                 "requires_date": False,
                 "date_format": None,
                 "description": "东方财富网-质押机构分布统计-证券公司"
             },
             "stock_gpzy_distribute_statistics_bank_em": {
-                "fn": ak.stock_gpzy_distribute_statistics_bank_em,
+                "fn": "stock_gpzy_distribute_statistics_bank_em",
                 "requires_date": False,
                 "date_format": None,
                 "description": "东方财富网-质押机构分布统计-银行"
             },
             "stock_sy_profile_em": {
-                "fn": ak.stock_sy_profile_em,
+                "fn": "stock_sy_profile_em",
                 "requires_date": False,
                 "date_format": None,
                 "description": "东方财富网-A股商誉市场概况-所有历史"
             },
             "stock_sy_jz_em": {
-                "fn": ak.stock_sy_jz_em,
+                "fn": "stock_sy_jz_em",
                 "requires_date": True,
                 "date_format": "YYYYMMDD",
+                "temporal_params": {"date": "report_period"},
                 "description": "东方财富网-个股商誉减值明细-指定日期(季末)"
             },
             "stock_sy_em": {
-                "fn": ak.stock_sy_em,
+                "fn": "stock_sy_em",
                 "requires_date": True,
                 "date_format": "YYYYMMDD",
+                "temporal_params": {"date": "report_period"},
                 "description": "东方财富网-个股商誉明细-指定日期(季末)"
             },
             "stock_sy_hy_em": {
-                "fn": ak.stock_sy_hy_em,
+                "fn": "stock_sy_hy_em",
                 "requires_date": True,
                 "date_format": "YYYYMMDD",
+                "temporal_params": {"date": "report_period"},
                 "description": "东方财富网-行业商誉-指定日期(季末)"
             },
             "stock_account_statistics_em": {
-                "fn": ak.stock_account_statistics_em,
+                "fn": "stock_account_statistics_em",
                 "requires_date": False,
                 "date_format": None,
                 "description": "东方财富网-股票账户统计月度-所有历史"
             },
             "stock_comment_em": {
-                "fn": ak.stock_comment_em,
+                "fn": "stock_comment_em",
                 "requires_date": False,
                 "date_format": None,
                 "description": "东方财富网-千股千评-所有数据"
             },
             # 新股申购-打新收益率
             "stock_dxsyl_em": {
-                "fn": ak.stock_dxsyl_em,
+                "fn": "stock_dxsyl_em",
                 "requires_date": False,
                 "date_format": None,
                 "description": "东方财富网-打新收益率-所有数据"
             },
             "stock_xgsglb_em": {
-                "fn": ak.stock_xgsglb_em,
+                "fn": "stock_xgsglb_em",
                 "requires_date": False,
                 "requires_symbol": True,
                 "date_format": None,
@@ -145,43 +152,47 @@ class StockMarketSummaryTool(Tool):
             },
             # 停复牌
             "news_trade_notify_suspend_baidu": {
-                "fn": ak.news_trade_notify_suspend_baidu,
+                "fn": "news_trade_notify_suspend_baidu",
                 "requires_date": True,
                 "date_format": "YYYYMMDD",
+                "temporal_params": {"date": "date"},
                 "description": "百度股市通-停复牌-指定日期"
             },
             # 分红派息
             "news_trade_notify_dividend_baidu": {
-                "fn": ak.news_trade_notify_dividend_baidu,
+                "fn": "news_trade_notify_dividend_baidu",
                 "requires_date": True,
                 "date_format": "YYYYMMDD",
+                "temporal_params": {"date": "date"},
                 "description": "百度股市通-分红派息-指定日期"
             },
             "stock_fhps_em": {
-                "fn": ak.stock_fhps_em,
+                "fn": "stock_fhps_em",
                 "requires_date": True,
                 "date_format": "YYYYMMDD",
+                "temporal_params": {"date": "report_period"},
                 "description": "东方财富网-分红配送-指定日期"
             },
             "stock_history_dividend": {
-                "fn": ak.stock_history_dividend,
+                "fn": "stock_history_dividend",
                 "requires_date": False,
                 "description": "新浪财经-历史分红"
             },
             "stock_institute_hold": {
-                "fn": ak.stock_institute_hold,
+                "fn": "stock_institute_hold",
                 "requires_date": False,
                 "requires_quarter": True,
+                "temporal_params": {"symbol": "report_period"},  # symbol 为报告期，如 20231
                 "description": "新浪财经-机构持股一览表-指定报告期"
             },
             "stock_institute_recommend": {
-                "fn": ak.stock_institute_recommend,
+                "fn": "stock_institute_recommend",
                 "requires_date": False,
                 "requires_recommend_indicator": True,
                 "description": "新浪财经-机构推荐池-指定指标"
             },
             "stock_info_a_code_name": {
-                "fn": ak.stock_info_a_code_name,
+                "fn": "stock_info_a_code_name",
                 "requires_date": False,
                 "description": "沪深京A股-股票代码和简称"
             }
@@ -232,6 +243,14 @@ class StockMarketSummaryTool(Tool):
             
             # 网络参数 - 统一处理逻辑
             retries = int(tool_parameters.get("retries", 5))
+            use_cache = parse_bool_param(tool_parameters.get("use_cache"), True)
+            output_mode = parse_output_mode(tool_parameters.get("output_mode"))
+            json_layout = parse_json_layout(tool_parameters.get("json_layout"))
+            try:
+                query = parse_query_params(tool_parameters)
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             timeout_param = tool_parameters.get("timeout")  # 让子进程根据接口类型自动决定超时时间
             timeout = float(timeout_param) if timeout_param is not None else None
             logging.info(f"Network params - retries: {retries}, timeout: {timeout} (auto-determined by interface type)")
@@ -258,10 +277,16 @@ class StockMarketSummaryTool(Tool):
                 result = safe_ak_call(
                     config["fn"],
                     retries=retries,
+                    use_cache=use_cache,
+                    query=query,
+                    temporal_params=config.get("temporal_params"),
                     timeout=timeout,
                     **call_params
                 )
                 logging.info(f"safe_ak_call completed successfully for {interface}")
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             except Exception as e:
                 logging.error(f"safe_ak_call failed for {interface} with date {date}: {e}")
                 # 检查是否是SSL连接错误
@@ -282,12 +307,12 @@ class StockMarketSummaryTool(Tool):
             
             # 处理结果
             if result is None:
-                yield from handle_empty_result(self)
+                yield from handle_empty_result(self, output_mode)
                 return
             
             # 检查是否为空
             if hasattr(result, 'empty') and result.empty:
-                yield from handle_empty_result(self)
+                yield from handle_empty_result(self, output_mode)
                 return
             
             # 特殊处理：清理stock_gsrl_gsdt_em接口数据中的特殊字符
@@ -304,9 +329,9 @@ class StockMarketSummaryTool(Tool):
             
             # 输出处理
             if isinstance(result, pd.DataFrame):
-                yield from process_dataframe_output(result, self)
+                yield from process_dataframe_output(result, self, output_mode=output_mode, json_layout=json_layout)
             else:
-                yield from process_other_output(result, self)
+                yield from process_other_output(result, self, output_mode=output_mode)
                 
         except Exception as e:
             import logging
@@ -1,12 +1,11 @@
 from collections.abc import Generator
 from typing import Any
-import pandas as pd
 
-import akshare as ak
-from provider.akshare_stockdata import safe_ak_call, build_error_payload
+from provider.akshare_stockdata import safe_ak_stream, build_error_payload
+from provider.akshare_query import QueryError
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, handle_akshare_error
+from .common_utils import process_dataframe_stream_output, handle_akshare_error, parse_bool_param, parse_output_mode, parse_json_layout, parse_query_params, handle_query_error
 
 
 class StockSpotQuotationsTool(Tool):
@@ -32,63 +31,63 @@ class StockSpotQuotationsTool(Tool):
         interface_configs = {
             # A股相关接口
             "stock_bid_ask_em": {
-                "fn": ak.stock_bid_ask_em,
+                "fn": "stock_bid_ask_em",
                 "description": "东方财富网-行情报价-指定股票"
             },
             "stock_zh_a_spot_em": {
-                "fn": ak.stock_zh_a_spot_em,
+                "fn": "stock_zh_a_spot_em",
                 "description": "东方财富网-沪深京A股-实时行情数据"
             },
             "stock_zh_a_spot": {
-                "fn": ak.stock_zh_a_spot,
+                "fn": "stock_zh_a_spot",
                 "description": "新浪财经-沪深京A股-实时行情数据"
             },
             "stock_sh_a_spot_em": {
-                "fn": ak.stock_sh_a_spot_em,
+                "fn": "stock_sh_a_spot_em",
                 "description": "东方财富网-沪A股-实时行情数据"
             },
             "stock_sz_a_spot_em": {
-                "fn": ak.stock_sz_a_spot_em,
+                "fn": "stock_sz_a_spot_em",
                 "description": "东方财富网-深A股-实时行情数据"
             },
             "stock_bj_a_spot_em": {
-                "fn": ak.stock_bj_a_spot_em,
+                "fn": "stock_bj_a_spot_em",
                 "description": "东方财富网-京A股-实时行情数据"
             },
             "stock_new_a_spot_em": {
-                "fn": ak.stock_new_a_spot_em,
+                "fn": "stock_new_a_spot_em",
                 "description": "东方财富网-新股-实时行情数据"
             },
             "stock_cy_a_spot_em": {
-                "fn": ak.stock_cy_a_spot_em,
+                "fn": "stock_cy_a_spot_em",
                 "description": "东方财富网-创业板-实时行情"
             },
             "stock_kc_a_spot_em": {
-                "fn": ak.stock_kc_a_spot_em,
+                "fn": "stock_kc_a_spot_em",
                 "description": "东方财富网-科创板-实时行情"
             },
             "stock_zh_ah_spot_em": {
-                "fn": ak.stock_zh_ah_spot_em,
+                "fn": "stock_zh_ah_spot_em",
                 "description": "东方财富网-沪深港通-AH股比价-实时行情"
             },
             "stock_zh_ab_comparison_em": {
-                "fn": ak.stock_zh_ab_comparison_em,
+                "fn": "stock_zh_ab_comparison_em",
                 "description": "东方财富网-沪深京A股-全量AB股比价"
             },
             "stock_zh_a_new_em": {
-                "fn": ak.stock_zh_a_new_em,
+                "fn": "stock_zh_a_new_em",
                 "description": "东方财富网-沪深个股-新股板块实时行情"
             },
             "stock_zh_a_new": {
-                "fn": ak.stock_zh_a_new,
+                "fn": "stock_zh_a_new",
                 "description": "新浪财经-沪深股市-次新股-实时行情"
             },
             "stock_zh_a_stop_em": {
-                "fn": ak.stock_zh_a_stop_em,
+                "fn": "stock_zh_a_stop_em",
                 "description": "东方财富网-沪深个股-两网及退市"
             },
             "stock_ipo_benefit_ths": {
-                "fn": ak.stock_ipo_benefit_ths,
+                "fn": "stock_ipo_benefit_ths",
                 "description": "同花顺-新股数据-IPO受益股"
             },
         }
@@ -106,6 +105,14 @@ class StockSpotQuotationsTool(Tool):
             
             # 网络参数 - 统一处理逻辑
             retries = int(tool_parameters.get("retries", 5))
+            use_cache = parse_bool_param(tool_parameters.get("use_cache"), True)
+            output_mode = parse_output_mode(tool_parameters.get("output_mode"))
+            json_layout = parse_json_layout(tool_parameters.get("json_layout"))
+            try:
+                query = parse_query_params(tool_parameters)
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             timeout_param = tool_parameters.get("timeout")  # 让子进程根据接口类型自动决定超时时间
             timeout = float(timeout_param) if timeout_param is not None else None
             logging.info(f"Network params - retries: {retries}, timeout: {timeout} (auto-determined by interface type)")
@@ -127,13 +134,19 @@ class StockSpotQuotationsTool(Tool):
             logging.info(f"Function: {config['fn']}")
             
             # 调用AKShare接口 - timeout现在仅用于子进程超时控制
+            # 全市场行情数据量较大，按页流式获取并逐块输出
             try:
-                result = safe_ak_call(
+                pages = safe_ak_stream(
                     config["fn"],
                     retries=retries,
+                    use_cache=use_cache,
+                    query=query,
                     timeout=timeout,
                     **call_params
                 )
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             except Exception as e:
                 # 检查是否是SSL连接错误（实时行情接口常见问题）
                 error_msg = str(e)
@@ -151,21 +164,8 @@ class StockSpotQuotationsTool(Tool):
                     yield from handle_akshare_error(e, self, f"接口: {interface}", str(timeout))
                     return
             
-            # 处理结果
-            if result is None:
-                yield from handle_empty_result(self)
-                return
-            
-            # 检查是否为空
-            if hasattr(result, 'empty') and result.empty:
-                yield from handle_empty_result(self)
-                return
-            
-            # 输出处理
-            if isinstance(result, pd.DataFrame):
-                yield from process_dataframe_output(result, self)
-            else:
-                yield from process_other_output(result, self)
+            # 输出处理 - 逐页转发，空结果和非DataFrame结果由输出函数统一处理
+            yield from process_dataframe_stream_output(pages, self, output_mode=output_mode, json_layout=json_layout)
                 
         except Exception as e:
             import logging
@@ -2,12 +2,12 @@ from collections.abc import Generator
 from typing import Any
 import pandas as pd
 
-import akshare as ak
 from provider.akshare_stockdata import safe_ak_call, build_error_payload
+from provider.akshare_query import QueryError
 from provider.akshare_registry import get_interface_config
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, validate_required_params, validate_date_format, handle_akshare_error
+from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, validate_required_params, validate_date_format, handle_akshare_error, parse_bool_param, parse_output_mode, parse_json_layout, parse_query_params, handle_query_error
 
 
 class StockTechnicalAnalysisTool(Tool):
@@ -23,6 +23,14 @@ class StockTechnicalAnalysisTool(Tool):
             stock_code = tool_parameters.get("stock_code", "")  # 股票代码
             market_type = tool_parameters.get("market_type", "")  # 市场类型
             retries = int(tool_parameters.get("retries", 5))
+            use_cache = parse_bool_param(tool_parameters.get("use_cache"), True)
+            output_mode = parse_output_mode(tool_parameters.get("output_mode"))
+            json_layout = parse_json_layout(tool_parameters.get("json_layout"))
+            try:
+                query = parse_query_params(tool_parameters)
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             timeout = float(tool_parameters.get("timeout", 120))
             
             logging.info(f"Interface: {interface}, High Category: {technical_indicator1}, Low Category: {technical_indicator2}, MA Type: {ma_type}, Stock Code: {stock_code}, Market Type: {market_type}, Retries: {retries}, Timeout: {timeout}")
@@ -41,67 +49,67 @@ class StockTechnicalAnalysisTool(Tool):
         interface_configs = {
             # 技术指标类接口
             "stock_rank_cxg_ths": {
-                "fn": ak.stock_rank_cxg_ths,
+                "fn": "stock_rank_cxg_ths",
                 "requires_technical_indicator1": True,
                 "timeout": 120,  # 设置为120秒（2分钟）
                 "description": "同花顺-技术选股-创新高-指定新高类别"
             },
             "stock_rank_cxd_ths": {
-                "fn": ak.stock_rank_cxd_ths,
+                "fn": "stock_rank_cxd_ths",
                 "requires_technical_indicator2": True,
                 "timeout": 120,  # 设置为120秒（2分钟）
                 "description": "同花顺-技术选股-创新低-指定新低类别"
             },
             "stock_rank_lxsz_ths": {
-                "fn": ak.stock_rank_lxsz_ths,
+                "fn": "stock_rank_lxsz_ths",
                 "requires_technical_indicator": False,
                 "timeout": 120,  # 设置为120秒（2分钟）
                 "description": "同花顺-技术选股-连续上涨"
             },
             "stock_rank_lxxd_ths": {
-                "fn": ak.stock_rank_lxxd_ths,
+                "fn": "stock_rank_lxxd_ths",
                 "requires_technical_indicator": False,
                 "timeout": 120,  # 设置为120秒（2分钟）
                 "description": "同花顺-技术选股-连续下跌"
             },
             "stock_rank_cxfl_ths": {
-                "fn": ak.stock_rank_cxfl_ths,
+                "fn": "stock_rank_cxfl_ths",
                 "requires_technical_indicator": False,
                 "timeout": 120,  # 设置为120秒（2分钟）
                 "description": "同花顺-技术选股-持续放量"
             },
             "stock_rank_cxsl_ths": {
-                "fn": ak.stock_rank_cxsl_ths,
+                "fn": "stock_rank_cxsl_ths",
                 "requires_technical_indicator": False,
                 "timeout": 120,  # 设置为120秒（2分钟）
                 "description": "同花顺-技术选股-持续缩量"
             },
             "stock_rank_xstp_ths": {
-                "fn": ak.stock_rank_xstp_ths,
+                "fn": "stock_rank_xstp_ths",
                 "requires_ma_type": True,
                 "timeout": 120,  # 设置为120秒（2分钟）
                 "description": "同花顺-技术选股-向上突破-指定均线类型"
             },
             "stock_rank_xxtp_ths": {
-                "fn": ak.stock_rank_xxtp_ths,
+                "fn": "stock_rank_xxtp_ths",
                 "requires_ma_type": True,
                 "timeout": 120,  # 设置为120秒（2分钟）
                 "description": "同花顺-技术选股-向下突破-指定均线类型"
             },
             "stock_rank_ljqs_ths": {
-                "fn": ak.stock_rank_ljqs_ths,
+                "fn": "stock_rank_ljqs_ths",
                 "requires_technical_indicator": False,
                 "timeout": 120,  # 设置为120秒（2分钟）
                 "description": "同花顺-技术选股-量价齐升"
             },
             "stock_rank_ljqd_ths": {
-                "fn": ak.stock_rank_ljqd_ths,
+                "fn": "stock_rank_ljqd_ths",
                 "requires_technical_indicator": False,
                 "timeout": 120,  # 设置为120秒（2分钟）
                 "description": "同花顺-技术选股-量价齐跌"
             },
             "stock_rank_xzjp_ths": {
-                "fn": ak.stock_rank_xzjp_ths,
+                "fn": "stock_rank_xzjp_ths",
                 "requires_technical_indicator": False,
                 "timeout": 120,  # 设置为120秒（2分钟）
                 "description": "同花顺-技术选股-险资举牌"
@@ -111,19 +119,19 @@ class StockTechnicalAnalysisTool(Tool):
             # 注意：stock_esg_rate_sina 接口处理时间很长（约12分钟），但 Dify 工作流系统超时限制为600秒
             # 暂时禁用该接口，避免超时错误
             # "stock_esg_rate_sina": {
-            #     "fn": ak.stock_esg_rate_sina,
+            #     "fn": "stock_esg_rate_sina",
             #     "requires_technical_indicator": False,
             #     "timeout": 1800,  # 设置为1800秒（30分钟），因为该接口处理时间很长（约12分钟）
             #     "description": "新浪财经-ESG评级-ESG评级数据"
             # },
             "stock_esg_msci_sina": {
-                "fn": ak.stock_esg_msci_sina,
+                "fn": "stock_esg_msci_sina",
                 "requires_technical_indicator": False,
                 "timeout": 300,  # 设置为300秒（5分钟）
                 "description": "新浪财经-ESG评级-MSCI"
             },
             "stock_esg_rft_sina": {
-                "fn": ak.stock_esg_rft_sina,
+                "fn": "stock_esg_rft_sina",
                 "requires_technical_indicator": False,
                 "timeout": 300,  # 设置为300秒（5分钟）
                 "description": "新浪财经-ESG评级-路孚特"
@@ -199,6 +207,8 @@ class StockTechnicalAnalysisTool(Tool):
             result = safe_ak_call(
                 config["fn"],
                 retries=retries,
+                use_cache=use_cache,
+                query=query,
                 timeout=interface_timeout,
                 **call_params
             )
@@ -215,11 +225,14 @@ class StockTechnicalAnalysisTool(Tool):
                     yield self.create_json_message({"data": []})
                 else:
                     # 处理DataFrame输出
-                    yield from process_dataframe_output(result, self)
+                    yield from process_dataframe_output(result, self, output_mode=output_mode, json_layout=json_layout)
             else:
                 # 处理其他类型输出
-                yield from process_other_output(result, self)
+                yield from process_other_output(result, self, output_mode=output_mode)
                 
+        except QueryError as e:
+            yield from handle_query_error(e, self)
+            return
         except Exception as e:
             logging.error(f"Error in AKShare call: {e}")
             
@@ -2,12 +2,12 @@ from collections.abc import Generator
 from typing import Any
 import pandas as pd
 
-import akshare as ak
 from provider.akshare_stockdata import safe_ak_call, build_error_payload
+from provider.akshare_query import QueryError
 from provider.akshare_registry import get_interface_config
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
-from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, handle_akshare_error
+from .common_utils import process_dataframe_output, process_other_output, handle_empty_result, handle_akshare_error, parse_bool_param, parse_output_mode, parse_json_layout, parse_query_params, handle_query_error
 
 
 class StockUsDataTool(Tool):
@@ -33,26 +33,26 @@ class StockUsDataTool(Tool):
         interface_configs = {
             # 美股实时行情接口
             "stock_us_spot_em": {
-                "fn": ak.stock_us_spot_em,
+                "fn": "stock_us_spot_em",
                 "description": "美股-实时行情"
             },
             "stock_us_spot": {
-                "fn": ak.stock_us_spot,
+                "fn": "stock_us_spot",
                 "description": "新浪-美股-实时行情(延15分钟)"
             },
             "stock_us_famous_spot_em": {
-                "fn": ak.stock_us_famous_spot_em,
+                "fn": "stock_us_famous_spot_em",
                 "description": "知名美股的实时行情数据-指定类别"
             },
             # 美股历史行情接口
             "stock_us_daily": {
-                "fn": ak.stock_us_daily,
+                "fn": "stock_us_daily",
                 "requires_symbol": True,
                 "requires_adjust": True,
                 "description": "新浪-美股-历史行情数据-指定股票代码、复权方式"
             },
             "stock_us_hist": {
-                "fn": ak.stock_us_hist,
+                "fn": "stock_us_hist",
                 "requires_symbol": True,
                 "requires_period": True,
                 "period_type": "historical",  # 历史行情类
@@ -62,7 +62,7 @@ class StockUsDataTool(Tool):
                 "description": "美股-每日行情-指定股票代码、周期、日期范围、复权方式"
             },
             "stock_us_hist_min_em": {
-                "fn": ak.stock_us_hist_min_em,
+                "fn": "stock_us_hist_min_em",
                 "requires_symbol": True,
                 "requires_period": False,  # 美股分时接口不需要period参数
                 "requires_date_range": False,  # 美股分时接口不需要日期范围，自动返回最近5天
@@ -72,14 +72,14 @@ class StockUsDataTool(Tool):
             },
             # 美股财务分析接口
             "stock_financial_us_analysis_indicator_em": {
-                "fn": ak.stock_financial_us_analysis_indicator_em,
+                "fn": "stock_financial_us_analysis_indicator_em",
                 "requires_symbol": True,
                 "requires_indicator_us": True,
                 "timeout": 600,
                 "description": "美股-财务分析-主要指标-指定股票代码、指标类型"
             },
             "stock_financial_us_report_em": {
-                "fn": ak.stock_financial_us_report_em,
+                "fn": "stock_financial_us_report_em",
                 "requires_symbol": True,
                 "requires_report_type": True,
                 "requires_indicator_us": True,
@@ -191,6 +191,14 @@ class StockUsDataTool(Tool):
             
             # 获取重试次数和超时时间
             retries = tool_parameters.get("retries", 5)
+            use_cache = parse_bool_param(tool_parameters.get("use_cache"), True)
+            output_mode = parse_output_mode(tool_parameters.get("output_mode"))
+            json_layout = parse_json_layout(tool_parameters.get("json_layout"))
+            try:
+                query = parse_query_params(tool_parameters)
+            except QueryError as e:
+                yield from handle_query_error(e, self)
+                return
             timeout = tool_parameters.get("timeout", 600)
             
             # 使用接口特定的超时时间
@@ -200,6 +208,8 @@ class StockUsDataTool(Tool):
             result = safe_ak_call(
                 config["fn"],
                 retries=retries,
+                use_cache=use_cache,
+                query=query,
                 timeout=interface_timeout,
                 **call_params
             )
@@ -217,10 +227,13 @@ class StockUsDataTool(Tool):
                     return
                 
                 # 处理DataFrame输出
-                yield from process_dataframe_output(result, self)
+                yield from process_dataframe_output(result, self, output_mode=output_mode, json_layout=json_layout)
             else:
                 # 处理其他类型输出
-                yield from process_other_output(result, self)
+                yield from process_other_output(result, self, output_mode=output_mode)
                 
+        except QueryError as e:
+            yield from handle_query_error(e, self)
+            return
         except Exception as e:
             yield from handle_akshare_error(e, self, f"接口: {interface}")
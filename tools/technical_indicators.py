@@ -1,6 +1,6 @@
 """
 技术指标计算模块
-使用pandas库实现专业级技术指标计算
+使用NumPy指标内核（indicator_kernels）实现专业级技术指标计算
 遵循股票分析领域的标准计算惯例
 """
 
@@ -9,12 +9,46 @@ import numpy as np
 from typing import List, Dict, Any, Optional
 import warnings
 
+from .indicator_kernels import compute_indicators, join_indicator_columns
+
 warnings.filterwarnings('ignore')
 
+# 内核输出列名 -> 本模块使用的列名
+COLUMN_NAMES = {
+    'MACD_SIGNAL': 'MACD_Signal',
+    'MACD_HIST': 'MACD_Histogram',
+    'KDJ_K': 'K',
+    'KDJ_D': 'D',
+    'KDJ_J': 'J',
+    'BOLL_MIDDLE': 'BB_Middle',
+    'BOLL_UPPER': 'BB_Upper',
+    'BOLL_LOWER': 'BB_Lower',
+}
+
+# 本模块的计算口径：数据不足一个窗口时也从第一行开始输出，RSI和KDJ的分母加1e-10避免除零
+KERNEL_OPTIONS = {'min_periods': 1, 'epsilon': 1e-10}
+
 
 class TechnicalIndicators:
     """技术指标计算类"""
     
+    @staticmethod
+    def _compute(data: pd.DataFrame, **groups: Any) -> tuple:
+        """使用NumPy指标内核计算指定的指标组，返回(数组, 列名)"""
+        spec = {'ma_periods': None, 'rsi_periods': None, 'macd': None, 'kdj': None, 'boll': None, 'vma_periods': None}
+        spec.update(groups)
+        values, columns = compute_indicators(
+            data['close'], data.get('high'), data.get('low'), data.get('volume'), **spec, **KERNEL_OPTIONS
+        )
+        return values, [COLUMN_NAMES.get(column, column) for column in columns]
+    
+    @staticmethod
+    def _assign(data: pd.DataFrame, **groups: Any) -> pd.DataFrame:
+        values, columns = TechnicalIndicators._compute(data, **groups)
+        for position, column in enumerate(columns):
+            data[column] = values[:, position]
+        return data
+    
     @staticmethod
     def calculate_ma(data: pd.DataFrame, periods: List[int] = [5, 10, 20, 30, 60]) -> pd.DataFrame:
         """
@@ -28,9 +62,7 @@ class TechnicalIndicators:
             添加了MA指标的DataFrame
         """
         try:
-            for period in periods:
-                data[f'MA{period}'] = data['close'].rolling(window=period, min_periods=1).mean()
-            return data
+            return TechnicalIndicators._assign(data, ma_periods=periods)
         except Exception as e:
             raise Exception(f"MA指标计算失败: {str(e)}")
     
@@ -47,15 +79,7 @@ class TechnicalIndicators:
             添加了RSI指标的DataFrame
         """
         try:
-            for period in periods:
-                delta = data['close'].diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=period, min_periods=1).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=period, min_periods=1).mean()
-                
-                # 避免除零错误
-                rs = gain / (loss + 1e-10)
-                data[f'RSI{period}'] = 100 - (100 / (1 + rs))
-            return data
+            return TechnicalIndicators._assign(data, rsi_periods=periods)
         except Exception as e:
             raise Exception(f"RSI指标计算失败: {str(e)}")
     
@@ -74,13 +98,7 @@ class TechnicalIndicators:
             添加了MACD指标的DataFrame
         """
         try:
-            ema_fast = data['close'].ewm(span=fast, min_periods=1).mean()
-            ema_slow = data['close'].ewm(span=slow, min_periods=1).mean()
-            
-            data['MACD'] = ema_fast - ema_slow
-            data['MACD_Signal'] = data['MACD'].ewm(span=signal, min_periods=1).mean()
-            data['MACD_Histogram'] = data['MACD'] - data['MACD_Signal']
-            return data
+            return TechnicalIndicators._assign(data, macd=(fast, slow, signal))
         except Exception as e:
             raise Exception(f"MACD指标计算失败: {str(e)}")
     
@@ -97,16 +115,7 @@ class TechnicalIndicators:
             添加了KDJ指标的DataFrame
         """
         try:
-            low_min = data['low'].rolling(window=period, min_periods=1).min()
-            high_max = data['high'].rolling(window=period, min_periods=1).max()
-            
-            # 避免除零错误
-            rsv = (data['close'] - low_min) / (high_max - low_min + 1e-10) * 100
-            
-            data['K'] = rsv.ewm(com=2, min_periods=1).mean()
-            data['D'] = data['K'].ewm(com=2, min_periods=1).mean()
-            data['J'] = 3 * data['K'] - 2 * data['D']
-            return data
+            return TechnicalIndicators._assign(data, kdj=(period, 3, 3))
         except Exception as e:
             raise Exception(f"KDJ指标计算失败: {str(e)}")
     
@@ -124,12 +133,7 @@ class TechnicalIndicators:
             添加了布林带指标的DataFrame
         """
         try:
-            data['BB_Middle'] = data['close'].rolling(window=period, min_periods=1).mean()
-            bb_std = data['close'].rolling(window=period, min_periods=1).std()
-            
-            data['BB_Upper'] = data['BB_Middle'] + (bb_std * std_dev)
-            data['BB_Lower'] = data['BB_Middle'] - (bb_std * std_dev)
-            return data
+            return TechnicalIndicators._assign(data, boll=(period, std_dev))
         except Exception as e:
             raise Exception(f"布林带指标计算失败: {str(e)}")
     
@@ -146,9 +150,7 @@ class TechnicalIndicators:
             添加了VMA指标的DataFrame
         """
         try:
-            for period in periods:
-                data[f'VMA{period}'] = data['volume'].rolling(window=period, min_periods=1).mean()
-            return data
+            return TechnicalIndicators._assign(data, vma_periods=periods)
         except Exception as e:
             raise Exception(f"VMA指标计算失败: {str(e)}")
     
@@ -175,15 +177,12 @@ class TechnicalIndicators:
                 if col not in data.columns:
                     raise Exception(f"缺少必要的列: {col}")
             
-            # 计算各类指标
-            data = TechnicalIndicators.calculate_ma(data)
-            data = TechnicalIndicators.calculate_rsi(data)
-            data = TechnicalIndicators.calculate_macd(data)
-            data = TechnicalIndicators.calculate_kdj(data)
-            data = TechnicalIndicators.calculate_bollinger_bands(data)
-            data = TechnicalIndicators.calculate_vma(data)
-            
-            return data
+            # 一次计算全部指标，共享价格差分、滚动均值等中间结果
+            values, columns = TechnicalIndicators._compute(
+                data, ma_periods=[5, 10, 20, 30, 60], rsi_periods=[6, 12, 24], macd=(12, 26, 9),
+                kdj=(9, 3, 3), boll=(20, 2.0), vma_periods=[5, 10, 20]
+            )
+            return join_indicator_columns(data, values, columns)
             
         except Exception as e:
             raise Exception(f"技术指标计算失败: {str(e)}")
@@ -0,0 +1,127 @@
+"""
+历史估值指标向量化计算
+- 每个交易日按日期做as-of匹配：使用早于交易日所在年度的最新年报（年报年度 < 交易日年度）
+- 各估值比率按整列数组相除，财务指标不大于阈值（0.01）或缺失时为NaN，计算结果为数值列
+- "N/A" 文本和保留两位小数的字符串只在输出阶段由 format_historical_valuation 生成，
+  与原逐行计算的输出逐字一致：str(round(x, 2))，PEG和市净率×ROE由四舍五入后的PE/PB计算；
+  原实现中财务字段为numpy浮点数时 round() 按 np.round 取舍，为Python float时按内置 round() 取舍，这里按字段类型分别处理
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# (输出列, 财务数据缓存中的字段)，比率 = 收盘价 / 字段值
+HISTORICAL_VALUATION_RATIOS = [
+    ('PE_历史', 'eps'),
+    ('PB_历史', 'bps'),
+    ('PCF_历史', 'cps'),
+    ('PE_加权历史', 'w_eps'),
+    ('PE_扣非历史', 'n_eps'),
+    ('PB_调整后历史', 'adj_bps'),
+    ('每股资本公积金比率_历史', 'cap_reserve'),
+    ('每股未分配利润比率_历史', 'undist_profit'),
+]
+HISTORICAL_VALUATION_COLUMNS = [column for column, _ in HISTORICAL_VALUATION_RATIOS] + [
+    'PEG_历史', '市净率×ROE_历史', '财务数据时间点',
+]
+MISSING_LABEL = "N/A"
+
+# 每股指标不大于该值时不计算比率（避免除以接近0的值得到无意义的极大值）
+DENOMINATOR_THRESHOLD = 0.01
+
+
+def round_like_builtin(values: Any, digits: int = 2) -> np.ndarray:
+    """
+    向量化的四舍五入，逐元素与Python内置 round(x, digits) 结果一致
+    np.round 先放大再取整，只有放大后的值非常接近 .5 时才可能与 round()（按精确十进制值取舍）不同，
+    这些位置逐个用 round() 重算
+    """
+    values = np.asarray(values, dtype='float64')
+    result = np.round(values, digits)
+    scaled = values * 10.0 ** digits
+    with np.errstate(invalid='ignore'):
+        distance = np.abs(scaled - np.floor(scaled) - 0.5)
+        suspects = np.flatnonzero(distance <= 1e-9 * np.maximum(1.0, np.abs(scaled)))
+    for position in suspects:
+        result.flat[position] = round(float(values.flat[position]), digits)
+    return result
+
+
+def _annual_table(financial_cache: Dict[int, Dict]) -> Dict[str, np.ndarray]:
+    """把 {年度: 财务指标} 缓存转换为按年度升序排列的列数组"""
+    years = sorted(financial_cache)
+    table = {'year': np.array(years, dtype='int64')}
+    keys = [key for _, key in HISTORICAL_VALUATION_RATIOS] + ['growth_rate', 'roe']
+    for key in keys:
+        raw = [financial_cache[year].get(key) for year in years]
+        table[key] = pd.to_numeric(pd.Series(raw, dtype=object), errors='coerce').to_numpy(dtype='float64')
+        table[f'{key}_numpy'] = np.array([isinstance(value, np.floating) for value in raw], dtype=bool)
+    table['date'] = np.array([pd.Timestamp(financial_cache[year]['date']).strftime('%Y-%m-%d') for year in years], dtype=object)
+    return table
+
+
+def compute_historical_valuation(dates: Any, close: Any, financial_cache: Dict[int, Dict]) -> pd.DataFrame:
+    """
+    计算历史估值指标的数值结果，返回与输入等长的DataFrame（列见 HISTORICAL_VALUATION_COLUMNS）
+    无法计算的位置为NaN，财务数据时间点为None；收盘价缺失或不大于0、没有更早年报的交易日整行为空
+    """
+    dates = pd.to_datetime(pd.Series(dates).reset_index(drop=True))
+    price = pd.to_numeric(pd.Series(close).reset_index(drop=True), errors='coerce').to_numpy(dtype='float64')
+    n = len(price)
+    table = _annual_table(financial_cache)
+
+    # as-of匹配：year < 交易日年度 的最后一个年报
+    position = np.searchsorted(table['year'], dates.dt.year.to_numpy(dtype='int64'), side='left') - 1
+    with np.errstate(invalid='ignore'):
+        matched = (position >= 0) & (price > 0)
+    position = np.where(matched, position, 0)
+
+    def financial(key: str) -> np.ndarray:
+        values = table[key][position] if len(table['year']) else np.full(n, np.nan)
+        return np.where(matched, values, np.nan)
+
+    def rounded(values: np.ndarray, key: str) -> np.ndarray:
+        numpy_typed = table[f'{key}_numpy'][position] if len(table['year']) else np.zeros(n, dtype=bool)
+        if not numpy_typed.any():
+            return round_like_builtin(values)
+        return np.where(numpy_typed, np.round(values, 2), round_like_builtin(values))
+
+    result = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for column, key in HISTORICAL_VALUATION_RATIOS:
+            denominator = financial(key)
+            result[column] = rounded(np.where(denominator > DENOMINATOR_THRESHOLD, price / denominator, np.nan), key)
+
+        pe = result['PE_历史']
+        growth_rate = financial('growth_rate')
+        result['PEG_历史'] = rounded(np.where((growth_rate > DENOMINATOR_THRESHOLD) & (pe > 0), pe / growth_rate, np.nan), 'growth_rate')
+
+        pb = result['PB_历史']
+        roe = financial('roe')
+        result['市净率×ROE_历史'] = rounded(np.where(~np.isnan(roe) & (pb > 0), pb * roe, np.nan), 'roe')
+
+    labels = table['date'][position] if len(table['year']) else np.full(n, None, dtype=object)
+    result['财务数据时间点'] = np.where(matched, labels, None)
+    return pd.DataFrame(result, columns=HISTORICAL_VALUATION_COLUMNS)
+
+
+def add_historical_valuation_columns(df: pd.DataFrame, financial_cache: Dict[int, Dict]) -> pd.DataFrame:
+    """在K线数据（需要 日期/收盘 列）上添加数值形式的历史估值指标列，已有的同名列被替换"""
+    values = compute_historical_valuation(df['日期'], df['收盘'], financial_cache)
+    values.index = df.index
+    base = df.drop(columns=[column for column in HISTORICAL_VALUATION_COLUMNS if column in df.columns])
+    return pd.concat([base, values], axis=1)
+
+
+def format_historical_valuation(df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    输出阶段把数值形式的历史估值指标转换为文本：保留两位小数的数值为 str(x)，缺失为 "N/A"
+    只处理存在的列，返回副本
+    """
+    df = df.copy()
+    for column in columns or HISTORICAL_VALUATION_COLUMNS:
+        if column not in df.columns:
+            continue
+        df[column] = [MISSING_LABEL if value is None or value != value else str(value) for value in df[column].tolist()]
+    return df
@@ -0,0 +1,140 @@
+"""
+全市场批量估值筛选
+- 只调用四个整表接口：实时行情（stock_zh_a_spot_em）提供最新价和市值，业绩报表（stock_yjbb_em）提供每股指标，
+  利润表（stock_lrb_em）和资产负债表（stock_zcfz_em）提供利润和资本结构，按报告期整表获取，四个接口并发调用
+- 按股票代码一次合并，所有估值比率按整列数组计算，不再逐只股票获取财务数据
+- 估值口径与动态估值指标一致：比率 = 最新价 / 每股指标，每股指标不大于阈值（0.01）或缺失时为NaN；
+  非年报报告期的每股指标为报告期累计值，不做年化
+- 结果为数值列，可直接用 filter/sort_by/limit 筛选排序
+"""
+import concurrent.futures
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from provider.akshare_stockdata import safe_ak_call
+from .valuation_kernels import DENOMINATOR_THRESHOLD
+
+SPOT_FUNCTION = 'stock_zh_a_spot_em'
+# 按报告期获取的整表接口，{接口名: {原列名: 输出列名}}
+REPORT_TABLES = {
+    'stock_yjbb_em': {
+        '所处行业': '所处行业',
+        '每股收益': '每股收益',
+        '每股净资产': '每股净资产',
+        '每股经营现金流量': '每股经营现金流量',
+        '净资产收益率': '净资产收益率',
+        '净利润-同比增长': '净利润同比增长',
+        '营业总收入-营业总收入': '营业总收入',
+        '净利润-净利润': '净利润',
+        '销售毛利率': '销售毛利率',
+        '最新公告日期': '最新公告日期',
+    },
+    'stock_lrb_em': {
+        '营业利润': '营业利润',
+    },
+    'stock_zcfz_em': {
+        '资产负债率': '资产负债率',
+    },
+}
+# 缺少这些接口的数据时无法计算估值
+REQUIRED_TABLES = (SPOT_FUNCTION, 'stock_yjbb_em')
+
+SPOT_COLUMNS = {'代码': '代码', '名称': '名称', '最新价': '最新价', '涨跌幅': '涨跌幅', '总市值': '总市值', '流通市值': '流通市值'}
+
+BATCH_VALUATION_COLUMNS = [
+    '代码', '名称', '所处行业', '最新价', '涨跌幅', '总市值', '流通市值',
+    # 估值指标
+    'PE_动态', 'PB_动态', 'PCF_动态', 'PEG', '市净率×ROE', '市销率',
+    # 财务指标
+    '每股收益', '每股净资产', '每股经营现金流量', '净资产收益率', '净利润同比增长',
+    '销售毛利率', '净利率', '营业利润率', '资产负债率',
+    # 元数据
+    '报告期', '最新公告日期',
+]
+
+
+def fetch_screener_tables(
+    report_date: str, retries: int = 5, timeout: float = 600, use_cache: bool = True
+) -> Dict[str, Optional[pd.DataFrame]]:
+    """
+    并发获取实时行情和指定报告期的三张整表，返回 {接口名: DataFrame}
+    单个接口失败时对应的值为None，由调用方决定是否可以继续
+    """
+    calls = {SPOT_FUNCTION: {}}
+    calls.update({name: {'date': report_date} for name in REPORT_TABLES})
+    tables: Dict[str, Optional[pd.DataFrame]] = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(calls), thread_name_prefix="akshare-screener") as executor:
+        futures = {
+            name: executor.submit(safe_ak_call, name, retries=retries, timeout=timeout, use_cache=use_cache, **kwargs)
+            for name, kwargs in calls.items()
+        }
+        for name, future in futures.items():
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.warning(f"Batch valuation table {name} failed: {e}")
+                result = None
+            tables[name] = result if isinstance(result, pd.DataFrame) and not result.empty else None
+    return tables
+
+
+def _normalize_codes(series: pd.Series) -> pd.Series:
+    return series.astype(str).str.strip().str.zfill(6)
+
+
+def _select(df: Optional[pd.DataFrame], code_column: str, columns: Dict[str, str]) -> pd.DataFrame:
+    """取出需要的列并按代码去重（同一代码保留最后一行），接口没有返回的列为NaN"""
+    if df is None or code_column not in df.columns:
+        return pd.DataFrame(columns=['代码'] + list(columns.values()))
+    selected = df.reindex(columns=[code_column] + list(columns)).rename(columns={code_column: '代码', **columns})
+    selected['代码'] = _normalize_codes(selected['代码'])
+    return selected.drop_duplicates('代码', keep='last')
+
+
+def _numeric(df: pd.DataFrame, column: str) -> np.ndarray:
+    return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype='float64')
+
+
+def compute_batch_valuation(tables: Dict[str, Optional[pd.DataFrame]], report_date: str) -> pd.DataFrame:
+    """
+    合并实时行情和报告期整表，计算全部A股的估值指标（列见 BATCH_VALUATION_COLUMNS）
+    以实时行情为准：每只在行情表中的股票输出一行，没有该报告期财务数据的股票估值指标为NaN
+    """
+    df = _select(tables.get(SPOT_FUNCTION), '代码', {column: column for column in SPOT_COLUMNS if column != '代码'})
+    for name, columns in REPORT_TABLES.items():
+        df = df.merge(_select(tables.get(name), '股票代码', columns), on='代码', how='left')
+
+    price = _numeric(df, '最新价')
+    market_value = _numeric(df, '总市值')
+    eps = _numeric(df, '每股收益')
+    bps = _numeric(df, '每股净资产')
+    cps = _numeric(df, '每股经营现金流量')
+    roe = _numeric(df, '净资产收益率')
+    growth_rate = _numeric(df, '净利润同比增长')
+    revenue = _numeric(df, '营业总收入')
+    net_profit = _numeric(df, '净利润')
+    operating_profit = _numeric(df, '营业利润')
+
+    def ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        return np.round(np.where((denominator > DENOMINATOR_THRESHOLD) & (numerator > 0), numerator / denominator, np.nan), 2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['PE_动态'] = ratio(price, eps)
+        df['PB_动态'] = ratio(price, bps)
+        df['PCF_动态'] = ratio(price, cps)
+        pe, pb = df['PE_动态'].to_numpy(), df['PB_动态'].to_numpy()
+        df['PEG'] = np.round(np.where((growth_rate > DENOMINATOR_THRESHOLD) & (pe > 0), pe / growth_rate, np.nan), 2)
+        df['市净率×ROE'] = np.round(np.where(~np.isnan(roe) & (pb > 0), pb * roe, np.nan), 2)
+        df['市销率'] = ratio(market_value, revenue)
+        df['净利率'] = np.round(np.where(revenue > 0, net_profit / revenue * 100, np.nan), 2)
+        df['营业利润率'] = np.round(np.where(revenue > 0, operating_profit / revenue * 100, np.nan), 2)
+
+    for column in ('最新价', '涨跌幅', '总市值', '流通市值', '每股收益', '每股净资产', '每股经营现金流量',
+                   '净资产收益率', '净利润同比增长', '销售毛利率', '资产负债率'):
+        df[column] = pd.to_numeric(df[column], errors='coerce')
+    df['报告期'] = pd.Timestamp(report_date).strftime('%Y-%m-%d')
+    df['最新公告日期'] = pd.to_datetime(df['最新公告日期'], errors='coerce').dt.strftime('%Y-%m-%d')
+    return df[BATCH_VALUATION_COLUMNS].reset_index(drop=True)